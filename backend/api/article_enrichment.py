@@ -6,6 +6,11 @@ Provides API endpoints for managing and testing article enrichment features.
 Endpoints:
 - POST /api/articles/{article_id}/enrich - Enrich a single article
 - POST /api/articles/enrich-batch - Enrich multiple articles
+- POST /api/articles/enrichment/jobs - Start a resumable batch enrichment job
+- GET /api/articles/enrichment/jobs - List recent batch jobs
+- GET /api/articles/enrichment/jobs/{job_id} - Job progress, throughput and failures
+- POST /api/articles/enrichment/jobs/{job_id}/resume - Resume an interrupted job
+- POST /api/articles/enrichment/jobs/{job_id}/cancel - Cancel a running job
 - GET /api/articles/enrichment/stats - Get enrichment statistics
 - POST /api/articles/enrichment/migrate - Migrate existing articles
 - POST /api/articles/enrichment/test - Test enrichment on a URL
@@ -16,12 +21,13 @@ Rate Limiting: Applied
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from pydantic import BaseModel, HttpUrl
-from typing import Optional, List
+from pydantic import BaseModel, HttpUrl, Field
+from typing import Optional, List, Dict, Any
 from loguru import logger
 
-from database import get_db
-from utils.auth import get_current_user
+from database import get_db, User
+from database_enrichment_jobs import EnrichmentJob
+from utils.auth_selector import get_current_user
 from services.article_enrichment_service import (
     ArticleEnrichmentService,
     enrich_article_by_url,
@@ -31,6 +37,16 @@ from services.feed_aggregator_enriched import (
     add_enrichment_columns_to_articles,
     migrate_existing_articles
 )
+from services.enrichment_job_service import (
+    MAX_JOB_ARTICLES,
+    MAX_JOB_CONCURRENCY,
+    cancel_enrichment_job,
+    create_enrichment_job,
+    filter_owned_article_ids,
+    get_enrichment_job_progress,
+    is_job_resumable,
+    start_enrichment_job,
+)
 
 router = APIRouter()
 
@@ -47,7 +63,14 @@ class EnrichArticleRequest(BaseModel):
 
 class EnrichBatchRequest(BaseModel):
     """Request to enrich multiple articles"""
-    article_ids: List[int]
+    article_ids: List[int] = Field(..., min_length=1, max_length=MAX_JOB_ARTICLES)
+    force_refresh: bool = False
+
+
+class EnrichmentJobRequest(BaseModel):
+    """Request to start a batch enrichment job"""
+    article_ids: List[int] = Field(..., min_length=1, max_length=MAX_JOB_ARTICLES)
+    concurrency: Optional[int] = Field(default=None, ge=1, le=MAX_JOB_CONCURRENCY)
     force_refresh: bool = False
 
 
@@ -65,6 +88,42 @@ class EnrichmentStatsResponse(BaseModel):
     summaries_generated: int
     quality_failures: int
     cache_size: int
+    persistent_cache_hits: int = 0
+    persistent_cache_misses: int = 0
+
+
+class StageLatency(BaseModel):
+    """Latency of one enrichment stage"""
+    count: int
+    avg_ms: float
+    max_ms: float
+
+
+class EnrichmentJobResponse(BaseModel):
+    """Batch enrichment job progress"""
+    job_id: int
+    status: str
+    total: int
+    processed: int
+    succeeded: int
+    skipped: int
+    failed: int
+    progress_percent: float
+    concurrency: int
+    force_refresh: bool
+    elapsed_seconds: float
+    throughput_per_sec: float
+    eta_seconds: Optional[float] = None
+    stage_latency: Dict[str, StageLatency] = {}
+    failure_breakdown: Dict[str, int] = {}
+    recent_failures: List[Dict[str, Any]] = []
+    runs: int = 0
+    error_message: Optional[str] = None
+    ignored_article_ids: int = 0
+    created_at: Optional[str] = None
+    started_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    completed_at: Optional[str] = None
 
 
 class ArticleEnrichmentResponse(BaseModel):
@@ -90,7 +149,7 @@ class ArticleEnrichmentResponse(BaseModel):
 @router.post("/articles/{article_id}/enrich", response_model=ArticleEnrichmentResponse)
 async def enrich_article(
     article_id: int,
-    current_user: dict = Depends(get_current_user),
+    user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -109,7 +168,7 @@ async def enrich_article(
     **Rate Limit**: 30 requests per minute
     """
     try:
-        user_id = current_user["id"]
+        user_id = user.id
 
         # Get article
         result = db.execute(
@@ -182,7 +241,7 @@ async def enrich_article(
 @router.post("/articles/enrich/test", response_model=ArticleEnrichmentResponse)
 async def test_enrichment(
     request: EnrichArticleRequest,
-    current_user: dict = Depends(get_current_user)
+    user: User = Depends(get_current_user)
 ):
     """
     Test article enrichment on a URL
@@ -222,98 +281,41 @@ async def test_enrichment(
 @router.post("/articles/enrich-batch")
 async def enrich_batch(
     request: EnrichBatchRequest,
-    background_tasks: BackgroundTasks,
-    current_user: dict = Depends(get_current_user),
+    user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Enrich multiple articles in batch
 
-    Processes multiple articles in the background.
-    Returns immediately with a task ID.
+    Processes multiple articles in the background as a batch enrichment job.
+    Returns immediately with a job ID; poll /articles/enrichment/jobs/{job_id}
+    for progress.
 
     **Authentication Required**: Yes
     **Rate Limit**: 5 requests per minute
     """
     try:
-        user_id = current_user["id"]
+        user_id = user.id
 
         # Verify articles exist and belong to user
-        placeholders = ','.join([f':id{i}' for i in range(len(request.article_ids))])
-        params = {f'id{i}': aid for i, aid in enumerate(request.article_ids)}
-        params['user_id'] = user_id
-
-        result = db.execute(
-            text(f"""
-                SELECT COUNT(*) as count
-                FROM articles
-                WHERE id IN ({placeholders}) AND user_id = :user_id
-            """),
-            params
-        ).fetchone()
+        article_ids = filter_owned_article_ids(db, user_id, request.article_ids)
 
-        if result.count != len(request.article_ids):
+        if len(article_ids) != len(set(request.article_ids)):
             raise HTTPException(
                 status_code=400,
                 detail="Some articles not found or don't belong to user"
             )
 
-        # Add background task
-        async def enrich_articles_background():
-            service = ArticleEnrichmentService()
-            enriched_count = 0
-
-            for article_id in request.article_ids:
-                try:
-                    # Get article
-                    article_result = db.execute(
-                        text("""
-                            SELECT id, link, content
-                            FROM articles
-                            WHERE id = :article_id
-                        """),
-                        {"article_id": article_id}
-                    ).fetchone()
-
-                    if article_result:
-                        # Enrich
-                        enriched = await service.enrich_article(
-                            url=article_result.link,
-                            existing_content=article_result.content
-                        )
-
-                        # Update database
-                        db.execute(
-                            text("""
-                                UPDATE articles
-                                SET
-                                    content = COALESCE(:content, content),
-                                    category = COALESCE(:category, category),
-                                    summary = COALESCE(:summary, summary)
-                                WHERE id = :article_id
-                            """),
-                            {
-                                "article_id": article_id,
-                                "content": enriched.get("content_for_ai"),
-                                "category": enriched.get("category"),
-                                "summary": enriched.get("auto_summary"),
-                            }
-                        )
-                        enriched_count += 1
-
-                except Exception as e:
-                    logger.error(f"Error enriching article {article_id}: {e}")
-                    continue
-
-            db.commit()
-            logger.info(f"Batch enrichment complete: {enriched_count}/{len(request.article_ids)} articles")
-
-        background_tasks.add_task(enrich_articles_background)
+        job = create_enrichment_job(
+            db, user_id, article_ids, force_refresh=request.force_refresh
+        )
+        start_enrichment_job(job.id)
 
         return {
             "success": True,
-            "message": f"Enriching {len(request.article_ids)} articles in background",
-            "article_count": len(request.article_ids)
+            "message": f"Enriching {len(article_ids)} articles in background",
+            "article_count": len(article_ids),
+            "job_id": job.id
         }
 
     except HTTPException:
@@ -323,9 +325,159 @@ async def enrich_batch(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/articles/enrichment/jobs", response_model=EnrichmentJobResponse, status_code=202)
+async def create_enrichment_job_endpoint(
+    request: EnrichmentJobRequest,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Start a batch enrichment job
+
+    Accepts up to 10,000 article IDs and enriches them in the background with
+    bounded parallel fetching. Progress is checkpointed, so the job can be
+    resumed after a restart or cancellation. IDs that do not exist or belong
+    to another user are ignored and counted in `ignored_article_ids`.
+
+    **Authentication Required**: Yes
+    **Rate Limit**: 5 requests per minute
+    """
+    try:
+        article_ids = filter_owned_article_ids(db, user.id, request.article_ids)
+
+        if not article_ids:
+            raise HTTPException(status_code=404, detail="No matching articles found")
+
+        job = create_enrichment_job(
+            db,
+            user.id,
+            article_ids,
+            concurrency=request.concurrency,
+            force_refresh=request.force_refresh
+        )
+        start_enrichment_job(job.id)
+
+        progress = get_enrichment_job_progress(db, job.id, user.id)
+        progress["ignored_article_ids"] = len(request.article_ids) - len(article_ids)
+
+        return EnrichmentJobResponse(**progress)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating enrichment job: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/articles/enrichment/jobs", response_model=List[EnrichmentJobResponse])
+async def list_enrichment_jobs(
+    limit: int = 20,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    List the user's most recent batch enrichment jobs
+
+    **Authentication Required**: Yes
+    """
+    jobs = (
+        db.query(EnrichmentJob.id)
+        .filter(EnrichmentJob.user_id == user.id)
+        .order_by(EnrichmentJob.created_at.desc())
+        .limit(min(max(limit, 1), 100))
+        .all()
+    )
+
+    return [
+        EnrichmentJobResponse(**get_enrichment_job_progress(db, job.id, user.id))
+        for job in jobs
+    ]
+
+
+@router.get("/articles/enrichment/jobs/{job_id}", response_model=EnrichmentJobResponse)
+async def get_enrichment_job(
+    job_id: int,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get batch enrichment job progress
+
+    Reports counters, throughput (articles/sec), ETA, per-stage latency
+    (load, cache_lookup, fetch, extract, analyze, summarize, persist, total)
+    and a breakdown of failures by category.
+
+    **Authentication Required**: Yes
+    """
+    progress = get_enrichment_job_progress(db, job_id, user.id)
+    if not progress:
+        raise HTTPException(status_code=404, detail="Enrichment job not found")
+
+    return EnrichmentJobResponse(**progress)
+
+
+@router.post("/articles/enrichment/jobs/{job_id}/resume", response_model=EnrichmentJobResponse)
+async def resume_enrichment_job(
+    job_id: int,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Resume a cancelled, failed or interrupted job from its last checkpoint
+
+    **Authentication Required**: Yes
+    """
+    job = db.query(EnrichmentJob).filter(
+        EnrichmentJob.id == job_id,
+        EnrichmentJob.user_id == user.id
+    ).first()
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Enrichment job not found")
+
+    if not is_job_resumable(job):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Job cannot be resumed while {job.status}"
+        )
+
+    start_enrichment_job(job.id)
+    logger.info(f"Resuming enrichment job {job_id} at {job.processed}/{job.total}")
+
+    return EnrichmentJobResponse(**get_enrichment_job_progress(db, job_id, user.id))
+
+
+@router.post("/articles/enrichment/jobs/{job_id}/cancel", response_model=EnrichmentJobResponse)
+async def cancel_enrichment_job_endpoint(
+    job_id: int,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Cancel a running job
+
+    Articles already in flight finish; progress is kept so the job can be
+    resumed later.
+
+    **Authentication Required**: Yes
+    """
+    job = db.query(EnrichmentJob).filter(
+        EnrichmentJob.id == job_id,
+        EnrichmentJob.user_id == user.id
+    ).first()
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Enrichment job not found")
+
+    if not cancel_enrichment_job(db, job):
+        raise HTTPException(status_code=409, detail=f"Job is already {job.status}")
+
+    return EnrichmentJobResponse(**get_enrichment_job_progress(db, job_id, user.id))
+
+
 @router.get("/articles/enrichment/stats", response_model=EnrichmentStatsResponse)
 async def get_enrichment_stats(
-    current_user: dict = Depends(get_current_user)
+    user: User = Depends(get_current_user)
 ):
     """
     Get enrichment service statistics
@@ -350,7 +502,7 @@ async def get_enrichment_stats(
 async def migrate_articles(
     request: MigrateArticlesRequest,
     background_tasks: BackgroundTasks,
-    current_user: dict = Depends(get_current_user)
+    user: User = Depends(get_current_user)
 ):
     """
     Migrate existing articles to add enrichment data
@@ -367,10 +519,13 @@ async def migrate_articles(
 
     **Authentication Required**: Yes
     **Rate Limit**: 3 requests per minute
-    **Admin Only**: Yes (optional - can be restricted)
+    **Admin Only**: Yes (user_id selects whose articles to migrate)
     """
+    if not user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin privileges required")
+
     try:
-        user_id = request.user_id or current_user["id"]
+        user_id = request.user_id or user.id
 
         # Add background task
         async def migrate_background():
@@ -395,7 +550,7 @@ async def migrate_articles(
 
 @router.post("/articles/enrichment/init-db")
 async def initialize_enrichment_database(
-    current_user: dict = Depends(get_current_user)
+    user: User = Depends(get_current_user)
 ):
     """
     Initialize database for article enrichment
@@ -404,12 +559,12 @@ async def initialize_enrichment_database(
     This is a one-time setup operation.
 
     **Authentication Required**: Yes
-    **Admin Only**: Yes (recommended)
+    **Admin Only**: Yes
     """
-    try:
-        # Check if user is admin (optional - implement your admin check)
-        # For now, allow any authenticated user
+    if not user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin privileges required")
 
+    try:
         add_enrichment_columns_to_articles()
 
         return {
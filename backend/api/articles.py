@@ -18,6 +18,16 @@ from database import get_db, Article, User  # noqa: E402
 from src.aggregators import RSSAggregator  # noqa: E402
 from src.utils import ConfigLoader  # noqa: E402
 from utils.auth_selector import get_current_user as get_current_user_dependency  # noqa: E402
+from services.article_enrichment_service import (  # noqa: E402
+    ensure_article_enriched,
+    is_lazy_enrichment_enabled,
+)
+from services.corpus_stats_service import (  # noqa: E402
+    TREND_RETENTION_HOURS,
+    get_trending_topics as get_corpus_trending_topics,
+    record_documents,
+)
+from api.feeds_enhanced import invalidate_user_feeds  # noqa: E402
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -372,12 +382,54 @@ async def get_saved_count(
         )
 
 
+@router.get("/trending-topics")
+async def get_trending_topics(
+    hours: int = Query(24, ge=1, le=TREND_RETENTION_HOURS),
+    limit: int = Query(20, ge=1, le=100),
+    user: User = Depends(get_current_user_dependency),
+    db: Session = Depends(get_db),
+):
+    """
+    Get trending topics across all users for the last N hours.
+
+    Reads the hourly topic counters maintained at ingest, so the cost does
+    not grow with the number of stored articles.
+
+    Args:
+        hours: Time window in hours (max one week)
+        limit: Maximum number of topics
+        user: Current authenticated user
+        db: Database session
+
+    Returns:
+        Window info and topics with mention counts, share and lift
+    """
+    try:
+        return {"success": True, **get_corpus_trending_topics(db, hours=hours, limit=limit)}
+
+    except Exception as e:
+        logger.error(f"Error retrieving trending topics: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="An error occurred while retrieving trending topics",
+        )
+
+
 @router.get("/{article_id}", response_model=ArticleResponse)
 async def get_article(article_id: int, db: Session = Depends(get_db)):
-    """Get a single article by ID"""
+    """Get a single article by ID
+
+    In lazy enrichment mode the first open enriches the article (full text,
+    image, summary) and persists the result; later opens read it back.
+    """
     article = db.query(Article).filter(Article.id == article_id).first()
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
+
+    if is_lazy_enrichment_enabled():
+        if await ensure_article_enriched(article_id):
+            db.refresh(article)
+
     return article
 
 
@@ -400,6 +452,7 @@ async def fetch_articles(request: FetchRequest, db: Session = Depends(get_db)):
 
         # Store in database (avoid duplicates)
         new_count = 0
+        new_articles = []
         for article_data in articles:
             try:
                 # Check if already exists
@@ -428,6 +481,7 @@ async def fetch_articles(request: FetchRequest, db: Session = Depends(get_db)):
                 db.add(article)
                 db.flush()  # Flush to check for errors without committing
                 new_count += 1
+                new_articles.append(article_data)
 
             except Exception as article_error:
                 # Skip this article if there's an error
@@ -439,6 +493,9 @@ async def fetch_articles(request: FetchRequest, db: Session = Depends(get_db)):
         # Final commit
         db.commit()
 
+        # Update corpus term statistics (topics, trending)
+        record_documents(new_articles)
+
         return {
             "success": True,
             "total_fetched": len(articles),
@@ -505,6 +562,7 @@ async def save_article(
         article.bookmarked = True
         db.commit()
         db.refresh(article)
+        await invalidate_user_feeds(user.id, "articles")
 
         logger.info(f"Article {article.id} bookmarked by user {user.id}")
 
@@ -556,6 +614,7 @@ async def unsave_article(
         article.bookmarked = False
         db.commit()
         db.refresh(article)
+        await invalidate_user_feeds(user.id, "articles")
 
         logger.info(f"Article {article.id} unbookmarked by user {user.id}")
 
@@ -593,6 +652,7 @@ async def toggle_bookmark(article_id: int, db: Session = Depends(get_db)):
 
     article.bookmarked = not article.bookmarked
     db.commit()
+    await invalidate_user_feeds(article.user_id, "articles")
 
     return {"bookmarked": article.bookmarked}
 
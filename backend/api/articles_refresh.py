@@ -26,6 +26,8 @@ from loguru import logger
 from database import get_db, Article, User
 from utils.auth_selector import get_current_user as get_current_user_dependency
 from config.redis_config import get_async_redis_client, RedisConfig
+from services.corpus_stats_service import record_documents
+from api.feeds_enhanced import invalidate_user_feeds
 
 # Import RSS aggregator for optional fetch
 from src.aggregators.rss_aggregator import RSSAggregator
@@ -125,27 +127,9 @@ async def set_user_last_refresh(user_id: int, timestamp: datetime) -> bool:
 
 async def invalidate_articles_cache(user_id: int) -> int:
     """Invalidate article cache for user after refresh"""
-    try:
-        redis = await get_async_redis_client()
-
-        # Invalidate all article-related cache for this user
-        patterns = [
-            f"feeds:recent:{user_id}:*",
-            f"feeds:articles:{user_id}:*",
-            f"feeds:list:{user_id}:*",
-        ]
-
-        total_invalidated = 0
-        for pattern in patterns:
-            keys = await redis.keys(pattern)
-            if keys:
-                await redis.delete(*keys)
-                total_invalidated += len(keys)
-
-        return total_invalidated
-    except Exception as e:
-        logger.warning(f"Failed to invalidate cache: {e}")
-        return 0
+    # Feed listings, per-feed articles and recent articles are all tagged
+    # with the user's feeds tag (see api/feeds_enhanced.py)
+    return await invalidate_user_feeds(user_id)
 
 
 # ============================================================================
@@ -195,6 +179,7 @@ async def trigger_rss_fetch(db: Session, user_id: int) -> Dict[str, Any]:
 
         # Store new articles in database
         new_count = 0
+        new_articles = []
         for article_data in articles:
             try:
                 # Check if already exists
@@ -220,6 +205,7 @@ async def trigger_rss_fetch(db: Session, user_id: int) -> Dict[str, Any]:
                 )
                 db.add(article)
                 new_count += 1
+                new_articles.append(article_data)
 
             except Exception as e:
                 logger.warning(f"Error storing article: {e}")
@@ -228,6 +214,9 @@ async def trigger_rss_fetch(db: Session, user_id: int) -> Dict[str, Any]:
         # Commit all new articles
         db.commit()
 
+        # Update corpus term statistics (topics, trending)
+        record_documents(new_articles)
+
         logger.info(f"RSS fetch for user {user_id}: {new_count} new articles from {len(articles)} total")
 
         return {
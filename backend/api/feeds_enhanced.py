@@ -19,13 +19,14 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 import time
 import hashlib
-import json
 from loguru import logger
 
 from database import get_db, User, Article
 from utils.auth_selector import get_current_user as get_current_user_dependency
 from utils.feed_validator import validate_feed, parse_feed_metadata, get_feed_preview_items
-from config.redis_config import get_async_redis_client, RedisConfig
+from config.redis_config import RedisConfig
+from utils.cache_manager import get_cache, invalidate_tags
+from utils.data_version import bump_data_version
 
 router = APIRouter()
 
@@ -133,53 +134,460 @@ class FeedValidationDetailedResponse(BaseModel):
 # CACHE HELPERS
 # ============================================================================
 
+# Keys live under "feeds:" (policy in utils/cache_manager.py)
+feeds_cache = get_cache("feeds")
+
 
 async def get_cached_data(key: str) -> Optional[Any]:
-    """Get data from Redis cache"""
-    try:
-        redis = await get_async_redis_client()
-        data = await redis.get(key)
-        if data:
-            logger.debug(f"Cache HIT: {key}")
-            return json.loads(data)
-        logger.debug(f"Cache MISS: {key}")
-        return None
-    except Exception as e:
-        logger.warning(f"Redis get failed: {e}")
-        return None
+    """Get data from the feeds cache"""
+    return await feeds_cache.get(key)
 
 
-async def set_cached_data(key: str, data: Any, ttl: int = 300) -> bool:
-    """Set data in Redis cache"""
-    try:
-        redis = await get_async_redis_client()
-        await redis.setex(key, ttl, json.dumps(data, default=str))
-        logger.debug(f"Cache SET: {key} (TTL: {ttl}s)")
-        return True
-    except Exception as e:
-        logger.warning(f"Redis set failed: {e}")
-        return False
+async def set_cached_data(
+    key: str,
+    data: Any,
+    ttl: int = 300,
+    tags: Optional[List[str]] = None
+) -> bool:
+    """Set data in the feeds cache, registering the key under tags"""
+    return await feeds_cache.set(key, data, ttl=ttl, tags=tags)
 
 
-async def invalidate_cache(pattern: str) -> int:
-    """Invalidate cache keys matching pattern"""
-    try:
-        redis = await get_async_redis_client()
-        keys = await redis.keys(pattern)
-        if keys:
-            await redis.delete(*keys)
-            logger.info(f"Invalidated {len(keys)} cache keys: {pattern}")
-            return len(keys)
-        return 0
-    except Exception as e:
-        logger.warning(f"Cache invalidation failed: {e}")
+def user_feeds_tag(user_id: int) -> str:
+    """Cache tag covering all of a user's feed/article listings"""
+    return f"user:{user_id}:feeds"
+
+
+async def invalidate_user_feeds(user_id: Optional[int], *scopes: str) -> int:
+    """
+    Drop a user's cached feed/article listings, then bump their data versions
+
+    In this order, so a client that sees the new ETag never gets a listing
+    cached before the change.
+
+    Args:
+        user_id: Owner of the changed feeds/articles (None = nothing to do)
+        *scopes: Data version scopes that changed (default: articles, feeds)
+
+    Returns:
+        Number of cache keys invalidated
+    """
+    if user_id is None:
         return 0
 
+    count = await invalidate_tags(user_feeds_tag(user_id))
+    await bump_data_version(user_id, *(scopes or ("articles", "feeds")))
+    return count
+
 
 def generate_cache_key(*parts: Any) -> str:
-    """Generate consistent cache key"""
-    key_str = ":".join(str(p) for p in parts)
-    return f"feeds:{key_str}"
+    """Generate consistent cache key (within the feeds namespace)"""
+    return ":".join(str(p) for p in parts)
+
+
+# ============================================================================
+# LISTING QUERIES (shared with cache warming, see services/cache_warmer.py)
+# ============================================================================
+
+# Recent articles pages change with every aggregation cycle
+RECENT_ARTICLES_TTL = 60
+
+SYSTEM_SOURCES_CACHE_KEY = generate_cache_key("system-sources", "all")
+
+
+def feed_list_cache_key(
+    user_id: int,
+    limit: int = 20,
+    offset: int = 0,
+    sort_by: str = "created_at",
+    sort_order: str = "desc",
+    active_only: Optional[bool] = None,
+    health_status: Optional[str] = None,
+    include_article_count: bool = True
+) -> str:
+    """Cache key of a feed listing page (defaults match the endpoint's)"""
+    return generate_cache_key(
+        "list",
+        user_id,
+        limit,
+        offset,
+        sort_by,
+        sort_order,
+        active_only,
+        health_status,
+        include_article_count
+    )
+
+
+def build_feed_list_page(
+    db: Session,
+    user_id: int,
+    limit: int = 20,
+    offset: int = 0,
+    sort_by: str = "created_at",
+    sort_order: str = "desc",
+    active_only: Optional[bool] = None,
+    health_status: Optional[str] = None,
+    include_article_count: bool = True
+) -> Dict[str, Any]:
+    """
+    Query one page of a user's feeds with statistics
+
+    Returns:
+        PaginatedFeedsResponse as a JSON-compatible dict
+    """
+    # Build query with filters
+    filters = [text("user_id = :user_id")]
+    params = {"user_id": user_id}
+
+    if active_only is not None:
+        filters.append(text("is_active = :is_active"))
+        params["is_active"] = active_only
+
+    if health_status:
+        filters.append(text("health_status = :health_status"))
+        params["health_status"] = health_status
+
+    where_clause = " AND ".join(str(f) for f in filters)
+
+    # Get total count
+    count_query = f"""
+        SELECT COUNT(*) as total
+        FROM user_feeds
+        WHERE {where_clause}
+    """
+    total_result = db.execute(text(count_query), params).fetchone()
+    total_count = total_result.total if total_result else 0
+
+    # Validate sort parameters
+    valid_sort_fields = {
+        "name": "feed_name",
+        "created_at": "created_at",
+        "updated_at": "updated_at",
+        "article_count": "total_items_fetched"  # Fallback to stored count
+    }
+
+    sort_field = valid_sort_fields.get(sort_by, "created_at")
+    sort_direction = "DESC" if sort_order.lower() == "desc" else "ASC"
+
+    # Get feeds
+    feeds_query = f"""
+        SELECT *
+        FROM user_feeds
+        WHERE {where_clause}
+        ORDER BY {sort_field} {sort_direction}
+        LIMIT :limit OFFSET :offset
+    """
+
+    params["limit"] = limit
+    params["offset"] = offset
+
+    feeds = db.execute(text(feeds_query), params).fetchall()
+
+    # Convert to list with article counts
+    feeds_list = []
+    for feed in feeds:
+        feed_dict = {
+            "id": feed.id,
+            "feed_url": feed.feed_url,
+            "feed_name": feed.feed_name,
+            "feed_description": feed.feed_description,
+            "feed_type": feed.feed_type,
+            "website_url": feed.website_url,
+            "update_frequency": feed.update_frequency,
+            "last_fetched_at": feed.last_fetched_at,
+            "last_successful_fetch": feed.last_successful_fetch,
+            "health_status": feed.health_status,
+            "error_message": feed.error_message,
+            "total_items_fetched": feed.total_items_fetched,
+            "is_active": feed.is_active,
+            "created_at": feed.created_at,
+            "updated_at": feed.updated_at,
+            "article_count": 0
+        }
+
+        # Get live article count if requested
+        if include_article_count:
+            count_result = db.execute(
+                text("""
+                    SELECT COUNT(*) as count
+                    FROM articles
+                    WHERE source = :source AND user_id = :user_id
+                """),
+                {"source": feed.feed_name, "user_id": user_id}
+            ).fetchone()
+
+            if count_result:
+                feed_dict["article_count"] = count_result.count
+
+        feeds_list.append(FeedWithStats(**feed_dict))
+
+    # Calculate statistics
+    stats_query = f"""
+        SELECT
+            health_status,
+            COUNT(*) as count
+        FROM user_feeds
+        WHERE {where_clause}
+        GROUP BY health_status
+    """
+    stats_result = db.execute(text(stats_query), params).fetchall()
+
+    health_breakdown = {row.health_status: row.count for row in stats_result}
+
+    response = PaginatedFeedsResponse(
+        feeds=feeds_list,
+        pagination={
+            "limit": limit,
+            "offset": offset,
+            "total": total_count,
+            "has_more": (offset + limit) < total_count,
+            "page": (offset // limit) + 1 if limit > 0 else 1,
+            "total_pages": (total_count + limit - 1) // limit if limit > 0 else 1
+        },
+        statistics={
+            "total_feeds": total_count,
+            "health_breakdown": health_breakdown,
+            "active_feeds": sum(1 for f in feeds_list if f.is_active),
+            "healthy_feeds": health_breakdown.get("healthy", 0)
+        }
+    )
+
+    return response.model_dump(mode='json')
+
+
+def recent_articles_cache_key(
+    user_id: int,
+    limit: int = 20,
+    offset: int = 0,
+    category: Optional[str] = None,
+    source: Optional[str] = None,
+    feed_ids: Optional[str] = None,
+    search: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    sort_by: str = "published",
+    sort_order: str = "desc"
+) -> str:
+    """Cache key of a recent articles page (defaults match the endpoint's)"""
+    return generate_cache_key(
+        "recent",
+        user_id,
+        limit,
+        offset,
+        category or "",
+        source or "",
+        feed_ids or "",
+        search or "",
+        date_from or "",
+        date_to or "",
+        sort_by,
+        sort_order
+    )
+
+
+def build_recent_articles_page(
+    db: Session,
+    user_id: int,
+    limit: int = 20,
+    offset: int = 0,
+    category: Optional[str] = None,
+    source: Optional[str] = None,
+    feed_ids: Optional[str] = None,
+    search: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    sort_by: str = "published",
+    sort_order: str = "desc"
+) -> Dict[str, Any]:
+    """
+    Query one page of a user's recent articles
+
+    Returns:
+        PaginatedArticlesResponse as a JSON-compatible dict
+    """
+    # Build filters
+    filters = ["user_id = :user_id"]
+    params = {
+        "user_id": user_id,
+        "limit": limit,
+        "offset": offset
+    }
+
+    # Category filter
+    if category:
+        filters.append("category = :category")
+        params["category"] = category
+
+    # Source filter
+    if source:
+        filters.append("source = :source")
+        params["source"] = source
+
+    # Feed IDs filter
+    if feed_ids:
+        feed_id_list = [int(fid.strip()) for fid in feed_ids.split(",") if fid.strip().isdigit()]
+        if feed_id_list:
+            # Get feed names for these IDs
+            feeds_result = db.execute(
+                text("""
+                    SELECT feed_name FROM user_feeds
+                    WHERE id IN :feed_ids AND user_id = :user_id
+                """),
+                {"feed_ids": tuple(feed_id_list), "user_id": user_id}
+            ).fetchall()
+
+            if feeds_result:
+                feed_names = [row.feed_name for row in feeds_result]
+                placeholders = ",".join([f":feed_{i}" for i in range(len(feed_names))])
+                filters.append(f"source IN ({placeholders})")
+                for i, name in enumerate(feed_names):
+                    params[f"feed_{i}"] = name
+
+    # Search filter
+    if search:
+        filters.append("(title LIKE :search OR summary LIKE :search)")
+        params["search"] = f"%{search}%"
+
+    # Date filters
+    if date_from:
+        filters.append("published >= :date_from")
+        params["date_from"] = date_from
+
+    if date_to:
+        filters.append("published <= :date_to")
+        params["date_to"] = date_to
+
+    where_clause = " AND ".join(filters)
+
+    # Validate sort parameters
+    valid_sort_fields = {
+        "published": "published",
+        "fetched_at": "fetched_at",
+        "title": "title"
+    }
+    sort_field = valid_sort_fields.get(sort_by, "published")
+    sort_direction = "DESC" if sort_order.lower() == "desc" else "ASC"
+
+    # Get total count
+    count_query = f"""
+        SELECT COUNT(*) as total
+        FROM articles
+        WHERE {where_clause}
+    """
+    total_result = db.execute(text(count_query), params).fetchone()
+    total_count = total_result.total if total_result else 0
+
+    # Get articles
+    articles_query = f"""
+        SELECT
+            id, title, link, summary, source, category,
+            published, bookmarked, fetched_at, image_url
+        FROM articles
+        WHERE {where_clause}
+        ORDER BY {sort_field} {sort_direction}
+        LIMIT :limit OFFSET :offset
+    """
+
+    articles_raw = db.execute(text(articles_query), params).fetchall()
+
+    # Convert to metadata
+    articles = []
+    for article in articles_raw:
+        articles.append(ArticleMetadata(
+            id=article.id,
+            title=article.title,
+            link=article.link,
+            summary=article.summary,
+            source=article.source,
+            category=article.category,
+            published=article.published,
+            bookmarked=article.bookmarked or False,
+            image_url=article.image_url
+        ))
+
+    response = PaginatedArticlesResponse(
+        articles=articles,
+        pagination={
+            "limit": limit,
+            "offset": offset,
+            "total": total_count,
+            "has_more": (offset + limit) < total_count,
+            "page": (offset // limit) + 1 if limit > 0 else 1,
+            "total_pages": (total_count + limit - 1) // limit if limit > 0 else 1
+        },
+        feed_info=None
+    )
+
+    return response.model_dump(mode='json')
+
+
+def load_system_sources() -> Dict[str, Any]:
+    """
+    Load system-wide RSS sources from sources.yaml
+
+    Returns:
+        Sources response (empty if sources.yaml is missing)
+    """
+    # Load from YAML file
+    from pathlib import Path
+    import yaml
+
+    config_path = Path("/Users/ranhui/ai_post/config/sources.yaml")
+
+    if not config_path.exists():
+        config_path = Path("../../config/sources.yaml")
+
+    if not config_path.exists():
+        logger.warning("sources.yaml not found")
+        return {
+            "sources": [],
+            "total_sources": 0,
+            "categories": [],
+            "cached": False
+        }
+
+    # Load sources
+    with open(config_path, "r") as f:
+        config = yaml.safe_load(f)
+
+    rss_feeds = config.get("sources", {}).get("rss_feeds", [])
+
+    # Transform sources
+    sources = []
+    for idx, feed in enumerate(rss_feeds):
+        sources.append({
+            "id": f"system-{idx}",
+            "feed_name": feed.get("name", "Unnamed Source"),
+            "feed_url": feed.get("url", ""),
+            "feed_description": f"Category: {feed.get('category', 'general')}",
+            "category": feed.get("category", "general"),
+            "feed_type": "rss",
+            "health_status": "unknown",
+            "is_active": True,
+            "is_system": True,
+            "update_frequency": 3600,
+            "total_items_fetched": 0,
+        })
+
+    # Get unique categories
+    categories = list(set(s["category"] for s in sources))
+
+    # Calculate statistics
+    category_counts = {}
+    for cat in categories:
+        category_counts[cat] = sum(1 for s in sources if s["category"] == cat)
+
+    response = {
+        "sources": sources,
+        "total_sources": len(sources),
+        "categories": categories,
+        "category_counts": category_counts,
+        "cached": False,
+        "cache_ttl_seconds": RedisConfig.CACHE_TTL_LONG
+    }
+
+    return response
 
 
 # ============================================================================
@@ -214,8 +622,7 @@ async def list_user_feeds_enhanced(
     """
     try:
         # Generate cache key
-        cache_key = generate_cache_key(
-            "list",
+        cache_key = feed_list_cache_key(
             user.id,
             limit,
             offset,
@@ -231,128 +638,30 @@ async def list_user_feeds_enhanced(
         if cached:
             return PaginatedFeedsResponse(**cached)
 
-        # Build query with filters
-        filters = [text("user_id = :user_id")]
-        params = {"user_id": user.id}
-
-        if active_only is not None:
-            filters.append(text("is_active = :is_active"))
-            params["is_active"] = active_only
-
-        if health_status:
-            filters.append(text("health_status = :health_status"))
-            params["health_status"] = health_status
-
-        where_clause = " AND ".join(str(f) for f in filters)
-
-        # Get total count
-        count_query = f"""
-            SELECT COUNT(*) as total
-            FROM user_feeds
-            WHERE {where_clause}
-        """
-        total_result = db.execute(text(count_query), params).fetchone()
-        total_count = total_result.total if total_result else 0
-
-        # Validate sort parameters
-        valid_sort_fields = {
-            "name": "feed_name",
-            "created_at": "created_at",
-            "updated_at": "updated_at",
-            "article_count": "total_items_fetched"  # Fallback to stored count
-        }
-
-        sort_field = valid_sort_fields.get(sort_by, "created_at")
-        sort_direction = "DESC" if sort_order.lower() == "desc" else "ASC"
-
-        # Get feeds
-        feeds_query = f"""
-            SELECT *
-            FROM user_feeds
-            WHERE {where_clause}
-            ORDER BY {sort_field} {sort_direction}
-            LIMIT :limit OFFSET :offset
-        """
-
-        params["limit"] = limit
-        params["offset"] = offset
-
-        feeds = db.execute(text(feeds_query), params).fetchall()
-
-        # Convert to list with article counts
-        feeds_list = []
-        for feed in feeds:
-            feed_dict = {
-                "id": feed.id,
-                "feed_url": feed.feed_url,
-                "feed_name": feed.feed_name,
-                "feed_description": feed.feed_description,
-                "feed_type": feed.feed_type,
-                "website_url": feed.website_url,
-                "update_frequency": feed.update_frequency,
-                "last_fetched_at": feed.last_fetched_at,
-                "last_successful_fetch": feed.last_successful_fetch,
-                "health_status": feed.health_status,
-                "error_message": feed.error_message,
-                "total_items_fetched": feed.total_items_fetched,
-                "is_active": feed.is_active,
-                "created_at": feed.created_at,
-                "updated_at": feed.updated_at,
-                "article_count": 0
-            }
-
-            # Get live article count if requested
-            if include_article_count:
-                count_result = db.execute(
-                    text("""
-                        SELECT COUNT(*) as count
-                        FROM articles
-                        WHERE source = :source AND user_id = :user_id
-                    """),
-                    {"source": feed.feed_name, "user_id": user.id}
-                ).fetchone()
-
-                if count_result:
-                    feed_dict["article_count"] = count_result.count
-
-            feeds_list.append(FeedWithStats(**feed_dict))
-
-        # Calculate statistics
-        stats_query = f"""
-            SELECT
-                health_status,
-                COUNT(*) as count
-            FROM user_feeds
-            WHERE {where_clause}
-            GROUP BY health_status
-        """
-        stats_result = db.execute(text(stats_query), params).fetchall()
-
-        health_breakdown = {row.health_status: row.count for row in stats_result}
-
-        response = PaginatedFeedsResponse(
-            feeds=feeds_list,
-            pagination={
-                "limit": limit,
-                "offset": offset,
-                "total": total_count,
-                "has_more": (offset + limit) < total_count,
-                "page": (offset // limit) + 1 if limit > 0 else 1,
-                "total_pages": (total_count + limit - 1) // limit if limit > 0 else 1
-            },
-            statistics={
-                "total_feeds": total_count,
-                "health_breakdown": health_breakdown,
-                "active_feeds": sum(1 for f in feeds_list if f.is_active),
-                "healthy_feeds": health_breakdown.get("healthy", 0)
-            }
+        data = build_feed_list_page(
+            db,
+            user.id,
+            limit,
+            offset,
+            sort_by,
+            sort_order,
+            active_only,
+            health_status,
+            include_article_count
         )
 
         # Cache response for 5 minutes
-        await set_cached_data(cache_key, response.model_dump(mode='json'), ttl=RedisConfig.CACHE_TTL_MEDIUM)
+        await set_cached_data(
+            cache_key,
+            data,
+            ttl=RedisConfig.CACHE_TTL_MEDIUM,
+            tags=[user_feeds_tag(user.id)]
+        )
+
+        response = PaginatedFeedsResponse(**data)
 
         logger.info(
-            f"User {user.id} listed feeds: {len(feeds_list)} feeds "
+            f"User {user.id} listed feeds: {len(response.feeds)} feeds "
             f"(page {response.pagination['page']}/{response.pagination['total_pages']})"
         )
 
@@ -496,7 +805,12 @@ async def get_feed_articles(
         )
 
         # Cache for 2 minutes (articles change frequently)
-        await set_cached_data(cache_key, response.model_dump(mode='json'), ttl=120)
+        await set_cached_data(
+            cache_key,
+            response.model_dump(mode='json'),
+            ttl=120,
+            tags=[user_feeds_tag(user.id), f"feed:{feed_id}"]
+        )
 
         logger.info(
             f"User {user.id} retrieved {len(articles)} articles from feed {feed_id} "
@@ -556,148 +870,49 @@ async def get_recent_articles_bulk(
     """
     try:
         # Generate cache key
-        cache_key = generate_cache_key(
-            "recent",
+        cache_key = recent_articles_cache_key(
             user.id,
             limit,
             offset,
-            category or "",
-            source or "",
-            feed_ids or "",
-            search or "",
-            date_from or "",
-            date_to or "",
+            category,
+            source,
+            feed_ids,
+            search,
+            date_from,
+            date_to,
             sort_by,
             sort_order
         )
 
-        # Try cache
-        cached = await get_cached_data(cache_key)
-        if cached:
-            return PaginatedArticlesResponse(**cached)
-
-        # Build filters
-        filters = ["user_id = :user_id"]
-        params = {
-            "user_id": user.id,
-            "limit": limit,
-            "offset": offset
-        }
-
-        # Category filter
-        if category:
-            filters.append("category = :category")
-            params["category"] = category
-
-        # Source filter
-        if source:
-            filters.append("source = :source")
-            params["source"] = source
-
-        # Feed IDs filter
-        if feed_ids:
-            feed_id_list = [int(fid.strip()) for fid in feed_ids.split(",") if fid.strip().isdigit()]
-            if feed_id_list:
-                # Get feed names for these IDs
-                feeds_result = db.execute(
-                    text("""
-                        SELECT feed_name FROM user_feeds
-                        WHERE id IN :feed_ids AND user_id = :user_id
-                    """),
-                    {"feed_ids": tuple(feed_id_list), "user_id": user.id}
-                ).fetchall()
-
-                if feeds_result:
-                    feed_names = [row.feed_name for row in feeds_result]
-                    placeholders = ",".join([f":feed_{i}" for i in range(len(feed_names))])
-                    filters.append(f"source IN ({placeholders})")
-                    for i, name in enumerate(feed_names):
-                        params[f"feed_{i}"] = name
-
-        # Search filter
-        if search:
-            filters.append("(title LIKE :search OR summary LIKE :search)")
-            params["search"] = f"%{search}%"
-
-        # Date filters
-        if date_from:
-            filters.append("published >= :date_from")
-            params["date_from"] = date_from
-
-        if date_to:
-            filters.append("published <= :date_to")
-            params["date_to"] = date_to
-
-        where_clause = " AND ".join(filters)
-
-        # Validate sort parameters
-        valid_sort_fields = {
-            "published": "published",
-            "fetched_at": "fetched_at",
-            "title": "title"
-        }
-        sort_field = valid_sort_fields.get(sort_by, "published")
-        sort_direction = "DESC" if sort_order.lower() == "desc" else "ASC"
-
-        # Get total count
-        count_query = f"""
-            SELECT COUNT(*) as total
-            FROM articles
-            WHERE {where_clause}
-        """
-        total_result = db.execute(text(count_query), params).fetchone()
-        total_count = total_result.total if total_result else 0
-
-        # Get articles
-        articles_query = f"""
-            SELECT
-                id, title, link, summary, source, category,
-                published, bookmarked, fetched_at, image_url
-            FROM articles
-            WHERE {where_clause}
-            ORDER BY {sort_field} {sort_direction}
-            LIMIT :limit OFFSET :offset
-        """
-
-        articles_raw = db.execute(text(articles_query), params).fetchall()
-
-        # Convert to metadata
-        articles = []
-        for article in articles_raw:
-            articles.append(ArticleMetadata(
-                id=article.id,
-                title=article.title,
-                link=article.link,
-                summary=article.summary,
-                source=article.source,
-                category=article.category,
-                published=article.published,
-                bookmarked=article.bookmarked or False,
-                image_url=article.image_url
-            ))
+        async def load_recent() -> Dict[str, Any]:
+            data = build_recent_articles_page(
+                db,
+                user.id,
+                limit,
+                offset,
+                category,
+                source,
+                feed_ids,
+                search,
+                date_from,
+                date_to,
+                sort_by,
+                sort_order
+            )
 
-        response = PaginatedArticlesResponse(
-            articles=articles,
-            pagination={
-                "limit": limit,
-                "offset": offset,
-                "total": total_count,
-                "has_more": (offset + limit) < total_count,
-                "page": (offset // limit) + 1 if limit > 0 else 1,
-                "total_pages": (total_count + limit - 1) // limit if limit > 0 else 1
-            },
-            feed_info=None
-        )
+            logger.info(
+                f"User {user.id} retrieved {len(data['articles'])} recent articles "
+                f"(filters: category={category}, search={bool(search)}, page={data['pagination']['page']})"
+            )
 
-        # Cache for 1 minute (balance between freshness and performance)
-        await set_cached_data(cache_key, response.model_dump(mode='json'), ttl=60)
+            return data
 
-        logger.info(
-            f"User {user.id} retrieved {len(articles)} recent articles "
-            f"(filters: category={category}, search={bool(search)}, page={response.pagination['page']})"
+        # Cache for 1 minute (balance between freshness and performance);
+        # concurrent misses for the same page share one query (single-flight)
+        data = await feeds_cache.get_or_set(
+            cache_key, load_recent, ttl=RECENT_ARTICLES_TTL, tags=[user_feeds_tag(user.id)]
         )
-
-        return response
+        return PaginatedArticlesResponse(**data)
 
     except Exception as e:
         logger.error(f"Error getting recent articles: {str(e)}")
@@ -853,70 +1068,18 @@ async def get_system_sources_cached(
     """
     try:
         # Try cache first
-        cache_key = generate_cache_key("system-sources", "all")
+        cache_key = SYSTEM_SOURCES_CACHE_KEY
         cached = await get_cached_data(cache_key)
 
         if cached:
             logger.debug("Returning cached system sources")
             return cached
 
-        # Load from YAML file
-        from pathlib import Path
-        import yaml
-
-        config_path = Path("/Users/ranhui/ai_post/config/sources.yaml")
-
-        if not config_path.exists():
-            config_path = Path("../../config/sources.yaml")
+        response = load_system_sources()
+        sources = response["sources"]
 
-        if not config_path.exists():
-            logger.warning("sources.yaml not found")
-            return {
-                "sources": [],
-                "total_sources": 0,
-                "categories": [],
-                "cached": False
-            }
-
-        # Load sources
-        with open(config_path, "r") as f:
-            config = yaml.safe_load(f)
-
-        rss_feeds = config.get("sources", {}).get("rss_feeds", [])
-
-        # Transform sources
-        sources = []
-        for idx, feed in enumerate(rss_feeds):
-            sources.append({
-                "id": f"system-{idx}",
-                "feed_name": feed.get("name", "Unnamed Source"),
-                "feed_url": feed.get("url", ""),
-                "feed_description": f"Category: {feed.get('category', 'general')}",
-                "category": feed.get("category", "general"),
-                "feed_type": "rss",
-                "health_status": "unknown",
-                "is_active": True,
-                "is_system": True,
-                "update_frequency": 3600,
-                "total_items_fetched": 0,
-            })
-
-        # Get unique categories
-        categories = list(set(s["category"] for s in sources))
-
-        # Calculate statistics
-        category_counts = {}
-        for cat in categories:
-            category_counts[cat] = sum(1 for s in sources if s["category"] == cat)
-
-        response = {
-            "sources": sources,
-            "total_sources": len(sources),
-            "categories": categories,
-            "category_counts": category_counts,
-            "cached": False,
-            "cache_ttl_seconds": RedisConfig.CACHE_TTL_LONG
-        }
+        if not sources:
+            return response
 
         # Cache for 1 hour
         await set_cached_data(cache_key, response, ttl=RedisConfig.CACHE_TTL_LONG)
@@ -955,7 +1118,7 @@ async def invalidate_feeds_cache(
     """
     try:
         # Invalidate user-specific cache
-        count = await invalidate_cache(f"feeds:*:{user.id}:*")
+        count = await invalidate_user_feeds(user.id)
 
         logger.info(f"User {user.id} invalidated {count} feed cache keys")
 
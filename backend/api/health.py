@@ -20,6 +20,9 @@ from loguru import logger
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
 from utils.cache_manager import CacheStats
+from utils.ai_content_cache import AIContentCache
+from utils.llm_rate_limiter import get_rate_limit_stats
+from utils.llm_usage import get_usage_totals
 from utils.query_monitor import query_monitor
 
 router = APIRouter()
@@ -381,11 +384,29 @@ async def get_cache_stats():
     - Connection info
     - Eviction stats
 
+    - AI generation cache hits/misses and estimated API cost saved
+    - LLM tokens and estimated cost today, per operation and model
+
     Useful for monitoring cache effectiveness and tuning TTL values.
     """
     try:
         stats = await CacheStats.get_stats()
 
+        try:
+            stats["ai_generation"] = await AIContentCache.get_stats()
+        except Exception as e:
+            logger.warning(f"Failed to get AI generation cache stats: {e}")
+
+        try:
+            stats["llm_usage_today"] = (await get_usage_totals())[0]
+        except Exception as e:
+            logger.warning(f"Failed to get LLM usage stats: {e}")
+
+        try:
+            stats["llm_rate_limits"] = await get_rate_limit_stats()
+        except Exception as e:
+            logger.warning(f"Failed to get LLM rate limit stats: {e}")
+
         return {
             "success": True,
             "stats": stats,
@@ -13,7 +13,6 @@ All endpoints require authentication via JWT token.
 
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlalchemy.orm import Session
-import asyncio
 from loguru import logger
 
 from database import get_db, Post, User, InstagramImage
@@ -27,6 +26,7 @@ from schemas.instagram import (
     ImageGenerationQuotaResponse
 )
 from services.image_generation_service import ImageGenerationService
+from services.generation_worker import enqueue_image_generation
 
 
 router = APIRouter()
@@ -98,7 +98,7 @@ async def generate_instagram_image(
             )
 
         # Create generation job
-        job_id = ImageGenerationService.create_job(
+        job_id = await ImageGenerationService.create_job(
             post_id=post_id,
             user_id=user.id,
             prompt=prompt,
@@ -106,22 +106,14 @@ async def generate_instagram_image(
             custom_prompt=request.custom_prompt
         )
 
-        # Start background generation
-        # Create new DB session for background task
-        from database import SessionLocal
-        background_db = SessionLocal()
-
-        # Use asyncio.create_task for true async execution
-        asyncio.create_task(
-            ImageGenerationService.generate_image_async(
-                job_id=job_id,
-                post_id=post_id,
-                user_id=user.id,
-                prompt=prompt,
-                style=request.style.value if request.style else "modern",
-                db=background_db,
-                regenerate=request.regenerate
-            )
+        # Queue for the generation workers (any process may run it)
+        await enqueue_image_generation(
+            job_id=job_id,
+            post_id=post_id,
+            user_id=user.id,
+            prompt=prompt,
+            style=request.style.value if request.style else "modern",
+            regenerate=request.regenerate
         )
 
         logger.info(
@@ -185,11 +177,7 @@ async def get_image_generation_status(
         # If job_id provided, use it; otherwise find most recent job for post
         if not job_id:
             # Find active job for this post
-            job_id = None
-            for jid, job_data in ImageGenerationService.active_jobs.items():
-                if job_data["post_id"] == post_id and job_data["user_id"] == user.id:
-                    job_id = jid
-                    break
+            job_id = await ImageGenerationService.find_job_for_post(post_id, user.id)
 
             if not job_id:
                 # No active job, check if image already exists
@@ -209,7 +197,7 @@ async def get_image_generation_status(
                     )
 
         # Get job status
-        status = ImageGenerationService.get_status(job_id)
+        status = await ImageGenerationService.get_status(job_id)
 
         if not status:
             raise HTTPException(
@@ -370,7 +358,7 @@ async def regenerate_instagram_image(
             prompt = "Modern AI technology illustration, vibrant, professional"
 
         # Create job with regenerate=True
-        job_id = ImageGenerationService.create_job(
+        job_id = await ImageGenerationService.create_job(
             post_id=post_id,
             user_id=user.id,
             prompt=prompt,
@@ -378,20 +366,14 @@ async def regenerate_instagram_image(
             custom_prompt=request.custom_prompt
         )
 
-        # Start background generation
-        from database import SessionLocal
-        background_db = SessionLocal()
-
-        asyncio.create_task(
-            ImageGenerationService.generate_image_async(
-                job_id=job_id,
-                post_id=post_id,
-                user_id=user.id,
-                prompt=prompt,
-                style=request.style.value if request.style else "modern",
-                db=background_db,
-                regenerate=True  # Force regenerate
-            )
+        # Queue for the generation workers
+        await enqueue_image_generation(
+            job_id=job_id,
+            post_id=post_id,
+            user_id=user.id,
+            prompt=prompt,
+            style=request.style.value if request.style else "modern",
+            regenerate=True  # Force regenerate
         )
 
         logger.info(f"Started image regeneration for post {post_id}")
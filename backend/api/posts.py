@@ -29,6 +29,18 @@ from utils.auth_selector import get_current_user as get_current_user_dependency
 from utils.encryption import decrypt_api_key
 from utils.social_connection_manager import SocialConnectionManager
 from utils.posts_cache import posts_cache, PostsCache
+from utils.ai_content_cache import AIContentCache, SUMMARY_PLATFORM, is_generation_cache_enabled
+from utils.llm_usage import check_token_quota
+from services.post_generation_service import (
+    PostGenerationService,
+    provider_generation_budget,
+    user_generation_budget,
+)
+from services.article_enrichment_service import (
+    ensure_articles_enriched,
+    is_lazy_enrichment_enabled,
+    load_article_contexts,
+)
 
 # QUOTA MANAGEMENT: Import quota checker
 from middleware.quota_checker import QuotaManager, check_quota_dependency, increment_user_quota
@@ -59,6 +71,11 @@ import logging
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Streamed drafts are re-validated at sentence/line ends, or after this many
+# new characters, rather than on every delta (each check scans the full text)
+STREAM_VALIDATION_INTERVAL = 80
+STREAM_VALIDATION_BOUNDARIES = frozenset(".!?\n")
+
 
 # Pydantic models
 class GenerateRequest(BaseModel):
@@ -128,34 +145,13 @@ def _prepare_articles_data(db: Session, article_ids: List[int]) -> Optional[List
     """
     Fetch and prepare articles for summarization.
 
+    Uses the AI context precomputed at enrichment time when available.
+
     Returns:
         List of article dicts, or None if no articles found
     """
-    articles = db.query(Article).filter(Article.id.in_(article_ids)).all()
-
-    if not articles:
-        return None
-
-    return [
-        {
-            "title": a.title,
-            "link": a.link,
-            "summary": a.summary or "",
-            "source": a.source,
-            "published": a.published,
-        }
-        for a in articles
-    ]
-
-
-def _configure_api_key(api_key: str, ai_provider: str):
-    """Set API key in environment based on provider."""
-    if ai_provider == "openai":
-        os.environ["OPENAI_API_KEY"] = api_key
-    elif ai_provider == "anthropic":
-        os.environ["ANTHROPIC_API_KEY"] = api_key
-    elif ai_provider == "deepseek":
-        os.environ["DEEPSEEK_API_KEY"] = api_key
+    # Stored fields only: precomputed AI context, no full-text processing
+    return load_article_contexts(db, article_ids) or None
 
 
 def _build_platform_config(platforms: List[str]) -> dict:
@@ -197,13 +193,26 @@ def _update_generation_progress(post_id: int, completed_count: int, total_count:
 
 
 async def _generate_platform_content(
+    summarizer: AISummarizer,
     summary: dict,
     platform_config: dict,
-    post_id: int
+    post_id: int,
+    articles_data: Optional[List[dict]] = None,
+    cache_params: Optional[Dict[str, str]] = None,
+    user_id: Optional[int] = None
 ) -> dict:
     """
     Generate content for all enabled platforms in parallel.
 
+    Args:
+        summarizer: Summarizer whose async client generates the posts
+        summary: Article summary
+        platform_config: Platform configurations
+        post_id: Post ID (progress tracking)
+        articles_data: Source articles, used as the generation cache key
+        cache_params: provider/model for the generation cache (None = no cache)
+        user_id: User the generation is for (usage metrics)
+
     Returns:
         Dictionary mapping platform names to generated content
     """
@@ -211,11 +220,21 @@ async def _generate_platform_content(
         if not config.get("enabled"):
             return platform, None
 
-        generator = ContentGenerator(None, {platform: config})
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(None, generator.generate_posts, summary)
+        cache_args = None
+        if cache_params is not None and articles_data:
+            cache_args = {**cache_params, "params": {"max_length": config.get("max_length")}}
+            cached = await AIContentCache.get(articles_data, platform, **cache_args)
+            if cached is not None:
+                return platform, cached
+
+        generator = ContentGenerator(summarizer, {platform: config})
+        result = await generator.generate_posts(summary, user_id=user_id, post_id=post_id)
+        content = result.get(platform, "")
 
-        return platform, result.get(platform, "")
+        if cache_args is not None:
+            await AIContentCache.set(articles_data, platform, content, **cache_args)
+
+        return platform, content
 
     tasks = [
         generate_single_platform(platform, config)
@@ -268,7 +287,7 @@ def _update_post_with_content(post: Post, content: dict, summary: dict, db: Sess
     db.refresh(post)
 
 
-def _save_error_to_post(post_id: int, error_message: str, error_details: Optional[Dict], db: Session):
+async def _save_error_to_post(post_id: int, error_message: str, error_details: Optional[Dict], db: Session):
     """Save error information to post record in database."""
     post = db.query(Post).filter(Post.id == post_id).first()
     if post:
@@ -277,6 +296,7 @@ def _save_error_to_post(post_id: int, error_message: str, error_details: Optiona
         if error_details:
             post.error_details = error_details  # Save structured error as JSON
         db.commit()
+        await PostsCache.invalidate_post_and_list(post_id, post.user_id)
 
 
 async def generate_post_async(
@@ -300,22 +320,34 @@ async def generate_post_async(
             "error_details": None,
         }
 
-        # Configure API
-        _configure_api_key(api_key, ai_provider)
+        # Lazy mode: enrich picked articles on first use
+        if is_lazy_enrichment_enabled():
+            await ensure_articles_enriched(article_ids)
 
         # Get articles
         articles_data = _prepare_articles_data(db, article_ids)
         if not articles_data:
             error_msg = "No articles found"
             _update_job_status(post_id, "failed", 0, "Failed", error_msg)
-            _save_error_to_post(post_id, error_msg, None, db)
+            await _save_error_to_post(post_id, error_msg, None, db)
             return
 
         # Generate summary with AI error handling
         _update_job_status(post_id, "processing", 25, "Generating AI summary")
+        cache_params = None
         try:
-            summarizer = AISummarizer(provider=ai_provider)
-            summary = summarizer.summarize_articles(articles_data, user_id=user_id)
+            summarizer = AISummarizer(provider=ai_provider, api_key=api_key)
+
+            # Shared generation cache, unless the user opted out
+            summary = None
+            if is_generation_cache_enabled(db, user_id):
+                cache_params = {"provider": ai_provider, "model": summarizer.model}
+                summary = await AIContentCache.get(articles_data, SUMMARY_PLATFORM, **cache_params)
+
+            if summary is None:
+                summary = await summarizer.summarize_articles(articles_data, user_id=user_id)
+                if cache_params is not None:
+                    await AIContentCache.set(articles_data, SUMMARY_PLATFORM, summary, **cache_params)
         except AIProviderError as e:
             # Structured AI error
             error_details = e.to_dict() if hasattr(e, 'to_dict') else {
@@ -336,7 +368,7 @@ async def generate_post_async(
                 error_details.get("message"),
                 error_details
             )
-            _save_error_to_post(post_id, error_details.get("message"), error_details, db)
+            await _save_error_to_post(post_id, error_details.get("message"), error_details, db)
             return
         except Exception as e:
             # Unexpected error
@@ -344,20 +376,22 @@ async def generate_post_async(
             logger.error(f"Unexpected error in summarization for post {post_id}: {e}")
 
             _update_job_status(post_id, "failed", 25, "Error", error_msg)
-            _save_error_to_post(post_id, error_msg, None, db)
+            await _save_error_to_post(post_id, error_msg, None, db)
             return
 
         # Generate platform content
         _update_job_status(post_id, "processing", 50, "Generating platform posts")
         try:
             platform_config = _build_platform_config(platforms)
-            posts_content = await _generate_platform_content(summary, platform_config, post_id)
+            posts_content = await _generate_platform_content(
+                summarizer, summary, platform_config, post_id, articles_data, cache_params, user_id
+            )
         except Exception as e:
             error_msg = f"Failed to generate platform content: {str(e)}"
             logger.error(f"Error generating platform content for post {post_id}: {e}")
 
             _update_job_status(post_id, "failed", 50, "Error", error_msg)
-            _save_error_to_post(post_id, error_msg, None, db)
+            await _save_error_to_post(post_id, error_msg, None, db)
             return
 
         # Save to database
@@ -371,6 +405,9 @@ async def generate_post_async(
             post.error_details = None
             db.commit()
 
+            # Cached post (shared by list pages) still has the pre-generation content
+            await PostsCache.invalidate_single_post(post_id, user_id)
+
             # Complete
             _update_job_status(post_id, "completed", 100, "Complete")
             generation_jobs[post_id]["content"] = {
@@ -389,7 +426,7 @@ async def generate_post_async(
         logger.error(f"Unexpected error in generate_post_async for post {post_id}: {e}")
 
         _update_job_status(post_id, "failed", 0, "Failed", error_msg)
-        _save_error_to_post(post_id, error_msg, None, db)
+        await _save_error_to_post(post_id, error_msg, None, db)
 
 
 @router.post("/generate")
@@ -507,6 +544,17 @@ async def generate_post(
 
         logger.info(f"Quota check passed for user {user.id}: {quota_info['used']}/{quota_info['limit']} used")
 
+        within_token_quota, token_quota = await check_token_quota(user.id)
+        if not within_token_quota:
+            raise HTTPException(
+                status_code=429,
+                detail={
+                    "error": "token_quota_exceeded",
+                    "message": f"Daily AI token quota exceeded. You have used {token_quota['used']}/{token_quota['daily_limit']} tokens today.",
+                    "quota": token_quota,
+                },
+            )
+
         # Create post record immediately with "processing" status
         post = Post(
             user_id=user.id,
@@ -595,6 +643,11 @@ async def generate_post_stream(
     """
     Generate social media posts with real-time progress via Server-Sent Events (SSE)
 
+    Platform posts are streamed as the model writes them, all platforms at once:
+    - {"platform", "delta"}: next piece of a platform's text
+    - {"platform", "validation"}: validation result whenever it changes
+    - {"platform", "validation", "content"}: the platform's final post
+
     Example usage:
     GET /api/posts/generate/stream?article_ids=1,2,3&platforms=twitter,linkedin
     """
@@ -629,34 +682,41 @@ async def generate_post_stream(
                 yield f"data: {json.dumps({'status': 'error', 'error': 'No API key configured'})}\n\n"
                 return
 
-            # Set API key
-            _configure_api_key(api_key, ai_provider)
+            within_token_quota, _ = await check_token_quota(user.id)
+            if not within_token_quota:
+                yield f"data: {json.dumps({'status': 'error', 'error': 'Daily AI token quota exceeded'})}\n\n"
+                return
 
             # Get articles
             yield f"data: {json.dumps({'status': 'processing', 'progress': 10, 'step': 'Fetching articles'})}\n\n"
 
-            articles = db.query(Article).filter(Article.id.in_(article_id_list)).all()
+            if is_lazy_enrichment_enabled():
+                await ensure_articles_enriched(article_id_list)
+
+            # Stored fields only: precomputed AI context, no full-text processing
+            articles = load_article_contexts(db, article_id_list)
 
             if not articles:
                 yield f"data: {json.dumps({'status': 'error', 'error': 'No articles found'})}\n\n"
                 return
 
-            articles_data = [
-                {
-                    "title": a.title,
-                    "link": a.link,
-                    "summary": a.summary or "",
-                    "source": a.source,
-                    "published": a.published,
-                }
-                for a in articles
-            ]
+            articles_data = articles
 
             # Generate summary
             yield f"data: {json.dumps({'status': 'processing', 'progress': 25, 'step': 'Generating AI summary'})}\n\n"
 
-            summarizer = AISummarizer(provider=ai_provider)
-            summary = summarizer.summarize_articles(articles_data)
+            summarizer = AISummarizer(provider=ai_provider, api_key=api_key)
+
+            summary = None
+            cache_params = None
+            if is_generation_cache_enabled(db, user.id):
+                cache_params = {"provider": ai_provider, "model": summarizer.model}
+                summary = await AIContentCache.get(articles_data, SUMMARY_PLATFORM, **cache_params)
+
+            if summary is None:
+                summary = await summarizer.summarize_articles(articles_data, user_id=user.id)
+                if cache_params is not None:
+                    await AIContentCache.set(articles_data, SUMMARY_PLATFORM, summary, **cache_params)
 
             # Generate platform posts
             yield f"data: {json.dumps({'status': 'processing', 'progress': 50, 'step': 'Generating platform posts'})}\n\n"
@@ -669,24 +729,88 @@ async def generate_post_stream(
 
             posts_content = {}
             enabled_platforms = [p for p, c in platform_config.items() if c.get("enabled")]
+            generator = ContentGenerator(summarizer, platform_config)
+
+            # Platforms stream concurrently; their events are merged here
+            events: asyncio.Queue = asyncio.Queue()
 
-            for i, platform in enumerate(enabled_platforms):
+            async def stream_platform(platform: str):
                 config = platform_config[platform]
-                generator = ContentGenerator(summarizer, {platform: config})
-                result = generator.generate_posts(summary)
-                posts_content[platform] = result.get(platform, "")
+                try:
+                    content = None
+                    if cache_params is not None:
+                        cache_args = {**cache_params, "params": {"max_length": config["max_length"]}}
+                        content = await AIContentCache.get(articles_data, platform, **cache_args)
+
+                    if content is None:
+                        async with user_generation_budget.acquire(user.id), \
+                                provider_generation_budget.acquire(ai_provider):
+                            parts = []
+                            length = validated_length = 0
+                            last_validation = None
+                            async for delta in generator.stream_platform_post(
+                                platform, summary, user_id=user.id
+                            ):
+                                parts.append(delta)
+                                length += len(delta)
+                                await events.put((platform, "delta", delta))
+
+                                # Validate as the text grows; report only changes.
+                                # The final text is validated with the "done" event.
+                                if (length - validated_length < STREAM_VALIDATION_INTERVAL
+                                        and STREAM_VALIDATION_BOUNDARIES.isdisjoint(delta)):
+                                    continue
+                                validated_length = length
+                                validation = PostGenerationService.validate_content(
+                                    platform, "".join(parts).strip()
+                                )
+                                state = (validation.is_valid, validation.errors, validation.warnings)
+                                if state != last_validation:
+                                    last_validation = state
+                                    await events.put((platform, "validation", validation.dict()))
+
+                        content = generator.finish_platform_post(platform, "".join(parts))
+                        if cache_params is not None:
+                            await AIContentCache.set(articles_data, platform, content, **cache_args)
+
+                    await events.put((platform, "done", content))
+                except Exception as e:
+                    await events.put((platform, "error", e))
+
+            tasks = [asyncio.create_task(stream_platform(p)) for p in enabled_platforms]
+            try:
+                while len(posts_content) < len(enabled_platforms):
+                    platform, kind, value = await events.get()
+                    progress = 50 + (len(posts_content) / len(enabled_platforms) * 40)
+
+                    if kind == "error":
+                        raise value
+
+                    if kind == "delta":
+                        yield f"data: {json.dumps({'status': 'processing', 'progress': int(progress), 'step': f'Generating {platform} post', 'platform': platform, 'delta': value})}\n\n"
+                        continue
+
+                    if kind == "validation":
+                        yield f"data: {json.dumps({'status': 'processing', 'progress': int(progress), 'step': f'Generating {platform} post', 'platform': platform, 'validation': value})}\n\n"
+                        continue
+
+                    posts_content[platform] = value
 
-                # Send progress update
-                progress = 50 + ((i + 1) / len(enabled_platforms) * 40)
-                yield f"data: {json.dumps({'status': 'processing', 'progress': int(progress), 'step': f'Generated {platform} post', 'content': {platform: posts_content[platform]}})}\n\n"
+                    # Send progress update
+                    progress = 50 + (len(posts_content) / len(enabled_platforms) * 40)
+                    validation = PostGenerationService.validate_content(platform, value).dict()
+                    yield f"data: {json.dumps({'status': 'processing', 'progress': int(progress), 'step': f'Generated {platform} post', 'platform': platform, 'validation': validation, 'content': {platform: value}})}\n\n"
+            finally:
+                for task in tasks:
+                    task.cancel()
 
             # Save to database
             yield f"data: {json.dumps({'status': 'processing', 'progress': 95, 'step': 'Saving post'})}\n\n"
 
             post = Post(
                 user_id=user.id,
-                article_id=articles[0].id if len(articles) == 1 else None,  # FIX: Link to source article
-                article_title=articles[0].title
+                article_id=articles[0]["id"] if len(articles) == 1 else None,  # FIX: Link to source article
+                article_title=articles[0]["title"]
                 if len(articles) == 1
                 else f"{len(articles)} articles",
                 twitter_content=posts_content.get("twitter", ""),
@@ -700,6 +824,7 @@ async def generate_post_stream(
             db.add(post)
             db.commit()
             db.refresh(post)
+            await PostsCache.invalidate_user_posts(user.id)
 
             # Send completion event
             yield f"data: {json.dumps({'status': 'completed', 'progress': 100, 'step': 'Complete', 'post_id': post.id, 'content': {'twitter': post.twitter_content, 'linkedin': post.linkedin_content, 'threads': post.threads_content, 'summary': summary.get('summary', '')}})}\n\n"
@@ -1210,6 +1335,7 @@ async def publish_post(
         # Update post status
         _update_post_publish_status(post, results, errors)
         db.commit()
+        await PostsCache.invalidate_single_post(post.id, user.id)
 
         return _build_publish_response(results, errors)
 
@@ -21,6 +21,7 @@ import logging
 from database import get_db, User, Post, Article, UserApiKey
 from utils.auth_selector import get_current_user as get_current_user_dependency
 from utils.encryption import decrypt_api_key
+from utils.ai_content_cache import is_generation_cache_enabled
 from services.ai_post_generation_service import (
     AIPostGenerationService,
     AIProviderError,
@@ -300,7 +301,7 @@ async def generate_posts(
             platforms=[p.value for p in request.platforms],
             user_id=user.id,
             tone=request.tone.value if request.tone else None,
-            use_cache=request.use_cache
+            use_cache=request.use_cache and is_generation_cache_enabled(db, user.id)
         )
 
         # Check if any platforms succeeded
@@ -676,25 +677,26 @@ async def clear_cache(
     """
     Clear cached posts
 
-    Admin users can clear all cache.
-    Regular users can clear only their cache (not implemented yet).
+    The generation cache is shared by all users (keyed on article content),
+    so only admin users can clear it. Users who don't want cached results
+    can opt out with the "ai_generation_cache" setting.
     """
     try:
+        if not user.is_admin:
+            raise HTTPException(
+                status_code=403,
+                detail="Only admins can clear the shared generation cache. "
+                       "Set ai_generation_cache to false in your settings to opt out."
+            )
+
         # Get user API key to initialize service
         api_key, provider = _get_user_api_key(user.id, db)
 
         # Initialize AI service
         ai_service = AIPostGenerationService(api_key, provider)
 
-        # Clear cache
-        if user.is_admin:
-            # Clear all cache
-            cleared_count = await ai_service.clear_cache()
-            message = f"Cleared {cleared_count} cached posts (all users)"
-        else:
-            # Clear user-specific cache (not implemented)
-            cleared_count = await ai_service.clear_cache(user_id=user.id)
-            message = f"Cleared {cleared_count} cached posts (your posts)"
+        cleared_count = await ai_service.clear_cache()
+        message = f"Cleared {cleared_count} cached posts (all users)"
 
         return {
             "success": True,
@@ -702,6 +704,8 @@ async def clear_cache(
             "message": message
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error clearing cache: {e}", exc_info=True)
         raise HTTPException(
@@ -7,17 +7,20 @@ This module provides enhanced endpoints for:
 - Content validation
 - Publishing with comprehensive error handling
 """
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
-import asyncio
+import json
 import logging
 
 from database import get_db, Post, Article, User
 from database_social_media import SocialMediaPost
 from utils.auth_selector import get_current_user as get_current_user_dependency
 from utils.social_connection_manager import SocialConnectionManager
+from utils.llm_usage import check_token_quota, get_user_usage
+from utils.posts_cache import PostsCache
 from src.publishers import LinkedInPublisher, ThreadsPublisher
 from src.publishers.twitter_publisher_oauth1 import TwitterPublisherUnified
 from src.publishers.exceptions import AuthenticationException, RateLimitException, PublishingException
@@ -32,6 +35,7 @@ from schemas.posts import (
 
 # Import services
 from services.post_generation_service import PostGenerationService
+from services.generation_worker import enqueue_post_generation
 from services.platform_status_service import PlatformStatusService
 
 router = APIRouter()
@@ -53,18 +57,20 @@ async def generate_post(
     Start async post generation
 
     This endpoint immediately returns a post ID and starts generation in the background.
-    Use GET /api/posts/generation/{post_id}/status to poll for progress.
+    Use GET /api/posts/generation/{post_id}/events to stream progress (SSE),
+    or poll GET /api/posts/generation/{post_id}/status.
 
     Flow:
     1. Validates article IDs and platforms
     2. Creates post record with 'processing' status
-    3. Starts async generation task
+    3. Queues the generation job for the worker pool
     4. Returns post_id for status polling
 
     Errors:
     - 400: Invalid request (bad article IDs, platforms)
     - 400: No API key configured
     - 404: Articles not found
+    - 429: Daily AI token quota exceeded
     """
     try:
         # Get API key from user settings
@@ -76,36 +82,44 @@ async def generate_post(
                 detail="No API key configured. Please add your OpenAI or Anthropic API key in Profile settings."
             )
 
+        within_quota, token_quota = await check_token_quota(user.id)
+        if not within_quota:
+            raise HTTPException(
+                status_code=429,
+                detail={
+                    "error": "token_quota_exceeded",
+                    "message": f"Daily AI token quota exceeded ({token_quota['used']}/{token_quota['daily_limit']} tokens).",
+                    "quota": token_quota,
+                }
+            )
+
         # Validate articles exist
         articles = _validate_articles(request.article_ids, db)
 
         # Create post record
         post = _create_post_record(user.id, articles, request.platforms, db)
+        await PostsCache.invalidate_user_posts(user.id)
 
         # Initialize generation job
-        PostGenerationService.create_job(post.id)
-
-        # Start background task with new DB session
-        from database import SessionLocal
-        background_db = SessionLocal()
-
-        asyncio.create_task(
-            PostGenerationService.generate_post_async(
-                post.id,
-                request.article_ids,
-                [p.value for p in request.platforms],
-                user.id,
-                api_key,
-                ai_provider,
-                background_db
-            )
+        await PostGenerationService.create_job(post.id)
+
+        # Queue for the generation workers (any process may run it)
+        await enqueue_post_generation(
+            post.id,
+            request.article_ids,
+            [p.value for p in request.platforms],
+            user.id,
+            batch=request.batch
         )
 
         return GenerateResponse(
             success=True,
             post_id=post.id,
             status=GenerationStatus.PROCESSING,
-            message=f"Post generation started. Poll /api/posts/generation/{post.id}/status for progress."
+            message=(
+                f"Post generation started. Stream /api/posts/generation/{post.id}/events "
+                f"or poll /api/posts/generation/{post.id}/status for progress."
+            )
         )
 
     except HTTPException:
@@ -257,14 +271,14 @@ async def get_generation_status(
         raise HTTPException(status_code=404, detail="Post not found")
 
     # Get status from service
-    status = PostGenerationService.get_status(post_id, db)
+    status = await PostGenerationService.get_status(post_id, db)
 
     if not status:
         raise HTTPException(status_code=404, detail="Generation status not found")
 
     # Clean up completed jobs
     if status['status'] == GenerationStatus.COMPLETED:
-        PostGenerationService.delete_job(post_id)
+        await PostGenerationService.delete_job(post_id)
 
     return GenerationStatusResponse(
         post_id=post_id,
@@ -279,6 +293,73 @@ async def get_generation_status(
     )
 
 
+@router.get("/generation/{post_id}/events")
+async def stream_generation_events(
+    post_id: int,
+    user: User = Depends(get_current_user_dependency),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream generation progress via Server-Sent Events (SSE)
+
+    Alternative to polling the status endpoint: one authenticated request,
+    then an event for every progress update until the generation completes
+    or fails. Events use the same shape as /api/v1/posts/generate/stream:
+
+    - {"status": "started" | "processing", "progress", "step", "content", "platforms"}
+    - {"status": "completed", "progress": 100, "step", "post_id", "content", "platforms"}
+    - {"status": "error", "error"}
+
+    A comment line is sent every 15 seconds while nothing changes.
+    """
+    post = db.query(Post).filter(
+        Post.id == post_id,
+        Post.user_id == user.id
+    ).first()
+
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    async def event_generator():
+        try:
+            async for event in PostGenerationService.stream_progress(post_id):
+                if event is None:
+                    yield ": keep-alive\n\n"
+                else:
+                    yield f"data: {json.dumps(event, default=str)}\n\n"
+        except Exception as e:
+            logger.error(f"Error streaming generation events for post {post_id}: {e}", exc_info=True)
+            yield f"data: {json.dumps({'status': 'error', 'error': str(e)})}\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",  # Disable nginx buffering
+        },
+    )
+
+
+@router.get("/ai-usage")
+async def get_ai_usage(
+    days: int = Query(7, ge=1, le=35),
+    user: User = Depends(get_current_user_dependency)
+):
+    """
+    Get the user's AI token usage and estimated cost
+
+    Daily totals (today first), the daily token quota (null = unlimited) and
+    the most recent LLM calls with their tokens and cost.
+    """
+    try:
+        return await get_user_usage(user.id, days)
+    except Exception as e:
+        logger.error(f"Error reading AI usage for user {user.id}: {e}")
+        raise HTTPException(status_code=503, detail="AI usage metrics are unavailable")
+
+
 # ============================================================================
 # POST EDIT ENDPOINTS
 # ============================================================================
@@ -400,6 +481,7 @@ async def update_post(
         updated_fields.append(f"status={request.status}")
 
     db.commit()
+    await PostsCache.invalidate_post_and_list(post_id, user.id)
 
     # Log successful update
     logger.info(
@@ -501,6 +583,7 @@ async def publish_post(
 
         # Update post status
         _update_post_status_after_publish(post, results, errors, db)
+        await PostsCache.invalidate_post_and_list(post.id, user.id)
 
         return PublishResponse(
             success=bool(results),
@@ -809,5 +892,6 @@ async def delete_post(
 
     db.delete(post)
     db.commit()
+    await PostsCache.invalidate_post_and_list(post_id, user.id)
 
     return {"success": True, "message": "Post deleted"}
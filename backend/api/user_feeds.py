@@ -24,6 +24,7 @@ from database import get_db, User
 from utils.auth_selector import get_current_user as get_current_user_dependency
 from utils.feed_discovery import discover_feeds_from_url
 from utils.feed_validator import validate_feed, parse_feed_metadata, get_feed_preview_items
+from api.feeds_enhanced import invalidate_user_feeds
 
 router = APIRouter()
 
@@ -383,6 +384,7 @@ async def create_feed(
 
         # Now commit the transaction
         db.commit()
+        await invalidate_user_feeds(user.id, "feeds")
 
         # Fetch created feed
         feed = db.execute(
@@ -494,6 +496,7 @@ async def update_feed(
         )
 
         db.commit()
+        await invalidate_user_feeds(user.id, "feeds")
 
         # Fetch updated feed
         updated_feed = db.execute(
@@ -570,6 +573,7 @@ async def delete_feed(
         )
 
         db.commit()
+        await invalidate_user_feeds(user.id, "feeds", "articles")
 
         logger.info(f"User {user.id} deleted feed {feed_id}")
 
@@ -655,6 +659,7 @@ async def test_feed_connection(
         )
 
         db.commit()
+        await invalidate_user_feeds(user.id, "feeds")
 
         logger.info(f"Feed {feed_id} tested successfully ({fetch_time}ms)")
 
@@ -689,6 +694,7 @@ async def test_feed_connection(
                 {"id": feed_id, "error": str(e)},
             )
             db.commit()
+            await invalidate_user_feeds(user.id, "feeds")
         except Exception:
             pass
 
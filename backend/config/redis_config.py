@@ -3,11 +3,19 @@ Redis Configuration for Caching Layer
 
 Provides centralized Redis configuration with connection pooling,
 async support, and comprehensive TTL management.
+
+Connections come from settings.REDIS_URL when it is set (auth, TLS, managed
+Redis), else from the REDIS_* settings below. There is one connection pool
+for sync clients and one for async clients; the binary clients (raw bytes,
+for cache payloads) share them and only skip reply decoding.
 """
 import os
-from typing import Optional
-from redis import Redis
-from redis.asyncio import Redis as AsyncRedis
+from typing import Any, Dict, Optional
+from redis import ConnectionPool, Redis, SSLConnection
+from redis.asyncio import ConnectionPool as AsyncConnectionPool, Redis as AsyncRedis
+from redis.asyncio.client import Pipeline as AsyncPipeline
+from redis.asyncio.connection import SSLConnection as AsyncSSLConnection
+from redis.client import NEVER_DECODE, Pipeline
 from loguru import logger
 
 
@@ -36,11 +44,131 @@ class RedisConfig:
     CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
     CACHE_DEBUG = os.getenv("CACHE_DEBUG", "false").lower() == "true"
 
+    # In-process L1 cache in front of Redis (see utils/cache_manager.py)
+    CACHE_L1_ENABLED = os.getenv("CACHE_L1_ENABLED", "false").lower() == "true"
+    CACHE_L1_MAX_ENTRIES = int(os.getenv("CACHE_L1_MAX_ENTRIES", 2000))
+    CACHE_L1_TTL = int(os.getenv("CACHE_L1_TTL", 5))  # Seconds; bounds staleness if pub/sub is down
+    CACHE_INVALIDATION_CHANNEL = os.getenv("CACHE_INVALIDATION_CHANNEL", "aipost:cache:invalidate")
+
+    # Stampede protection: how long one worker may hold a key's fill lock
+    # (and how long other workers wait for its result)
+    CACHE_FILL_LOCK_TTL = int(os.getenv("CACHE_FILL_LOCK_TTL", 10))
+
+    # Cached payload encoding (see utils/cache_serializer.py)
+    CACHE_SERIALIZER = os.getenv("CACHE_SERIALIZER", "orjson")  # orjson, msgpack or json
+    CACHE_COMPRESSION = os.getenv("CACHE_COMPRESSION", "zlib")  # zlib, lz4 or none
+    CACHE_COMPRESS_MIN_BYTES = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", 1024))
+
+    # HTTP response cache (ETag / 304, see middleware/response_cache.py)
+    RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_CREDENTIAL_TTL = int(os.getenv("RESPONSE_CACHE_CREDENTIAL_TTL", 300))
+    DATA_VERSION_TTL = int(os.getenv("DATA_VERSION_TTL", 2592000))  # 30 days
+
+    # AI generation cache (see utils/ai_content_cache.py)
+    AI_GENERATION_CACHE_ENABLED = os.getenv("AI_GENERATION_CACHE_ENABLED", "true").lower() == "true"
+    AI_GENERATION_CACHE_TTL = int(os.getenv("AI_GENERATION_CACHE_TTL", 86400))
+    AI_GENERATION_CACHE_MAX_ENTRIES = int(os.getenv("AI_GENERATION_CACHE_MAX_ENTRIES", 5000))
+    AI_GENERATION_CACHE_MAX_VALUE_BYTES = int(os.getenv("AI_GENERATION_CACHE_MAX_VALUE_BYTES", 65536))
+
+    # Background job store and queue (see utils/job_store.py)
+    JOB_TTL = int(os.getenv("JOB_TTL", 86400))  # Queued / running jobs
+    JOB_FINISHED_TTL = int(os.getenv("JOB_FINISHED_TTL", 3600))  # Completed / failed jobs
+    JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", 60))  # Requeue if a worker stops renewing
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+
+    # LLM token and cost metrics (see utils/llm_usage.py)
+    LLM_USAGE_TTL = int(os.getenv("LLM_USAGE_TTL", 3024000))  # Daily counters kept 35 days
+    LLM_USAGE_RECENT_CALLS = int(os.getenv("LLM_USAGE_RECENT_CALLS", 100))  # Calls listed per user
+
+
+# Shared connection pools (sync / async)
+_redis_pool: Optional[ConnectionPool] = None
+_async_redis_pool: Optional[AsyncConnectionPool] = None
 
 # Singleton Redis clients
 _redis_client: Optional[Redis] = None
 _async_redis_client: Optional[AsyncRedis] = None
 
+# Clients returning raw bytes, for binary cache payloads
+_redis_binary_client: Optional[Redis] = None
+_async_redis_binary_client: Optional[AsyncRedis] = None
+
+
+def _pool_kwargs() -> Dict[str, Any]:
+    return {
+        "max_connections": RedisConfig.REDIS_MAX_CONNECTIONS,
+        "socket_timeout": RedisConfig.REDIS_SOCKET_TIMEOUT,
+        "socket_connect_timeout": RedisConfig.REDIS_SOCKET_CONNECT_TIMEOUT,
+        "decode_responses": True,
+    }
+
+
+def _create_pool(pool_class, ssl_connection_class):
+    """Connection pool from settings.REDIS_URL, else from the REDIS_* settings"""
+    from config.settings import settings
+
+    if settings.REDIS_URL:
+        return pool_class.from_url(settings.REDIS_URL, **_pool_kwargs())
+
+    kwargs = _pool_kwargs()
+    kwargs.update(
+        host=RedisConfig.REDIS_HOST,
+        port=RedisConfig.REDIS_PORT,
+        db=RedisConfig.REDIS_DB,
+        password=RedisConfig.REDIS_PASSWORD,
+    )
+    if RedisConfig.REDIS_SSL:
+        kwargs["connection_class"] = ssl_connection_class
+    return pool_class(**kwargs)
+
+
+def _get_pool() -> ConnectionPool:
+    global _redis_pool
+    if _redis_pool is None:
+        _redis_pool = _create_pool(ConnectionPool, SSLConnection)
+    return _redis_pool
+
+
+def _get_async_pool() -> AsyncConnectionPool:
+    global _async_redis_pool
+    if _async_redis_pool is None:
+        _async_redis_pool = _create_pool(AsyncConnectionPool, AsyncSSLConnection)
+    return _async_redis_pool
+
+
+class _BinaryPipeline(Pipeline):
+    def parse_response(self, connection, command_name, **options):
+        options[NEVER_DECODE] = True
+        return super().parse_response(connection, command_name, **options)
+
+
+class _BinaryRedis(Redis):
+    """Client on the shared pool whose replies are not decoded"""
+
+    def parse_response(self, connection, command_name, **options):
+        options[NEVER_DECODE] = True
+        return super().parse_response(connection, command_name, **options)
+
+    def pipeline(self, transaction=True, shard_hint=None) -> Pipeline:
+        return _BinaryPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+class _AsyncBinaryPipeline(AsyncPipeline):
+    async def parse_response(self, connection, command_name, **options):
+        options[NEVER_DECODE] = True
+        return await super().parse_response(connection, command_name, **options)
+
+
+class _AsyncBinaryRedis(AsyncRedis):
+    """Async client on the shared pool whose replies are not decoded"""
+
+    async def parse_response(self, connection, command_name, **options):
+        options[NEVER_DECODE] = True
+        return await super().parse_response(connection, command_name, **options)
+
+    def pipeline(self, transaction=True, shard_hint=None) -> AsyncPipeline:
+        return _AsyncBinaryPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
 
 def get_redis_client() -> Redis:
     """
@@ -52,17 +180,7 @@ def get_redis_client() -> Redis:
     global _redis_client
 
     if _redis_client is None:
-        _redis_client = Redis(
-            host=RedisConfig.REDIS_HOST,
-            port=RedisConfig.REDIS_PORT,
-            db=RedisConfig.REDIS_DB,
-            password=RedisConfig.REDIS_PASSWORD,
-            ssl=RedisConfig.REDIS_SSL,
-            max_connections=RedisConfig.REDIS_MAX_CONNECTIONS,
-            socket_timeout=RedisConfig.REDIS_SOCKET_TIMEOUT,
-            socket_connect_timeout=RedisConfig.REDIS_SOCKET_CONNECT_TIMEOUT,
-            decode_responses=True
-        )
+        _redis_client = Redis(connection_pool=_get_pool())
         logger.info("Synchronous Redis client initialized")
 
     return _redis_client
@@ -78,25 +196,52 @@ async def get_async_redis_client() -> AsyncRedis:
     global _async_redis_client
 
     if _async_redis_client is None:
-        _async_redis_client = AsyncRedis(
-            host=RedisConfig.REDIS_HOST,
-            port=RedisConfig.REDIS_PORT,
-            db=RedisConfig.REDIS_DB,
-            password=RedisConfig.REDIS_PASSWORD,
-            ssl=RedisConfig.REDIS_SSL,
-            max_connections=RedisConfig.REDIS_MAX_CONNECTIONS,
-            socket_timeout=RedisConfig.REDIS_SOCKET_TIMEOUT,
-            socket_connect_timeout=RedisConfig.REDIS_SOCKET_CONNECT_TIMEOUT,
-            decode_responses=True
-        )
+        _async_redis_client = AsyncRedis(connection_pool=_get_async_pool())
         logger.info("Async Redis client initialized")
 
     return _async_redis_client
 
 
+def get_redis_binary_client() -> Redis:
+    """
+    Get synchronous Redis client that returns bytes (for binary cache values).
+
+    Shares the connection pool of get_redis_client.
+
+    Returns:
+        Redis: Synchronous Redis client instance (replies not decoded)
+    """
+    global _redis_binary_client
+
+    if _redis_binary_client is None:
+        _redis_binary_client = _BinaryRedis(connection_pool=_get_pool())
+        logger.info("Synchronous binary Redis client initialized")
+
+    return _redis_binary_client
+
+
+async def get_async_redis_binary_client() -> AsyncRedis:
+    """
+    Get async Redis client that returns bytes (for binary cache values).
+
+    Shares the connection pool of get_async_redis_client.
+
+    Returns:
+        AsyncRedis: Async Redis client instance (replies not decoded)
+    """
+    global _async_redis_binary_client
+
+    if _async_redis_binary_client is None:
+        _async_redis_binary_client = _AsyncBinaryRedis(connection_pool=_get_async_pool())
+        logger.info("Async binary Redis client initialized")
+
+    return _async_redis_binary_client
+
+
 async def close_redis_connections():
     """Close Redis connections on app shutdown."""
-    global _redis_client, _async_redis_client
+    global _redis_client, _async_redis_client, _redis_binary_client, _async_redis_binary_client
+    global _redis_pool, _async_redis_pool
 
     if _redis_client:
         _redis_client.close()
@@ -108,6 +253,23 @@ async def close_redis_connections():
         _async_redis_client = None
         logger.info("Async Redis connection closed")
 
+    if _redis_binary_client:
+        _redis_binary_client.close()
+        _redis_binary_client = None
+
+    if _async_redis_binary_client:
+        await _async_redis_binary_client.close()
+        _async_redis_binary_client = None
+
+    # Clients on a shared pool leave it open
+    if _redis_pool:
+        _redis_pool.disconnect()
+        _redis_pool = None
+
+    if _async_redis_pool:
+        await _async_redis_pool.disconnect()
+        _async_redis_pool = None
+
 
 async def test_redis_connection() -> bool:
     """
@@ -162,6 +162,24 @@ class Settings(BaseSettings):
     CACHE_TTL_SECONDS: int = Field(default=300, description="Default cache TTL (5 minutes)")
     CACHE_BACKEND: str = Field(default="memory", description="Cache backend: memory or redis")
     REDIS_URL: Optional[str] = Field(default=None, description="Redis URL for caching")
+    CACHE_MAX_ENTRIES: int = Field(default=10000, description="In-memory cache: max entries (LRU eviction)")
+    CACHE_MAX_BYTES: int = Field(default=64 * 1024 * 1024, description="In-memory cache: approx. max size in bytes")
+    CACHE_SWEEP_INTERVAL_SECONDS: int = Field(default=60, description="In-memory cache: expired-entry sweep interval")
+    CACHE_WARM_ENABLED: bool = Field(default=True, description="Warm listing caches at startup and after aggregation")
+    CACHE_WARM_CONCURRENCY: int = Field(default=4, description="Users warmed in parallel")
+    CACHE_WARM_ACTIVE_HOURS: int = Field(default=72, description="Warm users with a session active within this window")
+    CACHE_WARM_MAX_USERS: int = Field(default=500, description="Max users warmed per run (most recently active first)")
+
+    # ========================================================================
+    # ARTICLE ENRICHMENT
+    # ========================================================================
+    ENRICHMENT_MODE: str = Field(
+        default="eager",
+        description="Enrichment mode: eager (at ingest), lazy (on first open/generation), off"
+    )
+    ENRICHMENT_PREFETCH_PER_FEED: int = Field(
+        default=3, description="Newest articles per fetched feed to enrich ahead of time (lazy mode)"
+    )
 
     # ========================================================================
     # MONITORING & PERFORMANCE
@@ -170,6 +188,29 @@ class Settings(BaseSettings):
     ENABLE_METRICS: bool = Field(default=True, description="Enable metrics collection")
     SLOW_QUERY_THRESHOLD_MS: int = Field(default=1000, description="Log queries slower than this")
     MAX_CONCURRENT_GENERATIONS: int = Field(default=10, description="Max concurrent post generations")
+    GENERATION_USER_CONCURRENCY: int = Field(
+        default=4, description="LLM calls in flight per user (per worker)"
+    )
+    GENERATION_PROVIDER_CONCURRENCY: int = Field(
+        default=256, description="LLM calls in flight per AI provider (per worker)"
+    )
+    GENERATION_WORKERS: int = Field(
+        default=4,
+        description="Queued generation jobs run in parallel by each API process (0 = only by "
+                    "separate workers: python -m services.generation_worker)"
+    )
+    GENERATION_BATCH_JOBS: int = Field(
+        default=50,
+        description="Batch generation jobs (batched LLM calls) each worker pool runs alongside its workers"
+    )
+    AI_DAILY_TOKEN_QUOTA: int = Field(
+        default=0, description="LLM tokens per user per day (0 = unlimited, see utils/llm_usage.py)"
+    )
+    GENERATION_ONE_SHOT: bool = Field(
+        default=False,
+        description="Generate the summary and all platform posts in one LLM call (JSON reply) "
+                    "instead of one call each"
+    )
 
     # ========================================================================
     # EMAIL (SendGrid)
@@ -226,6 +267,15 @@ class Settings(BaseSettings):
             raise ValueError(f"DALLE_IMAGE_QUALITY must be one of: {allowed}")
         return v
 
+    @field_validator("ENRICHMENT_MODE")
+    @classmethod
+    def validate_enrichment_mode(cls, v: str) -> str:
+        """Validate article enrichment mode"""
+        allowed = ["eager", "lazy", "off"]
+        if v.lower() not in allowed:
+            raise ValueError(f"ENRICHMENT_MODE must be one of: {allowed}")
+        return v.lower()
+
     @field_validator("PORT")
     @classmethod
     def validate_port(cls, v: int) -> int:
@@ -0,0 +1,48 @@
+"""
+Corpus Statistics Database Models
+
+Incrementally maintained term statistics across all ingested articles:
+- corpus_terms: document frequency per term (how many articles mention it)
+- corpus_term_buckets: per-hour counts of each term being a top topic of a
+  newly ingested article, used for trending topics
+
+Both tables are updated when articles are ingested, so topic ranking and
+trending queries never have to scan the articles table.
+"""
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from datetime import datetime
+from database import Base
+
+
+class CorpusTerm(Base):
+    """
+    Document frequency of a normalized (lowercase) term.
+
+    The reserved term "__documents__" holds the total number of documents.
+    """
+
+    __tablename__ = "corpus_terms"
+
+    term = Column(String(64), primary_key=True)
+    doc_count = Column(Integer, default=0, nullable=False)
+    display = Column(String(64), nullable=True)  # Most recent original casing, e.g. "OpenAI"
+    last_seen = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+
+class CorpusTermBucket(Base):
+    """
+    Hourly topic counts for trending.
+
+    One row per (hour, term); the reserved term "__documents__" holds the
+    number of documents ingested in that hour.
+    """
+
+    __tablename__ = "corpus_term_buckets"
+
+    bucket = Column(DateTime, primary_key=True)  # Hour start (UTC)
+    term = Column(String(64), primary_key=True)
+    doc_count = Column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        Index("idx_corpus_term_buckets_term", "term"),
+    )
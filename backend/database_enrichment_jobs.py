@@ -0,0 +1,89 @@
+"""
+Batch Enrichment Job Models
+
+Database model for long-running article enrichment jobs. Progress is
+checkpointed here so an interrupted job (restart, crash, cancel) can be
+resumed where it stopped instead of starting over.
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, JSON, ForeignKey, Index
+from datetime import datetime
+from database import Base
+import enum
+
+
+class EnrichmentJobStatus(str, enum.Enum):
+    """Enrichment job states"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+
+class EnrichmentFailureCategory(str, enum.Enum):
+    """Failure categorization for batch enrichment"""
+    NOT_FOUND = "not_found"  # Article deleted or not owned by the user
+    FETCH_FAILED = "fetch_failed"  # Page unreachable and no feed content to fall back on
+    TIMEOUT = "timeout"  # Article exceeded the per-article time limit
+    DATABASE_ERROR = "database_error"  # Reading or writing the article row failed
+    UNKNOWN_ERROR = "unknown_error"  # Uncategorized errors
+
+
+class EnrichmentJob(Base):
+    """
+    Batch enrichment job with resumable progress.
+
+    Article IDs are processed in list order. The checkpoint is stored as:
+    - cursor: every article before this index is done
+    - done_ahead: indexes past the cursor that already finished
+    so a resumed job skips exactly the work that was recorded.
+    """
+
+    __tablename__ = "enrichment_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+
+    status = Column(String(20), default=EnrichmentJobStatus.QUEUED, nullable=False, index=True)
+
+    # Work definition
+    article_ids = Column(JSON, nullable=False)  # Ordered list of article IDs
+    concurrency = Column(Integer, default=8, nullable=False)  # Parallel fetches
+    force_refresh = Column(Boolean, default=False, nullable=False)  # Re-enrich enriched articles
+
+    # Checkpoint
+    total = Column(Integer, default=0, nullable=False)
+    cursor = Column(Integer, default=0, nullable=False)
+    done_ahead = Column(JSON, nullable=True)
+
+    # Counters
+    processed = Column(Integer, default=0, nullable=False)
+    succeeded = Column(Integer, default=0, nullable=False)
+    skipped = Column(Integer, default=0, nullable=False)  # Already enriched
+    failed = Column(Integer, default=0, nullable=False)
+
+    # Reporting
+    failure_breakdown = Column(JSON, nullable=True)  # {category: count}
+    recent_failures = Column(JSON, nullable=True)  # [{article_id, category, error}]
+    stage_stats = Column(JSON, nullable=True)  # {stage: {count, total_ms, max_ms}}
+    elapsed_seconds = Column(Float, default=0.0, nullable=False)  # Active run time across resumes
+    runs = Column(Integer, default=0, nullable=False)  # Number of times started/resumed
+    error_message = Column(Text, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    completed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("idx_enrichment_jobs_user_status", "user_id", "status"),
+    )
+
+    def __repr__(self):
+        return (
+            f"<EnrichmentJob(id={self.id}, user_id={self.user_id}, "
+            f"status={self.status}, {self.processed}/{self.total})>"
+        )
@@ -116,6 +116,7 @@ from api import (
     feeds_enhanced,  # NEW: Enhanced RSS feeds for iOS (Task 2.6)
     feed_aggregator_api,  # NEW: Feed aggregator service (Task 2.7)
     publishing_api,  # NEW: Phase 4 - Multi-platform publishing API
+    article_enrichment,  # Article enrichment + batch enrichment jobs
 )
 
 # Import LinkedIn OAuth module
@@ -126,9 +127,16 @@ from database_user_oauth_credentials import UserOAuthCredential, UserOAuthCreden
 from database_social_media import SocialMediaConnection  # Ensure social media tables exist
 from middleware.security import SecurityMiddleware, ActivityLoggerMiddleware
 from middleware.security_headers import SecurityHeadersMiddleware
+from middleware.response_cache import ResponseCacheMiddleware
 
 # Redis Configuration
 from config.redis_config import test_redis_connection, close_redis_connections
+from utils.cache_manager import stop_cache_invalidation_listener
+from services.cache_warmer import schedule_cache_warming
+
+# Pooled async LLM clients
+from src.utils.llm_client import close_llm_clients
+from services.generation_worker import start_generation_workers, stop_generation_workers
 
 # Mobile API Exception Handlers (Task 1.7)
 from utils.exception_handlers import register_exception_handlers
@@ -247,6 +255,17 @@ async def lifespan(app: FastAPI):
     SetupMetrics.__table__.create(engine, checkfirst=True)
     PlatformConfiguration.__table__.create(engine, checkfirst=True)
 
+    # Initialize batch enrichment job table
+    from database_enrichment_jobs import EnrichmentJob
+
+    EnrichmentJob.__table__.create(engine, checkfirst=True)
+
+    # Initialize corpus term statistics tables (topics, trending)
+    from database_corpus_stats import CorpusTerm, CorpusTermBucket
+
+    CorpusTerm.__table__.create(engine, checkfirst=True)
+    CorpusTermBucket.__table__.create(engine, checkfirst=True)
+
     # Create Instagram image storage directory if it doesn't exist
     # Use relative path from this file's location
     BASE_DIR = Path(__file__).resolve().parent
@@ -257,9 +276,15 @@ async def lifespan(app: FastAPI):
     redis_connected = await test_redis_connection()
     if redis_connected:
         logger.info("Redis cache layer initialized successfully")
+
+        # Precompute recently active users' listings without delaying startup
+        schedule_cache_warming(reason="startup", include_system=True)
     else:
         logger.warning("Redis not available - application will run without caching")
 
+    # Run queued post/image generation jobs in this process too
+    start_generation_workers()
+
     logger.info("Mobile API v1 initialized - iOS support enabled")
     logger.info("Standardized error responses enabled for mobile API")
     logger.info("Enhanced RSS feeds API initialized (Task 2.6)")
@@ -290,7 +315,10 @@ async def lifespan(app: FastAPI):
     yield
 
     # Cleanup on shutdown
+    await stop_cache_invalidation_listener()
+    await stop_generation_workers()
     await close_redis_connections()
+    await close_llm_clients()
 
     # Flush Sentry events before shutdown
     if SENTRY_DSN:
@@ -359,6 +387,11 @@ if os.getenv("ENVIRONMENT", "development") == "production" and "*" in ALLOWED_OR
         "Set ALLOWED_ORIGINS environment variable with specific domains."
     )
 
+# HTTP response cache: ETag / 304 for read-heavy endpoints. Added first so it
+# is the innermost middleware: 304s still pass through CORS, security and
+# performance middleware
+app.add_middleware(ResponseCacheMiddleware)
+
 # CORS middleware with specific origins (NO WILDCARD)
 app.add_middleware(
     CORSMiddleware,
@@ -425,6 +458,7 @@ app.include_router(oauth_mock.router, prefix="/api/auth/oauth/mock", tags=["oaut
 app.include_router(security.router, prefix="/api/auth/security", tags=["security"])
 
 # Content APIs
+app.include_router(article_enrichment.router, prefix="/api", tags=["article-enrichment"])
 app.include_router(articles.router, prefix="/api/articles", tags=["articles"])
 app.include_router(articles_refresh.router, prefix="/api", tags=["articles-refresh"])  # Enhanced refresh with feedback
 
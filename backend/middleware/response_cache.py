@@ -0,0 +1,153 @@
+"""
+HTTP Response Cache Middleware
+
+Conditional GET (ETag / If-None-Match -> 304) for read-heavy endpoints.
+
+ETags are derived from per-user data versions (utils/data_version.py) rather
+than from the response body, so an unchanged request is answered with 304
+before the route runs: no authentication query, no database work and no
+serialization.
+
+To know whose versions to read before the route runs, the middleware keeps a
+short-lived mapping from a hash of the Authorization header to the user id,
+recorded after the first successful (authenticated) response. Until that
+mapping exists the response is served without an ETag, because the versions
+read afterwards could be newer than the data the route returned.
+
+Usage:
+    from middleware.response_cache import ResponseCacheMiddleware
+    app.add_middleware(ResponseCacheMiddleware)
+"""
+import hashlib
+import os
+from typing import Dict, Optional, Tuple
+from loguru import logger
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from config.redis_config import get_async_redis_client, RedisConfig
+from utils.data_version import get_data_versions
+
+
+# Path -> (data version scopes, Cache-Control)
+CACHEABLE_ROUTES: Dict[str, Tuple[Tuple[str, ...], str]] = {
+    "/api/articles/recent": (("articles", "feeds"), "private, no-cache"),
+    "/api/user-feeds/enhanced": (("feeds", "articles"), "private, no-cache"),
+    "/api/system-sources/cached": (("system",), "private, max-age=3600"),
+    "/api/posts": (("posts",), "private, no-cache"),
+}
+
+ANONYMOUS_USER_ID = 1
+
+
+def _credential_key(credential_hash: str) -> str:
+    return f"respcache:cred:{credential_hash}"
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag (RFC 9110)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    """
+    Adds ETag / Cache-Control to cacheable GET routes and answers matching
+    If-None-Match requests with 304 Not Modified.
+
+    Any Redis failure disables caching for that request; the route is then
+    served normally.
+    """
+
+    def __init__(self, app, routes: Optional[Dict[str, Tuple[Tuple[str, ...], str]]] = None):
+        super().__init__(app)
+        self.routes = routes if routes is not None else CACHEABLE_ROUTES
+        self.anonymous_mode = os.getenv("ANONYMOUS_MODE", "false").lower() == "true"
+
+    def _compute_etag(
+        self,
+        request: Request,
+        credential_hash: str,
+        user_id: str,
+        versions: Dict[str, str]
+    ) -> str:
+        parts = [
+            request.app.version,
+            request.url.path,
+            request.url.query,
+            credential_hash,
+            user_id,
+        ]
+        parts.extend(f"{scope}={versions[scope]}" for scope in sorted(versions))
+        digest = hashlib.sha256("|".join(parts).encode()).hexdigest()[:32]
+        return f'"{digest}"'
+
+    async def dispatch(self, request: Request, call_next) -> Response:
+        route = self.routes.get(request.url.path)
+        if route is None or request.method != "GET" or not RedisConfig.RESPONSE_CACHE_ENABLED:
+            return await call_next(request)
+
+        scopes, cache_control = route
+        authorization = request.headers.get("authorization")
+
+        if not authorization and not self.anonymous_mode:
+            return await call_next(request)
+
+        credential_hash = hashlib.sha256((authorization or "").encode()).hexdigest()
+
+        # Resolve the user and their data versions before running the route
+        etag = None
+        user_id = None
+        try:
+            redis = await get_async_redis_client()
+            if self.anonymous_mode:
+                user_id = str(ANONYMOUS_USER_ID)
+            else:
+                user_id = await redis.get(_credential_key(credential_hash))
+
+            if user_id is not None:
+                versions = await get_data_versions(user_id, scopes)
+                etag = self._compute_etag(request, credential_hash, user_id, versions)
+        except Exception as e:
+            logger.warning(f"Response cache unavailable for {request.url.path}: {e}")
+            return await call_next(request)
+
+        cache_headers = {"Cache-Control": cache_control, "Vary": "Authorization"}
+
+        if etag is not None:
+            cache_headers["ETag"] = etag
+            if _etag_matches(request.headers.get("if-none-match"), etag):
+                return Response(status_code=304, headers=cache_headers)
+
+        response = await call_next(request)
+
+        if response.status_code != 200:
+            return response
+
+        response.headers.update(cache_headers)
+
+        # Remember who this credential belongs to, so the next request can
+        # be validated before the route runs
+        if user_id is None:
+            authenticated_user = getattr(request.state, "user_id", None)
+            if authenticated_user is not None:
+                try:
+                    await redis.set(
+                        _credential_key(credential_hash),
+                        authenticated_user,
+                        ex=RedisConfig.RESPONSE_CACHE_CREDENTIAL_TTL,
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to record response cache credential: {e}")
+
+        return response
@@ -39,6 +39,11 @@ class GenerateRequest(BaseModel):
     """Request to generate social media posts"""
     article_ids: List[int] = Field(..., min_length=1, max_length=10, description="Article IDs to generate posts from (1-10)")
     platforms: List[PlatformEnum] = Field(..., min_length=1, description="Platforms to generate content for")
+    batch: bool = Field(
+        False,
+        description="Non-interactive generation (digests, backfills): batched LLM calls, "
+                    "cheaper but may take minutes"
+    )
 
     @field_validator('article_ids')
     @classmethod
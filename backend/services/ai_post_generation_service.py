@@ -2,34 +2,29 @@
 Enhanced AI Post Generation Service - Phase 3
 
 Production-ready AI-powered post generation with:
-- Multi-provider support (OpenAI GPT-4, Anthropic Claude)
+- Multi-provider support (OpenAI GPT-4, Anthropic Claude, DeepSeek) over pooled async clients
 - Platform-specific prompts and optimization
 - Redis caching (24-hour TTL)
 - Rate limiting (10 generations per minute per user)
 - Streaming response support
 - Comprehensive error handling
-- Token counting and cost estimation
+- Token counting (tiktoken) for prompt budgets, cost estimation and
+  per-user daily token quotas (utils/llm_usage.py)
 - Retry logic with exponential backoff
 """
 import asyncio
-import hashlib
-import json
 import logging
 import time
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 
-import openai
-from anthropic import Anthropic, AsyncAnthropic
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type
-)
-
 from config.redis_config import get_redis_client
+from src.utils.ai_exceptions import AIProviderError as LLMProviderError
+from src.utils.llm_client import DEFAULT_MODELS, get_llm_client
+from utils.ai_content_cache import AIContentCache, estimate_generation_cost
+from utils.llm_usage import check_token_quota
+from utils.token_budget import allocate_token_budget, estimate_tokens as count_tokens, truncate_to_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -87,7 +82,7 @@ class AIPostGenerationService:
     Enhanced AI Post Generation Service
 
     Features:
-    - Multi-provider support (OpenAI, Anthropic)
+    - Multi-provider support (OpenAI, Anthropic, DeepSeek)
     - Platform-specific prompt engineering
     - Redis caching for cost optimization
     - Rate limiting per user
@@ -100,16 +95,20 @@ class AIPostGenerationService:
     RATE_LIMIT_WINDOW = 60  # seconds
     RATE_LIMIT_MAX_REQUESTS = 10
 
-    # Cache TTL: 24 hours
-    CACHE_TTL = 86400
-
     # Model configurations
     OPENAI_MODEL = "gpt-4-turbo-preview"
     ANTHROPIC_MODEL = "claude-3-5-sonnet-20241022"
+    DEEPSEEK_MODEL = "deepseek-chat"
 
     # Token limits
     OPENAI_MAX_TOKENS = 4096
     ANTHROPIC_MAX_TOKENS = 4096
+    DEEPSEEK_MAX_TOKENS = 4096
+
+    # Token budget for the article content of one prompt
+    MAX_ARTICLE_TOKENS = 3000
+
+    SYSTEM_PROMPT = "You are an expert social media content creator. Generate engaging, platform-optimized posts."
 
     def __init__(self, api_key: str, provider: str = "openai"):
         """
@@ -117,19 +116,22 @@ class AIPostGenerationService:
 
         Args:
             api_key: API key for the provider
-            provider: "openai" or "anthropic"
+            provider: "openai", "anthropic" or "deepseek"
         """
         self.api_key = api_key
         self.provider = provider.lower()
         self.redis_client = get_redis_client()
 
-        # Initialize provider clients
+        # Pooled async clients, shared with other requests using the same key
         if self.provider == "openai":
-            openai.api_key = api_key
-            self.client = openai
+            self.model = self.OPENAI_MODEL
+            self.max_tokens = self.OPENAI_MAX_TOKENS
         elif self.provider == "anthropic":
-            self.client = Anthropic(api_key=api_key)
-            self.async_client = AsyncAnthropic(api_key=api_key)
+            self.model = self.ANTHROPIC_MODEL
+            self.max_tokens = self.ANTHROPIC_MAX_TOKENS
+        elif self.provider == "deepseek":
+            self.model = self.DEEPSEEK_MODEL
+            self.max_tokens = self.DEEPSEEK_MAX_TOKENS
         else:
             raise ValueError(f"Unsupported provider: {provider}")
 
@@ -139,17 +141,6 @@ class AIPostGenerationService:
         """Get Redis key for rate limiting"""
         return f"rate_limit:post_generation:{user_id}"
 
-    def _get_cache_key(self, article_ids: List[int], platform: str, tone: str, model: str) -> str:
-        """
-        Generate cache key for post generation
-
-        Cache key is based on article IDs, platform, tone, and model
-        to ensure consistent caching across same inputs.
-        """
-        key_data = f"{sorted(article_ids)}:{platform}:{tone}:{model}"
-        key_hash = hashlib.sha256(key_data.encode()).hexdigest()
-        return f"post_generation:{key_hash}"
-
     async def check_rate_limit(self, user_id: int) -> Tuple[bool, int]:
         """
         Check if user has exceeded rate limit
@@ -193,38 +184,6 @@ class AIPostGenerationService:
             # On error, allow the request
             return True, self.RATE_LIMIT_MAX_REQUESTS
 
-    async def get_cached_post(self, cache_key: str) -> Optional[Dict[str, Any]]:
-        """Get cached post from Redis"""
-        if not self.redis_client:
-            return None
-
-        try:
-            cached_data = await self.redis_client.get(cache_key)
-            if cached_data:
-                logger.info(f"Cache hit for key: {cache_key}")
-                return json.loads(cached_data)
-            return None
-        except Exception as e:
-            logger.error(f"Error getting cached post: {e}")
-            return None
-
-    async def cache_post(self, cache_key: str, post_data: Dict[str, Any]) -> bool:
-        """Cache generated post in Redis"""
-        if not self.redis_client:
-            return False
-
-        try:
-            await self.redis_client.setex(
-                cache_key,
-                self.CACHE_TTL,
-                json.dumps(post_data)
-            )
-            logger.info(f"Cached post with key: {cache_key}")
-            return True
-        except Exception as e:
-            logger.error(f"Error caching post: {e}")
-            return False
-
     def _build_platform_prompt(
         self,
         article_content: str,
@@ -235,11 +194,14 @@ class AIPostGenerationService:
         Build platform-specific prompt for content generation
 
         Uses advanced prompt engineering techniques for optimal results.
+        The article content is kept within MAX_ARTICLE_TOKENS.
         """
         config = PLATFORM_CONFIGS.get(platform)
         if not config:
             raise ValueError(f"Unsupported platform: {platform}")
 
+        article_content = truncate_to_tokens(article_content, self.MAX_ARTICLE_TOKENS, self.model)
+
         # Use custom tone or default platform tone
         selected_tone = tone or config.tone
 
@@ -313,138 +275,90 @@ Return ONLY the Threads post text, no explanations or meta-commentary.
 
         return prompt
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type((openai.RateLimitError, openai.APIError)),
-        reraise=True
-    )
-    async def _generate_with_openai(
-        self,
-        prompt: str,
-        max_tokens: int = OPENAI_MAX_TOKENS
-    ) -> Tuple[str, Dict[str, Any]]:
+    def _build_article_content(self, articles: List[Dict[str, Any]]) -> str:
         """
-        Generate content using OpenAI GPT-4
+        Article content for a prompt, within MAX_ARTICLE_TOKENS
 
-        Returns:
-            Tuple of (generated_content, metadata)
+        Summaries are cut to their share of the budget (see
+        allocate_token_budget), so one long article can't crowd out the others.
         """
-        try:
-            logger.info(f"Generating with OpenAI: {self.OPENAI_MODEL}")
-
-            response = await asyncio.to_thread(
-                openai.ChatCompletion.create,
-                model=self.OPENAI_MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert social media content creator. Generate engaging, platform-optimized posts."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                max_tokens=max_tokens,
-                temperature=0.7,
-                top_p=0.9,
-                frequency_penalty=0.3,
-                presence_penalty=0.3
-            )
-
-            content = response.choices[0].message.content.strip()
-
-            # Metadata for monitoring and cost tracking
-            metadata = {
-                "provider": "openai",
-                "model": self.OPENAI_MODEL,
-                "prompt_tokens": response.usage.prompt_tokens,
-                "completion_tokens": response.usage.completion_tokens,
-                "total_tokens": response.usage.total_tokens,
-                "finish_reason": response.choices[0].finish_reason,
-                "generated_at": datetime.utcnow().isoformat()
-            }
-
-            logger.info(f"OpenAI generation successful. Tokens: {metadata['total_tokens']}")
-
-            return content, metadata
-
-        except openai.RateLimitError as e:
-            logger.error(f"OpenAI rate limit exceeded: {e}")
-            raise AIProviderError(f"Rate limit exceeded. Please try again later.")
+        summaries = [a.get('summary') or 'N/A' for a in articles]
+        headers = [
+            f"Title: {a.get('title', 'N/A')}\nLink: {a.get('link', 'N/A')}"
+            for a in articles
+        ]
 
-        except openai.AuthenticationError as e:
-            logger.error(f"OpenAI authentication error: {e}")
-            raise AIProviderError("Invalid API key. Please check your OpenAI API key.")
+        budget = self.MAX_ARTICLE_TOKENS - sum(count_tokens(h, self.model) + 4 for h in headers)
+        budgets = allocate_token_budget(
+            [count_tokens(summary, self.model) for summary in summaries], budget
+        )
 
-        except openai.APIError as e:
-            logger.error(f"OpenAI API error: {e}")
-            raise AIProviderError(f"OpenAI API error: {str(e)}")
+        return "\n\n".join([
+            f"Title: {a.get('title', 'N/A')}\n"
+            f"Summary: {truncate_to_tokens(summary, summary_budget, self.model)}\n"
+            f"Link: {a.get('link', 'N/A')}"
+            for a, summary, summary_budget in zip(articles, summaries, budgets)
+        ])
 
-        except Exception as e:
-            logger.error(f"Unexpected error in OpenAI generation: {e}", exc_info=True)
-            raise AIProviderError(f"Failed to generate content: {str(e)}")
+    def _completion_budget(self, platform: str) -> int:
+        """Max tokens to generate for a platform: its character limit with headroom (emojis, hashtags)"""
+        return min(self.max_tokens, PLATFORM_CONFIGS[platform].max_length // 2 + 100)
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        reraise=True
-    )
-    async def _generate_with_anthropic(
+    async def _generate(
         self,
         prompt: str,
-        max_tokens: int = ANTHROPIC_MAX_TOKENS
+        max_tokens: Optional[int] = None,
+        context: Optional[Dict[str, Any]] = None
     ) -> Tuple[str, Dict[str, Any]]:
         """
-        Generate content using Anthropic Claude
+        Generate content with the provider's pooled async client
+
+        Retries and timeouts are handled by the client (src/utils/llm_client.py),
+        which also records the call's usage for the user in `context`.
 
         Returns:
             Tuple of (generated_content, metadata)
         """
-        try:
-            logger.info(f"Generating with Anthropic: {self.ANTHROPIC_MODEL}")
+        params = {}
+        if self.provider in ("openai", "deepseek"):
+            params = {"top_p": 0.9, "frequency_penalty": 0.3, "presence_penalty": 0.3}
+
+        logger.info(f"Generating with {self.provider}: {self.model}")
 
-            response = await self.async_client.messages.create(
-                model=self.ANTHROPIC_MODEL,
-                max_tokens=max_tokens,
+        try:
+            response = await get_llm_client(self.provider, self.api_key).complete(
+                prompt,
+                model=self.model,
+                system=self.SYSTEM_PROMPT,
+                max_tokens=max_tokens or self.max_tokens,
                 temperature=0.7,
-                system="You are an expert social media content creator. Generate engaging, platform-optimized posts.",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
+                context=context,
+                **params
             )
+        except LLMProviderError as e:
+            logger.error(f"{self.provider} generation failed: {e.message}")
+            raise AIProviderError(e.message)
+        except Exception as e:
+            logger.error(f"Unexpected error in {self.provider} generation: {e}", exc_info=True)
+            raise AIProviderError(f"Failed to generate content: {str(e)}")
 
-            content = response.content[0].text.strip()
-
-            # Metadata for monitoring and cost tracking
-            metadata = {
-                "provider": "anthropic",
-                "model": self.ANTHROPIC_MODEL,
-                "input_tokens": response.usage.input_tokens,
-                "output_tokens": response.usage.output_tokens,
-                "total_tokens": response.usage.input_tokens + response.usage.output_tokens,
-                "stop_reason": response.stop_reason,
-                "generated_at": datetime.utcnow().isoformat()
-            }
-
-            logger.info(f"Anthropic generation successful. Tokens: {metadata['total_tokens']}")
+        # Metadata for monitoring and cost tracking
+        metadata = {
+            "provider": self.provider,
+            "model": self.model,
+            "prompt_tokens": response.prompt_tokens,
+            "completion_tokens": response.completion_tokens,
+            "total_tokens": response.total_tokens,
+            "cost_usd": round(
+                estimate_generation_cost(self.model, response.prompt_tokens, response.completion_tokens), 6
+            ),
+            "finish_reason": response.finish_reason,
+            "generated_at": datetime.utcnow().isoformat()
+        }
 
-            return content, metadata
+        logger.info(f"{self.provider} generation successful. Tokens: {metadata['total_tokens']}")
 
-        except Exception as e:
-            logger.error(f"Error in Anthropic generation: {e}", exc_info=True)
-
-            # Check for specific error types
-            if "authentication" in str(e).lower() or "api key" in str(e).lower():
-                raise AIProviderError("Invalid API key. Please check your Anthropic API key.")
-            elif "rate limit" in str(e).lower():
-                raise AIProviderError("Rate limit exceeded. Please try again later.")
-            else:
-                raise AIProviderError(f"Failed to generate content: {str(e)}")
+        return response.text, metadata
 
     async def generate_post(
         self,
@@ -482,36 +396,35 @@ Return ONLY the Threads post text, no explanations or meta-commentary.
 
         logger.info(f"Rate limit check passed. Remaining: {remaining}")
 
-        # Generate cache key
-        article_ids = [a.get('id', hash(a.get('title', ''))) for a in articles]
-        cache_key = self._get_cache_key(article_ids, platform, tone or "default", self.provider)
+        within_quota, token_quota = await check_token_quota(user_id)
+        if not within_quota:
+            raise RateLimitError(
+                f"Daily AI token quota exceeded ({token_quota['used']}/{token_quota['daily_limit']} "
+                f"tokens). Please try again tomorrow."
+            )
 
-        # Check cache
+        # Check cache (keyed on article content, see utils/ai_content_cache.py)
+        cache_args = {"provider": self.provider, "model": self.model, "tone": tone}
         if use_cache:
-            cached_result = await self.get_cached_post(cache_key)
+            cached_result = await AIContentCache.get(articles, platform, **cache_args)
             if cached_result:
                 cached_result['cached'] = True
                 cached_result['generation_time'] = 0
+                cached_result['remaining_requests'] = remaining
                 return cached_result
 
         # Prepare article content
-        article_content = "\n\n".join([
-            f"Title: {a.get('title', 'N/A')}\n"
-            f"Summary: {a.get('summary', 'N/A')}\n"
-            f"Link: {a.get('link', 'N/A')}"
-            for a in articles
-        ])
+        article_content = self._build_article_content(articles)
 
         # Build prompt
         prompt = self._build_platform_prompt(article_content, platform, tone)
 
         # Generate content
-        if self.provider == "openai":
-            content, metadata = await self._generate_with_openai(prompt)
-        elif self.provider == "anthropic":
-            content, metadata = await self._generate_with_anthropic(prompt)
-        else:
-            raise ValueError(f"Unsupported provider: {self.provider}")
+        content, metadata = await self._generate(
+            prompt,
+            max_tokens=self._completion_budget(platform),
+            context={"user_id": user_id, "platform": platform, "operation": "generate_post"}
+        )
 
         # Calculate generation time
         generation_time = time.time() - start_time
@@ -528,7 +441,14 @@ Return ONLY the Threads post text, no explanations or meta-commentary.
 
         # Cache result
         if use_cache:
-            await self.cache_post(cache_key, result)
+            await AIContentCache.set(
+                articles,
+                platform,
+                result,
+                prompt_tokens=metadata['prompt_tokens'],
+                completion_tokens=metadata['completion_tokens'],
+                **cache_args
+            )
 
         logger.info(
             f"Generated post for {platform} in {generation_time:.2f}s. "
@@ -665,50 +585,27 @@ Return ONLY the Threads post text, no explanations or meta-commentary.
 
     async def estimate_tokens(self, text: str, provider: Optional[str] = None) -> int:
         """
-        Estimate token count for text
+        Count tokens of text for the provider's model
 
-        Uses rough estimation: ~4 characters per token
-        For production, use tiktoken for OpenAI or proper tokenizer for Claude
+        Exact (tiktoken) for OpenAI, calibrated estimate for other providers
+        (see utils/token_budget.py)
         """
-        selected_provider = provider or self.provider
-
-        # Rough estimation
-        estimated_tokens = len(text) // 4
+        selected_provider = (provider or self.provider).lower()
+        model = self.model if selected_provider == self.provider else DEFAULT_MODELS.get(selected_provider)
 
-        return estimated_tokens
+        return count_tokens(text, model)
 
-    async def clear_cache(self, user_id: Optional[int] = None) -> int:
+    async def clear_cache(self) -> int:
         """
-        Clear cached posts
-
-        Args:
-            user_id: If provided, clear only for this user
+        Clear cached generations (shared by all users)
 
         Returns:
-            Number of keys cleared
+            Number of entries cleared
         """
-        if not self.redis_client:
-            return 0
-
         try:
-            if user_id:
-                # Clear user-specific cache (not implemented in current cache key structure)
-                logger.warning("User-specific cache clearing not implemented")
-                return 0
-            else:
-                # Clear all post generation cache
-                pattern = "post_generation:*"
-                keys = []
-                async for key in self.redis_client.scan_iter(match=pattern):
-                    keys.append(key)
-
-                if keys:
-                    deleted = await self.redis_client.delete(*keys)
-                    logger.info(f"Cleared {deleted} cached posts")
-                    return deleted
-
-                return 0
-
+            deleted = await AIContentCache.clear()
+            logger.info(f"Cleared {deleted} cached posts")
+            return deleted
         except Exception as e:
             logger.error(f"Error clearing cache: {e}")
             return 0
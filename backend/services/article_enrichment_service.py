@@ -14,6 +14,8 @@ Features:
 - Metadata extraction (author, publish date, reading time, topics)
 - Content cleaning and sanitization
 - Summary caching to reduce AI calls
+- Persistent enrichment cache shared across users, workers and restarts
+  (keyed by canonical URL, validated by content hash)
 
 Architecture:
 - Modular design with separate functions for each enrichment task
@@ -32,9 +34,13 @@ Usage:
 
     # Process article from feed entry
     enriched = await service.process_feed_article(feed_entry)
+
+    # On-demand (lazy) enrichment: read-through, persisted on first use
+    enrichment = await ensure_article_enriched(article_id)
 """
 import asyncio
 import re
+import time
 from datetime import datetime
 from typing import Dict, Any, Optional, List, Tuple
 from urllib.parse import urlparse, urljoin
@@ -47,12 +53,17 @@ from loguru import logger
 from readability import Document
 import hashlib
 
+from utils.enrichment_cache import EnrichmentCache
+from utils.token_budget import estimate_tokens, truncate_to_tokens
+from services.corpus_stats_service import extract_topics as extract_corpus_topics
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
 
 # Content extraction settings
 MAX_CONTENT_LENGTH = 5000  # Maximum characters for AI processing
+AI_CONTEXT_TOKEN_BUDGET = 400  # Token budget of the precomputed per-article AI context
 MIN_CONTENT_LENGTH = 100   # Minimum characters for valid article
 MIN_PARAGRAPH_LENGTH = 50  # Minimum length for a paragraph to be considered
 
@@ -92,6 +103,15 @@ CATEGORY_KEYWORDS = {
 REQUEST_TIMEOUT = 10       # Timeout for HTTP requests
 USER_AGENT = "Mozilla/5.0 (compatible; ArticleEnrichmentBot/1.0)"
 
+# On-demand enrichment settings
+MAX_CONCURRENT_PREFETCH = 3  # Background prefetch enrichments running at once
+
+
+def _record_stage(timings: Optional[Dict[str, float]], stage: str, started: float):
+    """Add the time since `started` (perf_counter) to a stage timing in ms"""
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + (time.perf_counter() - started) * 1000
+
 
 # ============================================================================
 # ARTICLE ENRICHMENT SERVICE
@@ -114,6 +134,8 @@ class ArticleEnrichmentService:
             "categories_assigned": 0,
             "summaries_generated": 0,
             "quality_failures": 0,
+            "persistent_cache_hits": 0,
+            "persistent_cache_misses": 0,
         }
 
     # ========================================================================
@@ -124,7 +146,8 @@ class ArticleEnrichmentService:
         self,
         url: str,
         existing_content: Optional[str] = None,
-        existing_data: Optional[Dict[str, Any]] = None
+        existing_data: Optional[Dict[str, Any]] = None,
+        timings: Optional[Dict[str, float]] = None
     ) -> Dict[str, Any]:
         """
         Enrich an article with full content, images, metadata, etc.
@@ -141,6 +164,8 @@ class ArticleEnrichmentService:
             url: Article URL
             existing_content: Existing article content (optional, will fetch if not provided)
             existing_data: Existing article data to merge with
+            timings: Optional dict that receives per-stage durations in ms
+                     (cache_lookup, fetch, extract, analyze, summarize)
 
         Returns:
             Dictionary with enriched article data
@@ -148,9 +173,20 @@ class ArticleEnrichmentService:
         logger.info(f"Enriching article: {url}")
 
         try:
+            # Another user (or an earlier process) may have enriched this URL already
+            started = time.perf_counter()
+            cached = await EnrichmentCache.get(url, existing_content)
+            _record_stage(timings, "cache_lookup", started)
+            if cached is not None:
+                self.stats["persistent_cache_hits"] += 1
+                return self._merge_cached_enrichment(url, cached, existing_data)
+            self.stats["persistent_cache_misses"] += 1
+
             # Fetch article HTML if not provided
             if existing_content is None:
+                started = time.perf_counter()
                 html_content = await self._fetch_article_html(url)
+                _record_stage(timings, "fetch", started)
             else:
                 html_content = existing_content
 
@@ -159,12 +195,15 @@ class ArticleEnrichmentService:
                 return existing_data or {}
 
             # Parse HTML
+            started = time.perf_counter()
             soup = BeautifulSoup(html_content, 'lxml')
 
             # Extract full text using readability
             full_text, cleaned_html = self._extract_full_text(html_content, url)
+            _record_stage(timings, "extract", started)
 
             # Extract images
+            started = time.perf_counter()
             featured_image = self._extract_featured_image(soup, url)
 
             # Classify category
@@ -179,15 +218,23 @@ class ArticleEnrichmentService:
                 has_image=bool(featured_image),
                 metadata=metadata
             )
+            _record_stage(timings, "analyze", started)
 
             # Generate summary (only if quality is sufficient)
             summary = None
             if quality_score >= MIN_QUALITY_SCORE:
+                started = time.perf_counter()
                 summary = self._generate_summary(full_text, url)
+                _record_stage(timings, "summarize", started)
 
             # Prepare limited content for AI processing
             content_for_ai = self._prepare_content_for_ai(full_text)
 
+            # Precompute the token-budgeted prompt context used by generation
+            ai_context, ai_context_tokens = self._build_ai_context(
+                content_for_ai, summary, metadata.get("topics")
+            )
+
             # Compile enriched data
             enriched_data = {
                 "url": url,
@@ -198,9 +245,19 @@ class ArticleEnrichmentService:
                 "category": category,
                 "auto_summary": summary,
                 "quality_score": quality_score,
+                "ai_context": ai_context,
+                "ai_context_tokens": ai_context_tokens,
                 **metadata,  # author, publish_date, reading_time, topics
             }
 
+            # Share results with other users/workers
+            await EnrichmentCache.set(
+                url,
+                enriched_data,
+                html_content,
+                origin="page" if existing_content is None else "feed"
+            )
+
             # Merge with existing data
             if existing_data:
                 # Don't overwrite existing values with None
@@ -229,6 +286,55 @@ class ArticleEnrichmentService:
             logger.error(f"Error enriching article {url}: {e}")
             return existing_data or {}
 
+    def _merge_cached_enrichment(
+        self,
+        url: str,
+        cached: Dict[str, Any],
+        existing_data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Build enriched article data from a persistent cache entry
+
+        Category is re-classified per caller since it may depend on the
+        caller's own feed tags.
+
+        Args:
+            url: Article URL
+            cached: Cached enrichment fields
+            existing_data: Existing article data to merge with
+
+        Returns:
+            Dictionary with enriched article data
+        """
+        enriched_data = {
+            "url": url,
+            **cached,
+            "category": self._classify_category(cached.get("full_text") or "", existing_data),
+        }
+
+        # Entries cached before AI context existed
+        if not enriched_data.get("ai_context"):
+            enriched_data["ai_context"], enriched_data["ai_context_tokens"] = self._build_ai_context(
+                cached.get("content_for_ai"), cached.get("auto_summary"), cached.get("topics")
+            )
+
+        if existing_data:
+            for key, value in enriched_data.items():
+                if value is not None:
+                    existing_data[key] = value
+            enriched_data = existing_data
+
+        self.stats["articles_enriched"] += 1
+        if cached.get("featured_image"):
+            self.stats["images_extracted"] += 1
+        if enriched_data.get("category"):
+            self.stats["categories_assigned"] += 1
+        if cached.get("auto_summary"):
+            self.stats["summaries_generated"] += 1
+
+        logger.info(f"Article enrichment served from cache - Quality: {cached.get('quality_score')}/100")
+        return enriched_data
+
     async def process_feed_article(
         self,
         entry: Dict[str, Any],
@@ -292,7 +398,10 @@ class ArticleEnrichmentService:
             HTML content or None if fetch fails
         """
         try:
-            response = requests.get(
+            # Run the blocking request in a worker thread so on-demand
+            # enrichment inside a request handler doesn't stall the event loop
+            response = await asyncio.to_thread(
+                requests.get,
                 url,
                 timeout=REQUEST_TIMEOUT,
                 headers={"User-Agent": USER_AGENT},
@@ -853,8 +962,9 @@ class ArticleEnrichmentService:
         """
         Extract key topics/entities from content
 
-        Uses simple frequency analysis of meaningful words.
-        Can be enhanced with NER (Named Entity Recognition) models.
+        Ranks terms by TF-IDF against the corpus document-frequency table
+        maintained at ingest, so words common to every article don't rank
+        as topics. Falls back to term frequency when no statistics exist.
 
         Args:
             content: Article content
@@ -866,46 +976,7 @@ class ArticleEnrichmentService:
             if not content:
                 return []
 
-            # First try to extract capitalized words (likely proper nouns/important terms)
-            capitalized_words = re.findall(r'\b[A-Z][a-z]{3,}\b', content)
-
-            # Filter out common words
-            common_words = {'The', 'This', 'That', 'With', 'From', 'Have', 'Been',
-                          'Will', 'Would', 'Could', 'Should', 'There', 'Their',
-                          'When', 'What', 'Where', 'Which', 'While'}
-
-            if capitalized_words:
-                # Count frequency of capitalized words
-                word_freq = Counter(capitalized_words)
-
-                # Get top topics (words that appear at least once)
-                topics = [word for word, count in word_freq.most_common(10)
-                         if word not in common_words]
-
-                if topics:
-                    return topics[:5]  # Return top 5
-
-            # Fallback: extract all meaningful words (4+ characters)
-            all_words = re.findall(r'\b[a-z]{4,}\b', content.lower())
-
-            if all_words:
-                word_freq = Counter(all_words)
-
-                # Common lowercase words to exclude
-                common_lowercase = {'that', 'this', 'with', 'from', 'have', 'been',
-                                  'will', 'would', 'could', 'should', 'there', 'their',
-                                  'when', 'what', 'where', 'which', 'while', 'about',
-                                  'more', 'than', 'some', 'into', 'over', 'after',
-                                  'make', 'made', 'most', 'many', 'much', 'them',
-                                  'such', 'only', 'also', 'well', 'very', 'even'}
-
-                # Get top topics that appear multiple times
-                topics = [word for word, count in word_freq.most_common(15)
-                         if word not in common_lowercase and count >= 2]
-
-                return topics[:5]  # Return top 5
-
-            return []
+            return extract_corpus_topics(content, limit=5)
 
         except Exception as e:
             logger.warning(f"Error extracting topics: {e}")
@@ -965,6 +1036,63 @@ class ArticleEnrichmentService:
 
         return final_result
 
+    def _build_ai_context(
+        self,
+        content: Optional[str],
+        summary: Optional[str],
+        topics: Optional[List[str]] = None
+    ) -> Tuple[Optional[str], int]:
+        """
+        Build the per-article context block used in generation prompts
+
+        Summary and topics first, then lead paragraphs of the article until
+        AI_CONTEXT_TOKEN_BUDGET is reached. Computed once at enrichment and
+        stored with its token estimate, so prompt assembly never re-reads
+        the full text.
+
+        Args:
+            content: Content prepared for AI (see _prepare_content_for_ai)
+            summary: Extractive summary
+            topics: Key topics
+
+        Returns:
+            Tuple of (context text or None, estimated tokens)
+        """
+        parts = []
+        if summary:
+            parts.append(f"Summary: {summary}")
+        if topics:
+            parts.append(f"Topics: {', '.join(topics)}")
+
+        remaining = AI_CONTEXT_TOKEN_BUDGET - estimate_tokens("\n".join(parts))
+        excerpt = []
+
+        for para in (content or "").split('\n'):
+            para = para.strip()
+            if len(para) < MIN_PARAGRAPH_LENGTH or remaining <= 0:
+                continue
+            # Skip paragraphs already covered by the extractive summary
+            if summary and para in summary:
+                continue
+
+            para_tokens = estimate_tokens(para)
+            if para_tokens > remaining:
+                if remaining >= 40:  # Only if a meaningful chunk fits
+                    excerpt.append(truncate_to_tokens(para, remaining))
+                break
+
+            excerpt.append(para)
+            remaining -= para_tokens + 1
+
+        if excerpt:
+            parts.append("Excerpt:\n" + "\n".join(excerpt))
+
+        if not parts:
+            return None, 0
+
+        context = "\n".join(parts)
+        return context, estimate_tokens(context)
+
     # ========================================================================
     # UTILITY FUNCTIONS
     # ========================================================================
@@ -1007,23 +1135,27 @@ async def enrich_existing_articles(user_id: int, limit: int = 100):
     Enrich existing articles in database
 
     This can be run as a background job to enrich articles that were
-    added before the enrichment service was implemented.
+    added before the enrichment service was implemented. Runs as a
+    checkpointed batch job with bounded parallel fetching.
 
     Args:
         user_id: User ID
         limit: Maximum number of articles to process
+
+    Returns:
+        Job progress report (throughput, stage latency, failures)
     """
     from database import get_db
     from sqlalchemy import text
+    from services.enrichment_job_service import create_enrichment_job, run_enrichment_job
 
-    service = ArticleEnrichmentService()
     db = next(get_db())
 
     try:
         # Get articles without enrichment data
         result = db.execute(
             text("""
-                SELECT id, link, content
+                SELECT id
                 FROM articles
                 WHERE user_id = :user_id
                 AND (full_text IS NULL OR featured_image IS NULL)
@@ -1032,44 +1164,433 @@ async def enrich_existing_articles(user_id: int, limit: int = 100):
             {"user_id": user_id, "limit": limit}
         )
 
-        articles = result.fetchall()
-        logger.info(f"Found {len(articles)} articles to enrich for user {user_id}")
-
-        enriched_count = 0
-        for article in articles:
-            try:
-                # Enrich article
-                enriched = await service.enrich_article(
-                    url=article.link,
-                    existing_content=article.content
-                )
-
-                # Update database (basic update, extend as needed)
-                if enriched:
-                    db.execute(
-                        text("""
-                            UPDATE articles
-                            SET
-                                content = COALESCE(:content, content),
-                                category = COALESCE(:category, category)
-                            WHERE id = :article_id
-                        """),
-                        {
-                            "article_id": article.id,
-                            "content": enriched.get("content_for_ai"),
-                            "category": enriched.get("category"),
-                        }
-                    )
-                    enriched_count += 1
-
-            except Exception as e:
-                logger.error(f"Error enriching article {article.id}: {e}")
-                continue
+        article_ids = [row.id for row in result]
+        logger.info(f"Found {len(article_ids)} articles to enrich for user {user_id}")
+
+        job = create_enrichment_job(db, user_id, article_ids, force_refresh=True)
+
+    finally:
+        db.close()
+
+    progress = await run_enrichment_job(job.id)
+    logger.info(f"Successfully enriched {progress['succeeded'] if progress else 0} articles")
+
+    return progress
+
+
+# ============================================================================
+# ON-DEMAND (LAZY) ENRICHMENT
+# ============================================================================
+#
+# In lazy mode (ENRICHMENT_MODE=lazy) articles are stored raw at ingest and
+# enriched the first time they are opened or picked for post generation.
+# Results are written back to the articles table, so every later read is a
+# plain row lookup. A handful of articles likely to be opened (newest per
+# feed, bookmarked) are prefetched in the background.
+
+# Per-process registry of running enrichments (article_id -> task) so that
+# concurrent opens of the same article share a single fetch
+_inflight_enrichments: Dict[int, "asyncio.Task"] = {}
+
+# Strong references to fire-and-forget prefetch tasks
+_prefetch_tasks: set = set()
+
+# Shared service instance for on-demand enrichment (keeps stats and summary cache)
+_lazy_service: Optional[ArticleEnrichmentService] = None
+
+
+def is_lazy_enrichment_enabled() -> bool:
+    """Check whether articles should be enriched on demand"""
+    from config.settings import settings
+
+    return settings.ENRICHMENT_MODE == "lazy"
+
+
+def get_lazy_enrichment_service() -> ArticleEnrichmentService:
+    """Get the shared enrichment service used for on-demand enrichment"""
+    global _lazy_service
+
+    if _lazy_service is None:
+        _lazy_service = ArticleEnrichmentService()
+
+    return _lazy_service
+
+
+def _row_to_enrichment(row) -> Dict[str, Any]:
+    """Convert a stored article row into an enrichment dictionary"""
+    topics = row.topics
+    if isinstance(topics, str):
+        try:
+            topics = json.loads(topics)
+        except ValueError:
+            topics = []
+
+    return {
+        "article_id": row.id,
+        "full_text": row.full_text,
+        "content_for_ai": row.content_for_ai,
+        "featured_image": row.featured_image,
+        "auto_summary": row.auto_summary,
+        "quality_score": row.quality_score,
+        "author": row.author,
+        "reading_time": row.reading_time,
+        "topics": topics or [],
+        "category": row.category,
+        "ai_context": row.ai_context,
+        "ai_context_tokens": row.ai_context_tokens,
+    }
+
+
+def _load_article_for_enrichment(db, article_id: int, user_id: Optional[int] = None):
+    """
+    Read the columns needed to enrich an article
+
+    Args:
+        db: Database session
+        article_id: Article ID
+        user_id: Only match articles owned by this user (optional)
+
+    Returns:
+        Row, or None if the article does not exist
+    """
+    from sqlalchemy import text
+
+    owner_filter = "AND user_id = :user_id" if user_id is not None else ""
+
+    return db.execute(
+        text(f"""
+            SELECT id, title, link, content, category, enriched_at,
+                   full_text, content_for_ai, featured_image, auto_summary,
+                   quality_score, author, reading_time, topics,
+                   ai_context, ai_context_tokens
+            FROM articles
+            WHERE id = :article_id {owner_filter}
+        """),
+        {"article_id": article_id, "user_id": user_id}
+    ).fetchone()
+
+
+async def _compute_enrichment(
+    service: ArticleEnrichmentService,
+    row,
+    timings: Optional[Dict[str, float]] = None
+) -> Dict[str, Any]:
+    """
+    Enrich a stored article row without writing anything
+
+    Prefers the full page; falls back to the feed content if the fetch fails.
+
+    Args:
+        service: Enrichment service
+        row: Row from _load_article_for_enrichment
+        timings: Optional dict that receives per-stage durations in ms
+
+    Returns:
+        Enriched article data (no full_text if nothing could be extracted)
+    """
+    existing_data = {"title": row.title, "category": row.category}
+
+    enriched = await service.enrich_article(
+        url=row.link, existing_data=dict(existing_data), timings=timings
+    )
+    if not enriched.get("full_text") and row.content:
+        enriched = await service.enrich_article(
+            url=row.link,
+            existing_content=row.content,
+            existing_data=dict(existing_data),
+            timings=timings
+        )
 
-        db.commit()
-        logger.info(f"Successfully enriched {enriched_count} articles")
+    return enriched
 
-        return service.get_stats()
+
+def _persist_enrichment(db, row, enriched: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Write enrichment results to the articles table and commit
+
+    The article is marked as enriched even if extraction found nothing, so a
+    dead link is not re-fetched on every open.
+
+    Args:
+        db: Database session
+        row: Row from _load_article_for_enrichment
+        enriched: Enriched article data
+
+    Returns:
+        Enrichment dictionary as served to readers
+    """
+    from sqlalchemy import text
+
+    topics = enriched.get("topics") or []
+
+    db.execute(
+        text("""
+            UPDATE articles
+            SET
+                full_text = :full_text,
+                content_for_ai = :content_for_ai,
+                featured_image = :featured_image,
+                auto_summary = :auto_summary,
+                quality_score = :quality_score,
+                author = :author,
+                publish_date = :publish_date,
+                reading_time = :reading_time,
+                topics = :topics,
+                ai_context = :ai_context,
+                ai_context_tokens = :ai_context_tokens,
+                category = COALESCE(category, :category),
+                image_url = COALESCE(image_url, :featured_image),
+                summary = COALESCE(NULLIF(summary, ''), :auto_summary),
+                enriched_at = :enriched_at
+            WHERE id = :article_id
+        """),
+        {
+            "article_id": row.id,
+            "full_text": enriched.get("full_text"),
+            "content_for_ai": enriched.get("content_for_ai"),
+            "featured_image": enriched.get("featured_image"),
+            "auto_summary": enriched.get("auto_summary"),
+            "quality_score": enriched.get("quality_score"),
+            "author": (enriched.get("author") or "")[:200] or None,
+            "publish_date": enriched.get("publish_date"),
+            "reading_time": enriched.get("reading_time"),
+            "topics": json.dumps(topics),
+            "ai_context": enriched.get("ai_context"),
+            "ai_context_tokens": enriched.get("ai_context_tokens") or 0,
+            "category": enriched.get("category"),
+            "enriched_at": datetime.utcnow(),
+        }
+    )
+    db.commit()
+
+    return {
+        "article_id": row.id,
+        "full_text": enriched.get("full_text"),
+        "content_for_ai": enriched.get("content_for_ai"),
+        "featured_image": enriched.get("featured_image"),
+        "auto_summary": enriched.get("auto_summary"),
+        "quality_score": enriched.get("quality_score"),
+        "author": enriched.get("author"),
+        "reading_time": enriched.get("reading_time"),
+        "topics": topics,
+        "category": row.category or enriched.get("category"),
+        "ai_context": enriched.get("ai_context"),
+        "ai_context_tokens": enriched.get("ai_context_tokens") or 0,
+    }
+
+
+async def _enrich_and_persist(article_id: int, force: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Enrich a stored article and write the results back to the database
+
+    Args:
+        article_id: Article ID
+        force: Re-enrich even if the article was already enriched
+
+    Returns:
+        Enrichment dictionary, or None if the article does not exist
+    """
+    from database import get_db
+
+    db = next(get_db())
+
+    try:
+        row = _load_article_for_enrichment(db, article_id)
+
+        if not row:
+            return None
+
+        # Read-through: already enriched, serve the stored fields
+        if row.enriched_at and not force:
+            return _row_to_enrichment(row)
+
+        enriched = await _compute_enrichment(get_lazy_enrichment_service(), row)
+        enrichment = _persist_enrichment(db, row, enriched)
+
+        logger.info(f"Article {article_id} enriched on demand")
+        return enrichment
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"On-demand enrichment failed for article {article_id}: {e}")
+        return None
 
     finally:
         db.close()
+
+
+async def ensure_article_enriched(article_id: int, force: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Return enrichment data for an article, computing it on first use
+
+    Concurrent callers for the same article share one in-flight enrichment.
+
+    Args:
+        article_id: Article ID
+        force: Re-enrich even if the article was already enriched
+
+    Returns:
+        Enrichment dictionary, or None if unavailable
+    """
+    task = _inflight_enrichments.get(article_id)
+
+    if task is None:
+        task = asyncio.ensure_future(_enrich_and_persist(article_id, force))
+        _inflight_enrichments[article_id] = task
+        task.add_done_callback(lambda _: _inflight_enrichments.pop(article_id, None))
+
+    # Shield so one caller going away doesn't cancel the others' enrichment
+    return await asyncio.shield(task)
+
+
+async def ensure_articles_enriched(
+    article_ids: List[int],
+    max_concurrent: int = MAX_CONCURRENT_PREFETCH
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Enrich several articles on demand with bounded concurrency
+
+    Args:
+        article_ids: Article IDs
+        max_concurrent: Maximum enrichments running at once
+
+    Returns:
+        Dictionary mapping article ID to enrichment data
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def enrich_one(article_id: int):
+        async with semaphore:
+            return article_id, await ensure_article_enriched(article_id)
+
+    results = await asyncio.gather(
+        *[enrich_one(article_id) for article_id in dict.fromkeys(article_ids)],
+        return_exceptions=True
+    )
+
+    return {
+        article_id: enrichment
+        for result in results
+        if not isinstance(result, Exception)
+        for article_id, enrichment in [result]
+        if enrichment is not None
+    }
+
+
+def select_prefetch_candidates(db, user_id: int, limit: int) -> List[int]:
+    """
+    Pick a user's not-yet-enriched articles that are most likely to be opened
+
+    Bookmarked articles come first, then the newest ones (top of the feed).
+
+    Args:
+        db: Database session
+        user_id: User ID
+        limit: Maximum number of articles
+
+    Returns:
+        List of article IDs
+    """
+    from sqlalchemy import text
+
+    if limit <= 0:
+        return []
+
+    try:
+        result = db.execute(
+            text("""
+                SELECT id
+                FROM articles
+                WHERE user_id = :user_id
+                AND enriched_at IS NULL
+                ORDER BY bookmarked DESC, published DESC
+                LIMIT :limit
+            """),
+            {"user_id": user_id, "limit": limit}
+        )
+        return [row.id for row in result]
+
+    except Exception as e:
+        logger.warning(f"Could not select prefetch candidates for user {user_id}: {e}")
+        return []
+
+
+def schedule_prefetch(article_ids: List[int]) -> int:
+    """
+    Enrich articles in the background without waiting for the result
+
+    Must be called from a running event loop.
+
+    Args:
+        article_ids: Article IDs to prefetch
+
+    Returns:
+        Number of articles scheduled
+    """
+    pending = [aid for aid in article_ids if aid not in _inflight_enrichments]
+    if not pending:
+        return 0
+
+    task = asyncio.ensure_future(ensure_articles_enriched(pending))
+    _prefetch_tasks.add(task)
+    task.add_done_callback(_prefetch_tasks.discard)
+
+    logger.debug(f"Scheduled prefetch enrichment for {len(pending)} articles")
+    return len(pending)
+
+
+# ============================================================================
+# AI CONTEXT FOR GENERATION
+# ============================================================================
+
+def load_article_contexts(db, article_ids: List[int]) -> List[Dict[str, Any]]:
+    """
+    Load articles for prompt assembly from stored fields only
+
+    Reads the precomputed `ai_context` and its token estimate alongside the
+    basic article fields; no full text is loaded or re-processed. Falls back
+    to the basic fields if the enrichment columns have not been migrated.
+
+    Args:
+        db: Database session
+        article_ids: Article IDs
+
+    Returns:
+        List of article dictionaries (id, title, link, summary, source,
+        published, ai_context, ai_context_tokens)
+    """
+    from sqlalchemy import text, bindparam, DateTime
+
+    if not article_ids:
+        return []
+
+    base_columns = "id, title, link, summary, source, published"
+
+    def select(columns: str):
+        return db.execute(
+            text(f"SELECT {columns} FROM articles WHERE id IN :article_ids")
+            .bindparams(bindparam("article_ids", expanding=True))
+            .columns(published=DateTime),
+            {"article_ids": list(article_ids)}
+        ).fetchall()
+
+    try:
+        rows = select(f"{base_columns}, ai_context, ai_context_tokens")
+    except Exception as e:
+        logger.debug(f"AI context columns unavailable, using basic fields: {e}")
+        db.rollback()
+        rows = select(base_columns)
+
+    return [
+        {
+            "id": row.id,
+            "title": row.title,
+            "link": row.link,
+            "summary": row.summary or "",
+            "source": row.source,
+            "published": row.published,
+            "ai_context": getattr(row, "ai_context", None),
+            "ai_context_tokens": getattr(row, "ai_context_tokens", None) or 0,
+        }
+        for row in rows
+    ]
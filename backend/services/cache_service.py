@@ -2,10 +2,15 @@
 Caching Service
 
 Provides a unified caching interface with support for:
-- In-memory caching (development)
+- In-memory caching (development; bounded LRU)
 - Redis caching (production)
 - TTL-based expiration
 - Cache invalidation
+- Stampede protection (single-flight, stale-while-revalidate)
+
+This is the synchronous adapter of the async cache subsystem in
+utils/cache_manager.py: it shares its serializer, Redis connection settings
+and per-namespace policy/metrics (namespace "app").
 
 Usage:
     from services.cache_service import cache_service
@@ -19,49 +24,136 @@ Usage:
     # Delete value
     cache_service.delete("user:123:quota")
 """
-from typing import Optional, Any, Dict
-from datetime import datetime, timedelta
+from typing import Optional, Any, Dict, Callable, Tuple
+from collections import OrderedDict
+from concurrent.futures import Future
 import json
 import hashlib
+import sys
+import threading
+import time
+import uuid
 from loguru import logger
 
+from utils.cache_serializer import serializer
+from utils.cache_manager import register_namespace, get_namespace_metrics
+from config.redis_config import get_redis_binary_client
+
+
+# Stampede protection: lifetime of a key's fill lock, which is also how long
+# other processes wait for the lock holder's result
+FILL_LOCK_TTL = 10
+FILL_POLL_INTERVAL = 0.05
+
+# Marker key of stale-while-revalidate envelopes
+_SWR_MARKER = "__swr_fresh_until__"
+
+
+class _CacheEntry:
+    """In-memory cache entry (slots keep per-entry overhead small)"""
+
+    __slots__ = ("value", "expires_at", "size")
+
+    def __init__(self, value: Any, expires_at: float, size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
 
 class InMemoryCache:
-    """Simple in-memory cache with TTL support"""
+    """
+    Bounded in-memory cache with TTL support
 
-    def __init__(self):
-        self._cache: Dict[str, Dict[str, Any]] = {}
-        self._stats = {"hits": 0, "misses": 0, "sets": 0, "deletes": 0}
+    - LRU eviction once max_entries or max_bytes is exceeded
+    - TTLs on the monotonic clock (immune to wall-clock changes)
+    - Expired entries are swept every sweep_interval seconds, piggybacked
+      on writes, so memory is reclaimed even for keys never read again
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        sweep_interval: int = 60
+    ):
+        self._cache: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._sweep_interval = sweep_interval
+        self._next_sweep = time.monotonic() + sweep_interval
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "sets": 0, "deletes": 0, "evictions": 0, "expired": 0}
+
+    @staticmethod
+    def _estimate_size(key: str, value: Any) -> int:
+        """
+        Approximate memory footprint of an entry
+
+        Shallow on purpose: the container plus its top-level items, so a set
+        costs O(len) pointer reads instead of serializing the whole value.
+        Nested structures are undercounted, which is fine for an LRU bound.
+        """
+        size = sys.getsizeof(key) + sys.getsizeof(value)
+        if isinstance(value, dict):
+            size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            size += sum(sys.getsizeof(item) for item in value)
+        return size
+
+    def _remove(self, key: str) -> None:
+        """Drop an entry and release its size (lock held)"""
+        entry = self._cache.pop(key)
+        self._bytes -= entry.size
+
+    def _store(self, key: str, value: Any, ttl: int, size: int, now: float) -> None:
+        """Insert an entry and evict down to the limits (lock held)"""
+        if key in self._cache:
+            self._remove(key)
+
+        self._cache[key] = _CacheEntry(value, now + ttl, size)
+        self._bytes += size
+        self._stats["sets"] += 1
+
+        if now >= self._next_sweep:
+            self._sweep(now)
+
+        # Evict least recently used entries until within limits
+        while len(self._cache) > self._max_entries or self._bytes > self._max_bytes:
+            self._remove(next(iter(self._cache)))
+            self._stats["evictions"] += 1
 
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
-        if key not in self._cache:
-            self._stats["misses"] += 1
-            return None
+        with self._lock:
+            entry = self._cache.get(key)
 
-        entry = self._cache[key]
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
 
-        # Check expiration
-        if "expires_at" in entry and entry["expires_at"] < datetime.utcnow():
-            del self._cache[key]
-            self._stats["misses"] += 1
-            return None
+            # Check expiration
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
 
-        self._stats["hits"] += 1
-        return entry["value"]
+            self._cache.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry.value
 
     def set(self, key: str, value: Any, ttl: int = 300) -> bool:
         """Set value in cache with TTL (seconds)"""
         try:
-            expires_at = datetime.utcnow() + timedelta(seconds=ttl)
+            size = self._estimate_size(key, value)
+            if size > self._max_bytes:
+                logger.warning(f"Cache value too large for in-memory cache: {key} ({size} bytes)")
+                return False
 
-            self._cache[key] = {
-                "value": value,
-                "expires_at": expires_at,
-                "created_at": datetime.utcnow()
-            }
+            with self._lock:
+                self._store(key, value, ttl, size, time.monotonic())
 
-            self._stats["sets"] += 1
             return True
 
         except Exception as e:
@@ -70,15 +162,18 @@ class InMemoryCache:
 
     def delete(self, key: str) -> bool:
         """Delete value from cache"""
-        if key in self._cache:
-            del self._cache[key]
-            self._stats["deletes"] += 1
-            return True
-        return False
+        with self._lock:
+            if key in self._cache:
+                self._remove(key)
+                self._stats["deletes"] += 1
+                return True
+            return False
 
     def clear(self) -> bool:
         """Clear entire cache"""
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
+            self._bytes = 0
         return True
 
     def get_stats(self) -> Dict[str, int]:
@@ -90,57 +185,93 @@ class InMemoryCache:
             **self._stats,
             "total_requests": total_requests,
             "hit_rate_percent": round(hit_rate, 2),
-            "size": len(self._cache)
+            "size": len(self._cache),
+            "max_entries": self._max_entries,
+            "bytes": self._bytes,
+            "max_bytes": self._max_bytes
         }
 
-    def cleanup_expired(self) -> int:
-        """Remove expired entries"""
-        now = datetime.utcnow()
-        expired_keys = [
-            key for key, entry in self._cache.items()
-            if "expires_at" in entry and entry["expires_at"] < now
-        ]
+    def _sweep(self, now: float) -> int:
+        """Remove expired entries (lock held)"""
+        expired_keys = [key for key, entry in self._cache.items() if entry.expires_at <= now]
 
         for key in expired_keys:
-            del self._cache[key]
+            self._remove(key)
 
+        self._stats["expired"] += len(expired_keys)
+        self._next_sweep = now + self._sweep_interval
         return len(expired_keys)
 
+    def cleanup_expired(self) -> int:
+        """Remove expired entries"""
+        with self._lock:
+            return self._sweep(time.monotonic())
+
+    def acquire_lock(self, key: str, ttl: int) -> Optional[str]:
+        """Take a short-lived lock (set-if-absent); returns a token or None"""
+        lock_key = f"lock:{key}"
+        token = uuid.uuid4().hex
+        size = self._estimate_size(lock_key, token)
+
+        # Check and set under one lock hold, so two threads can't both win
+        with self._lock:
+            now = time.monotonic()
+            entry = self._cache.get(lock_key)
+            if entry is not None and entry.expires_at > now:
+                return None
+
+            self._store(lock_key, token, ttl, size, now)
+
+        return token
+
+    def release_lock(self, key: str, token: str) -> None:
+        """Release a lock if still owned"""
+        lock_key = f"lock:{key}"
+        with self._lock:
+            entry = self._cache.get(lock_key)
+            if entry is not None and entry.value == token:
+                self._remove(lock_key)
+
 
 class RedisCache:
     """Redis-based cache (for production)"""
 
-    def __init__(self, redis_url: str):
+    def __init__(self, namespace: str = "app"):
         """
         Initialize Redis cache
 
+        Uses the shared binary Redis client from config.redis_config, so the
+        connection (settings.REDIS_URL, else the REDIS_* settings) and pool
+        are the same as every other Redis client.
+
         Args:
-            redis_url: Redis connection URL
+            namespace: Key prefix
         """
+        self._prefix = f"{namespace}:"
         try:
-            import redis
-            self._redis = redis.from_url(redis_url, decode_responses=True)
+            # Values are binary (see utils.cache_serializer)
+            self._redis = get_redis_binary_client()
             self._available = True
-            logger.info(f"Redis cache initialized: {redis_url}")
-        except ImportError:
-            logger.warning("Redis library not installed, falling back to in-memory cache")
-            self._available = False
+            logger.info(f"Redis cache initialized (namespace: {namespace})")
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
             self._available = False
 
+    def _key(self, key: str) -> str:
+        """Namespaced Redis key"""
+        return f"{self._prefix}{key}"
+
     def get(self, key: str) -> Optional[Any]:
         """Get value from Redis"""
         if not self._available:
             return None
 
         try:
-            value = self._redis.get(key)
+            value = self._redis.get(self._key(key))
             if value is None:
                 return None
 
-            # Deserialize JSON
-            return json.loads(value)
+            return serializer.loads(value)
 
         except Exception as e:
             logger.error(f"Redis get failed for key {key}: {e}")
@@ -152,11 +283,10 @@ class RedisCache:
             return False
 
         try:
-            # Serialize to JSON
-            serialized = json.dumps(value)
+            serialized = serializer.dumps(value)
 
             # Set with TTL
-            self._redis.setex(key, ttl, serialized)
+            self._redis.setex(self._key(key), ttl, serialized)
             return True
 
         except Exception as e:
@@ -169,7 +299,7 @@ class RedisCache:
             return False
 
         try:
-            self._redis.delete(key)
+            self._redis.delete(self._key(key))
             return True
         except Exception as e:
             logger.error(f"Redis delete failed for key {key}: {e}")
@@ -205,6 +335,34 @@ class RedisCache:
             logger.error(f"Failed to get Redis stats: {e}")
             return {"available": False, "error": str(e)}
 
+    def acquire_lock(self, key: str, ttl: int) -> Optional[str]:
+        """Take a short-lived cross-process lock (SET NX EX); returns a token or None"""
+        if not self._available:
+            return uuid.uuid4().hex  # No shared state to protect
+
+        token = uuid.uuid4().hex
+        try:
+            if self._redis.set(self._key(f"lock:{key}"), token, nx=True, ex=ttl):
+                return token
+            return None
+        except Exception as e:
+            logger.warning(f"Redis lock failed for key {key}: {e}")
+            return token
+
+    def release_lock(self, key: str, token: str) -> None:
+        """Release a lock if still owned"""
+        if not self._available:
+            return
+
+        try:
+            self._redis.eval(
+                "if redis.call('get', KEYS[1]) == ARGV[1] then "
+                "return redis.call('del', KEYS[1]) end return 0",
+                1, self._key(f"lock:{key}"), token
+            )
+        except Exception as e:
+            logger.warning(f"Redis lock release failed for key {key}: {e}")
+
     @staticmethod
     def _calculate_hit_rate(info: Dict) -> float:
         """Calculate cache hit rate from Redis info"""
@@ -233,11 +391,24 @@ class CacheService:
         self._enabled = settings.CACHE_ENABLED
         self._default_ttl = settings.CACHE_TTL_SECONDS
 
+        # Shared policy/metrics with the async cache subsystem
+        self._namespace = "app"
+        register_namespace(self._namespace, default_ttl=self._default_ttl)
+        self._metrics = get_namespace_metrics(self._namespace)
+
+        # Loads in flight in this process (single-flight), keyed by cache key
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+
         # Initialize backend
-        if self._backend_type == "redis" and settings.REDIS_URL:
-            self._backend = RedisCache(settings.REDIS_URL)
+        if self._backend_type == "redis":
+            self._backend = RedisCache(self._namespace)
         else:
-            self._backend = InMemoryCache()
+            self._backend = InMemoryCache(
+                max_entries=settings.CACHE_MAX_ENTRIES,
+                max_bytes=settings.CACHE_MAX_BYTES,
+                sweep_interval=settings.CACHE_SWEEP_INTERVAL_SECONDS
+            )
             logger.info("Using in-memory cache")
 
     def get(self, key: str) -> Optional[Any]:
@@ -253,7 +424,19 @@ class CacheService:
         if not self._enabled:
             return None
 
-        return self._backend.get(key)
+        started = time.perf_counter()
+        value = self._backend.get(key)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        metrics = self._metrics
+        metrics.get_time_ms += elapsed_ms
+        metrics.max_get_ms = max(metrics.max_get_ms, elapsed_ms)
+        if value is None:
+            metrics.misses += 1
+        else:
+            metrics.hits += 1
+
+        return value
 
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """
@@ -273,7 +456,16 @@ class CacheService:
         if ttl is None:
             ttl = self._default_ttl
 
-        return self._backend.set(key, value, ttl)
+        started = time.perf_counter()
+        success = self._backend.set(key, value, ttl)
+        self._metrics.set_time_ms += (time.perf_counter() - started) * 1000
+
+        if success:
+            self._metrics.sets += 1
+        else:
+            self._metrics.errors += 1
+
+        return success
 
     def delete(self, key: str) -> bool:
         """
@@ -309,9 +501,150 @@ class CacheService:
         Get cache statistics
 
         Returns:
-            dict: Cache statistics including hit rate, size, etc.
+            dict: Cache statistics including hit rate, size, etc., plus
+            the shared "app" namespace metrics
+        """
+        return {**self._backend.get_stats(), "metrics": self._metrics.to_dict()}
+
+    def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: Optional[int] = None,
+        stale_ttl: int = 0,
+        single_flight: bool = True
+    ) -> Any:
+        """
+        Get value from cache, loading and caching it on a miss
+
+        With single_flight, concurrent misses for the same key run the loader
+        once: threads in this process share one result, other processes wait
+        on a short backend lock and then read the cached value. With
+        stale_ttl, values are kept stale_ttl seconds past their TTL; a stale
+        hit is returned immediately while one caller refreshes it in a
+        background thread, so the loader must not depend on request-scoped
+        resources (e.g. the request's DB session).
+
+        Args:
+            key: Cache key
+            loader: Callable producing the value (None is not cached)
+            ttl: Freshness lifetime in seconds (default: from config)
+            stale_ttl: Extra seconds a stale value may be served (0 = off)
+            single_flight: Coalesce concurrent loads of the same key
+
+        Returns:
+            Cached or freshly loaded value
         """
-        return self._backend.get_stats()
+        if not self._enabled:
+            return loader()
+
+        if ttl is None:
+            ttl = self._default_ttl
+
+        cached_value = self.get(key)
+        if cached_value is not None:
+            value, fresh = self._unwrap_stale(cached_value)
+            if not fresh:
+                self._schedule_refresh(key, loader, ttl, stale_ttl)
+            return value
+
+        if not single_flight:
+            return self._load_and_store(key, loader, ttl, stale_ttl)
+
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = self._load_with_lock(key, loader, ttl, stale_ttl)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def _load_with_lock(self, key: str, loader: Callable[[], Any], ttl: int, stale_ttl: int) -> Any:
+        """Load under the backend lock, or wait for the process holding it"""
+        token = self._backend.acquire_lock(key, FILL_LOCK_TTL)
+
+        if token is None:
+            deadline = time.monotonic() + FILL_LOCK_TTL
+            while time.monotonic() < deadline:
+                time.sleep(FILL_POLL_INTERVAL)
+                cached_value = self._backend.get(key)
+                if cached_value is not None:
+                    return self._unwrap_stale(cached_value)[0]
+                # The holder may have released without storing a value
+                # (loader returned None or raised); take over the fill
+                token = self._backend.acquire_lock(key, FILL_LOCK_TTL)
+                if token is not None:
+                    cached_value = self._backend.get(key)
+                    if cached_value is not None:
+                        self._backend.release_lock(key, token)
+                        return self._unwrap_stale(cached_value)[0]
+                    break
+            else:
+                logger.warning(f"Timed out waiting for another process to fill {key}, loading directly")
+
+        try:
+            return self._load_and_store(key, loader, ttl, stale_ttl)
+        finally:
+            if token is not None:
+                self._backend.release_lock(key, token)
+
+    def _load_and_store(self, key: str, loader: Callable[[], Any], ttl: int, stale_ttl: int) -> Any:
+        """Run the loader and cache its result (wrapped when serving stale)"""
+        result = loader()
+
+        if result is not None:
+            if stale_ttl:
+                envelope = {_SWR_MARKER: time.time() + ttl, "value": result}
+                self.set(key, envelope, ttl + stale_ttl)
+            else:
+                self.set(key, result, ttl)
+
+        return result
+
+    @staticmethod
+    def _unwrap_stale(cached_value: Any) -> Tuple[Any, bool]:
+        """Return (value, is_fresh) for a possibly wrapped cache value"""
+        if isinstance(cached_value, dict) and _SWR_MARKER in cached_value:
+            return cached_value["value"], cached_value[_SWR_MARKER] > time.time()
+        return cached_value, True
+
+    def _schedule_refresh(self, key: str, loader: Callable[[], Any], ttl: int, stale_ttl: int) -> None:
+        """Refresh a stale key in a background thread unless one is already running"""
+        flight_key = f"refresh:{key}"
+
+        with self._inflight_lock:
+            if flight_key in self._inflight:
+                return
+            self._inflight[flight_key] = Future()
+
+        def refresh():
+            token = None
+            try:
+                token = self._backend.acquire_lock(key, FILL_LOCK_TTL)
+                if token is not None:
+                    self._load_and_store(key, loader, ttl, stale_ttl)
+            except Exception as e:
+                logger.warning(f"Background cache refresh failed for {key}: {e}")
+            finally:
+                if token is not None:
+                    self._backend.release_lock(key, token)
+                with self._inflight_lock:
+                    self._inflight.pop(flight_key, None)
+
+        threading.Thread(target=refresh, name=f"cache-refresh:{key}", daemon=True).start()
 
     def generate_key(self, *parts: Any) -> str:
         """
@@ -354,13 +687,22 @@ class CacheService:
         data_hash = hashlib.sha256(data_str.encode()).hexdigest()[:12]
         return f"{prefix}:{data_hash}"
 
-    def cached(self, key: str, ttl: Optional[int] = None):
+    def cached(
+        self,
+        key: str,
+        ttl: Optional[int] = None,
+        single_flight: bool = False,
+        stale_ttl: int = 0
+    ):
         """
         Decorator for caching function results
 
         Args:
             key: Cache key (can include {arg} placeholders)
             ttl: Time to live in seconds
+            single_flight: Run the function once for concurrent misses of a key
+            stale_ttl: Serve values up to this many seconds past ttl while one
+                caller refreshes in the background (0 = off)
 
         Example:
             @cache_service.cached("user:{user_id}:profile", ttl=600)
@@ -373,6 +715,15 @@ class CacheService:
                 # Format key with arguments
                 cache_key = key.format(**kwargs)
 
+                if single_flight or stale_ttl:
+                    return self.get_or_set(
+                        cache_key,
+                        lambda: func(*args, **kwargs),
+                        ttl=ttl,
+                        stale_ttl=stale_ttl,
+                        single_flight=single_flight
+                    )
+
                 # Try to get from cache
                 cached_value = self.get(cache_key)
                 if cached_value is not None:
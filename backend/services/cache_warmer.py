@@ -0,0 +1,269 @@
+"""
+Cache Warming Service
+
+Precomputes the listings users open first (page one of recent articles,
+the feed list, system sources), so the first requests after a deploy or an
+aggregation cycle are cache hits instead of all reaching the database at once.
+
+Runs:
+- in the background at startup (main.py lifespan)
+- at the end of each FeedAggregator.fetch_all_feeds cycle, for the users
+  whose feeds were fetched
+
+Only recently active users are warmed (a session active within
+CACHE_WARM_ACTIVE_HOURS; the anonymous user in ANONYMOUS_MODE). Queries run
+in worker threads, at most CACHE_WARM_CONCURRENCY users at a time.
+
+How many warmed entries are actually read is tracked per namespace, see
+utils.cache_manager.CacheStats.get_warm_stats().
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from config.redis_config import get_async_redis_client, RedisConfig
+from config.settings import settings
+from database import SessionLocal
+from utils.auth_selector import ANONYMOUS_MODE
+from utils.cache_manager import get_cache
+
+
+ANONYMOUS_USER_ID = 1
+
+# Only one worker warms after a deploy; the lock simply expires
+WARM_LOCK_TTL = 60
+
+feeds_cache = get_cache("feeds")
+
+# Background warming runs (kept referenced until done)
+_warm_tasks: Set[asyncio.Task] = set()
+
+# Result of the most recent run in this process
+last_warm_run: Dict[str, Any] = {}
+
+
+def get_recently_active_user_ids(db: Session, hours: int, limit: int) -> List[int]:
+    """
+    Get users with a session active in the last `hours`, most recent first
+
+    Args:
+        db: Database session
+        hours: Activity window
+        limit: Max users
+
+    Returns:
+        User IDs
+    """
+    cutoff = datetime.utcnow() - timedelta(hours=hours)
+    rows = db.execute(
+        text("""
+            SELECT user_id, MAX(last_activity) AS last_seen
+            FROM sessions
+            WHERE last_activity >= :cutoff
+            GROUP BY user_id
+            ORDER BY last_seen DESC
+            LIMIT :limit
+        """),
+        {"cutoff": cutoff, "limit": limit}
+    ).fetchall()
+
+    user_ids = [row.user_id for row in rows]
+
+    # Anonymous mode has no sessions; user 1 is the only user
+    if ANONYMOUS_MODE and ANONYMOUS_USER_ID not in user_ids:
+        user_ids.insert(0, ANONYMOUS_USER_ID)
+
+    return user_ids
+
+
+def _build_user_listings(user_id: int) -> List[Tuple[str, Dict[str, Any], int]]:
+    """
+    Query a user's default listings (runs in a worker thread)
+
+    Returns:
+        List of (cache key, value, ttl) with the same keys and TTLs the
+        endpoints use
+    """
+    from api.feeds_enhanced import (
+        RECENT_ARTICLES_TTL,
+        build_feed_list_page,
+        build_recent_articles_page,
+        feed_list_cache_key,
+        recent_articles_cache_key,
+    )
+
+    db = SessionLocal()
+    try:
+        return [
+            (
+                recent_articles_cache_key(user_id),
+                build_recent_articles_page(db, user_id),
+                RECENT_ARTICLES_TTL,
+            ),
+            (
+                feed_list_cache_key(user_id),
+                build_feed_list_page(db, user_id),
+                RedisConfig.CACHE_TTL_MEDIUM,
+            ),
+        ]
+    finally:
+        db.close()
+
+
+async def warm_user_caches(user_id: int) -> int:
+    """
+    Warm one user's recent articles and feed list
+
+    Args:
+        user_id: User ID
+
+    Returns:
+        Number of cache entries written
+    """
+    from api.feeds_enhanced import user_feeds_tag
+
+    entries = await asyncio.to_thread(_build_user_listings, user_id)
+    tags = [user_feeds_tag(user_id)]
+
+    warmed = 0
+    for key, value, ttl in entries:
+        if await feeds_cache.warm(key, value, ttl=ttl, tags=tags):
+            warmed += 1
+
+    return warmed
+
+
+async def warm_system_sources() -> int:
+    """Warm the system sources listing shared by all users"""
+    from api.feeds_enhanced import SYSTEM_SOURCES_CACHE_KEY, load_system_sources
+
+    response = await asyncio.to_thread(load_system_sources)
+    if not response["sources"]:
+        return 0
+
+    warmed = await feeds_cache.warm(
+        SYSTEM_SOURCES_CACHE_KEY, response, ttl=RedisConfig.CACHE_TTL_LONG
+    )
+    return 1 if warmed else 0
+
+
+async def _acquire_warm_lock(reason: str) -> bool:
+    """Let one worker warm per reason (True if Redis is unavailable)"""
+    try:
+        redis = await get_async_redis_client()
+        acquired = await redis.set(f"cachewarm:lock:{reason}", 1, nx=True, ex=WARM_LOCK_TTL)
+        return bool(acquired)
+    except Exception as e:
+        logger.warning(f"Cache warm lock unavailable: {e}")
+        return True
+
+
+async def warm_caches(
+    user_ids: Optional[Iterable[int]] = None,
+    reason: str = "manual",
+    include_system: bool = False
+) -> Dict[str, Any]:
+    """
+    Warm listing caches for recently active users
+
+    Never raises: warming is an optimization, failures are logged.
+
+    Args:
+        user_ids: Restrict to these users (still only the recently active ones)
+        reason: Label for logs and the cross-worker lock ("startup", "aggregation")
+        include_system: Also warm the system sources listing
+
+    Returns:
+        Run statistics
+    """
+    if not settings.CACHE_WARM_ENABLED or not RedisConfig.CACHE_ENABLED:
+        return {"reason": reason, "skipped": "disabled"}
+
+    if not await _acquire_warm_lock(reason):
+        return {"reason": reason, "skipped": "running in another worker"}
+
+    started = time.monotonic()
+
+    try:
+        db = SessionLocal()
+        try:
+            active_users = get_recently_active_user_ids(
+                db, settings.CACHE_WARM_ACTIVE_HOURS, settings.CACHE_WARM_MAX_USERS
+            )
+        finally:
+            db.close()
+
+        if user_ids is not None:
+            wanted = set(user_ids)
+            active_users = [user_id for user_id in active_users if user_id in wanted]
+
+        semaphore = asyncio.Semaphore(settings.CACHE_WARM_CONCURRENCY)
+
+        async def warm_with_semaphore(user_id: int) -> int:
+            async with semaphore:
+                return await warm_user_caches(user_id)
+
+        results = await asyncio.gather(
+            *[warm_with_semaphore(user_id) for user_id in active_users],
+            return_exceptions=True
+        )
+
+        errors = [r for r in results if isinstance(r, Exception)]
+        keys_warmed = sum(r for r in results if not isinstance(r, Exception))
+
+        if include_system:
+            try:
+                keys_warmed += await warm_system_sources()
+            except Exception as e:
+                errors.append(e)
+
+    except Exception as e:
+        logger.error(f"Cache warming ({reason}) failed: {e}")
+        return {"reason": reason, "error": str(e)}
+
+    elapsed = time.monotonic() - started
+
+    if errors:
+        logger.warning(f"Cache warming ({reason}): {len(errors)} errors, first: {errors[0]}")
+
+    logger.info(
+        f"Cache warming ({reason}) complete: {len(active_users)} users, "
+        f"{keys_warmed} keys in {elapsed:.1f}s"
+    )
+
+    last_warm_run.clear()
+    last_warm_run.update({
+        "reason": reason,
+        "finished_at": datetime.utcnow().isoformat(),
+        "users": len(active_users),
+        "keys_warmed": keys_warmed,
+        "errors": len(errors),
+        "duration_seconds": round(elapsed, 3),
+    })
+    return dict(last_warm_run)
+
+
+def schedule_cache_warming(
+    user_ids: Optional[Iterable[int]] = None,
+    reason: str = "manual",
+    include_system: bool = False
+) -> Optional[asyncio.Task]:
+    """
+    Run warm_caches in the background
+
+    Returns:
+        The task, or None when warming is disabled
+    """
+    if not settings.CACHE_WARM_ENABLED:
+        return None
+
+    task = asyncio.get_running_loop().create_task(
+        warm_caches(user_ids=user_ids, reason=reason, include_system=include_system)
+    )
+    _warm_tasks.add(task)
+    task.add_done_callback(_warm_tasks.discard)
+    return task
@@ -0,0 +1,427 @@
+"""
+Corpus Statistics Service
+
+Maintains corpus-level term statistics incrementally at ingest time and uses
+them for TF-IDF topic extraction and trending topics.
+
+Features:
+- Document-frequency (DF) table updated once per ingested batch
+- TF-IDF topic ranking with one indexed DF lookup per article
+- Hourly topic buckets for "trending across all users in the last N hours"
+  without scanning the articles table
+- Pruning of old buckets and one-off terms to keep the tables compact
+
+Usage:
+    from services.corpus_stats_service import record_documents, extract_topics
+
+    # After storing new articles
+    record_documents(new_articles)
+
+    # Topics for one article
+    topics = extract_topics(article_text)
+
+    # Trending across all users
+    trending = get_trending_topics(db, hours=24)
+"""
+import math
+import re
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, List, Tuple
+
+from loguru import logger
+from sqlalchemy import text
+
+from database import get_db
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+TOTAL_DOCUMENTS_KEY = "__documents__"  # Reserved term holding document totals
+MAX_TERMS_PER_DOCUMENT = 150   # Most frequent terms counted per document
+TREND_TERMS_PER_DOCUMENT = 8   # Top TF-IDF terms recorded in trend buckets
+TITLE_WEIGHT = 3               # Title words count this many times toward TF
+MAX_TREND_DOCUMENT_SHARE = 0.2 # Terms in more of the corpus than this never trend
+MIN_TREND_CORPUS_SIZE = 50     # ...once the corpus has at least this many documents
+TREND_RETENTION_HOURS = 168    # Keep a week of hourly buckets
+RARE_TERM_RETENTION_DAYS = 30  # Drop single-document terms not seen for this long
+PRUNE_INTERVAL = 3600          # Seconds between prune runs
+QUERY_CHUNK_SIZE = 500         # Terms per IN (...) query (SQLite variable limit)
+
+TERM_PATTERN = re.compile(r"\b[A-Za-z][A-Za-z0-9]{2,39}\b")
+HTML_TAG_PATTERN = re.compile(r"<[^>]+>")
+
+STOPWORDS = frozenset("""
+    about above after again against all also although always among and another any
+    anyone anything are around because been before being below between both but
+    can cannot could did does doing done down during each either else enough even
+    ever every few for from further get gets getting given goes going gone got had
+    has have having her here hers herself him himself his how however into its
+    itself just last least less let like likely made main make makes making many
+    may maybe might more most much must near need needs never new next nor not
+    now off often once one only onto other others our ours ourselves out over own
+    per perhaps put rather really said same say says see seen several she should
+    show since some something still such take than that the their theirs them
+    themselves then there these they thing things think this those though three
+    through thus too two under until upon use used uses using very via want was
+    way ways well were what whatever when where whether which while who whom whose
+    why will with within without would year years yet you your yours yourself
+    today week day days time times first second back including according told
+    http https www com html amp nbsp read click subscribe newsletter sign share
+    comments comment post posted continue reading image images photo credit
+""".split())
+
+_last_prune: Optional[datetime] = None
+
+
+# ============================================================================
+# TERM EXTRACTION
+# ============================================================================
+
+def term_counts(content: Optional[str], title: Optional[str] = None) -> Tuple[Counter, Dict[str, str]]:
+    """
+    Count normalized terms in a document
+
+    Args:
+        content: Article text or HTML
+        title: Article title (weighted by TITLE_WEIGHT)
+
+    Returns:
+        (term frequency Counter keyed by lowercase term,
+         mapping of lowercase term to its most common original casing)
+    """
+    counts: Counter = Counter()
+    casings: Dict[str, Counter] = {}
+
+    for source, weight in ((title, TITLE_WEIGHT), (content, 1)):
+        if not source:
+            continue
+        for word in TERM_PATTERN.findall(HTML_TAG_PATTERN.sub(" ", source)):
+            term = word.lower()
+            if term in STOPWORDS:
+                continue
+            counts[term] += weight
+            casings.setdefault(term, Counter())[word] += 1
+
+    return counts, {term: forms.most_common(1)[0][0] for term, forms in casings.items()}
+
+
+def rank_terms_tfidf(
+    counts: Counter,
+    total_documents: int,
+    document_frequencies: Dict[str, int],
+    limit: int
+) -> List[str]:
+    """
+    Rank a document's terms by TF-IDF
+
+    Uses sublinear TF and smoothed IDF: (1 + log tf) * (log((N + 1) / (df + 1)) + 1)
+
+    Args:
+        counts: Term frequencies of the document
+        total_documents: Corpus size
+        document_frequencies: DF per term (missing = unseen)
+        limit: Maximum number of terms
+
+    Returns:
+        Terms ordered by descending score
+    """
+    def score(term: str) -> float:
+        df = document_frequencies.get(term, 0)
+        idf = math.log((total_documents + 1) / (df + 1)) + 1
+        return (1 + math.log(counts[term])) * idf
+
+    return sorted(counts, key=lambda term: (-score(term), term))[:limit]
+
+
+def get_document_frequencies(db, terms: List[str]) -> Tuple[int, Dict[str, int]]:
+    """
+    Look up corpus size and document frequencies
+
+    Args:
+        db: Database session
+        terms: Normalized terms
+
+    Returns:
+        (total documents, {term: document frequency})
+    """
+    lookup = list(dict.fromkeys(terms)) + [TOTAL_DOCUMENTS_KEY]
+    frequencies: Dict[str, int] = {}
+
+    for offset in range(0, len(lookup), QUERY_CHUNK_SIZE):
+        chunk = lookup[offset:offset + QUERY_CHUNK_SIZE]
+        placeholders = ",".join(f":t{i}" for i in range(len(chunk)))
+        result = db.execute(
+            text(f"SELECT term, doc_count FROM corpus_terms WHERE term IN ({placeholders})"),
+            {f"t{i}": term for i, term in enumerate(chunk)}
+        )
+        frequencies.update({row.term: row.doc_count for row in result})
+
+    return frequencies.pop(TOTAL_DOCUMENTS_KEY, 0), frequencies
+
+
+def extract_topics(content: str, title: Optional[str] = None, limit: int = 5) -> List[str]:
+    """
+    Extract an article's topics using TF-IDF against the corpus
+
+    Falls back to plain term frequency if corpus statistics are unavailable.
+
+    Args:
+        content: Article text
+        title: Article title (optional)
+        limit: Maximum number of topics
+
+    Returns:
+        Topics in their original casing
+    """
+    counts, casings = term_counts(content, title)
+    if not counts:
+        return []
+
+    candidates = [term for term, _ in counts.most_common(MAX_TERMS_PER_DOCUMENT)]
+    counts = Counter({term: counts[term] for term in candidates})
+
+    total_documents, frequencies = 0, {}
+    db = next(get_db())
+    try:
+        total_documents, frequencies = get_document_frequencies(db, candidates)
+    except Exception as e:
+        logger.debug(f"Corpus statistics unavailable, using term frequency: {e}")
+    finally:
+        db.close()
+
+    if total_documents:
+        ranked = rank_terms_tfidf(counts, total_documents, frequencies, limit)
+    else:
+        ranked = [term for term, count in counts.most_common(limit) if count >= 2]
+
+    return [casings[term] for term in ranked]
+
+
+# ============================================================================
+# INCREMENTAL UPDATES
+# ============================================================================
+
+def _hour_bucket(moment: datetime) -> datetime:
+    """Truncate a timestamp to the start of its hour"""
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def record_documents(documents: List[Dict[str, Any]]) -> int:
+    """
+    Add newly ingested articles to the corpus statistics
+
+    Updates document frequencies and the current hour's trend bucket in one
+    transaction. Call after the articles themselves have been committed;
+    failures are logged and never affect ingestion.
+
+    Args:
+        documents: Article dictionaries with title and content/summary
+
+    Returns:
+        Number of documents recorded
+    """
+    if not documents:
+        return 0
+
+    now = datetime.utcnow()
+    bucket = _hour_bucket(now)
+
+    per_document: List[Counter] = []
+    df_increments: Counter = Counter()
+    display: Dict[str, str] = {}
+
+    for document in documents:
+        counts, casings = term_counts(
+            document.get("full_text") or document.get("content") or document.get("summary"),
+            document.get("title")
+        )
+        top = dict(counts.most_common(MAX_TERMS_PER_DOCUMENT))
+        per_document.append(Counter(top))
+        df_increments.update(top.keys())
+        display.update({term: casings[term] for term in top})
+
+    df_increments[TOTAL_DOCUMENTS_KEY] = len(documents)
+
+    db = next(get_db())
+
+    try:
+        db.execute(
+            text("""
+                INSERT INTO corpus_terms (term, doc_count, display, last_seen)
+                VALUES (:term, :increment, :display, :now)
+                ON CONFLICT (term) DO UPDATE SET
+                    doc_count = corpus_terms.doc_count + excluded.doc_count,
+                    display = COALESCE(excluded.display, corpus_terms.display),
+                    last_seen = excluded.last_seen
+            """),
+            [
+                {"term": term, "increment": increment, "display": display.get(term), "now": now}
+                for term, increment in df_increments.items()
+            ]
+        )
+
+        # Rank each document against the updated corpus for the trend bucket
+        total_documents, frequencies = get_document_frequencies(db, list(display))
+        trend_increments: Counter = Counter({TOTAL_DOCUMENTS_KEY: len(documents)})
+        max_df = (
+            MAX_TREND_DOCUMENT_SHARE * total_documents
+            if total_documents >= MIN_TREND_CORPUS_SIZE else total_documents
+        )
+        for counts in per_document:
+            # Corpus-wide words are effectively stopwords, not topics
+            distinctive = Counter({
+                term: count for term, count in counts.items()
+                if frequencies.get(term, 0) <= max_df
+            })
+            trend_increments.update(
+                rank_terms_tfidf(distinctive, total_documents, frequencies, TREND_TERMS_PER_DOCUMENT)
+            )
+
+        db.execute(
+            text("""
+                INSERT INTO corpus_term_buckets (bucket, term, doc_count)
+                VALUES (:bucket, :term, :increment)
+                ON CONFLICT (bucket, term) DO UPDATE SET
+                    doc_count = corpus_term_buckets.doc_count + excluded.doc_count
+            """),
+            [
+                {"bucket": bucket, "term": term, "increment": increment}
+                for term, increment in trend_increments.items()
+            ]
+        )
+
+        db.commit()
+        logger.debug(f"Corpus statistics updated with {len(documents)} documents")
+        return len(documents)
+
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Failed to update corpus statistics: {e}")
+        return 0
+
+    finally:
+        db.close()
+
+
+def prune_corpus_stats(force: bool = False) -> Dict[str, int]:
+    """
+    Drop expired trend buckets and stale single-document terms
+
+    Runs at most once per PRUNE_INTERVAL unless forced.
+
+    Args:
+        force: Prune regardless of when it last ran
+
+    Returns:
+        Number of deleted buckets and terms
+    """
+    global _last_prune
+
+    now = datetime.utcnow()
+    if not force and _last_prune and (now - _last_prune).total_seconds() < PRUNE_INTERVAL:
+        return {"buckets": 0, "terms": 0}
+    _last_prune = now
+
+    db = next(get_db())
+
+    try:
+        buckets = db.execute(
+            text("DELETE FROM corpus_term_buckets WHERE bucket < :cutoff"),
+            {"cutoff": _hour_bucket(now - timedelta(hours=TREND_RETENTION_HOURS))}
+        ).rowcount
+
+        terms = db.execute(
+            text("""
+                DELETE FROM corpus_terms
+                WHERE doc_count <= 1 AND last_seen < :cutoff AND term != :total_key
+            """),
+            {
+                "cutoff": now - timedelta(days=RARE_TERM_RETENTION_DAYS),
+                "total_key": TOTAL_DOCUMENTS_KEY,
+            }
+        ).rowcount
+
+        db.commit()
+
+        if buckets or terms:
+            logger.info(f"Pruned corpus statistics: {buckets} buckets, {terms} terms")
+        return {"buckets": buckets, "terms": terms}
+
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Failed to prune corpus statistics: {e}")
+        return {"buckets": 0, "terms": 0}
+
+    finally:
+        db.close()
+
+
+# ============================================================================
+# TRENDING
+# ============================================================================
+
+def get_trending_topics(db, hours: int = 24, limit: int = 20) -> Dict[str, Any]:
+    """
+    Get the topics most often ranked top-of-article in the last N hours
+
+    Reads only the hourly bucket table (at most TREND_RETENTION_HOURS hours).
+
+    Args:
+        db: Database session
+        hours: Window size in hours
+        limit: Maximum number of topics
+
+    Returns:
+        Dictionary with window info and topics (mentions, share, lift)
+    """
+    hours = min(max(hours, 1), TREND_RETENTION_HOURS)
+    since = _hour_bucket(datetime.utcnow() - timedelta(hours=hours - 1))
+
+    window_documents = db.execute(
+        text("""
+            SELECT COALESCE(SUM(doc_count), 0) AS total
+            FROM corpus_term_buckets
+            WHERE bucket >= :since AND term = :total_key
+        """),
+        {"since": since, "total_key": TOTAL_DOCUMENTS_KEY}
+    ).scalar() or 0
+
+    rows = db.execute(
+        text("""
+            SELECT b.term, SUM(b.doc_count) AS mentions, t.display, t.doc_count AS df
+            FROM corpus_term_buckets b
+            LEFT JOIN corpus_terms t ON t.term = b.term
+            WHERE b.bucket >= :since AND b.term != :total_key
+            GROUP BY b.term, t.display, t.doc_count
+            ORDER BY mentions DESC, b.term
+            LIMIT :limit
+        """),
+        {"since": since, "total_key": TOTAL_DOCUMENTS_KEY, "limit": limit}
+    ).fetchall()
+
+    total_documents = db.execute(
+        text("SELECT doc_count FROM corpus_terms WHERE term = :total_key"),
+        {"total_key": TOTAL_DOCUMENTS_KEY}
+    ).scalar() or 0
+
+    topics = []
+    for row in rows:
+        share = row.mentions / window_documents if window_documents else 0.0
+        baseline = (row.df or 0) / total_documents if total_documents else 0.0
+        topics.append({
+            "topic": row.display or row.term,
+            "term": row.term,
+            "mentions": row.mentions,
+            "share": round(share, 4),
+            # How much more often the term appears now than across the corpus
+            "lift": round(share / baseline, 2) if baseline else None,
+        })
+
+    return {
+        "hours": hours,
+        "since": since.isoformat(),
+        "documents": window_documents,
+        "topics": topics,
+    }
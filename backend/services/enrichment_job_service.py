@@ -0,0 +1,637 @@
+"""
+Batch Enrichment Job Service
+
+Runs article enrichment over large ID lists (thousands of articles) with
+bounded parallel fetching, checkpointed progress and run metrics.
+
+Features:
+- Bounded concurrency: a fixed pool of workers pulls articles in list order
+- Checkpointing: progress is written to the enrichment_jobs table every few
+  seconds, so a cancelled, crashed or restarted job resumes where it stopped
+- Throughput (articles/sec), per-stage latency and failure breakdowns
+- Per-article timeout so one slow site cannot stall the job
+
+Usage:
+    from services.enrichment_job_service import create_enrichment_job, start_enrichment_job
+
+    job = create_enrichment_job(db, user_id, article_ids, concurrency=8)
+    start_enrichment_job(job.id)
+
+    # Later
+    progress = get_enrichment_job_progress(db, job.id, user_id)
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Tuple
+
+from loguru import logger
+from sqlalchemy.exc import SQLAlchemyError
+
+from database import get_db
+from database_enrichment_jobs import (
+    EnrichmentJob,
+    EnrichmentJobStatus,
+    EnrichmentFailureCategory,
+)
+from services.article_enrichment_service import (
+    ArticleEnrichmentService,
+    _load_article_for_enrichment,
+    _compute_enrichment,
+    _persist_enrichment,
+)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEFAULT_JOB_CONCURRENCY = 8    # Parallel article fetches per job
+MAX_JOB_CONCURRENCY = 32       # Upper bound accepted from clients
+MAX_JOB_ARTICLES = 10000       # Maximum article IDs per job
+ARTICLE_TIMEOUT = 60           # Seconds before an article counts as timed out
+CHECKPOINT_INTERVAL = 5        # Seconds between progress checkpoints
+CHECKPOINT_EVERY = 50          # ...or after this many completed articles
+STALE_JOB_SECONDS = 120        # A "running" job not updated for this long was interrupted
+MAX_RECENT_FAILURES = 50       # Failure samples kept for reporting
+OWNERSHIP_CHUNK_SIZE = 500     # IDs per ownership query (SQLite variable limit)
+
+RESUMABLE_STATUSES = {
+    EnrichmentJobStatus.QUEUED.value,
+    EnrichmentJobStatus.CANCELLED.value,
+    EnrichmentJobStatus.FAILED.value,
+}
+
+# Runners active in this process (job_id -> runner)
+_active_runners: Dict[int, "EnrichmentJobRunner"] = {}
+
+# Strong references to background job tasks
+_job_tasks: set = set()
+
+
+# ============================================================================
+# JOB RUNNER
+# ============================================================================
+
+class EnrichmentJobRunner:
+    """
+    Executes one enrichment job.
+
+    Workers pull article indexes in order; each completion is folded into
+    in-memory counters which are periodically checkpointed to the job row.
+    """
+
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+        self.service = ArticleEnrichmentService()
+        self.state: Dict[str, Any] = {}
+        self._cancelled = False
+        self._run_started: Optional[float] = None
+        self._base_elapsed = 0.0
+        self._last_checkpoint = 0.0
+        self._since_checkpoint = 0
+
+    # ========================================================================
+    # PUBLIC API
+    # ========================================================================
+
+    def cancel(self):
+        """Stop handing out new articles; in-flight articles finish normally"""
+        self._cancelled = True
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current in-memory job state (fresher than the last checkpoint)"""
+        state = dict(self.state)
+        state["elapsed_seconds"] = self._elapsed()
+        return state
+
+    async def run(self):
+        """Run (or resume) the job until all articles are done or it is cancelled"""
+        db = next(get_db())
+
+        try:
+            job = db.query(EnrichmentJob).filter(EnrichmentJob.id == self.job_id).first()
+            if not job:
+                logger.warning(f"Enrichment job {self.job_id} not found")
+                return
+
+            self.state = _job_state(job)
+            self._base_elapsed = job.elapsed_seconds or 0.0
+            self._run_started = time.monotonic()
+            self._last_checkpoint = self._run_started
+
+            job.status = EnrichmentJobStatus.RUNNING.value
+            job.started_at = job.started_at or datetime.utcnow()
+            job.runs = (job.runs or 0) + 1
+            job.error_message = None
+            db.commit()
+            self.state.update(status=job.status, started_at=job.started_at, runs=job.runs)
+
+            article_ids: List[int] = job.article_ids or []
+            done_ahead = set(self.state["done_ahead"])
+            pending = iter([
+                index for index in range(self.state["cursor"], len(article_ids))
+                if index not in done_ahead
+            ])
+
+            logger.info(
+                f"Enrichment job {self.job_id} started: "
+                f"{self.state['processed']}/{self.state['total']} done, "
+                f"concurrency={job.concurrency}"
+            )
+
+            async def worker():
+                while not self._cancelled:
+                    index = next(pending, None)
+                    if index is None:
+                        return
+                    outcome = await self._process_article(
+                        article_ids[index], job.user_id, job.force_refresh
+                    )
+                    self._record(index, article_ids[index], outcome)
+                    self._maybe_checkpoint(db, job)
+
+            await asyncio.gather(*[worker() for _ in range(max(1, job.concurrency))])
+
+            if self._cancelled or self._cancelled_in_db(db):
+                self.state["status"] = EnrichmentJobStatus.CANCELLED.value
+            else:
+                self.state["status"] = EnrichmentJobStatus.COMPLETED.value
+                self.state["completed_at"] = datetime.utcnow()
+
+            self._checkpoint(db, job)
+
+            logger.info(
+                f"Enrichment job {self.job_id} {self.state['status']}: "
+                f"{self.state['succeeded']} enriched, {self.state['skipped']} skipped, "
+                f"{self.state['failed']} failed in {self._elapsed():.1f}s"
+            )
+
+        except Exception as e:
+            logger.error(f"Enrichment job {self.job_id} failed: {e}")
+            db.rollback()
+            job = db.query(EnrichmentJob).filter(EnrichmentJob.id == self.job_id).first()
+            if job and self.state:
+                self.state["status"] = EnrichmentJobStatus.FAILED.value
+                self.state["error_message"] = str(e)[:1000]
+                self._checkpoint(db, job)
+
+        finally:
+            db.close()
+
+    # ========================================================================
+    # ARTICLE PROCESSING
+    # ========================================================================
+
+    async def _process_article(
+        self,
+        article_id: int,
+        user_id: int,
+        force: bool
+    ) -> Tuple[str, Optional[str], Optional[str], Dict[str, float]]:
+        """
+        Enrich and persist one article
+
+        Returns:
+            (outcome, failure_category, error, timings) where outcome is
+            "succeeded", "skipped" or "failed"
+        """
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
+        db = next(get_db())
+
+        try:
+            stage_started = time.perf_counter()
+            row = _load_article_for_enrichment(db, article_id, user_id)
+            timings["load"] = (time.perf_counter() - stage_started) * 1000
+
+            if not row:
+                return "failed", EnrichmentFailureCategory.NOT_FOUND.value, None, timings
+
+            if row.enriched_at and not force:
+                return "skipped", None, None, timings
+
+            enriched = await asyncio.wait_for(
+                _compute_enrichment(self.service, row, timings),
+                timeout=ARTICLE_TIMEOUT
+            )
+
+            stage_started = time.perf_counter()
+            _persist_enrichment(db, row, enriched)
+            timings["persist"] = (time.perf_counter() - stage_started) * 1000
+
+            if not enriched.get("full_text"):
+                return "failed", EnrichmentFailureCategory.FETCH_FAILED.value, None, timings
+
+            return "succeeded", None, None, timings
+
+        except asyncio.TimeoutError:
+            return (
+                "failed",
+                EnrichmentFailureCategory.TIMEOUT.value,
+                f"Exceeded {ARTICLE_TIMEOUT}s",
+                timings,
+            )
+
+        except SQLAlchemyError as e:
+            db.rollback()
+            return "failed", EnrichmentFailureCategory.DATABASE_ERROR.value, str(e)[:200], timings
+
+        except Exception as e:
+            db.rollback()
+            return "failed", EnrichmentFailureCategory.UNKNOWN_ERROR.value, str(e)[:200], timings
+
+        finally:
+            db.close()
+            timings["total"] = (time.perf_counter() - started) * 1000
+
+    def _record(self, index: int, article_id: int, outcome: Tuple):
+        """Fold one article result into the job state and advance the cursor"""
+        result, category, error, timings = outcome
+        state = self.state
+
+        state["processed"] += 1
+        state[result] += 1
+
+        if category:
+            breakdown = state["failure_breakdown"]
+            breakdown[category] = breakdown.get(category, 0) + 1
+            state["recent_failures"] = (state["recent_failures"] + [{
+                "article_id": article_id,
+                "category": category,
+                "error": error,
+            }])[-MAX_RECENT_FAILURES:]
+
+        for stage, duration_ms in timings.items():
+            stats = state["stage_stats"].setdefault(
+                stage, {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+            )
+            stats["count"] += 1
+            stats["total_ms"] += duration_ms
+            stats["max_ms"] = max(stats["max_ms"], duration_ms)
+
+        # Everything before the cursor is done; finished indexes past it wait
+        # in done_ahead until the gap closes
+        done_ahead = state["done_ahead"]
+        done_ahead.append(index)
+        while state["cursor"] in done_ahead:
+            done_ahead.remove(state["cursor"])
+            state["cursor"] += 1
+
+        self._since_checkpoint += 1
+
+    # ========================================================================
+    # CHECKPOINTING
+    # ========================================================================
+
+    def _elapsed(self) -> float:
+        """Active run time across all runs of this job"""
+        if self._run_started is None:
+            return self._base_elapsed
+        return self._base_elapsed + (time.monotonic() - self._run_started)
+
+    def _maybe_checkpoint(self, db, job: EnrichmentJob):
+        """Checkpoint if enough articles or time passed since the last one"""
+        if (
+            self._since_checkpoint >= CHECKPOINT_EVERY
+            or time.monotonic() - self._last_checkpoint >= CHECKPOINT_INTERVAL
+        ):
+            self._checkpoint(db, job)
+
+    def _cancelled_in_db(self, db) -> bool:
+        """
+        Pick up a cancellation written to the job row by another process
+
+        cancel_enrichment_job can only signal runners in its own process;
+        elsewhere it just sets the row's status, which this re-reads.
+        """
+        if self._cancelled:
+            return True
+
+        try:
+            status = db.query(EnrichmentJob.status).filter(EnrichmentJob.id == self.job_id).scalar()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.warning(f"Failed to check enrichment job {self.job_id} status: {e}")
+            return False
+
+        if status == EnrichmentJobStatus.CANCELLED.value:
+            logger.info(f"Enrichment job {self.job_id} was cancelled, stopping")
+            self.cancel()
+
+        return self._cancelled
+
+    def _checkpoint(self, db, job: EnrichmentJob):
+        """Write the in-memory state to the job row"""
+        state = self.state
+
+        # Don't overwrite a cancellation made since the last checkpoint
+        if state["status"] == EnrichmentJobStatus.RUNNING.value and self._cancelled_in_db(db):
+            state["status"] = EnrichmentJobStatus.CANCELLED.value
+
+        try:
+            job.status = state["status"]
+            job.cursor = state["cursor"]
+            job.done_ahead = sorted(state["done_ahead"])
+            job.processed = state["processed"]
+            job.succeeded = state["succeeded"]
+            job.skipped = state["skipped"]
+            job.failed = state["failed"]
+            # Fresh containers so SQLAlchemy sees the JSON columns as modified
+            job.failure_breakdown = dict(state["failure_breakdown"])
+            job.recent_failures = list(state["recent_failures"])
+            job.stage_stats = {stage: dict(stats) for stage, stats in state["stage_stats"].items()}
+            job.elapsed_seconds = self._elapsed()
+            job.error_message = state.get("error_message")
+            job.completed_at = state.get("completed_at")
+            job.updated_at = datetime.utcnow()
+            db.commit()
+
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Failed to checkpoint enrichment job {self.job_id}: {e}")
+
+        self._last_checkpoint = time.monotonic()
+        self._since_checkpoint = 0
+
+
+# ============================================================================
+# STANDALONE FUNCTIONS
+# ============================================================================
+
+def _job_state(job: EnrichmentJob) -> Dict[str, Any]:
+    """Copy the progress fields of a job row into a mutable dictionary"""
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "total": job.total,
+        "concurrency": job.concurrency,
+        "force_refresh": job.force_refresh,
+        "cursor": job.cursor or 0,
+        "done_ahead": list(job.done_ahead or []),
+        "processed": job.processed or 0,
+        "succeeded": job.succeeded or 0,
+        "skipped": job.skipped or 0,
+        "failed": job.failed or 0,
+        "failure_breakdown": dict(job.failure_breakdown or {}),
+        "recent_failures": list(job.recent_failures or []),
+        "stage_stats": {stage: dict(stats) for stage, stats in (job.stage_stats or {}).items()},
+        "elapsed_seconds": job.elapsed_seconds or 0.0,
+        "runs": job.runs or 0,
+        "error_message": job.error_message,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "updated_at": job.updated_at,
+        "completed_at": job.completed_at,
+    }
+
+
+def format_job_progress(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the progress report for a job state
+
+    Args:
+        state: Job state from the database or a running job
+
+    Returns:
+        Progress dictionary with throughput, stage latency and failures
+    """
+    total = state["total"] or 0
+    processed = state["processed"]
+    elapsed = state["elapsed_seconds"] or 0.0
+    throughput = processed / elapsed if elapsed > 0 else 0.0
+    remaining = max(total - processed, 0)
+
+    stage_latency = {
+        stage: {
+            "count": stats["count"],
+            "avg_ms": round(stats["total_ms"] / stats["count"], 1) if stats["count"] else 0.0,
+            "max_ms": round(stats["max_ms"], 1),
+        }
+        for stage, stats in state["stage_stats"].items()
+    }
+
+    def iso(value):
+        return value.isoformat() if isinstance(value, datetime) else value
+
+    return {
+        "job_id": state["job_id"],
+        "status": state["status"],
+        "total": total,
+        "processed": processed,
+        "succeeded": state["succeeded"],
+        "skipped": state["skipped"],
+        "failed": state["failed"],
+        "progress_percent": round(processed / total * 100, 1) if total else 100.0,
+        "concurrency": state["concurrency"],
+        "force_refresh": state["force_refresh"],
+        "elapsed_seconds": round(elapsed, 2),
+        "throughput_per_sec": round(throughput, 2),
+        "eta_seconds": round(remaining / throughput, 1) if throughput > 0 and remaining else None,
+        "stage_latency": stage_latency,
+        "failure_breakdown": state["failure_breakdown"],
+        "recent_failures": state["recent_failures"],
+        "runs": state["runs"],
+        "error_message": state.get("error_message"),
+        "created_at": iso(state.get("created_at")),
+        "started_at": iso(state.get("started_at")),
+        "updated_at": iso(state.get("updated_at")),
+        "completed_at": iso(state.get("completed_at")),
+    }
+
+
+def filter_owned_article_ids(db, user_id: int, article_ids: List[int]) -> List[int]:
+    """
+    Keep only IDs of articles owned by the user, preserving order
+
+    Args:
+        db: Database session
+        user_id: User ID
+        article_ids: Candidate article IDs (duplicates are dropped)
+
+    Returns:
+        Owned article IDs in request order
+    """
+    from sqlalchemy import text
+
+    unique_ids = list(dict.fromkeys(article_ids))
+    owned = set()
+
+    for offset in range(0, len(unique_ids), OWNERSHIP_CHUNK_SIZE):
+        chunk = unique_ids[offset:offset + OWNERSHIP_CHUNK_SIZE]
+        placeholders = ",".join(f":id{i}" for i in range(len(chunk)))
+        params = {f"id{i}": aid for i, aid in enumerate(chunk)}
+        params["user_id"] = user_id
+
+        result = db.execute(
+            text(f"""
+                SELECT id
+                FROM articles
+                WHERE id IN ({placeholders}) AND user_id = :user_id
+            """),
+            params
+        )
+        owned.update(row.id for row in result)
+
+    return [aid for aid in unique_ids if aid in owned]
+
+
+def create_enrichment_job(
+    db,
+    user_id: int,
+    article_ids: List[int],
+    concurrency: Optional[int] = None,
+    force_refresh: bool = False
+) -> EnrichmentJob:
+    """
+    Create a queued enrichment job (call start_enrichment_job to run it)
+
+    Args:
+        db: Database session
+        user_id: Job owner
+        article_ids: Article IDs owned by the user, in processing order
+        concurrency: Parallel fetches (defaults to DEFAULT_JOB_CONCURRENCY)
+        force_refresh: Re-enrich articles that were already enriched
+
+    Returns:
+        Created job
+    """
+    concurrency = min(max(concurrency or DEFAULT_JOB_CONCURRENCY, 1), MAX_JOB_CONCURRENCY)
+
+    job = EnrichmentJob(
+        user_id=user_id,
+        status=EnrichmentJobStatus.QUEUED.value,
+        article_ids=list(article_ids),
+        total=len(article_ids),
+        concurrency=concurrency,
+        force_refresh=force_refresh,
+        done_ahead=[],
+        failure_breakdown={},
+        recent_failures=[],
+        stage_stats={},
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    logger.info(f"Created enrichment job {job.id}: {job.total} articles for user {user_id}")
+    return job
+
+
+def is_job_resumable(job: EnrichmentJob) -> bool:
+    """
+    Check whether a job can be (re)started
+
+    Queued, cancelled and failed jobs can; so can a "running" job that is not
+    active in this process and has not checkpointed recently (its process
+    died or restarted).
+    """
+    if job.id in _active_runners:
+        return False
+
+    if job.status in RESUMABLE_STATUSES:
+        return True
+
+    if job.status == EnrichmentJobStatus.RUNNING.value and job.updated_at:
+        return (datetime.utcnow() - job.updated_at).total_seconds() > STALE_JOB_SECONDS
+
+    return False
+
+
+async def run_enrichment_job(job_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Run or resume a job in the current task and wait for it to finish
+
+    Args:
+        job_id: Job ID
+
+    Returns:
+        Final progress report, or None if the job is already running here
+    """
+    if job_id in _active_runners:
+        return None
+
+    runner = EnrichmentJobRunner(job_id)
+    _active_runners[job_id] = runner
+
+    try:
+        await runner.run()
+        return format_job_progress(runner.snapshot()) if runner.state else None
+    finally:
+        _active_runners.pop(job_id, None)
+
+
+def start_enrichment_job(job_id: int) -> bool:
+    """
+    Run or resume a job in the background
+
+    Must be called from a running event loop.
+
+    Args:
+        job_id: Job ID
+
+    Returns:
+        True if started, False if it is already running in this process
+    """
+    if job_id in _active_runners:
+        return False
+
+    task = asyncio.ensure_future(run_enrichment_job(job_id))
+    _job_tasks.add(task)
+    task.add_done_callback(_job_tasks.discard)
+    return True
+
+
+def cancel_enrichment_job(db, job: EnrichmentJob) -> bool:
+    """
+    Cancel a job; it keeps its checkpoint and can be resumed later
+
+    Args:
+        db: Database session
+        job: Job to cancel
+
+    Returns:
+        True if the job was running or queued
+    """
+    runner = _active_runners.get(job.id)
+    if runner:
+        # The runner writes the final "cancelled" checkpoint itself
+        runner.cancel()
+        return True
+
+    # A runner in another process sees the status at its next checkpoint
+    if job.status in (EnrichmentJobStatus.QUEUED.value, EnrichmentJobStatus.RUNNING.value):
+        job.status = EnrichmentJobStatus.CANCELLED.value
+        db.commit()
+        return True
+
+    return False
+
+
+def get_enrichment_job_progress(db, job_id: int, user_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Get the progress report for a user's job
+
+    Jobs running in this process report live counters; others report their
+    last checkpoint.
+
+    Args:
+        db: Database session
+        job_id: Job ID
+        user_id: Job owner
+
+    Returns:
+        Progress dictionary, or None if not found
+    """
+    job = db.query(EnrichmentJob).filter(
+        EnrichmentJob.id == job_id,
+        EnrichmentJob.user_id == user_id
+    ).first()
+
+    if not job:
+        return None
+
+    runner = _active_runners.get(job_id)
+    if runner and runner.state:
+        return format_job_progress(runner.snapshot())
+
+    return format_job_progress(_job_state(job))
@@ -45,6 +45,8 @@ from tenacity import (
 )
 
 from database import get_db, engine
+from services.corpus_stats_service import record_documents, prune_corpus_stats
+from services.cache_warmer import warm_caches
 from utils.feed_validator import REQUEST_TIMEOUT, USER_AGENT
 
 
@@ -181,6 +183,15 @@ class FeedAggregator:
         self.fetch_stats["failed_fetches"] += failed
         self.fetch_stats["articles_added"] += total_articles
 
+        # Expire old trending buckets and one-off terms (hourly at most)
+        prune_corpus_stats()
+
+        # Refill the listings of (recently active) users whose feeds were fetched
+        await warm_caches(
+            user_ids={feed["user_id"] for feed in feeds_to_fetch},
+            reason="aggregation"
+        )
+
     def _get_feeds_to_fetch(self) -> List[Dict[str, Any]]:
         """
         Get all feeds that need fetching
@@ -369,6 +380,7 @@ class FeedAggregator:
             # Process articles
             articles_added = 0
             duplicates_skipped = 0
+            stored_articles = []
 
             for entry in entries[:MAX_ARTICLES_PER_FETCH]:
                 # Extract article data
@@ -382,9 +394,13 @@ class FeedAggregator:
                 # Store article
                 if self._store_article(db, article_data):
                     articles_added += 1
+                    stored_articles.append(article_data)
 
             db.commit()
 
+            # Update corpus term statistics (topics, trending)
+            record_documents(stored_articles)
+
             # Update feed status
             await self._update_feed_status(
                 db, feed_id,
@@ -392,6 +408,7 @@ class FeedAggregator:
                 health_status="healthy",
                 articles_count=articles_added
             )
+            await self._invalidate_listings(user_id, articles_added)
 
             logger.info(
                 f"Feed {feed_id} processed: "
@@ -447,6 +464,15 @@ class FeedAggregator:
         finally:
             db.close()
 
+    @staticmethod
+    async def _invalidate_listings(user_id: int, articles_added: int):
+        """Drop the user's cached listings and bump their versions if articles were stored"""
+        if not articles_added:
+            return
+
+        from api.feeds_enhanced import invalidate_user_feeds
+        await invalidate_user_feeds(user_id)
+
     def _extract_article_data(
         self,
         entry: feedparser.FeedParserDict,
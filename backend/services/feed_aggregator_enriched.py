@@ -13,19 +13,34 @@ It integrates the ArticleEnrichmentService to provide:
 This ensures that all articles stored in the database have comprehensive
 metadata for better iOS app experience.
 
+Enrichment modes (ENRICHMENT_MODE setting):
+- eager: enrich every article at ingest (default)
+- lazy: store raw articles, prefetch only the newest few per feed; the rest
+  are enriched on first open or post generation
+- off: no enrichment
+
 Usage:
     from services.feed_aggregator_enriched import EnrichedFeedAggregator
 
     aggregator = EnrichedFeedAggregator()
     await aggregator.start()
+
+    # On-demand enrichment
+    aggregator = EnrichedFeedAggregator(enrichment_mode="lazy")
 """
 import asyncio
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 from loguru import logger
 
+from config.settings import settings
 from services.feed_aggregator import FeedAggregator
-from services.article_enrichment_service import ArticleEnrichmentService
+from services.corpus_stats_service import record_documents
+from services.article_enrichment_service import (
+    ArticleEnrichmentService,
+    select_prefetch_candidates,
+    schedule_prefetch,
+)
 
 
 class EnrichedFeedAggregator(FeedAggregator):
@@ -36,16 +51,20 @@ class EnrichedFeedAggregator(FeedAggregator):
     with full-text, images, categories, summaries, and metadata.
     """
 
-    def __init__(self, enable_enrichment: bool = True):
+    def __init__(self, enable_enrichment: bool = True, enrichment_mode: Optional[str] = None):
         """
         Initialize enriched feed aggregator
 
         Args:
             enable_enrichment: Whether to enable article enrichment (default: True)
+            enrichment_mode: eager, lazy or off (default: ENRICHMENT_MODE setting)
         """
         super().__init__()
-        self.enable_enrichment = enable_enrichment
-        self.enrichment_service = ArticleEnrichmentService() if enable_enrichment else None
+        if not enable_enrichment:
+            enrichment_mode = "off"
+        self.enrichment_mode = enrichment_mode or settings.ENRICHMENT_MODE
+        self.enable_enrichment = self.enrichment_mode == "eager"
+        self.enrichment_service = ArticleEnrichmentService() if self.enable_enrichment else None
 
         # Update stats to track enrichment
         self.fetch_stats.update({
@@ -53,6 +72,7 @@ class EnrichedFeedAggregator(FeedAggregator):
             "enrichment_failures": 0,
             "images_extracted": 0,
             "summaries_generated": 0,
+            "prefetch_scheduled": 0,
         })
 
     async def _fetch_and_store_feed(self, feed_info: Dict[str, Any]) -> Dict[str, Any]:
@@ -72,7 +92,7 @@ class EnrichedFeedAggregator(FeedAggregator):
         feed_name = feed_info["feed_name"]
         user_id = feed_info["user_id"]
 
-        logger.info(f"Fetching feed {feed_id}: {feed_name} (enrichment: {self.enable_enrichment})")
+        logger.info(f"Fetching feed {feed_id}: {feed_name} (enrichment: {self.enrichment_mode})")
 
         from database import get_db
         db = next(get_db())
@@ -105,6 +125,7 @@ class EnrichedFeedAggregator(FeedAggregator):
             duplicates_skipped = 0
             enriched_count = 0
             enrichment_failures = 0
+            stored_articles = []
 
             # Limit concurrent enrichment to avoid overwhelming the system
             MAX_CONCURRENT_ENRICHMENT = 3
@@ -146,6 +167,7 @@ class EnrichedFeedAggregator(FeedAggregator):
                     # Store article
                     if self._store_article_enriched(db, article_data):
                         articles_added += 1
+                        stored_articles.append(article_data)
 
             # Process articles concurrently (but limited)
             from services.feed_aggregator import MAX_ARTICLES_PER_FETCH
@@ -154,6 +176,17 @@ class EnrichedFeedAggregator(FeedAggregator):
 
             db.commit()
 
+            # Update corpus term statistics (topics, trending)
+            record_documents(stored_articles)
+
+            # Lazy mode: enrich only the articles most likely to be opened now,
+            # everything else waits for its first open
+            if self.enrichment_mode == "lazy" and articles_added:
+                candidates = select_prefetch_candidates(
+                    db, user_id, min(articles_added, settings.ENRICHMENT_PREFETCH_PER_FEED)
+                )
+                self.fetch_stats["prefetch_scheduled"] += schedule_prefetch(candidates)
+
             # Update feed status
             await self._update_feed_status(
                 db, feed_id,
@@ -161,6 +194,7 @@ class EnrichedFeedAggregator(FeedAggregator):
                 health_status="healthy",
                 articles_count=articles_added
             )
+            await self._invalidate_listings(user_id, articles_added)
 
             logger.info(
                 f"Feed {feed_id} processed: "
@@ -233,6 +267,27 @@ class EnrichedFeedAggregator(FeedAggregator):
                 "tags": json.dumps(article_data.get("tags")) if article_data.get("tags") else None,
             }
 
+            # Enrichment fields, stored when the table has been migrated
+            if article_data.get("full_text"):
+                enrichment_data = {
+                    "full_text": article_data.get("full_text"),
+                    "content_for_ai": article_data.get("content_for_ai"),
+                    "featured_image": article_data.get("featured_image"),
+                    "auto_summary": article_data.get("auto_summary"),
+                    "quality_score": article_data.get("quality_score"),
+                    "author": (article_data.get("author") or "")[:200] or None,
+                    "publish_date": article_data.get("publish_date"),
+                    "reading_time": article_data.get("reading_time"),
+                    "topics": json.dumps(article_data.get("topics") or []),
+                    "ai_context": article_data.get("ai_context"),
+                    "ai_context_tokens": article_data.get("ai_context_tokens"),
+                    "enriched_at": datetime.utcnow(),
+                }
+                insert_data.update({
+                    column: value for column, value in enrichment_data.items()
+                    if column in existing_columns and value is not None
+                })
+
             # Build dynamic INSERT query based on available columns
             columns = list(insert_data.keys())
             placeholders = [f":{col}" for col in columns]
@@ -278,6 +333,9 @@ def add_enrichment_columns_to_articles():
     - publish_date: Original publication date
     - reading_time: Estimated reading time in minutes
     - topics: JSON array of key topics
+    - enriched_at: When the article was enriched (NULL = not yet, see lazy mode)
+    - ai_context: Token-budgeted context block for generation prompts
+    - ai_context_tokens: Estimated tokens of ai_context
 
     Run this once to add the columns to the database.
     """
@@ -300,6 +358,9 @@ def add_enrichment_columns_to_articles():
                 ("publish_date", "VARCHAR(100)"),
                 ("reading_time", "INTEGER"),
                 ("topics", "JSON"),
+                ("enriched_at", "DATETIME"),
+                ("ai_context", "TEXT"),
+                ("ai_context_tokens", "INTEGER"),
             ]
 
             for column_name, column_type in columns_to_add:
@@ -327,8 +388,9 @@ async def start_enriched_aggregator():
     Start enriched feed aggregator service
 
     This is the main entry point for starting the aggregator with enrichment.
+    Uses the configured ENRICHMENT_MODE.
     """
-    aggregator = EnrichedFeedAggregator(enable_enrichment=True)
+    aggregator = EnrichedFeedAggregator()
     await aggregator.start()
 
 
@@ -338,7 +400,7 @@ async def fetch_all_feeds_enriched():
 
     Use this for manual/scheduled runs.
     """
-    aggregator = EnrichedFeedAggregator(enable_enrichment=True)
+    aggregator = EnrichedFeedAggregator()
     await aggregator.fetch_all_feeds()
     return aggregator.get_enrichment_stats()
 
@@ -0,0 +1,326 @@
+"""
+Generation Worker Pool
+
+Runs queued post and image generation jobs (utils/job_store.py). Any number
+of pools may run, in API processes (GENERATION_WORKERS per process) and as
+separate worker processes, so generation scales independently of the API:
+
+    python -m services.generation_worker --workers 8
+
+API endpoints only create the job and enqueue it; whichever pool claims it
+runs it and writes progress to the shared job store, where every API worker
+can read it. Decrypted API keys are never queued: the worker loads the
+user's key from the database when it starts the job.
+
+Batch post jobs (batch=True) spend most of their time waiting for the
+provider's batch to finish, so they don't take a worker slot: they have
+their own queue, which each pool claims from only while fewer than
+GENERATION_BATCH_JOBS of them are running there.
+
+If Redis is unavailable, enqueue_* run the job in the calling process
+instead, as before the job store existed.
+"""
+import argparse
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from loguru import logger
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.settings import settings
+from database import SessionLocal
+from services.image_generation_service import ImageGenerationService
+from services.post_generation_service import PostGenerationService
+from utils.job_store import JobStore
+from utils.posts_cache import PostsCache
+
+
+POLL_INTERVAL = 0.5  # Seconds between queue checks when idle
+REQUEUE_INTERVAL = 15  # Seconds between scans for interrupted jobs
+
+# Jobs run in this process without the queue (Redis unavailable)
+_local_tasks: Set[asyncio.Task] = set()
+
+
+# ============================================================================
+# JOB HANDLERS
+# ============================================================================
+
+async def run_post_generation(job_id: str, payload: Dict[str, Any]):
+    """Run one queued post generation job"""
+    from api.posts_v2 import _get_user_api_key
+    from schemas.posts import GenerationStatus
+
+    post_id = int(job_id)
+    db = SessionLocal()
+    try:
+        api_key, ai_provider = _get_user_api_key(payload["user_id"], db)
+        if not api_key:
+            await PostGenerationService.update_job(
+                post_id,
+                status=GenerationStatus.FAILED,
+                error="No API key configured. Please add your OpenAI or Anthropic API key in Profile settings."
+            )
+            await PostsCache.invalidate_post_and_list(post_id, payload["user_id"])
+            return
+
+        await PostGenerationService.generate_post_async(
+            post_id,
+            payload["article_ids"],
+            payload["platforms"],
+            payload["user_id"],
+            api_key,
+            ai_provider,
+            db,
+            batch=payload.get("batch", False)
+        )
+    finally:
+        db.close()
+
+
+async def run_image_generation(job_id: str, payload: Dict[str, Any]):
+    """Run one queued image generation job (closes its own session)"""
+    await ImageGenerationService.generate_image_async(job_id=job_id, db=SessionLocal(), **payload)
+
+
+# (job store, handler) per job kind
+JOB_HANDLERS: Dict[str, tuple] = {
+    "post": (PostGenerationService.jobs, run_post_generation),
+    "image": (ImageGenerationService.jobs, run_image_generation),
+}
+
+# Batch job queues, claimed only when a batch slot is free
+BATCH_JOB_HANDLERS: Dict[str, tuple] = {
+    "post": (PostGenerationService.batch_jobs, run_post_generation),
+}
+
+
+# ============================================================================
+# ENQUEUE
+# ============================================================================
+
+async def _enqueue(kind: str, job_id: Any, payload: Dict[str, Any]):
+    handlers = BATCH_JOB_HANDLERS if payload.get("batch") else JOB_HANDLERS
+    store, handler = handlers[kind]
+
+    if await store.enqueue(job_id, payload):
+        return
+
+    task = asyncio.get_running_loop().create_task(handler(str(job_id), payload))
+    _local_tasks.add(task)
+    task.add_done_callback(_local_tasks.discard)
+
+
+async def enqueue_post_generation(
+    post_id: int,
+    article_ids: List[int],
+    platforms: List[str],
+    user_id: int,
+    batch: bool = False
+):
+    """
+    Queue generation of a post whose job was created with PostGenerationService.create_job
+
+    `batch`: non-interactive job, generated with batched LLM calls (see
+    src/utils/llm_batch.py)
+    """
+    await _enqueue("post", post_id, {
+        "article_ids": list(article_ids),
+        "platforms": list(platforms),
+        "user_id": user_id,
+        "batch": batch,
+    })
+
+
+async def enqueue_image_generation(
+    job_id: str,
+    post_id: int,
+    user_id: int,
+    prompt: str,
+    style: str = "modern",
+    regenerate: bool = False
+):
+    """Queue an image job created with ImageGenerationService.create_job"""
+    await _enqueue("image", job_id, {
+        "post_id": post_id,
+        "user_id": user_id,
+        "prompt": prompt,
+        "style": style,
+        "regenerate": regenerate,
+    })
+
+
+# ============================================================================
+# WORKER POOL
+# ============================================================================
+
+class GenerationWorkerPool:
+    """
+    Claims and runs queued jobs of every kind, `workers` at a time.
+
+    Each running job's lease is renewed from its claim until it finishes;
+    jobs whose worker died are requeued by the periodic stale scan of any
+    pool. Batch jobs run outside the worker slots: a separate claimer takes
+    them from the batch queues, only while fewer than `batch_jobs` run.
+    """
+
+    def __init__(self, workers: int, batch_jobs: Optional[int] = None):
+        self.workers = workers
+        self._tasks: List[asyncio.Task] = []
+        self._batch_tasks: Set[asyncio.Task] = set()
+        self._batch_slots = asyncio.Semaphore(max(1, batch_jobs or settings.GENERATION_BATCH_JOBS))
+        self._stopping = False
+
+    def start(self):
+        """Start the workers and the stale job scanner on the running loop"""
+        loop = asyncio.get_running_loop()
+        self._stopping = False
+        self._tasks = [loop.create_task(self._worker(index)) for index in range(self.workers)]
+        self._tasks.append(loop.create_task(self._batch_claimer()))
+        self._tasks.append(loop.create_task(self._requeue_loop()))
+        logger.info(f"Generation worker pool started ({self.workers} workers)")
+
+    async def stop(self):
+        """Stop claiming jobs and cancel running ones (their leases expire and they are requeued)"""
+        self._stopping = True
+        tasks = self._tasks + list(self._batch_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Generation worker pool stopped")
+
+    async def run_forever(self):
+        """Run until cancelled (standalone worker process)"""
+        self.start()
+        try:
+            await asyncio.gather(*self._tasks)
+        finally:
+            await self.stop()
+
+    @staticmethod
+    async def _claim(handlers: Dict[str, tuple]) -> Optional[tuple]:
+        for kind, (store, handler) in handlers.items():
+            claimed = await store.claim()
+            if claimed:
+                return kind, store, handler, claimed
+        return None
+
+    async def _worker(self, index: int):
+        while not self._stopping:
+            try:
+                claimed = await self._claim(JOB_HANDLERS)
+            except Exception as e:
+                logger.warning(f"Generation worker {index}: queue unavailable: {e}")
+                await asyncio.sleep(POLL_INTERVAL * 10)
+                continue
+
+            if claimed is None:
+                await asyncio.sleep(POLL_INTERVAL)
+                continue
+
+            await self._run(*claimed)
+
+    async def _batch_claimer(self):
+        """Claim batch jobs while a batch slot is free and run them alongside the workers"""
+        while not self._stopping:
+            # Take the slot first: a job is only claimed (and its lease
+            # started) when it can run right away
+            await self._batch_slots.acquire()
+            try:
+                claimed = await self._claim(BATCH_JOB_HANDLERS)
+            except Exception as e:
+                self._batch_slots.release()
+                logger.warning(f"Batch job queue unavailable: {e}")
+                await asyncio.sleep(POLL_INTERVAL * 10)
+                continue
+
+            if claimed is None:
+                self._batch_slots.release()
+                await asyncio.sleep(POLL_INTERVAL)
+                continue
+
+            task = asyncio.get_running_loop().create_task(self._run(*claimed))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+            task.add_done_callback(lambda _: self._batch_slots.release())
+
+    async def _run(self, kind: str, store: JobStore, handler: Callable[..., Awaitable], job: Dict):
+        job_id = job["job_id"]
+        logger.info(f"Running {kind} job {job_id} (attempt {job['attempts']})")
+
+        async def renew():
+            while True:
+                await asyncio.sleep(store.lease_seconds / 3)
+                try:
+                    await store.renew_lease(job_id)
+                except Exception as e:
+                    logger.warning(f"Failed to renew lease of {kind} job {job_id}: {e}")
+
+        renewer = asyncio.get_running_loop().create_task(renew())
+        try:
+            await handler(job_id, job["payload"])
+        except asyncio.CancelledError:
+            # Shutting down: leave the job claimed so it is requeued
+            raise
+        except Exception as e:
+            logger.error(f"{kind} job {job_id} crashed: {e}")
+            await store.update(job_id, status="failed", error=str(e))
+        finally:
+            renewer.cancel()
+
+        try:
+            await store.complete(job_id)
+        except Exception as e:
+            logger.warning(f"Failed to release {kind} job {job_id}: {e}")
+
+    async def _requeue_loop(self):
+        while not self._stopping:
+            for store, _ in [*JOB_HANDLERS.values(), *BATCH_JOB_HANDLERS.values()]:
+                try:
+                    await store.requeue_stale()
+                except Exception as e:
+                    logger.warning(f"Stale {store.kind} job scan failed: {e}")
+            await asyncio.sleep(REQUEUE_INTERVAL)
+
+
+# Pool of the API process (main.py lifespan)
+_pool: Optional[GenerationWorkerPool] = None
+
+
+def start_generation_workers() -> Optional[GenerationWorkerPool]:
+    """Start the in-process worker pool (GENERATION_WORKERS, 0 disables it)"""
+    global _pool
+
+    if settings.GENERATION_WORKERS <= 0 or _pool is not None:
+        return _pool
+
+    _pool = GenerationWorkerPool(settings.GENERATION_WORKERS)
+    _pool.start()
+    return _pool
+
+
+async def stop_generation_workers():
+    """Stop the in-process worker pool"""
+    global _pool
+
+    if _pool is not None:
+        await _pool.stop()
+        _pool = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run queued post and image generation jobs")
+    parser.add_argument(
+        "--workers", type=int, default=max(settings.GENERATION_WORKERS, 1),
+        help="Jobs run in parallel by this process"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(GenerationWorkerPool(args.workers).run_forever())
+
+
+if __name__ == "__main__":
+    main()
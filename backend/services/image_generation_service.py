@@ -13,12 +13,12 @@ Features:
 - Cost tracking
 
 Usage:
-    # Create job and start generation
-    job_id = ImageGenerationService.create_job(post_id, user_id, prompt)
-    asyncio.create_task(ImageGenerationService.generate_image_async(...))
+    # Create job and queue it for the generation workers
+    job_id = await ImageGenerationService.create_job(post_id, user_id, prompt)
+    await enqueue_image_generation(job_id, post_id, user_id, prompt)
 
-    # Poll status
-    status = ImageGenerationService.get_status(job_id)
+    # Poll status (from any API worker)
+    status = await ImageGenerationService.get_status(job_id)
 
     # Check quota
     quota = ImageGenerationService.check_quota(user_id, db)
@@ -39,6 +39,7 @@ import base64
 
 from database import Post, User, Base, engine, InstagramImage, ImageGenerationQuota, UserApiKey
 from utils.encryption import decrypt_api_key
+from utils.job_store import JobStore
 
 
 # ============================================================================
@@ -63,12 +64,12 @@ class ImageGenerationService:
     """
     Service for AI-powered image generation for Instagram posts
 
-    Uses class methods and in-memory job store for async generation
-    with progress tracking.
+    Uses class methods and the shared job store (utils/job_store.py) for
+    async generation with progress tracking.
     """
 
-    # In-memory job store (use Redis in production)
-    active_jobs: Dict[str, Dict[str, Any]] = {}
+    # Job state shared by all API and generation workers
+    jobs = JobStore("image")
 
     # Image cache by prompt hash
     _image_cache: Dict[str, Dict[str, Any]] = {}
@@ -86,7 +87,7 @@ class ImageGenerationService:
     )
 
     @classmethod
-    def create_job(
+    async def create_job(
         cls,
         post_id: int,
         user_id: int,
@@ -132,13 +133,35 @@ class ImageGenerationService:
             "file_size_bytes": None
         }
 
-        cls.active_jobs[job_id] = job
+        await cls.jobs.create(job_id, job)
+        await cls.jobs.set_alias(cls._post_alias(post_id, user_id), job_id)
         logger.info(f"Created image generation job {job_id} for post {post_id}")
 
         return job_id
 
+    @staticmethod
+    def _post_alias(post_id: int, user_id: int) -> str:
+        return f"post:{post_id}:user:{user_id}"
+
+    @classmethod
+    async def find_job_for_post(cls, post_id: int, user_id: int) -> Optional[str]:
+        """
+        Get the most recent job of a user's post, if it has not expired
+
+        Args:
+            post_id: Post ID
+            user_id: User ID
+
+        Returns:
+            str: Job ID or None
+        """
+        job_id = await cls.jobs.resolve_alias(cls._post_alias(post_id, user_id))
+        if job_id and await cls.jobs.get(job_id):
+            return job_id
+        return None
+
     @classmethod
-    def get_status(cls, job_id: str) -> Optional[Dict[str, Any]]:
+    async def get_status(cls, job_id: str) -> Optional[Dict[str, Any]]:
         """
         Get job status
 
@@ -148,10 +171,10 @@ class ImageGenerationService:
         Returns:
             dict: Job status or None if not found
         """
-        return cls.active_jobs.get(job_id)
+        return await cls.jobs.get(job_id)
 
     @classmethod
-    def update_job(
+    async def update_job(
         cls,
         job_id: str,
         progress: Optional[int] = None,
@@ -167,24 +190,22 @@ class ImageGenerationService:
             current_step: Current step description
             **kwargs: Additional fields to update
         """
-        if job_id in cls.active_jobs:
-            if progress is not None:
-                cls.active_jobs[job_id]["progress"] = progress
-            if current_step is not None:
-                cls.active_jobs[job_id]["current_step"] = current_step
-            cls.active_jobs[job_id].update(kwargs)
+        if progress is not None:
+            kwargs["progress"] = progress
+        if current_step is not None:
+            kwargs["current_step"] = current_step
+        await cls.jobs.update(job_id, **kwargs)
 
     @classmethod
-    def delete_job(cls, job_id: str):
+    async def delete_job(cls, job_id: str):
         """
-        Remove completed job from memory
+        Remove completed job from the job store
 
         Args:
             job_id: Job ID to delete
         """
-        if job_id in cls.active_jobs:
-            del cls.active_jobs[job_id]
-            logger.info(f"Deleted job {job_id} from memory")
+        await cls.jobs.delete(job_id)
+        logger.info(f"Deleted job {job_id} from job store")
 
     @classmethod
     def check_quota(cls, user_id: int, db: Session) -> Dict[str, Any]:
@@ -274,7 +295,7 @@ class ImageGenerationService:
 
         try:
             # Update: Started
-            cls.update_job(
+            await cls.update_job(
                 job_id,
                 status="processing",
                 progress=0,
@@ -293,7 +314,7 @@ class ImageGenerationService:
                 raise ImageGenerationError(f"Post {post_id} not found")
 
             # Update: 10%
-            cls.update_job(job_id, progress=10, current_step="Preparing prompt...")
+            await cls.update_job(job_id, progress=10, current_step="Preparing prompt...")
 
             # Enhance prompt with style
             enhanced_prompt = cls._enhance_prompt_with_style(prompt, style)
@@ -301,14 +322,14 @@ class ImageGenerationService:
 
             # Check cache (if not regenerating)
             if not regenerate:
-                cls.update_job(job_id, progress=20, current_step="Checking cache...")
+                await cls.update_job(job_id, progress=20, current_step="Checking cache...")
                 cached = await cls._check_cache(prompt_hash, db)
                 if cached:
                     # Update post with cached image
                     post.instagram_image_url = cached["image_url"]
                     db.commit()
 
-                    cls.update_job(
+                    await cls.update_job(
                         job_id,
                         status="completed",
                         progress=100,
@@ -326,7 +347,7 @@ class ImageGenerationService:
                     return
 
             # Update: 30%
-            cls.update_job(job_id, progress=30, current_step="Calling DALL-E API...")
+            await cls.update_job(job_id, progress=30, current_step="Calling DALL-E API...")
 
             # Get user's OpenAI API key
             user_openai_key = cls._get_user_openai_key(user_id, db)
@@ -340,7 +361,7 @@ class ImageGenerationService:
             )
 
             # Update: 60%
-            cls.update_job(job_id, progress=60, current_step="Saving image...")
+            await cls.update_job(job_id, progress=60, current_step="Saving image...")
 
             # Save image
             filename = f"post_{post_id}_{int(datetime.now().timestamp())}.png"
@@ -354,7 +375,7 @@ class ImageGenerationService:
             image_url = f"/api/images/instagram/{user_id}/{filename}"
 
             # Update: 80%
-            cls.update_job(job_id, progress=80, current_step="Saving to database...")
+            await cls.update_job(job_id, progress=80, current_step="Saving to database...")
 
             # Save to database
             import json
@@ -402,7 +423,7 @@ class ImageGenerationService:
 
             # Update: 100%
             elapsed = (datetime.utcnow() - start_time).total_seconds()
-            cls.update_job(
+            await cls.update_job(
                 job_id,
                 status="completed",
                 progress=100,
@@ -421,7 +442,7 @@ class ImageGenerationService:
 
         except Exception as e:
             logger.error(f"Job {job_id} failed: {str(e)}")
-            cls.update_job(
+            await cls.update_job(
                 job_id,
                 status="failed",
                 progress=0,
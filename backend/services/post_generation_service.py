@@ -7,14 +7,24 @@ progress tracking, error handling, and platform-specific content generation.
 import asyncio
 import logging
 import json
-from typing import List, Dict, Optional
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, List, Dict, Optional, Tuple
 from datetime import datetime
 from sqlalchemy.orm import Session
 
-from database import Article, Post
+from config.settings import settings
+from database import Post
 from src.summarizers import AISummarizer
 from src.generators import ContentGenerator
 from schemas.posts import GenerationStatus, ContentValidation, PlatformEnum
+from utils.ai_content_cache import AIContentCache, SUMMARY_PLATFORM, is_generation_cache_enabled
+from utils.job_store import JobStore
+from utils.posts_cache import PostsCache
+from services.article_enrichment_service import (
+    ensure_articles_enriched,
+    is_lazy_enrichment_enabled,
+    load_article_contexts,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -24,15 +34,45 @@ class GenerationStep:
     INITIALIZE = ("Initializing", 0, 5)
     FETCH_ARTICLES = ("Fetching articles", 5, 15)
     GENERATE_SUMMARY = ("Generating AI summary", 15, 30)
-    GENERATE_TWITTER = ("Generating Twitter content", 30, 45)
-    GENERATE_LINKEDIN = ("Generating LinkedIn content", 45, 60)
-    GENERATE_THREADS = ("Generating Threads content", 60, 75)
-    GENERATE_INSTAGRAM = ("Generating Instagram caption", 75, 85)
+    GENERATE_PLATFORMS = ("Generating platform content", 30, 85)
     SAVE_POST = ("Saving post", 85, 95)
     VALIDATE = ("Validating content", 95, 100)
     COMPLETE = ("Complete", 100, 100)
 
 
+class ConcurrencyBudget:
+    """
+    At most `limit` concurrent holders per key (e.g. per user or provider)
+
+    Semaphores are created on first use and dropped when their last holder
+    releases, so idle keys cost nothing. Budgets are per worker process.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self._slots: Dict[Any, list] = {}  # key -> [semaphore, holders]
+
+    @asynccontextmanager
+    async def acquire(self, key: Any):
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = [asyncio.Semaphore(self.limit), 0]
+
+        slot[1] += 1
+        try:
+            async with slot[0]:
+                yield
+        finally:
+            slot[1] -= 1
+            if slot[1] == 0:
+                self._slots.pop(key, None)
+
+
+# LLM calls in flight, shared by all generation jobs in this worker
+user_generation_budget = ConcurrencyBudget(settings.GENERATION_USER_CONCURRENCY)
+provider_generation_budget = ConcurrencyBudget(settings.GENERATION_PROVIDER_CONCURRENCY)
+
+
 class PostGenerationService:
     """
     Service for managing post generation lifecycle
@@ -41,8 +81,14 @@ class PostGenerationService:
     and content validation.
     """
 
-    # In-memory job store (use Redis in production)
-    _jobs: Dict[int, Dict] = {}
+    # Job state shared by all API and generation workers (utils/job_store.py)
+    jobs = JobStore("post")
+    # Queue of batch (non-interactive) jobs, claimed only when a pool has a
+    # free batch slot; their state is in `jobs`
+    batch_jobs = JobStore("post", queue="batch")
+
+    # Seconds between keep-alives on an idle progress stream
+    PROGRESS_KEEPALIVE = 15
 
     # Platform configuration
     PLATFORM_CONFIG = {
@@ -53,7 +99,7 @@ class PostGenerationService:
     }
 
     @classmethod
-    def create_job(cls, post_id: int) -> Dict:
+    async def create_job(cls, post_id: int) -> Dict:
         """Initialize a new generation job"""
         job = {
             "status": GenerationStatus.QUEUED,
@@ -66,25 +112,22 @@ class PostGenerationService:
             "started_at": datetime.utcnow(),
             "estimated_completion": None
         }
-        cls._jobs[post_id] = job
-        return job
+        return await cls.jobs.create(post_id, job)
 
     @classmethod
-    def get_job(cls, post_id: int) -> Optional[Dict]:
+    async def get_job(cls, post_id: int) -> Optional[Dict]:
         """Get job status"""
-        return cls._jobs.get(post_id)
+        return await cls.jobs.get(post_id)
 
     @classmethod
-    def update_job(cls, post_id: int, **kwargs):
-        """Update job status"""
-        if post_id in cls._jobs:
-            cls._jobs[post_id].update(kwargs)
+    async def update_job(cls, post_id: int, **kwargs):
+        """Update job status (atomic; published to status subscribers)"""
+        await cls.jobs.update(post_id, **kwargs)
 
     @classmethod
-    def delete_job(cls, post_id: int):
-        """Remove completed job from memory"""
-        if post_id in cls._jobs:
-            del cls._jobs[post_id]
+    async def delete_job(cls, post_id: int):
+        """Remove completed job from the store"""
+        await cls.jobs.delete(post_id)
 
     @classmethod
     def validate_content(cls, platform: str, content: str) -> ContentValidation:
@@ -164,7 +207,8 @@ class PostGenerationService:
         user_id: int,
         api_key: str,
         ai_provider: str,
-        db: Session
+        db: Session,
+        batch: bool = False
     ):
         """
         Asynchronously generate social media posts with progress tracking
@@ -173,114 +217,187 @@ class PostGenerationService:
         1. Fetches articles
         2. Generates AI summary
         3. Generates platform-specific content (Twitter, LinkedIn, Threads, Instagram)
+           concurrently, within the per-user and per-provider LLM call budgets
+           (with GENERATION_ONE_SHOT, steps 2-3 are one call returning JSON;
+           platforms missing from it are then generated separately)
         4. Validates content
         5. Saves to database
 
+        With `batch` (non-interactive jobs: digests, backfills) the LLM calls go
+        through the provider's batch API (src/utils/llm_batch.py) instead,
+        outside the per-user and per-provider budgets: slower, but cheaper.
+
         Progress is tracked at each step and can be polled via the status endpoint.
         """
         try:
             # Step 1: Initialize
-            cls.update_job(
+            await cls.update_job(
                 post_id,
                 status=GenerationStatus.PROCESSING,
                 progress=GenerationStep.INITIALIZE[2],
                 current_step=GenerationStep.INITIALIZE[0]
             )
 
-            # Set API key for AI provider
-            import os
-            if ai_provider == 'openai':
-                os.environ['OPENAI_API_KEY'] = api_key
-            elif ai_provider == 'anthropic':
-                os.environ['ANTHROPIC_API_KEY'] = api_key
-
             # Step 2: Fetch articles
-            cls.update_job(
+            await cls.update_job(
                 post_id,
                 progress=GenerationStep.FETCH_ARTICLES[1],
                 current_step=GenerationStep.FETCH_ARTICLES[0]
             )
 
-            articles = db.query(Article).filter(
-                Article.id.in_(article_ids)
-            ).all()
+            # Lazy mode: enrich picked articles on first use
+            if is_lazy_enrichment_enabled():
+                await ensure_articles_enriched(article_ids)
 
-            if not articles:
-                cls.update_job(
+            # Stored fields only: precomputed AI context, no full-text processing
+            articles_data = load_article_contexts(db, article_ids)
+
+            if not articles_data:
+                await cls.update_job(
                     post_id,
                     status=GenerationStatus.FAILED,
                     error="No articles found with provided IDs"
                 )
                 return
 
-            # Convert to dict format
-            articles_data = [
-                {
-                    'title': a.title,
-                    'link': a.link,
-                    'summary': a.summary or '',
-                    'source': a.source,
-                    'published': a.published
-                }
-                for a in articles
-            ]
-
-            logger.info(f"Generating post {post_id} from {len(articles)} articles")
+            logger.info(f"Generating post {post_id} from {len(articles_data)} articles")
 
             # Step 3: Generate AI summary
-            cls.update_job(
+            await cls.update_job(
                 post_id,
                 progress=GenerationStep.GENERATE_SUMMARY[1],
                 current_step=GenerationStep.GENERATE_SUMMARY[0]
             )
 
-            summarizer = AISummarizer(provider=ai_provider)
-            summary = summarizer.summarize_articles(articles_data)
+            summarizer = AISummarizer(provider=ai_provider, api_key=api_key, batch=batch)
+
+            @asynccontextmanager
+            async def llm_budget():
+                # Within the user's and the provider's budget (user first, always
+                # in that order); batched calls don't hold up interactive ones
+                if batch:
+                    yield
+                    return
+                async with user_generation_budget.acquire(user_id):
+                    async with provider_generation_budget.acquire(ai_provider):
+                        yield
+
+            # Always generate Instagram caption automatically
+            # (image generation remains manual in post-edit page)
+            all_platforms = list(dict.fromkeys(platforms + ['instagram']))
+
+            def platform_config(platform: str) -> Dict:
+                return {
+                    'enabled': True,
+                    'max_length': cls.PLATFORM_CONFIG[platform]['max_length']
+                }
+
+            # Shared generation cache, unless the user opted out
+            summary = None
+            cache_params = None
+            if is_generation_cache_enabled(db, user_id):
+                cache_params = {"provider": ai_provider, "model": summarizer.model}
+                summary = await AIContentCache.get(articles_data, SUMMARY_PLATFORM, **cache_params)
+
+            def platform_cache_args(platform: str) -> Optional[Dict]:
+                if cache_params is None:
+                    return None
+                return {**cache_params, "params": {"max_length": platform_config(platform)['max_length']}}
+
+            # One-shot mode: summary and all platforms from a single call
+            # (not worth it when the summary, and so usually the posts, are cached)
+            one_shot_posts = {}
+            if summary is None and settings.GENERATION_ONE_SHOT:
+                generator = ContentGenerator(
+                    summarizer, {platform: platform_config(platform) for platform in all_platforms}
+                )
+                try:
+                    async with llm_budget():
+                        summary, one_shot_posts = await generator.generate_posts_one_shot(
+                            articles_data, user_id=user_id, post_id=post_id
+                        )
+                except ValueError as e:
+                    logger.warning(
+                        f"One-shot generation of post {post_id} returned an invalid reply ({e}), "
+                        f"generating per platform"
+                    )
+                else:
+                    if cache_params is not None:
+                        await AIContentCache.set(articles_data, SUMMARY_PLATFORM, summary, **cache_params)
+                        for platform, content in one_shot_posts.items():
+                            await AIContentCache.set(
+                                articles_data, platform, content, **platform_cache_args(platform)
+                            )
+
+            if summary is None:
+                summary = await summarizer.summarize_articles(articles_data, user_id=user_id)
+                if cache_params is not None:
+                    await AIContentCache.set(articles_data, SUMMARY_PLATFORM, summary, **cache_params)
 
             # Step 4: Generate platform-specific content
             posts_content = {}
             validations = []
             platform_errors = {}  # Track errors per platform
 
-            # Track progress through platforms
-            platform_steps = {
-                'twitter': GenerationStep.GENERATE_TWITTER,
-                'linkedin': GenerationStep.GENERATE_LINKEDIN,
-                'threads': GenerationStep.GENERATE_THREADS,
-                'instagram': GenerationStep.GENERATE_INSTAGRAM
-            }
+            async def generate_platform(platform: str) -> Dict:
+                # Already generated (and repaired) by the one-shot call
+                if platform in one_shot_posts:
+                    return {platform: one_shot_posts[platform]}
 
-            # Always generate Instagram caption automatically
-            # (image generation remains manual in post-edit page)
-            all_platforms = list(set(platforms + ['instagram']))
+                cache_args = platform_cache_args(platform)
+                if cache_args is not None:
+                    cached = await AIContentCache.get(articles_data, platform, **cache_args)
+                    if cached is not None:
+                        return {platform: cached}
 
-            for platform in all_platforms:
-                step = platform_steps.get(platform)
-                if step:
-                    cls.update_job(
-                        post_id,
-                        progress=step[1],
-                        current_step=step[0]
+                # Generate content for this platform
+                generator = ContentGenerator(summarizer, {platform: platform_config(platform)})
+
+                async with llm_budget():
+                    result = await generator.generate_posts(summary, user_id=user_id, post_id=post_id)
+
+                if cache_args is not None:
+                    await AIContentCache.set(
+                        articles_data, platform, result.get(platform), **cache_args
                     )
 
+                return result
+
+            async def run_platform(platform: str) -> Tuple[str, Optional[Dict], Optional[Exception]]:
                 try:
-                    # Generate content for this platform
-                    platform_config = {
-                        platform: {
-                            'enabled': True,
-                            'max_length': cls.PLATFORM_CONFIG[platform]['max_length']
-                        }
-                    }
+                    return platform, await generate_platform(platform), None
+                except Exception as e:
+                    return platform, None, e
+
+            def display_name(platform: str) -> str:
+                return cls.PLATFORM_CONFIG.get(platform, {}).get('name', platform)
+
+            platform_names = ', '.join(display_name(p) for p in all_platforms)
+            step_name, step_start, step_end = GenerationStep.GENERATE_PLATFORMS
+            await cls.update_job(
+                post_id,
+                progress=step_start,
+                current_step=f"Generating {platform_names} content"
+            )
 
-                    generator = ContentGenerator(summarizer, platform_config)
+            # All platforms run concurrently; each is recorded as it finishes
+            completed = 0
+            for next_done in asyncio.as_completed([run_platform(p) for p in all_platforms]):
+                platform, result, error = await next_done
 
-                    # Run in thread pool to avoid blocking
-                    loop = asyncio.get_event_loop()
-                    result = await loop.run_in_executor(
-                        None,
-                        generator.generate_posts,
-                        summary
+                completed += 1
+                await cls.update_job(
+                    post_id,
+                    progress=int(step_start + (step_end - step_start) * completed / len(all_platforms)),
+                    current_step=(
+                        f"Generated {display_name(platform)} content "
+                        f"({completed}/{len(all_platforms)})"
                     )
+                )
+
+                try:
+                    if error is not None:
+                        raise error
 
                     # Handle Instagram special format (dict with caption/hashtags)
                     if platform == 'instagram':
@@ -313,6 +430,7 @@ class PostGenerationService:
                         logger.warning(error_msg)
                         platform_errors[platform] = error_msg
                         # Don't fail the whole job, just mark this platform as failed
+                        await cls.update_job(post_id, platform_errors=platform_errors.copy())
                         continue
 
                     # Validate content (use caption for Instagram)
@@ -327,7 +445,7 @@ class PostGenerationService:
                             platform_errors[platform] = error_msg
 
                     # Update job with partial content and errors
-                    cls.update_job(
+                    await cls.update_job(
                         post_id,
                         content=posts_content.copy(),
                         platform_errors=platform_errors.copy()
@@ -342,17 +460,14 @@ class PostGenerationService:
                     platform_errors[platform] = error_msg
 
                     # Update job with the error
-                    cls.update_job(
+                    await cls.update_job(
                         post_id,
                         platform_errors=platform_errors.copy()
                     )
 
-                    # Continue to next platform
-                    continue
-
             # Check if at least one platform succeeded
             if not posts_content:
-                cls.update_job(
+                await cls.update_job(
                     post_id,
                     status=GenerationStatus.FAILED,
                     error="Failed to generate content for any platform. Please check your API key and try again."
@@ -360,7 +475,7 @@ class PostGenerationService:
                 return
 
             # Step 5: Save to database
-            cls.update_job(
+            await cls.update_job(
                 post_id,
                 progress=GenerationStep.SAVE_POST[1],
                 current_step=GenerationStep.SAVE_POST[0]
@@ -396,7 +511,7 @@ class PostGenerationService:
                 db.refresh(post)
 
             # Step 6: Final validation
-            cls.update_job(
+            await cls.update_job(
                 post_id,
                 progress=GenerationStep.VALIDATE[1],
                 current_step=GenerationStep.VALIDATE[0],
@@ -408,7 +523,7 @@ class PostGenerationService:
             if platform_errors:
                 completion_message = f"Complete (some platforms failed: {', '.join(platform_errors.keys())})"
 
-            cls.update_job(
+            await cls.update_job(
                 post_id,
                 status=GenerationStatus.COMPLETED,
                 progress=GenerationStep.COMPLETE[1],
@@ -425,26 +540,70 @@ class PostGenerationService:
             logger.error(f"Error generating post {post_id}: {error_msg}")
             logger.error(traceback.format_exc())
 
-            cls.update_job(
+            await cls.update_job(
                 post_id,
                 status=GenerationStatus.FAILED,
                 error=error_msg
             )
 
+        finally:
+            # Completed or failed, the post changed: lists and ETags must follow
+            await PostsCache.invalidate_post_and_list(post_id, user_id)
+
+    @staticmethod
+    def _platform_statuses(job: Dict) -> Dict[str, Dict[str, str]]:
+        """Per-platform status of a job, from its content, errors and current step"""
+        platforms = {}
+        platform_errors = job.get('platform_errors', {})
+
+        for platform in ['twitter', 'linkedin', 'threads', 'instagram']:
+            # Check if platform failed
+            if platform in platform_errors:
+                platforms[platform] = {
+                    'status': 'error',
+                    'message': f'Failed: {platform_errors[platform]}'
+                }
+            # Check if platform has content
+            elif platform in job.get('content', {}):
+                platforms[platform] = {
+                    'status': 'completed',
+                    'message': 'Caption generated' if platform == 'instagram' else 'Content generated'
+                }
+            elif job['status'] == GenerationStatus.PROCESSING:
+                # Check current step to determine platform status
+                current_step = job.get('current_step', '').lower()
+                if platform in current_step:
+                    platforms[platform] = {
+                        'status': 'processing',
+                        'message': f'Generating {"caption" if platform == "instagram" else platform.capitalize() + " content"}...'
+                    }
+                else:
+                    platforms[platform] = {
+                        'status': 'pending',
+                        'message': 'Waiting...'
+                    }
+            else:
+                platforms[platform] = {
+                    'status': 'pending',
+                    'message': 'Queued'
+                }
+
+        return platforms
+
     @classmethod
-    def get_status(cls, post_id: int, db: Session) -> Dict:
+    async def get_status(cls, post_id: int, db: Session) -> Dict:
         """
         Get comprehensive generation status
 
         Returns job status if in progress, or database status if complete
         """
-        # Check in-memory job
-        job = cls.get_job(post_id)
+        # Check the job store
+        job = await cls.get_job(post_id)
 
         if job:
             # Calculate estimated completion
             if job['status'] == GenerationStatus.PROCESSING:
-                elapsed = (datetime.utcnow() - job['started_at']).total_seconds()
+                elapsed = (datetime.utcnow() - datetime.fromisoformat(job['started_at'])).total_seconds()
                 progress = job['progress']
                 if progress > 0:
                     total_estimated = (elapsed / progress) * 100
@@ -452,41 +611,7 @@ class PostGenerationService:
                     job['estimated_completion'] = int(remaining)
 
             # Add platform statuses based on content availability and errors
-            if 'platforms' not in job:
-                job['platforms'] = {}
-                platform_errors = job.get('platform_errors', {})
-
-                for platform in ['twitter', 'linkedin', 'threads', 'instagram']:
-                    # Check if platform failed
-                    if platform in platform_errors:
-                        job['platforms'][platform] = {
-                            'status': 'error',
-                            'message': f'Failed: {platform_errors[platform]}'
-                        }
-                    # Check if platform has content
-                    elif platform in job.get('content', {}):
-                        job['platforms'][platform] = {
-                            'status': 'completed',
-                            'message': 'Caption generated' if platform == 'instagram' else 'Content generated'
-                        }
-                    elif job['status'] == GenerationStatus.PROCESSING:
-                        # Check current step to determine platform status
-                        current_step = job.get('current_step', '').lower()
-                        if platform in current_step:
-                            job['platforms'][platform] = {
-                                'status': 'processing',
-                                'message': f'Generating {"caption" if platform == "instagram" else platform.capitalize() + " content"}...'
-                            }
-                        else:
-                            job['platforms'][platform] = {
-                                'status': 'pending',
-                                'message': 'Waiting...'
-                            }
-                    else:
-                        job['platforms'][platform] = {
-                            'status': 'pending',
-                            'message': 'Queued'
-                        }
+            job['platforms'] = cls._platform_statuses(job)
 
             return job
 
@@ -532,3 +657,87 @@ class PostGenerationService:
             "started_at": post.created_at,
             "estimated_completion": None
         }
+
+    # ========================================================================
+    # PROGRESS EVENTS
+    # ========================================================================
+
+    @classmethod
+    def progress_event(cls, post_id: int, state: Dict) -> Dict:
+        """
+        Progress event for a job state, in the shape generate_post_stream
+        (api/posts.py) emits: status started/processing/completed/error,
+        progress, step, content
+        """
+        status = str(getattr(state['status'], 'value', state['status']))
+
+        if status == GenerationStatus.FAILED.value:
+            return {'status': 'error', 'error': state.get('error') or 'Generation failed'}
+
+        event = {
+            'status': {
+                GenerationStatus.QUEUED.value: 'started',
+                GenerationStatus.COMPLETED.value: 'completed',
+            }.get(status, 'processing'),
+            'progress': state.get('progress', 0),
+            'step': state.get('current_step'),
+            'content': state.get('content', {}),
+            'platforms': cls._platform_statuses(state),
+        }
+        if status == GenerationStatus.COMPLETED.value:
+            event['post_id'] = post_id
+        return event
+
+    @classmethod
+    async def stream_progress(cls, post_id: int) -> AsyncIterator[Optional[Dict]]:
+        """
+        Yield progress events for a generation as they happen, until it
+        completes or fails
+
+        Events come from the job store's pub/sub channel, so the job may run
+        in any worker. None is yielded after PROGRESS_KEEPALIVE idle seconds
+        so callers can send a keep-alive.
+        """
+        from database import SessionLocal
+
+        async def load_status() -> Optional[Dict]:
+            db = SessionLocal()
+            try:
+                return await cls.get_status(post_id, db)
+            finally:
+                db.close()
+
+        def finished(state: Dict) -> bool:
+            return str(getattr(state['status'], 'value', state['status'])) in (
+                GenerationStatus.COMPLETED.value, GenerationStatus.FAILED.value
+            )
+
+        # Subscribe before reading the state so no update in between is lost
+        subscription = await cls.jobs.subscribe(post_id)
+        try:
+            state = await load_status()
+            if not state:
+                yield {'status': 'error', 'error': 'Generation status not found'}
+                return
+
+            yield cls.progress_event(post_id, state)
+
+            while not finished(state):
+                update = await subscription.next(cls.PROGRESS_KEEPALIVE)
+
+                if update is None:
+                    # Idle: make sure the job did not end or expire unnoticed
+                    if await cls.get_job(post_id) is None:
+                        state = await load_status()
+                        if state:
+                            yield cls.progress_event(post_id, state)
+                        return
+                    yield None
+                    continue
+
+                update.pop('job_id', None)
+                state.update(update)
+                yield cls.progress_event(post_id, state)
+        finally:
+            await subscription.close()
+
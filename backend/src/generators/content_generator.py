@@ -1,10 +1,31 @@
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import json
 import re
 from loguru import logger
 from src.utils.ai_exceptions import AIProviderError
 from src.utils.ai_error_handler import AIErrorHandler
 
 
+PLATFORM_POST_SYSTEM_PROMPT = (
+    "You are a social media content creator. You must strictly respect character limits."
+)
+
+ONE_SHOT_SYSTEM_PROMPT = (
+    "You are an expert AI news analyst and social media content creator. "
+    "You must strictly respect character limits and answer with a single JSON object."
+)
+
+# Platform-specific instructions
+PLATFORM_INSTRUCTIONS = {
+    "twitter": "Keep it punchy and conversational. Target 260 characters to be safe.",
+    "linkedin": "Professional tone. Focus on business implications and insights. Use paragraphs. Target 2900 characters.",
+    "threads": "CRITICAL: Must be under 480 characters. Be concise and punchy. Short paragraphs. This is non-negotiable - count your characters!",
+    "instagram": "Visual-first mindset. Engaging caption that encourages interaction.",
+    "youtube": "Could be used as a community post or video description.",
+}
+
+
 class ContentGenerator:
     """Generates platform-specific social media content"""
 
@@ -13,14 +34,14 @@ class ContentGenerator:
         Initialize content generator
 
         Args:
-            ai_client: AI client (from summarizer)
+            ai_client: AISummarizer whose pooled async client (and model) is used
             platform_config: Platform configurations
         """
         self.ai_client = ai_client
         self.platform_config = platform_config
         self.error_handler = AIErrorHandler()
 
-    def generate_posts(
+    async def generate_posts(
         self, summary: Dict, user_id: Optional[int] = None, post_id: Optional[int] = None
     ) -> Dict[str, str]:
         """
@@ -42,13 +63,13 @@ class ContentGenerator:
                 try:
                     if platform == "instagram":
                         # Special handling for Instagram - generates caption + image prompt
-                        instagram_content = self._generate_instagram_content(
+                        instagram_content = await self._generate_instagram_content(
                             summary, config, user_id=user_id, post_id=post_id
                         )
                         posts[platform] = instagram_content
                     else:
                         # Standard text post generation
-                        post = self._generate_platform_post(
+                        post = await self._generate_platform_post(
                             platform, summary, config, user_id=user_id, post_id=post_id
                         )
                         posts[platform] = post
@@ -74,7 +95,258 @@ class ContentGenerator:
 
         return posts
 
-    def _generate_instagram_content(
+    async def generate_posts_one_shot(
+        self,
+        articles: List[Dict],
+        user_id: Optional[int] = None,
+        post_id: Optional[int] = None,
+    ) -> Tuple[Dict, Dict]:
+        """
+        Generate the summary and posts for all enabled platforms in one AI call
+
+        The article context is sent once, and the reply is one JSON object
+        with the summary and every platform variant, instead of a summary call
+        followed by one call per platform. Posts that are missing or over
+        their platform's limit are repaired with a short follow-up call.
+
+        Args:
+            articles: List of article dictionaries (as for summarize_articles)
+            user_id: User ID for context (optional)
+            post_id: Post ID for context (optional)
+
+        Returns:
+            (summary, posts): summary in the summarize_articles format, posts
+            in the generate_posts format
+
+        Raises:
+            AIProviderError: If the AI call fails
+            ValueError: If the reply is not a JSON object with a summary
+        """
+        selected, context = self.ai_client.prepare_context(articles)
+        platforms = [
+            platform for platform, config in self.platform_config.items()
+            if config.get("enabled", False)
+        ]
+
+        # Budget of the separate calls this one replaces
+        max_tokens = 1000 + sum(550 if platform == "instagram" else 500 for platform in platforms)
+
+        reply = await self._call_ai(
+            self._create_one_shot_prompt(context, platforms),
+            max_tokens=max_tokens,
+            system=ONE_SHOT_SYSTEM_PROMPT,
+            json_output=True,
+            context={
+                "user_id": user_id,
+                "post_id": post_id,
+                "operation": "generate_posts_one_shot",
+                "num_articles": len(selected),
+            },
+        )
+
+        data = self._parse_json_object(reply)
+        summary_text = data.get("summary")
+        if not isinstance(summary_text, str) or not summary_text.strip():
+            raise ValueError("One-shot reply has no summary")
+
+        summary = {
+            "summary": summary_text.strip(),
+            "articles_processed": len(selected),
+            "sources": list(set(a["source"] for a in selected)),
+        }
+
+        results = await asyncio.gather(
+            *[
+                self._finish_one_shot_post(
+                    platform, data.get(platform), summary, user_id=user_id, post_id=post_id
+                )
+                for platform in platforms
+            ],
+            return_exceptions=True,
+        )
+
+        posts = {}
+        for platform, result in zip(platforms, results):
+            if isinstance(result, Exception):
+                # Same as generate_posts: the other platforms are kept
+                message = result.message if isinstance(result, AIProviderError) else str(result)
+                logger.error(f"Failed to repair one-shot post for {platform}: {message}")
+                continue
+            posts[platform] = result
+
+        logger.info(f"Generated {len(posts)}/{len(platforms)} posts in one call")
+
+        return summary, posts
+
+    def _create_one_shot_prompt(self, context: str, platforms: List[str]) -> str:
+        """Create the prompt for the summary and all platform posts"""
+        keys = ['- "summary": string']
+        sections = []
+
+        for platform in platforms:
+            if platform == "instagram":
+                keys.append('- "instagram": {"caption": string, "image_prompt": string}')
+                sections.append(
+                    """instagram:
+- caption: target 300-500 characters (strict maximum: 2200 characters)
+- caption: conversational and engaging, 2-3 relevant emojis, line breaks for readability
+- caption: end with a call-to-action or question, then 5-8 relevant hashtags
+- image_prompt: DALL-E prompt for a visually striking tech/AI image, max 400 characters
+- image_prompt: NO text, faces, or branded elements; specify a style (photorealistic, 3D render, abstract art, or digital illustration)"""
+                )
+                continue
+
+            requirements = self._platform_requirements(platform, self.platform_config[platform])
+            hashtags = requirements["hashtags"]
+            section = f"""{platform}:
+- STRICT character limit: {requirements["target_length"]} characters (absolute maximum: {requirements["max_length"]})
+- Tone: {requirements["tone"]}
+- {f"Include these hashtags: {' '.join(hashtags)}" if hashtags else "Include relevant hashtags"}"""
+
+            instruction = PLATFORM_INSTRUCTIONS.get(platform, "")
+            if instruction:
+                section += f"\n- {instruction}"
+
+            keys.append(f'- "{platform}": string')
+            sections.append(section)
+
+        keys_list = "\n".join(keys)
+        sections_list = "\n\n".join(sections)
+
+        return f"""Review these recent AI-related news articles, summarize them and write a social media post for each platform below.
+
+Articles:
+{context}
+
+Respond with a single JSON object with exactly these keys:
+{keys_list}
+
+"summary": a brief overview of the main themes and developments (2-3 sentences), 3-5 key insights or trends emerging from these articles, and why these developments matter for the AI industry. Informative yet engaging.
+
+Platform requirements (count your characters carefully, every post MUST be under its limit):
+
+{sections_list}"""
+
+    @staticmethod
+    def _parse_json_object(reply: str) -> Dict:
+        """Parse a JSON object reply (tolerates code fences or text around it)"""
+        start, end = reply.find("{"), reply.rfind("}")
+        if start == -1 or end < start:
+            raise ValueError("Reply contains no JSON object")
+
+        data = json.loads(reply[start:end + 1])
+        if not isinstance(data, dict):
+            raise ValueError("Reply is not a JSON object")
+
+        return data
+
+    async def _finish_one_shot_post(
+        self,
+        platform: str,
+        value,
+        summary: Dict,
+        user_id: Optional[int] = None,
+        post_id: Optional[int] = None,
+    ):
+        """
+        Validate one platform's part of a one-shot reply, repairing it if needed
+
+        Missing posts are generated on their own; posts over the limit are
+        shortened by the AI (and truncated if still too long).
+        """
+        config = self.platform_config[platform]
+
+        if platform == "instagram":
+            value = value if isinstance(value, dict) else {}
+            caption = value.get("caption")
+            caption = caption.strip() if isinstance(caption, str) else ""
+            image_prompt = value.get("image_prompt")
+            image_prompt = image_prompt.strip() if isinstance(image_prompt, str) else ""
+
+            if not caption:
+                logger.warning("One-shot reply has no Instagram caption, generating it")
+                caption = await self._generate_instagram_caption(
+                    summary, config, user_id=user_id, post_id=post_id
+                )
+            elif len(caption) > 2200:
+                try:
+                    caption = await self._shorten_post(
+                        "instagram", caption, 2200, user_id=user_id, post_id=post_id
+                    )
+                except AIProviderError as e:
+                    logger.warning(f"Could not shorten instagram caption: {e.message}")
+                if len(caption) > 2200:
+                    caption = caption[:2197] + "..."
+
+            if not image_prompt:
+                logger.warning("One-shot reply has no image prompt, generating it")
+                image_prompt = await self._generate_instagram_image_prompt(
+                    summary, user_id=user_id, post_id=post_id
+                )
+            elif len(image_prompt) > 400:
+                image_prompt = image_prompt[:397] + "..."
+
+            return {
+                "caption": caption,
+                "image_prompt": image_prompt,
+                "hashtags": self._extract_hashtags(caption),
+            }
+
+        content = value.strip() if isinstance(value, str) else ""
+        if not content:
+            logger.warning(f"One-shot reply has no {platform} post, generating it")
+            return await self._generate_platform_post(
+                platform, summary, config, user_id=user_id, post_id=post_id
+            )
+
+        max_length = self._platform_requirements(platform, config)["max_length"]
+        if len(content) > max_length:
+            try:
+                content = await self._shorten_post(
+                    platform, content, max_length, user_id=user_id, post_id=post_id
+                )
+            except AIProviderError as e:
+                logger.warning(f"Could not shorten {platform} post: {e.message}")
+
+        return self.finish_platform_post(platform, content)
+
+    async def _shorten_post(
+        self,
+        platform: str,
+        content: str,
+        max_length: int,
+        user_id: Optional[int] = None,
+        post_id: Optional[int] = None,
+    ) -> str:
+        """Ask the AI to bring a post over the limit back under it"""
+        target_length = int(max_length * 0.9)
+        logger.warning(
+            f"{platform} content exceeded {max_length} chars ({len(content)}), shortening"
+        )
+
+        prompt = f"""This {platform} post is {len(content)} characters long, over the {max_length} character limit.
+
+Shorten it to under {target_length} characters (absolute maximum: {max_length}). Keep its key message, tone, emojis and hashtags.
+
+Post:
+{content}
+
+Shortened post:"""
+
+        shortened = await self._call_ai(
+            prompt,
+            max_tokens=max(200, max_length // 3),
+            system=PLATFORM_POST_SYSTEM_PROMPT,
+            context={
+                "user_id": user_id,
+                "post_id": post_id,
+                "platform": platform,
+                "operation": "shorten_platform_post",
+            },
+        )
+        return shortened.strip() or content
+
+    async def _generate_instagram_content(
         self,
         summary: Dict,
         config: Dict,
@@ -106,14 +378,10 @@ class ContentGenerator:
             AIProviderError: If AI call fails with user-friendly message
         """
         try:
-            # Generate caption
-            caption = self._generate_instagram_caption(
-                summary, config, user_id=user_id, post_id=post_id
-            )
-
-            # Generate image prompt for DALL-E
-            image_prompt = self._generate_instagram_image_prompt(
-                summary, user_id=user_id, post_id=post_id
+            # Caption and DALL-E image prompt are independent: request both at once
+            caption, image_prompt = await asyncio.gather(
+                self._generate_instagram_caption(summary, config, user_id=user_id, post_id=post_id),
+                self._generate_instagram_image_prompt(summary, user_id=user_id, post_id=post_id),
             )
 
             # Extract hashtags from caption
@@ -142,7 +410,7 @@ class ContentGenerator:
                 "hashtags": ["AI", "Tech", "Innovation"],
             }
 
-    def _generate_instagram_caption(
+    async def _generate_instagram_caption(
         self,
         summary: Dict,
         config: Dict,
@@ -196,7 +464,7 @@ Format:
 
 Caption:"""
 
-        caption = self._call_ai(
+        caption = await self._call_ai(
             caption_prompt,
             max_tokens=400,
             context={
@@ -213,7 +481,7 @@ Caption:"""
 
         return caption.strip()
 
-    def _generate_instagram_image_prompt(
+    async def _generate_instagram_image_prompt(
         self, summary: Dict, user_id: Optional[int] = None, post_id: Optional[int] = None
     ) -> str:
         """
@@ -257,7 +525,7 @@ Example formats:
 
 Image Prompt:"""
 
-        image_prompt = self._call_ai(
+        image_prompt = await self._call_ai(
             image_prompt_query,
             max_tokens=150,
             context={
@@ -294,7 +562,7 @@ Image Prompt:"""
 
         return hashtags
 
-    def _generate_platform_post(
+    async def _generate_platform_post(
         self,
         platform: str,
         summary: Dict,
@@ -319,79 +587,22 @@ Image Prompt:"""
             AIProviderError: If AI call fails
         """
         prompt = self._create_platform_prompt(platform, summary, config)
-        max_length = config.get("max_length", 280)
 
         # Use the AI client to generate the post
         try:
-            generated_content = ""
-            if hasattr(self.ai_client, "provider"):
-                context = {
+            generated_content = await self._call_ai(
+                prompt,
+                max_tokens=500,
+                system=PLATFORM_POST_SYSTEM_PROMPT,
+                context={
                     "user_id": user_id,
                     "post_id": post_id,
                     "platform": platform,
                     "operation": "generate_platform_post",
-                }
-
-                if self.ai_client.provider == "openai":
-                    try:
-                        response = self.ai_client.client.chat.completions.create(
-                            model=self.ai_client.model,
-                            messages=[
-                                {
-                                    "role": "system",
-                                    "content": "You are a social media content creator. You must strictly respect character limits.",
-                                },
-                                {"role": "user", "content": prompt},
-                            ],
-                            temperature=0.8,
-                            max_tokens=500,
-                            timeout=30.0,
-                        )
-                        generated_content = response.choices[0].message.content.strip()
-
-                    except Exception as e:
-                        ai_error = self.error_handler.handle_openai_error(e, context)
-                        self.error_handler.log_error(ai_error, user_id=user_id)
-                        raise ai_error
-
-                elif self.ai_client.provider == "anthropic":
-                    try:
-                        response = self.ai_client.client.messages.create(
-                            model=self.ai_client.model,
-                            max_tokens=500,
-                            temperature=0.8,
-                            timeout=30.0,
-                            messages=[{"role": "user", "content": prompt}],
-                        )
-                        generated_content = response.content[0].text.strip()
-
-                    except Exception as e:
-                        ai_error = self.error_handler.handle_anthropic_error(e, context)
-                        self.error_handler.log_error(ai_error, user_id=user_id)
-                        raise ai_error
-
-            # Enforce character limit (truncate if AI ignored instructions)
-            if len(generated_content) > max_length:
-                logger.warning(
-                    f"{platform} content exceeded {max_length} chars ({len(generated_content)}), truncating"
-                )
-                # Truncate at last complete sentence before limit
-                truncated = generated_content[:max_length]
-                # Try to end at sentence boundary
-                last_period = truncated.rfind(".")
-                last_exclaim = truncated.rfind("!")
-                last_question = truncated.rfind("?")
-                last_sentence = max(last_period, last_exclaim, last_question)
-
-                if last_sentence > max_length * 0.7:  # Only use if we keep at least 70%
-                    generated_content = truncated[: last_sentence + 1]
-                else:
-                    # Just truncate and add ellipsis
-                    generated_content = truncated[: max_length - 3].rstrip() + "..."
-
-                logger.info(f"Truncated {platform} content to {len(generated_content)} chars")
+                },
+            )
 
-            return generated_content
+            return self.finish_platform_post(platform, generated_content)
 
         except AIProviderError:
             # Re-raise our custom exceptions
@@ -401,8 +612,93 @@ Image Prompt:"""
             logger.error(f"Unexpected error in _generate_platform_post: {e}")
             raise
 
-    def _create_platform_prompt(self, platform: str, summary: Dict, config: Dict) -> str:
-        """Create platform-specific prompt"""
+    async def stream_platform_post(
+        self,
+        platform: str,
+        summary: Dict,
+        user_id: Optional[int] = None,
+        post_id: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a post for a specific platform as the model writes it
+
+        Same prompt as generate_posts. Yields text deltas; pass the joined
+        text to finish_platform_post for the final (length-limited) post.
+
+        Args:
+            platform: Platform name (must be in platform_config)
+            summary: Article summary
+            user_id: User ID for context
+            post_id: Post ID for context
+
+        Raises:
+            AIProviderError: If the AI call fails
+        """
+        if not hasattr(self.ai_client, "llm"):
+            return
+
+        prompt = self._create_platform_prompt(platform, summary, self.platform_config[platform])
+        context = {
+            "user_id": user_id,
+            "post_id": post_id,
+            "platform": platform,
+            "operation": "stream_platform_post",
+        }
+
+        try:
+            async for delta in self.ai_client.llm.stream(
+                prompt,
+                model=self.ai_client.model,
+                system=PLATFORM_POST_SYSTEM_PROMPT,
+                max_tokens=500,
+                temperature=0.8,
+                context=context,
+            ):
+                yield delta
+
+        except AIProviderError as e:
+            self.error_handler.log_error(e, user_id=user_id)
+            raise
+
+    def finish_platform_post(self, platform: str, content: str) -> str:
+        """
+        Final form of generated post text: trimmed, within the platform limit
+
+        Args:
+            platform: Platform name
+            content: Generated text
+
+        Returns:
+            Post content
+        """
+        generated_content = content.strip()
+        max_length = self.platform_config.get(platform, {}).get("max_length", 280)
+
+        # Enforce character limit (truncate if AI ignored instructions)
+        if len(generated_content) > max_length:
+            logger.warning(
+                f"{platform} content exceeded {max_length} chars ({len(generated_content)}), truncating"
+            )
+            # Truncate at last complete sentence before limit
+            truncated = generated_content[:max_length]
+            # Try to end at sentence boundary
+            last_period = truncated.rfind(".")
+            last_exclaim = truncated.rfind("!")
+            last_question = truncated.rfind("?")
+            last_sentence = max(last_period, last_exclaim, last_question)
+
+            if last_sentence > max_length * 0.7:  # Only use if we keep at least 70%
+                generated_content = truncated[: last_sentence + 1]
+            else:
+                # Just truncate and add ellipsis
+                generated_content = truncated[: max_length - 3].rstrip() + "..."
+
+            logger.info(f"Truncated {platform} content to {len(generated_content)} chars")
+
+        return generated_content
+
+    def _platform_requirements(self, platform: str, config: Dict) -> Dict:
+        """Validated length target, tone and hashtags of a platform config"""
 
         max_length = config.get("max_length", 280)
         # Validate max_length
@@ -431,6 +727,20 @@ Image Prompt:"""
             logger.warning(f"Invalid hashtags type, using empty list")
             hashtags = []
 
+        return {
+            "max_length": max_length,
+            "target_length": target_length,
+            "tone": tone,
+            "hashtags": hashtags,
+        }
+
+    def _create_platform_prompt(self, platform: str, summary: Dict, config: Dict) -> str:
+        """Create platform-specific prompt"""
+        requirements = self._platform_requirements(platform, config)
+        max_length = requirements["max_length"]
+        target_length = requirements["target_length"]
+        hashtags = requirements["hashtags"]
+
         base_prompt = f"""Create a {platform} post about this AI news summary:
 
 {summary.get('summary', '')}
@@ -439,21 +749,12 @@ Requirements:
 - STRICT character limit: {target_length} characters (absolute maximum: {max_length})
 - Your post MUST be under {target_length} characters
 - Count your characters carefully before responding
-- Tone: {tone}
+- Tone: {requirements["tone"]}
 - Make it engaging and informative
 - {f"Include these hashtags: {' '.join(hashtags)}" if hashtags else "Include relevant hashtags"}
 """
 
-        # Platform-specific instructions
-        platform_instructions = {
-            "twitter": "Keep it punchy and conversational. Target 260 characters to be safe.",
-            "linkedin": "Professional tone. Focus on business implications and insights. Use paragraphs. Target 2900 characters.",
-            "threads": "CRITICAL: Must be under 480 characters. Be concise and punchy. Short paragraphs. This is non-negotiable - count your characters!",
-            "instagram": "Visual-first mindset. Engaging caption that encourages interaction.",
-            "youtube": "Could be used as a community post or video description.",
-        }
-
-        instruction = platform_instructions.get(platform, "")
+        instruction = PLATFORM_INSTRUCTIONS.get(platform, "")
         if instruction:
             base_prompt += f"\n\nPlatform-specific guidance: {instruction}"
 
@@ -465,8 +766,13 @@ Requirements:
 
         return base_prompt
 
-    def _call_ai(
-        self, prompt: str, max_tokens: int = 500, context: Optional[Dict] = None
+    async def _call_ai(
+        self,
+        prompt: str,
+        max_tokens: int = 500,
+        context: Optional[Dict] = None,
+        system: str = "You are an expert social media content creator.",
+        json_output: bool = False,
     ) -> str:
         """
         Call AI client to generate content with comprehensive error handling
@@ -475,57 +781,35 @@ Requirements:
             prompt: Prompt for AI
             max_tokens: Maximum tokens to generate
             context: Additional context for error logging
+            system: System prompt
+            json_output: Use the provider's JSON mode (if it has one)
 
         Returns:
-            str: Generated content
+            str: Generated content ("" without an AI client)
 
         Raises:
             AIProviderError: If AI call fails with user-friendly message
         """
         context = context or {}
 
-        try:
-            if hasattr(self.ai_client, "provider"):
-                if self.ai_client.provider == "openai":
-                    try:
-                        response = self.ai_client.client.chat.completions.create(
-                            model=self.ai_client.model,
-                            messages=[
-                                {
-                                    "role": "system",
-                                    "content": "You are an expert social media content creator.",
-                                },
-                                {"role": "user", "content": prompt},
-                            ],
-                            temperature=0.8,
-                            max_tokens=max_tokens,
-                            timeout=30.0,
-                        )
-                        return response.choices[0].message.content.strip()
-
-                    except Exception as e:
-                        ai_error = self.error_handler.handle_openai_error(e, context)
-                        raise ai_error
-
-                elif self.ai_client.provider == "anthropic":
-                    try:
-                        response = self.ai_client.client.messages.create(
-                            model=self.ai_client.model,
-                            max_tokens=max_tokens,
-                            temperature=0.8,
-                            timeout=30.0,
-                            messages=[{"role": "user", "content": prompt}],
-                        )
-                        return response.content[0].text.strip()
-
-                    except Exception as e:
-                        ai_error = self.error_handler.handle_anthropic_error(e, context)
-                        raise ai_error
-
+        if not hasattr(self.ai_client, "llm"):
             return ""
 
-        except AIProviderError:
-            # Re-raise our custom exceptions
+        try:
+            llm = self.ai_client.llm
+            response = await llm.complete(
+                prompt,
+                model=self.ai_client.model,
+                system=system,
+                max_tokens=max_tokens,
+                temperature=0.8,
+                context=context,
+                **(llm.json_params if json_output else {}),
+            )
+            return response.text
+
+        except AIProviderError as e:
+            self.error_handler.log_error(e, user_id=context.get("user_id"))
             raise
 
         except Exception as e:
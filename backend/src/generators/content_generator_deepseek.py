@@ -26,7 +26,9 @@ class ContentGeneratorWithDeepSeek:
         Initialize content generator
 
         Args:
-            ai_client: AI client (from summarizer - OpenAI, Anthropic, or DeepSeek)
+            ai_client: AI client (from summarizer - OpenAI, Anthropic, or DeepSeek).
+                Requests use its client and credentials; nothing is read from
+                the environment here.
             platform_config: Platform configurations
         """
         self.ai_client = ai_client
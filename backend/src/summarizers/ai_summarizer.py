@@ -1,59 +1,53 @@
-import os
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from loguru import logger
-from src.utils import retry_with_backoff
-from src.utils.ai_exceptions import AIProviderError, RateLimitError
+from src.utils.ai_exceptions import AIProviderError
 from src.utils.ai_error_handler import AIErrorHandler
+from src.utils.llm_batch import get_batch_llm_client
+from src.utils.llm_client import DEFAULT_MODELS, LLMClient, get_llm_client, resolve_api_key
+from utils.token_budget import allocate_token_budget, estimate_tokens, truncate_to_tokens
 
 
 class AISummarizer:
     """Summarizes news articles using AI/LLM APIs"""
 
-    def __init__(self, provider: str = "openai", model: Optional[str] = None):
+    # Token budget for all article contexts in one summary prompt
+    MAX_CONTEXT_TOKENS = 3000
+
+    def __init__(
+        self,
+        provider: str = "openai",
+        model: Optional[str] = None,
+        api_key: Optional[str] = None,
+        batch: bool = False,
+    ):
         """
         Initialize AI summarizer
 
         Args:
-            provider: AI provider (openai, anthropic)
+            provider: AI provider (openai, anthropic, deepseek)
             model: Model name (optional, uses defaults)
+            api_key: Provider API key (optional, defaults to the provider's
+                environment variable)
+            batch: Non-interactive use: batch the LLM calls (slower, cheaper)
         """
         self.provider = provider.lower()
         self.model = model or self._get_default_model()
-        self.client = self._initialize_client()
+        self.api_key = resolve_api_key(self.provider, api_key)
+        self.batch = batch
         self.error_handler = AIErrorHandler()
 
     def _get_default_model(self) -> str:
         """Get default model for provider"""
-        defaults = {"openai": "gpt-4-turbo-preview", "anthropic": "claude-3-5-sonnet-20241022"}
-        return defaults.get(self.provider, "gpt-4-turbo-preview")
-
-    def _initialize_client(self):
-        """Initialize the appropriate AI client"""
-        try:
-            if self.provider == "openai":
-                from openai import OpenAI
-
-                api_key = os.getenv("OPENAI_API_KEY")
-                if not api_key:
-                    raise ValueError("OPENAI_API_KEY environment variable not set")
-                return OpenAI(api_key=api_key)
-
-            elif self.provider == "anthropic":
-                from anthropic import Anthropic
-
-                api_key = os.getenv("ANTHROPIC_API_KEY")
-                if not api_key:
-                    raise ValueError("ANTHROPIC_API_KEY environment variable not set")
-                return Anthropic(api_key=api_key)
-
-            else:
-                raise ValueError(f"Unsupported provider: {self.provider}")
+        return DEFAULT_MODELS.get(self.provider, DEFAULT_MODELS["openai"])
 
-        except Exception as e:
-            logger.error(f"Failed to initialize {self.provider} client: {e}")
-            raise
+    @property
+    def llm(self) -> LLMClient:
+        """Pooled async client for this provider and key (see src/utils/llm_client.py)"""
+        if self.batch:
+            return get_batch_llm_client(self.provider, self.api_key)
+        return get_llm_client(self.provider, self.api_key)
 
-    def summarize_articles(
+    async def summarize_articles(
         self,
         articles: List[Dict],
         max_articles: int = 10,
@@ -76,19 +70,13 @@ class AISummarizer:
         if not articles:
             return {"summary": "", "insights": [], "topics": []}
 
-        # Sort by date and take most recent
-        sorted_articles = sorted(articles, key=lambda x: x.get("published", ""), reverse=True)[
-            :max_articles
-        ]
-
-        # Create context from articles
-        context = self._build_context(sorted_articles)
+        sorted_articles, context = self.prepare_context(articles, max_articles)
 
         # Generate summary with error handling
         prompt = self._create_summary_prompt(context)
 
         try:
-            summary = self._call_llm(
+            summary = await self._call_llm(
                 prompt,
                 context={
                     "user_id": user_id,
@@ -113,15 +101,49 @@ class AISummarizer:
             logger.error(f"Unexpected error in summarize_articles: {e}")
             raise
 
+    def prepare_context(self, articles: List[Dict], max_articles: int = 10) -> Tuple[List[Dict], str]:
+        """
+        Select the most recent articles and build their prompt context
+
+        Returns:
+            (selected articles, context string)
+        """
+        # Sort by date and take most recent
+        sorted_articles = sorted(articles, key=lambda x: x.get("published", ""), reverse=True)[
+            :max_articles
+        ]
+
+        # Create context from articles
+        return sorted_articles, self._build_context(sorted_articles)
+
     def _build_context(self, articles: List[Dict]) -> str:
-        """Build context string from articles"""
+        """
+        Build context string from articles
+
+        Uses the precomputed `ai_context` when available, within
+        MAX_CONTEXT_TOKENS counted with this model's tokenizer (articles
+        shorter than an equal share leave the rest to longer ones); otherwise
+        falls back to the first 200 chars of the summary.
+        """
         context_parts = []
+        token_counts = [
+            estimate_tokens(article.get("ai_context"), self.model) for article in articles
+        ]
+        token_budgets = allocate_token_budget(token_counts, self.MAX_CONTEXT_TOKENS)
 
         for i, article in enumerate(articles, 1):
+            ai_context = article.get("ai_context")
+
+            if ai_context:
+                ai_context = truncate_to_tokens(ai_context, token_budgets[i - 1], self.model)
+                body = "   " + ai_context.replace("\n", "\n   ")
+            else:
+                body = f"   Summary: {(article.get('summary') or 'N/A')[:200]}"
+
             context_parts.append(
                 f"{i}. {article['title']}\n"
                 f"   Source: {article['source']}\n"
-                f"   Summary: {article.get('summary', 'N/A')[:200]}\n"
+                f"{body}\n"
                 f"   Link: {article['link']}\n"
             )
 
@@ -141,14 +163,14 @@ Please provide:
 
 Keep the tone informative yet engaging, suitable for social media."""
 
-    def _call_llm(self, prompt: str, context: Optional[Dict] = None, max_retries: int = 3) -> str:
+    async def _call_llm(self, prompt: str, context: Optional[Dict] = None, max_retries: int = 3) -> str:
         """
         Call the LLM API with retry logic and comprehensive error handling
 
         Args:
             prompt: The prompt to send
             context: Additional context for error logging
-            max_retries: Maximum number of retry attempts
+            max_retries: Maximum number of attempts
 
         Returns:
             Generated text from the LLM
@@ -156,100 +178,18 @@ Keep the tone informative yet engaging, suitable for social media."""
         Raises:
             AIProviderError: Structured error with user-friendly message
         """
-        context = context or {}
-
-        for attempt in range(max_retries):
-            try:
-                if self.provider == "openai":
-                    return self._call_openai(prompt)
-                elif self.provider == "anthropic":
-                    return self._call_anthropic(prompt)
-
-            except Exception as e:
-                # Map to our custom exception
-                if self.provider == "openai":
-                    ai_error = self.error_handler.handle_openai_error(e, context)
-                elif self.provider == "anthropic":
-                    ai_error = self.error_handler.handle_anthropic_error(e, context)
-                else:
-                    ai_error = self.error_handler.handle_generic_error(e, self.provider, context)
-
-                # Determine if we should retry
-                should_retry = self.error_handler.should_retry(ai_error, attempt, max_retries)
-
-                if should_retry and attempt < max_retries - 1:
-                    # Calculate retry delay
-                    delay = self.error_handler.get_retry_delay(attempt)
-
-                    logger.warning(
-                        f"Retrying {self.provider} call (attempt {attempt + 1}/{max_retries}) "
-                        f"after {delay:.1f}s due to: {ai_error.error_type.value}"
-                    )
-
-                    import time
-
-                    time.sleep(delay)
-                    continue
-                else:
-                    # No more retries or non-retryable error
-                    raise ai_error
-
-        # Should not reach here, but just in case
-        raise AIProviderError(
-            provider=self.provider,
-            error_type="unknown_error",
-            message=f"Failed to call {self.provider} after {max_retries} attempts",
-            context=context,
-        )
-
-    def _call_openai(self, prompt: str) -> str:
-        """
-        Call OpenAI API
-
-        Args:
-            prompt: The prompt to send
-
-        Returns:
-            Generated text
-
-        Raises:
-            OpenAI exceptions (will be caught and mapped by _call_llm)
-        """
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are an expert AI news analyst."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.7,
-            max_tokens=1000,
-            timeout=30.0,
-        )
-        return response.choices[0].message.content
-
-    def _call_anthropic(self, prompt: str) -> str:
-        """
-        Call Anthropic API
-
-        Args:
-            prompt: The prompt to send
-
-        Returns:
-            Generated text
-
-        Raises:
-            Anthropic exceptions (will be caught and mapped by _call_llm)
-        """
-        response = self.client.messages.create(
+        response = await self.llm.complete(
+            prompt,
             model=self.model,
+            system="You are an expert AI news analyst.",
             max_tokens=1000,
             temperature=0.7,
-            messages=[{"role": "user", "content": prompt}],
-            timeout=30.0,
+            max_retries=max_retries,
+            context=context,
         )
-        return response.content[0].text
+        return response.text
 
-    def generate_headline(self, summary: str, user_id: Optional[int] = None) -> str:
+    async def generate_headline(self, summary: str, user_id: Optional[int] = None) -> str:
         """
         Generate an attention-grabbing headline
 
@@ -270,13 +210,14 @@ Keep the tone informative yet engaging, suitable for social media."""
 Headline:"""
 
         try:
-            return self._call_llm(
+            headline = await self._call_llm(
                 prompt,
                 context={
                     "user_id": user_id,
                     "operation": "generate_headline",
                 },
-            ).strip()
+            )
+            return headline.strip()
 
         except AIProviderError as e:
             self.error_handler.log_error(e, user_id=user_id)
@@ -26,17 +26,23 @@ class AISummarizerWithDeepSeek:
     Supports: OpenAI, Anthropic, DeepSeek
     """
 
-    def __init__(self, provider: str = "openai", model: Optional[str] = None):
+    def __init__(
+        self,
+        provider: str = "openai",
+        model: Optional[str] = None,
+        api_key: Optional[str] = None
+    ):
         """
         Initialize AI summarizer
 
         Args:
             provider: AI provider (openai, anthropic, deepseek)
             model: Model name (optional, uses defaults)
+            api_key: API key for this summarizer (default: provider environment variable)
         """
         self.provider = provider.lower()
         self.model = model or self._get_default_model()
-        self.client = self._initialize_client()
+        self.client = self._initialize_client(api_key)
         self.error_handler = AIErrorHandler()
 
     def _get_default_model(self) -> str:
@@ -48,13 +54,13 @@ class AISummarizerWithDeepSeek:
         }
         return defaults.get(self.provider, "gpt-4-turbo-preview")
 
-    def _initialize_client(self):
+    def _initialize_client(self, api_key: Optional[str] = None):
         """Initialize the appropriate AI client"""
         try:
             if self.provider == "openai":
                 from openai import OpenAI
 
-                api_key = os.getenv("OPENAI_API_KEY")
+                api_key = api_key or os.getenv("OPENAI_API_KEY")
                 if not api_key:
                     raise ValueError("OPENAI_API_KEY environment variable not set")
                 return OpenAI(api_key=api_key)
@@ -62,13 +68,13 @@ class AISummarizerWithDeepSeek:
             elif self.provider == "anthropic":
                 from anthropic import Anthropic
 
-                api_key = os.getenv("ANTHROPIC_API_KEY")
+                api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
                 if not api_key:
                     raise ValueError("ANTHROPIC_API_KEY environment variable not set")
                 return Anthropic(api_key=api_key)
 
             elif self.provider == "deepseek":
-                api_key = os.getenv("DEEPSEEK_API_KEY")
+                api_key = api_key or os.getenv("DEEPSEEK_API_KEY")
                 if not api_key:
                     raise ValueError("DEEPSEEK_API_KEY environment variable not set")
                 return DeepSeekClient(api_key=api_key)
@@ -12,6 +12,7 @@ from .ai_exceptions import (
     ErrorType,
 )
 from .ai_error_handler import AIErrorHandler
+from .llm_client import LLMClient, LLMResponse, LLMStream, get_llm_client, close_llm_clients
 
 __all__ = [
     "ConfigLoader",
@@ -27,4 +28,9 @@ __all__ = [
     "NetworkError",
     "ErrorType",
     "AIErrorHandler",
+    "LLMClient",
+    "LLMResponse",
+    "LLMStream",
+    "get_llm_client",
+    "close_llm_clients",
 ]
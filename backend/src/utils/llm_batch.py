@@ -0,0 +1,483 @@
+"""
+Batched LLM calls for non-interactive generation
+
+Jobs nobody is watching (scheduled digests, backfills: generation jobs
+queued with batch=True) don't need their answers within seconds. Their calls
+are collected and submitted together through the provider's batch API,
+which costs less and has its own, higher rate limits:
+
+    llm = get_batch_llm_client("openai", api_key)
+    response = await llm.complete(prompt, system="...", max_tokens=500)
+
+The interface is the same as LLMClient's (src/utils/llm_client.py).
+`complete` returns when the batch containing the call has finished.
+
+- Calls for the same provider and key are collected for LLM_BATCH_WINDOW
+  seconds, or until there are LLM_BATCH_MAX_REQUESTS, and then submitted as
+  one batch:
+    openai     Batch API (JSONL input file, /v1/chat/completions)
+    anthropic  Message Batches API
+    local      stand-in provider that answers without network access, for
+               tests and development (LLM_BATCH_BACKEND=local uses it for
+               every provider)
+  Providers without a batch API (DeepSeek) use the regular client. Their
+  calls still wait in the rate limiter's fair-share queue.
+- Batches are polled every LLM_BATCH_POLL_INTERVAL seconds. Calls that a
+  batch failed, or did not finish within LLM_BATCH_TIMEOUT, are sent
+  individually through the regular client, with its retries.
+- Usage is recorded like any other call (utils/llm_usage.py), at the
+  batch price (BATCH_COST_FACTOR).
+- Streaming is not batched: `stream` uses the regular client.
+"""
+import asyncio
+import json
+import os
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from loguru import logger
+
+from src.utils.llm_client import (
+    DEFAULT_MODELS,
+    LLMClient,
+    LLMResponse,
+    LLMStream,
+    LLM_CLIENT_POOL_SIZE,
+    get_llm_client,
+)
+from utils.token_budget import estimate_tokens
+
+
+# Configuration (environment)
+LLM_BATCH_BACKEND = os.getenv("LLM_BATCH_BACKEND", "").lower()  # "" = the provider's own
+LLM_BATCH_WINDOW = float(os.getenv("LLM_BATCH_WINDOW", 10))
+LLM_BATCH_MAX_REQUESTS = int(os.getenv("LLM_BATCH_MAX_REQUESTS", 1000))
+LLM_BATCH_POLL_INTERVAL = float(os.getenv("LLM_BATCH_POLL_INTERVAL", 30))
+LLM_BATCH_TIMEOUT = float(os.getenv("LLM_BATCH_TIMEOUT", 3600))
+
+# Price of a batched call relative to the regular API
+BATCH_COST_FACTOR = {
+    "openai": 0.5,
+    "anthropic": 0.5,
+    "local": 0.0,
+}
+
+
+@dataclass
+class BatchRequest:
+    """One collected call, resolved through `future`"""
+    custom_id: str
+    prompt: str
+    model: str
+    system: Optional[str]
+    max_tokens: int
+    temperature: float
+    params: Dict[str, Any]
+    context: Dict[str, Any]
+    future: asyncio.Future = field(repr=False)
+    timeout: Optional[float] = None  # If sent individually
+    max_retries: Optional[int] = None
+
+    def messages(self) -> List[Dict[str, str]]:
+        """Chat messages, system prompt first (OpenAI format)"""
+        messages: List[Dict[str, str]] = []
+        if self.system:
+            messages.append({"role": "system", "content": self.system})
+        messages.append({"role": "user", "content": self.prompt})
+        return messages
+
+
+async def _poll(retrieve: Callable[[], Awaitable[Any]], finished: Callable[[Any], bool]) -> Optional[Any]:
+    """Retrieve a batch until it is finished (None if LLM_BATCH_TIMEOUT passes first)"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + LLM_BATCH_TIMEOUT
+
+    while True:
+        batch = await retrieve()
+        if finished(batch):
+            return batch
+        if loop.time() + LLM_BATCH_POLL_INTERVAL > deadline:
+            return None
+        await asyncio.sleep(LLM_BATCH_POLL_INTERVAL)
+
+
+# ============================================================================
+# BATCH BACKENDS
+# ============================================================================
+
+class BatchBackend:
+    """Submits a list of calls as one batch"""
+
+    name = "unknown"
+
+    async def run(self, llm: LLMClient, requests: List[BatchRequest]) -> Dict[str, LLMResponse]:
+        """
+        Run a batch
+
+        Args:
+            llm: Regular client of the provider and key (SDK client to use)
+            requests: Calls in the batch
+
+        Returns:
+            Responses by custom_id (calls missing from it are sent individually)
+        """
+        raise NotImplementedError
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """OpenAI Batch API: JSONL input file, polled until the batch ends"""
+
+    name = "openai"
+
+    async def run(self, llm, requests):
+        client = llm.client
+        lines = [
+            json.dumps({
+                "custom_id": request.custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": request.model,
+                    "messages": request.messages(),
+                    "max_tokens": request.max_tokens,
+                    "temperature": request.temperature,
+                    **request.params,
+                },
+            })
+            for request in requests
+        ]
+
+        input_file = await client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode(), "application/jsonl"),
+            purpose="batch",
+        )
+        batch = await client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        batch_id = batch.id
+
+        batch = await _poll(
+            lambda: client.batches.retrieve(batch_id),
+            lambda batch: batch.status in ("completed", "failed", "expired", "cancelled"),
+        )
+        if batch is None:
+            try:
+                await client.batches.cancel(batch_id)
+            except Exception as e:
+                logger.warning(f"Failed to cancel OpenAI batch {batch_id}: {e}")
+            return {}
+
+        if not batch.output_file_id:
+            logger.warning(f"OpenAI batch {batch_id} ended {batch.status} without results")
+            return {}
+
+        models = {request.custom_id: request.model for request in requests}
+        output = await client.files.content(batch.output_file_id)
+
+        responses = {}
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            response = item.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+
+            body = response["body"]
+            choice = body["choices"][0]
+            usage = body.get("usage") or {}
+            responses[item["custom_id"]] = LLMResponse(
+                text=(choice["message"].get("content") or "").strip(),
+                provider=llm.provider,
+                model=models.get(item["custom_id"], body.get("model")),
+                prompt_tokens=usage.get("prompt_tokens", 0) or 0,
+                completion_tokens=usage.get("completion_tokens", 0) or 0,
+                finish_reason=choice.get("finish_reason"),
+            )
+
+        return responses
+
+
+class AnthropicBatchBackend(BatchBackend):
+    """Anthropic Message Batches API, polled until processing ends"""
+
+    name = "anthropic"
+
+    async def run(self, llm, requests):
+        batches = llm.client.messages.batches
+
+        batch_requests = []
+        for request in requests:
+            params = {
+                "model": request.model,
+                "max_tokens": request.max_tokens,
+                "messages": [{"role": "user", "content": request.prompt}],
+                "temperature": request.temperature,
+                **request.params,
+            }
+            if request.system:
+                params["system"] = request.system
+            batch_requests.append({"custom_id": request.custom_id, "params": params})
+
+        batch = await batches.create(requests=batch_requests)
+        batch_id = batch.id
+
+        batch = await _poll(
+            lambda: batches.retrieve(batch_id),
+            lambda batch: batch.processing_status == "ended",
+        )
+        if batch is None:
+            try:
+                await batches.cancel(batch_id)
+            except Exception as e:
+                logger.warning(f"Failed to cancel Anthropic batch {batch_id}: {e}")
+            return {}
+
+        models = {request.custom_id: request.model for request in requests}
+
+        responses = {}
+        async for entry in await batches.results(batch_id):
+            if entry.result.type != "succeeded":
+                continue
+            message = entry.result.message
+            responses[entry.custom_id] = LLMResponse(
+                text=message.content[0].text.strip(),
+                provider=llm.provider,
+                model=models.get(entry.custom_id, message.model),
+                prompt_tokens=message.usage.input_tokens,
+                completion_tokens=message.usage.output_tokens,
+                finish_reason=message.stop_reason,
+            )
+
+        return responses
+
+
+class LocalBatchBackend(BatchBackend):
+    """
+    Stand-in provider: answers every call immediately, without network access
+
+    `responder(request) -> str` produces the answers (tests set their own);
+    by default the reply echoes the start of the prompt.
+    """
+
+    name = "local"
+
+    def __init__(self, responder: Optional[Callable[[BatchRequest], str]] = None):
+        self.responder = responder or self.echo
+        self.batches: List[int] = []  # Size of every batch run (for tests)
+
+    @staticmethod
+    def echo(request: BatchRequest) -> str:
+        return f"[local] {request.prompt[:200]}"
+
+    async def run(self, llm, requests):
+        self.batches.append(len(requests))
+
+        responses = {}
+        for request in requests:
+            text = self.responder(request)
+            responses[request.custom_id] = LLMResponse(
+                text=text,
+                provider=llm.provider,
+                model=request.model,
+                prompt_tokens=estimate_tokens(f"{request.system or ''}\n{request.prompt}", request.model),
+                completion_tokens=estimate_tokens(text, request.model),
+                finish_reason="stop",
+            )
+        return responses
+
+
+BATCH_BACKENDS: Dict[str, BatchBackend] = {
+    "openai": OpenAIBatchBackend(),
+    "anthropic": AnthropicBatchBackend(),
+    "local": LocalBatchBackend(),
+}
+
+
+# ============================================================================
+# CLIENT
+# ============================================================================
+
+class BatchLLMClient:
+    """LLMClient interface whose calls are collected into batches"""
+
+    def __init__(self, llm: LLMClient, backend: BatchBackend):
+        self.llm = llm
+        self.backend = backend
+        self.provider = llm.provider
+        self.json_params = llm.json_params
+        self.cost_factor = BATCH_COST_FACTOR.get(backend.name, 1.0)
+
+        self._pending: List[BatchRequest] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: set = set()  # Submitted batches
+
+    @property
+    def idle(self) -> bool:
+        return not self._pending and not self._running
+
+    async def complete(
+        self,
+        prompt: str,
+        *,
+        model: Optional[str] = None,
+        system: Optional[str] = None,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        context: Optional[Dict[str, Any]] = None,
+        **params
+    ) -> LLMResponse:
+        """
+        Generate a completion in the next batch (same arguments as LLMClient.complete;
+        timeout and max_retries apply if the call is sent individually)
+
+        Raises:
+            AIProviderError: The call failed when sent individually
+        """
+        loop = asyncio.get_running_loop()
+        request = BatchRequest(
+            custom_id=f"req-{uuid.uuid4().hex}",
+            prompt=prompt,
+            model=model or DEFAULT_MODELS[self.provider],
+            system=system,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            params=params,
+            context=context or {},
+            future=loop.create_future(),
+            timeout=timeout,
+            max_retries=max_retries,
+        )
+
+        # The batch runs on the regular client: keep it open until answered
+        with self.llm.lease():
+            self._pending.append(request)
+            if len(self._pending) >= LLM_BATCH_MAX_REQUESTS:
+                self._submit()
+            elif self._timer is None:
+                self._timer = loop.call_later(LLM_BATCH_WINDOW, self._submit)
+
+            return await request.future
+
+    def stream(self, prompt: str, **options) -> LLMStream:
+        """Streams are interactive: not batched (see LLMClient.stream)"""
+        return self.llm.stream(prompt, **options)
+
+    def _submit(self):
+        """Submit the collected calls as one batch"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        requests = [request for request in self._pending if not request.future.done()]
+        self._pending = []
+        if not requests:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._run(requests))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, requests: List[BatchRequest]):
+        logger.info(f"Submitting {len(requests)} {self.provider} calls in one batch ({self.backend.name})")
+
+        try:
+            responses = await self.backend.run(self.llm, requests)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"{self.backend.name} batch of {len(requests)} calls failed: {e}")
+            responses = {}
+
+        individually = []
+        for request in requests:
+            response = responses.get(request.custom_id)
+            if response is None:
+                individually.append(request)
+                continue
+
+            await self.llm._record_usage(
+                response, request.prompt, request.system, request.context, cost_factor=self.cost_factor
+            )
+            if not request.future.done():
+                request.future.set_result(response)
+
+        if individually:
+            logger.warning(
+                f"{len(individually)} of {len(requests)} batched {self.provider} calls "
+                f"got no result, sending them individually"
+            )
+            await asyncio.gather(*[self._complete_individually(request) for request in individually])
+
+    async def _complete_individually(self, request: BatchRequest):
+        if request.future.done():  # Caller gave up
+            return
+
+        try:
+            response = await self.llm.complete(
+                request.prompt,
+                model=request.model,
+                system=request.system,
+                max_tokens=request.max_tokens,
+                temperature=request.temperature,
+                timeout=request.timeout,
+                max_retries=request.max_retries,
+                context=request.context,
+                **request.params
+            )
+        except Exception as e:
+            if not request.future.done():
+                request.future.set_exception(e)
+        else:
+            if not request.future.done():
+                request.future.set_result(response)
+
+
+# ============================================================================
+# POOL
+# ============================================================================
+
+# Pooled regular client -> its batch client, least recently used first
+_batch_clients: "OrderedDict[int, BatchLLMClient]" = OrderedDict()
+
+
+def get_batch_llm_client(provider: str, api_key: Optional[str] = None) -> Union[BatchLLMClient, LLMClient]:
+    """
+    Client for non-interactive calls: batched where the provider has a batch API
+
+    Call from the event loop the client will be used on.
+
+    Args:
+        provider: "openai", "anthropic" or "deepseek"
+        api_key: API key (default: provider environment variable)
+
+    Returns:
+        BatchLLMClient, or the regular LLMClient for providers without a batch API
+
+    Raises:
+        ValueError: Unsupported provider or no key available
+    """
+    llm = get_llm_client(provider, api_key)
+
+    backend = BATCH_BACKENDS.get(LLM_BATCH_BACKEND or llm.provider)
+    if backend is None:
+        return llm
+
+    batch = _batch_clients.get(id(llm))
+    if batch is None or batch.llm is not llm:
+        batch = BatchLLMClient(llm, backend)
+        _batch_clients[id(llm)] = batch
+    _batch_clients.move_to_end(id(llm))
+
+    # Forget idle batch clients beyond the size of the regular pool
+    for key in list(_batch_clients)[:-LLM_CLIENT_POOL_SIZE]:
+        if _batch_clients[key].idle:
+            del _batch_clients[key]
+
+    return batch
@@ -0,0 +1,678 @@
+"""
+Async LLM clients for OpenAI, Anthropic and DeepSeek
+
+One async interface over the providers, so generation awaits network I/O on
+the event loop instead of holding an executor thread per call:
+
+    llm = get_llm_client("openai", api_key)
+    response = await llm.complete(prompt, system="...", max_tokens=500)
+    response.text, response.prompt_tokens, response.completion_tokens
+
+Clients are pooled per (provider, API key, event loop). Each one owns the
+SDK's keep-alive connection pool, so connections (and TLS sessions) are
+reused across requests and generation jobs instead of being re-established
+for every job. The pool is bounded (LLM_CLIENT_POOL_SIZE, least recently
+used clients are evicted) and closed on shutdown (close_llm_clients). Calls
+hold a lease on their client, so an evicted client is only closed once its
+last call has finished.
+
+Every completed call's token usage and estimated cost are recorded per user
+(the context's `user_id`) by utils/llm_usage.py.
+
+Calls are rate limited per API key (requests and tokens per minute, shared
+across workers) by utils/llm_rate_limiter.py: a call waits its turn in a
+fair-share queue, and fails with RateLimitError only if the wait would exceed
+LLM_RATE_LIMIT_MAX_WAIT.
+
+Retries happen here, asynchronously (asyncio.sleep, exponential backoff), for
+retryable errors only; the SDKs' own retries are disabled. Every request has
+a timeout. Errors are mapped to AIProviderError by AIErrorHandler.
+
+Streaming has the same interface for every provider:
+
+    stream = llm.stream(prompt, system="...", max_tokens=500)
+    async for delta in stream:
+        ...
+    stream.response  # LLMResponse with the full text and token usage
+
+Structured output: `await llm.complete(prompt, **llm.json_params)` asks for
+a JSON object where the provider supports it (OpenAI, DeepSeek).
+
+Non-interactive calls can be batched instead (src/utils/llm_batch.py).
+
+DeepSeek uses its OpenAI-compatible API through the OpenAI SDK.
+"""
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from src.utils.ai_error_handler import AIErrorHandler
+from src.utils.ai_exceptions import AIProviderError, ErrorType, RateLimitError, get_error_info
+from utils.llm_rate_limiter import llm_rate_limiter, RateLimitWaitExceeded, Reservation
+from utils.llm_usage import record_llm_usage
+from utils.token_budget import estimate_tokens
+
+
+# Configuration (environment)
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", 30))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 3))
+LLM_CLIENT_POOL_SIZE = int(os.getenv("LLM_CLIENT_POOL_SIZE", 64))
+DEEPSEEK_BASE_URL = os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com/v1")
+
+DEFAULT_MODELS = {
+    "openai": "gpt-4-turbo-preview",
+    "anthropic": "claude-3-5-sonnet-20241022",
+    "deepseek": "deepseek-chat",
+}
+
+API_KEY_ENV_VARS = {
+    "openai": "OPENAI_API_KEY",
+    "anthropic": "ANTHROPIC_API_KEY",
+    "deepseek": "DEEPSEEK_API_KEY",
+}
+
+
+@dataclass
+class LLMResponse:
+    """Result of one completion"""
+    text: str
+    provider: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    finish_reason: Optional[str] = None
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+# ============================================================================
+# CLIENTS
+# ============================================================================
+
+class LLMClient:
+    """Async completion client for one provider and API key"""
+
+    provider = "unknown"
+
+    # Extra `complete` parameters that make the model return one JSON object
+    # (empty: the provider has no JSON mode, the prompt has to ask for it)
+    json_params: Dict[str, Any] = {}
+
+    def __init__(self, api_key: str):
+        self.client = None  # Async SDK client, set by subclasses
+        self.error_handler = AIErrorHandler()
+        self.key_id = hashlib.sha256(api_key.encode()).hexdigest()[:16]  # Rate limit bucket
+        self._leases = 0  # Calls in flight
+        self._retired_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._retired = False  # Evicted from the pool: close after the last lease
+
+    @contextmanager
+    def lease(self):
+        """Hold the client for one call (an evicted client is closed after its last lease)"""
+        self._leases += 1
+        try:
+            yield self
+        finally:
+            self._leases -= 1
+            if self._retired and self._leases == 0:
+                _close_later(self._retired_loop, self)
+
+    def retire(self, loop: Optional[asyncio.AbstractEventLoop]):
+        """Evicted from the pool: close now if idle, else when the last call finishes"""
+        self._retired = True
+        self._retired_loop = loop
+        if self._leases == 0:
+            _close_later(loop, self)
+
+    async def _create(
+        self,
+        prompt: str,
+        model: str,
+        system: Optional[str],
+        max_tokens: int,
+        temperature: float,
+        timeout: float,
+        **params
+    ) -> LLMResponse:
+        raise NotImplementedError
+
+    def _stream(
+        self,
+        prompt: str,
+        model: str,
+        system: Optional[str],
+        max_tokens: int,
+        temperature: float,
+        timeout: float,
+        usage: Dict[str, Any],
+        **params
+    ) -> AsyncIterator[str]:
+        """Yield text deltas; fill `usage` (prompt_tokens, completion_tokens, finish_reason)"""
+        raise NotImplementedError
+
+    def _map_error(self, error: Exception, context: Dict[str, Any]) -> AIProviderError:
+        return self.error_handler.handle_generic_error(error, self.provider, context)
+
+    async def _acquire(
+        self,
+        prompt: str,
+        model: str,
+        system: Optional[str],
+        max_tokens: int,
+        context: Dict[str, Any]
+    ) -> Optional[Reservation]:
+        """Wait for rate limit capacity for one attempt (prompt + max_tokens)"""
+        tokens = estimate_tokens(f"{system or ''}\n{prompt}", model) + max_tokens
+        try:
+            return await llm_rate_limiter.acquire(
+                self.provider, self.key_id, tokens, user_id=context.get("user_id")
+            )
+        except RateLimitWaitExceeded as e:
+            error_info = get_error_info(self.provider, ErrorType.RATE_LIMIT_EXCEEDED)
+            raise RateLimitError(
+                provider=self.provider,
+                error_type=ErrorType.RATE_LIMIT_EXCEEDED,
+                message=error_info["message"],
+                original_error=e,
+                code=429,
+                action=error_info["action"],
+                help_url=error_info["help_url"],
+                context=context,
+            )
+
+    async def _throttle_on(self, ai_error: AIProviderError) -> bool:
+        """Make every worker back off if the provider rate limited the key anyway"""
+        if not isinstance(ai_error, RateLimitError):
+            return False
+        await llm_rate_limiter.throttle(self.provider, self.key_id)
+        return True
+
+    async def _record_usage(
+        self,
+        response: LLMResponse,
+        prompt: str,
+        system: Optional[str],
+        context: Dict[str, Any],
+        cost_factor: float = 1.0
+    ):
+        """Record a completed call's usage (counted locally if the provider reported none)"""
+        if not response.prompt_tokens:
+            response.prompt_tokens = estimate_tokens(f"{system or ''}\n{prompt}", response.model)
+        if not response.completion_tokens:
+            response.completion_tokens = estimate_tokens(response.text, response.model)
+
+        await record_llm_usage(
+            self.provider,
+            response.model,
+            response.prompt_tokens,
+            response.completion_tokens,
+            user_id=context.get("user_id"),
+            operation=context.get("operation"),
+            cost_factor=cost_factor,
+        )
+
+    async def complete(
+        self,
+        prompt: str,
+        *,
+        model: Optional[str] = None,
+        system: Optional[str] = None,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        context: Optional[Dict[str, Any]] = None,
+        **params
+    ) -> LLMResponse:
+        """
+        Generate a completion, retrying retryable errors with backoff
+
+        Args:
+            prompt: User message
+            model: Model name (default: provider default)
+            system: Optional system prompt
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            timeout: Per-attempt timeout in seconds (default LLM_REQUEST_TIMEOUT)
+            max_retries: Attempts in total (default LLM_MAX_RETRIES)
+            context: Context for error logging and usage metrics
+                (user_id, post_id, operation)
+            **params: Extra provider parameters (e.g. top_p)
+
+        Returns:
+            LLMResponse
+
+        Raises:
+            AIProviderError: Structured error with user-friendly message
+        """
+        context = context or {}
+        model = model or DEFAULT_MODELS[self.provider]
+        timeout = timeout or LLM_REQUEST_TIMEOUT
+        max_retries = max(1, max_retries or LLM_MAX_RETRIES)
+
+        with self.lease():
+            for attempt in range(max_retries):
+                # Outside the try: a rate limit wait that ran out is not retried
+                reservation = await self._acquire(prompt, model, system, max_tokens, context)
+                used_tokens = 0
+
+                try:
+                    response = await self._create(
+                        prompt, model, system, max_tokens, temperature, timeout, **params
+                    )
+                    await self._record_usage(response, prompt, system, context)
+                    used_tokens = response.total_tokens
+                    return response
+
+                except asyncio.CancelledError:
+                    raise
+
+                except Exception as e:
+                    ai_error = e if isinstance(e, AIProviderError) else self._map_error(e, context)
+                    if await self._throttle_on(ai_error):
+                        reservation = None  # Buckets emptied, nothing to give back
+
+                    if attempt < max_retries - 1 and self.error_handler.should_retry(
+                        ai_error, attempt, max_retries
+                    ):
+                        delay = self.error_handler.get_retry_delay(attempt)
+                        logger.warning(
+                            f"Retrying {self.provider} call (attempt {attempt + 1}/{max_retries}) "
+                            f"after {delay:.1f}s due to: {ai_error.error_type.value}"
+                        )
+                        await asyncio.sleep(delay)
+                        continue
+
+                    raise ai_error
+
+                finally:
+                    await llm_rate_limiter.settle(reservation, used_tokens)
+
+            # Should not reach here, but just in case
+            raise AIProviderError(
+                provider=self.provider,
+                error_type="unknown_error",
+                message=f"Failed to call {self.provider} after {max_retries} attempts",
+                context=context,
+            )
+
+    def stream(
+        self,
+        prompt: str,
+        *,
+        model: Optional[str] = None,
+        system: Optional[str] = None,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        context: Optional[Dict[str, Any]] = None,
+        **params
+    ) -> "LLMStream":
+        """
+        Stream a completion as text deltas (same arguments as complete)
+
+        Retryable errors are retried until the first delta arrives; after
+        that an error is raised to the caller, since text was already
+        delivered.
+
+        Returns:
+            LLMStream: async iterator of text deltas; `response` is set once
+            it is exhausted
+
+        Raises:
+            AIProviderError: While iterating, with user-friendly message
+        """
+        return LLMStream(
+            self,
+            prompt,
+            model=model or DEFAULT_MODELS[self.provider],
+            system=system,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            timeout=timeout or LLM_REQUEST_TIMEOUT,
+            max_retries=max(1, max_retries or LLM_MAX_RETRIES),
+            context=context or {},
+            params=params,
+        )
+
+    async def aclose(self):
+        await self.client.close()
+
+
+class LLMStream:
+    """Text deltas of one streamed completion; `response` holds the totals when done"""
+
+    def __init__(self, llm: LLMClient, prompt: str, **options):
+        self.llm = llm
+        self.prompt = prompt
+        self.options = options
+        self.response: Optional[LLMResponse] = None
+
+    def __aiter__(self) -> AsyncIterator[str]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[str]:
+        llm = self.llm
+        options = self.options
+        context = options["context"]
+        max_retries = options["max_retries"]
+
+        with llm.lease():
+            for attempt in range(max_retries):
+                usage: Dict[str, Any] = {}
+                parts: List[str] = []
+                reservation = await llm._acquire(
+                    self.prompt, options["model"], options["system"], options["max_tokens"], context
+                )
+                used_tokens = 0
+
+                try:
+                    async for delta in llm._stream(
+                        self.prompt,
+                        options["model"],
+                        options["system"],
+                        options["max_tokens"],
+                        options["temperature"],
+                        options["timeout"],
+                        usage,
+                        **options["params"]
+                    ):
+                        if delta:
+                            parts.append(delta)
+                            yield delta
+
+                    self.response = LLMResponse(
+                        text="".join(parts).strip(),
+                        provider=llm.provider,
+                        model=options["model"],
+                        prompt_tokens=usage.get("prompt_tokens", 0) or 0,
+                        completion_tokens=usage.get("completion_tokens", 0) or 0,
+                        finish_reason=usage.get("finish_reason"),
+                    )
+                    await llm._record_usage(self.response, self.prompt, options["system"], context)
+                    used_tokens = self.response.total_tokens
+                    return
+
+                except asyncio.CancelledError:
+                    raise
+
+                except Exception as e:
+                    ai_error = e if isinstance(e, AIProviderError) else llm._map_error(e, context)
+                    if await llm._throttle_on(ai_error):
+                        reservation = None  # Buckets emptied, nothing to give back
+
+                    if not parts and attempt < max_retries - 1 and llm.error_handler.should_retry(
+                        ai_error, attempt, max_retries
+                    ):
+                        delay = llm.error_handler.get_retry_delay(attempt)
+                        logger.warning(
+                            f"Retrying {llm.provider} stream (attempt {attempt + 1}/{max_retries}) "
+                            f"after {delay:.1f}s due to: {ai_error.error_type.value}"
+                        )
+                        await asyncio.sleep(delay)
+                        continue
+
+                    raise ai_error
+
+                finally:
+                    await llm_rate_limiter.settle(reservation, used_tokens)
+
+class OpenAIClient(LLMClient):
+    """OpenAI chat completions"""
+
+    provider = "openai"
+    base_url: Optional[str] = None
+    json_params = {"response_format": {"type": "json_object"}}
+
+    def __init__(self, api_key: str):
+        super().__init__(api_key)
+        from openai import AsyncOpenAI
+
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=self.base_url,
+            timeout=LLM_REQUEST_TIMEOUT,
+            max_retries=0,
+        )
+
+    async def _create(self, prompt, model, system, max_tokens, temperature, timeout, **params):
+        messages: List[Dict[str, str]] = []
+        if system:
+            messages.append({"role": "system", "content": system})
+        messages.append({"role": "user", "content": prompt})
+
+        response = await self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            timeout=timeout,
+            **params
+        )
+
+        usage = response.usage
+        return LLMResponse(
+            text=(response.choices[0].message.content or "").strip(),
+            provider=self.provider,
+            model=model,
+            prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+            finish_reason=response.choices[0].finish_reason,
+        )
+
+    async def _stream(self, prompt, model, system, max_tokens, temperature, timeout, usage, **params):
+        messages: List[Dict[str, str]] = []
+        if system:
+            messages.append({"role": "system", "content": system})
+        messages.append({"role": "user", "content": prompt})
+
+        stream = await self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            timeout=timeout,
+            stream=True,
+            stream_options={"include_usage": True},
+            **params
+        )
+
+        async for chunk in stream:
+            if chunk.usage:
+                usage["prompt_tokens"] = chunk.usage.prompt_tokens
+                usage["completion_tokens"] = chunk.usage.completion_tokens
+            if chunk.choices:
+                choice = chunk.choices[0]
+                if choice.finish_reason:
+                    usage["finish_reason"] = choice.finish_reason
+                if choice.delta and choice.delta.content:
+                    yield choice.delta.content
+
+    def _map_error(self, error, context):
+        return self.error_handler.handle_openai_error(error, context)
+
+
+class DeepSeekClient(OpenAIClient):
+    """DeepSeek through its OpenAI-compatible API"""
+
+    provider = "deepseek"
+    base_url = DEEPSEEK_BASE_URL
+
+    def _map_error(self, error, context):
+        ai_error = self.error_handler.handle_openai_error(error, context)
+        ai_error.provider = self.provider
+        return ai_error
+
+
+class AnthropicClient(LLMClient):
+    """Anthropic messages"""
+
+    provider = "anthropic"
+
+    def __init__(self, api_key: str):
+        super().__init__(api_key)
+        from anthropic import AsyncAnthropic
+
+        self.client = AsyncAnthropic(
+            api_key=api_key,
+            timeout=LLM_REQUEST_TIMEOUT,
+            max_retries=0,
+        )
+
+    async def _create(self, prompt, model, system, max_tokens, temperature, timeout, **params):
+        response = await self.client.messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}],
+            timeout=timeout,
+            **self._request_params(system, temperature, params)
+        )
+
+        return LLMResponse(
+            text=response.content[0].text.strip(),
+            provider=self.provider,
+            model=model,
+            prompt_tokens=response.usage.input_tokens,
+            completion_tokens=response.usage.output_tokens,
+            finish_reason=response.stop_reason,
+        )
+
+    async def _stream(self, prompt, model, system, max_tokens, temperature, timeout, usage, **params):
+        stream = await self.client.messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}],
+            timeout=timeout,
+            stream=True,
+            **self._request_params(system, temperature, params)
+        )
+
+        async for event in stream:
+            if event.type == "message_start":
+                usage["prompt_tokens"] = event.message.usage.input_tokens
+            elif event.type == "content_block_delta" and event.delta.type == "text_delta":
+                yield event.delta.text
+            elif event.type == "message_delta":
+                usage["completion_tokens"] = event.usage.output_tokens
+                usage["finish_reason"] = event.delta.stop_reason
+
+    @staticmethod
+    def _request_params(system: Optional[str], temperature: float, params: Dict[str, Any]) -> Dict[str, Any]:
+        # Recent SDK releases no longer accept temperature as an argument;
+        # the API still does, so it is sent in the request body
+        params = dict(params)
+        if system:
+            params["system"] = system
+        params["extra_body"] = {"temperature": temperature, **params.get("extra_body", {})}
+        return params
+
+    def _map_error(self, error, context):
+        return self.error_handler.handle_anthropic_error(error, context)
+
+
+_CLIENT_CLASSES = {
+    "openai": OpenAIClient,
+    "anthropic": AnthropicClient,
+    "deepseek": DeepSeekClient,
+}
+
+
+# ============================================================================
+# POOL
+# ============================================================================
+
+# (provider, API key hash, event loop id) -> (loop, client), least recently used first
+_clients: "OrderedDict[Tuple[str, str, int], Tuple[Optional[asyncio.AbstractEventLoop], LLMClient]]" = OrderedDict()
+
+
+def resolve_api_key(provider: str, api_key: Optional[str] = None) -> str:
+    """
+    API key for a provider: the given key, else the provider's environment variable
+
+    Raises:
+        ValueError: Unsupported provider or no key available
+    """
+    provider = provider.lower()
+    if provider not in _CLIENT_CLASSES:
+        raise ValueError(f"Unsupported provider: {provider}")
+
+    api_key = api_key or os.getenv(API_KEY_ENV_VARS[provider])
+    if not api_key:
+        raise ValueError(f"{API_KEY_ENV_VARS[provider]} environment variable not set")
+    return api_key
+
+
+def _close_later(loop: Optional[asyncio.AbstractEventLoop], client: LLMClient):
+    """Close an evicted client on its own loop, if that loop is still running"""
+    if loop is not None and loop.is_running() and not loop.is_closed():
+        loop.call_soon_threadsafe(lambda: loop.create_task(client.aclose()))
+
+
+def get_llm_client(provider: str, api_key: Optional[str] = None) -> LLMClient:
+    """
+    Pooled async client for a provider and API key
+
+    Call from the event loop the client will be used on (clients hold
+    connections bound to that loop).
+
+    Args:
+        provider: "openai", "anthropic" or "deepseek"
+        api_key: API key (default: provider environment variable)
+
+    Returns:
+        LLMClient
+
+    Raises:
+        ValueError: Unsupported provider or no key available
+    """
+    provider = provider.lower()
+    api_key = resolve_api_key(provider, api_key)
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    key = (provider, hashlib.sha256(api_key.encode()).hexdigest(), id(loop))
+    entry = _clients.get(key)
+
+    if entry is not None and entry[0] is loop and (loop is None or not loop.is_closed()):
+        _clients.move_to_end(key)
+        return entry[1]
+
+    client = _CLIENT_CLASSES[provider](api_key)
+    _clients[key] = (loop, client)
+
+    while len(_clients) > LLM_CLIENT_POOL_SIZE:
+        _, (old_loop, old_client) = _clients.popitem(last=False)
+        old_client.retire(old_loop)
+
+    return client
+
+
+async def close_llm_clients():
+    """Close the pooled clients of the running event loop (application shutdown)"""
+    loop = asyncio.get_running_loop()
+    for key in [key for key, (client_loop, _) in _clients.items() if client_loop is loop]:
+        _, client = _clients.pop(key)
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Failed to close {client.provider} client: {e}")
+
+
+def get_llm_pool_stats() -> Dict[str, Any]:
+    """Pooled clients per provider in this process"""
+    per_provider: Dict[str, int] = {}
+    for provider, _, _ in _clients:
+        per_provider[provider] = per_provider.get(provider, 0) + 1
+    return {"clients": len(_clients), "max_clients": LLM_CLIENT_POOL_SIZE, "per_provider": per_provider}
@@ -944,3 +944,47 @@ def async_client(test_engine):
 def test_db(db_session):
     """Alias for db_session to support legacy test code"""
     return db_session
+
+
+# In-memory Redis for the Redis-backed utilities (job store, rate limiter, caches)
+REDIS_CLIENT_MODULES = (
+    "config.redis_config",
+    "middleware.response_cache",
+    "utils.ai_content_cache",
+    "utils.cache_manager",
+    "utils.data_version",
+    "utils.job_store",
+    "utils.llm_rate_limiter",
+    "utils.llm_usage",
+)
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Point the shared Redis client getters at one fakeredis server"""
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+
+    async def get_async_redis_client():
+        return fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+
+    async def get_async_redis_binary_client():
+        return fakeredis.FakeAsyncRedis(server=server)
+
+    def get_redis_client():
+        return fakeredis.FakeRedis(server=server, decode_responses=True)
+
+    def get_redis_binary_client():
+        return fakeredis.FakeRedis(server=server)
+
+    getters = {
+        "get_async_redis_client": get_async_redis_client,
+        "get_async_redis_binary_client": get_async_redis_binary_client,
+        "get_redis_client": get_redis_client,
+        "get_redis_binary_client": get_redis_binary_client,
+    }
+    for module in REDIS_CLIENT_MODULES:
+        for name, getter in getters.items():
+            monkeypatch.setattr(f"{module}.{name}", getter, raising=False)
+
+    return get_async_redis_client
@@ -0,0 +1,74 @@
+"""
+Tests for the shared AI generation cache (utils/ai_content_cache.py)
+"""
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from utils.ai_content_cache import (
+    OPT_OUT_SETTING_KEY,
+    AIContentCache,
+    generation_cache_key,
+    is_generation_cache_enabled,
+)
+
+
+ARTICLE = {
+    "id": 1,
+    "title": "Rust 2.0 Released",
+    "source": "Hacker News",
+    "link": "https://example.com/rust",
+    "ai_context": "The Rust team shipped\na new   major version.",
+}
+OTHER = {"id": 2, "title": "Python 4", "source": "LWN", "link": "https://example.com/py", "summary": "Not yet."}
+MODEL = {"provider": "openai", "model": "gpt-4o-mini"}
+
+
+def test_key_ignores_ids_order_case_and_whitespace():
+    same_text = {
+        **ARTICLE,
+        "id": 99,
+        "title": "  rust 2.0 RELEASED ",
+        "ai_context": "the rust team shipped a new major version.",
+    }
+
+    key = generation_cache_key([ARTICLE, OTHER], "twitter", **MODEL)
+
+    assert generation_cache_key([OTHER, same_text], "twitter", **MODEL) == key
+    assert generation_cache_key([ARTICLE, OTHER], "linkedin", **MODEL) != key
+    assert generation_cache_key([ARTICLE, OTHER], "twitter", "openai", "gpt-4o") != key
+    assert generation_cache_key([ARTICLE, OTHER], "twitter", tone="casual", **MODEL) != key
+
+
+@pytest.mark.asyncio
+async def test_generation_is_shared_across_article_ids(fake_redis):
+    duplicate = {**ARTICLE, "id": 42}
+
+    assert await AIContentCache.get([ARTICLE], "twitter", **MODEL) is None
+    assert await AIContentCache.set([ARTICLE], "twitter", "Rust 2.0 is out!", **MODEL)
+
+    assert await AIContentCache.get([duplicate], "twitter", **MODEL) == "Rust 2.0 is out!"
+    assert await AIContentCache.get([duplicate], "threads", **MODEL) is None
+
+    stats = await AIContentCache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+
+def test_users_can_opt_out():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE settings (user_id INTEGER, key TEXT, value TEXT)"))
+        conn.execute(
+            text("INSERT INTO settings VALUES (1, :key, 'false'), (2, :key, 'true')"),
+            {"key": OPT_OUT_SETTING_KEY}
+        )
+    db = sessionmaker(bind=engine)()
+
+    try:
+        assert not is_generation_cache_enabled(db, 1)
+        assert is_generation_cache_enabled(db, 2)
+        assert is_generation_cache_enabled(db, 3)
+        assert is_generation_cache_enabled(db, None)
+    finally:
+        db.close()
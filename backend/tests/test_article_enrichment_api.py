@@ -0,0 +1,57 @@
+"""
+Tests for the admin-only enrichment maintenance endpoints (api/article_enrichment.py)
+"""
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from api import article_enrichment
+from utils.auth_selector import get_current_user
+
+
+@pytest.fixture
+def enrichment_app(monkeypatch):
+    calls = []
+    monkeypatch.setattr(article_enrichment, "add_enrichment_columns_to_articles", lambda: calls.append("init-db"))
+
+    async def migrate(user_id, limit):
+        calls.append(("migrate", user_id, limit))
+
+    monkeypatch.setattr(article_enrichment, "migrate_existing_articles", migrate)
+
+    app = FastAPI()
+    app.include_router(article_enrichment.router, prefix="/api")
+    app.state.user = SimpleNamespace(id=5, is_admin=False)
+    app.dependency_overrides[get_current_user] = lambda: app.state.user
+    app.state.calls = calls
+    return app
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path, body", [
+    ("/api/articles/enrichment/init-db", None),
+    ("/api/articles/enrichment/migrate", {"limit": 10, "user_id": 99}),
+    ("/api/articles/enrichment/migrate", {"limit": 10}),
+])
+async def test_maintenance_endpoints_require_admin(enrichment_app, path, body):
+    async with AsyncClient(app=enrichment_app, base_url="http://test") as client:
+        response = await client.post(path, json=body)
+
+    assert response.status_code == 403
+    assert enrichment_app.state.calls == []
+
+
+@pytest.mark.asyncio
+async def test_admin_can_migrate_and_init_db(enrichment_app):
+    enrichment_app.state.user = SimpleNamespace(id=1, is_admin=True)
+
+    async with AsyncClient(app=enrichment_app, base_url="http://test") as client:
+        migrate = await client.post("/api/articles/enrichment/migrate", json={"limit": 10, "user_id": 99})
+        init_db = await client.post("/api/articles/enrichment/init-db")
+
+    assert migrate.status_code == 200
+    assert migrate.json()["user_id"] == 99
+    assert init_db.status_code == 200
+    assert enrichment_app.state.calls == [("migrate", 99, 10), "init-db"]
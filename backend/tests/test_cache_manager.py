@@ -0,0 +1,197 @@
+"""
+Tests for the Redis cache manager (utils/cache_manager.py)
+"""
+import asyncio
+import json
+import time
+
+import pytest
+
+from config.redis_config import RedisConfig
+from utils import cache_manager
+
+
+@pytest.mark.asyncio
+async def test_follower_takes_over_when_lock_released_without_value(fake_redis):
+    redis = await fake_redis()
+    await redis.set("lock:feeds:popular", "other-worker", ex=RedisConfig.CACHE_FILL_LOCK_TTL)
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        return ["feed"]
+
+    async def read():
+        return None
+
+    async def holder_fails():
+        await asyncio.sleep(0.2)
+        await redis.delete("lock:feeds:popular")
+
+    started = time.monotonic()
+    holder = asyncio.create_task(holder_fails())
+    result = await cache_manager._load_with_fill_lock("feeds:popular", loader, read)
+    await holder
+
+    assert result == ["feed"]
+    assert loads == [1]
+    assert time.monotonic() - started < 1
+    assert await redis.get("lock:feeds:popular") is None
+
+
+@pytest.mark.asyncio
+async def test_follower_returns_value_cached_by_holder(fake_redis):
+    redis = await fake_redis()
+    await redis.set("lock:feeds:popular", "other-worker", ex=RedisConfig.CACHE_FILL_LOCK_TTL)
+    cached = {}
+
+    async def loader():
+        raise AssertionError("follower must not load")
+
+    async def read():
+        return cached.get("value")
+
+    async def holder_fills():
+        await asyncio.sleep(0.1)
+        cached["value"] = ["feed"]
+        await redis.delete("lock:feeds:popular")
+
+    holder = asyncio.create_task(holder_fills())
+    assert await cache_manager._load_with_fill_lock("feeds:popular", loader, read) == ["feed"]
+    await holder
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_loads_once_and_caches(fake_redis):
+    cache = cache_manager.CacheManager(namespace="test", l1_enabled=False)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"id": 1}
+
+    results = await asyncio.gather(*(cache.get_or_set("item:1", loader) for _ in range(5)))
+
+    assert results == [{"id": 1}] * 5
+    assert calls == [1]
+    assert await cache.get("item:1") == {"id": 1}
+
+
+@pytest.mark.asyncio
+async def test_warm_hits_counted_once_via_evalsha(fake_redis):
+    cache_manager.register_namespace("warmtest", track_warm_hits=True, l1_enabled=False)
+    cache = cache_manager.get_cache("warmtest")
+    redis = await fake_redis()
+
+    assert await cache.warm("feed:1", {"items": [1, 2]})
+    assert await cache.get("feed:1") == {"items": [1, 2]}
+    assert await cache.get("feed:1") == {"items": [1, 2]}
+    assert await cache.get("feed:2") is None
+
+    assert cache.metrics.warm_hits == 1
+    assert await redis.hget(cache_manager.WARM_STATS_KEY, "warmtest:warm_hits") == "1"
+
+    # A server that lost its script cache (restart, SCRIPT FLUSH) gets it reloaded
+    await redis.script_flush()
+    await cache.warm("feed:3", "value")
+    assert await cache.get("feed:3") == "value"
+    assert cache.metrics.warm_hits == 2
+
+
+@pytest.mark.asyncio
+async def test_tag_sets_prune_expired_members_and_expire_with_last(fake_redis):
+    cache = cache_manager.CacheManager(namespace="tagtest", l1_enabled=False)
+    redis = await fake_redis()
+    tag = cache_manager._tag_key("user:1:posts")
+
+    await cache.set("post:1", {"id": 1}, ttl=60, tags=["user:1:posts"])
+    await cache.set("post:2", {"id": 2}, ttl=600, tags=["user:1:posts"])
+
+    assert 590 <= await redis.ttl(tag) <= 601
+
+    # post:1's value expired: the next write drops it from the tag
+    await redis.zadd(tag, {"tagtest:post:1": time.time() - 1})
+    await cache.set("post:3", {"id": 3}, ttl=60, tags=["user:1:posts"])
+
+    assert set(await redis.zrange(tag, 0, -1)) == {"tagtest:post:2", "tagtest:post:3"}
+    assert 590 <= await redis.ttl(tag) <= 601
+
+
+@pytest.mark.asyncio
+async def test_invalidate_tags_deletes_live_members_only(fake_redis):
+    cache = cache_manager.CacheManager(namespace="tagtest", l1_enabled=False)
+    redis = await fake_redis()
+    tag = cache_manager._tag_key("feed:9")
+
+    await cache.set("a", 1, tags=["feed:9"])
+    await cache.set("b", 2, tags=["feed:9", "feed:10"])
+    await redis.zadd(tag, {"tagtest:gone": time.time() - 1})
+
+    assert await cache.invalidate_tags("feed:9") == 2
+    assert await cache.get("a") is None
+    assert await cache.get("b") is None
+    assert await redis.exists(tag) == 0
+
+
+@pytest.mark.asyncio
+async def test_legacy_set_tags_are_converted(fake_redis):
+    cache = cache_manager.CacheManager(namespace="tagtest", l1_enabled=False)
+    redis = await fake_redis()
+    tag = cache_manager._tag_key("legacy")
+
+    await cache.set("old", 1)
+    await redis.sadd(tag, "tagtest:old")
+    await redis.expire(tag, 3600)
+
+    await cache.set("new", 2, tags=["legacy"])
+    assert await redis.type(tag) == "zset"
+
+    assert await cache.invalidate_tags("legacy") == 2
+    assert await cache.get("old") is None
+
+
+@pytest.fixture
+def published(fake_redis, monkeypatch):
+    """Invalidation messages, each with the matching keys still in Redis when sent"""
+    messages = []
+
+    async def get_client():
+        redis = await fake_redis()
+        publish = redis.publish
+
+        async def record(channel, message):
+            message = json.loads(message)
+            remaining = [key async for key in redis.scan_iter(match=message["pattern"])] \
+                if message["pattern"] else [key for key in message["keys"] if await redis.exists(key)]
+            messages.append((message, remaining))
+            return await publish(channel, json.dumps(message))
+
+        redis.publish = record
+        return redis
+
+    monkeypatch.setattr(cache_manager, "get_async_redis_client", get_client)
+    monkeypatch.setattr(cache_manager, "_ensure_invalidation_listener", lambda: None)
+    return messages
+
+
+@pytest.mark.asyncio
+async def test_delete_pattern_publishes_after_deleting(published):
+    cache = cache_manager.CacheManager(namespace="l1test", l1_enabled=True)
+    await cache.set("feed:1", "a")
+    await cache.set("feed:2", "b")
+
+    assert await cache.delete_pattern("feed:*") == 2
+
+    assert published == [({"origin": cache_manager._instance_id, "keys": None, "pattern": "l1test:feed:*"}, [])]
+    assert cache_manager._l1_cache.get("l1test:feed:1") is None
+
+
+@pytest.mark.asyncio
+async def test_increment_invalidates_other_workers_l1(published):
+    cache = cache_manager.CacheManager(namespace="l1test", l1_enabled=True)
+
+    assert await cache.increment("views") == 1
+    assert await cache.increment("views", 2) == 3
+
+    assert [message["keys"] for message, _ in published] == [["l1test:views"], ["l1test:views"]]
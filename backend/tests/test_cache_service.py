@@ -0,0 +1,71 @@
+"""
+Tests for the in-memory cache backend (services/cache_service.py)
+"""
+import threading
+import time
+
+from services.cache_service import CacheService, InMemoryCache
+
+
+def test_lru_eviction_by_entry_count():
+    cache = InMemoryCache(max_entries=2)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_size_estimate_bounds_bytes():
+    cache = InMemoryCache(max_bytes=4096)
+
+    assert cache.set("small", {"title": "x", "tags": ["a", "b"]})
+    assert not cache.set("huge", ["x" * 100] * 1000)
+    assert 0 < cache.get_stats()["bytes"] <= 4096
+
+
+def test_acquire_lock_has_a_single_winner():
+    cache = InMemoryCache()
+    barrier = threading.Barrier(16)
+    tokens = []
+
+    def contend():
+        barrier.wait()
+        token = cache.acquire_lock("feed", ttl=10)
+        if token:
+            tokens.append(token)
+
+    threads = [threading.Thread(target=contend) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(tokens) == 1
+
+    cache.release_lock("feed", "not-the-owner")
+    assert cache.acquire_lock("feed", ttl=10) is None
+
+    cache.release_lock("feed", tokens[0])
+    assert cache.acquire_lock("feed", ttl=10) is not None
+
+
+def test_fill_waiter_takes_over_a_released_lock():
+    service = CacheService()
+    service._enabled = True
+    service._backend = InMemoryCache()
+
+    # Another process holds the fill lock and gives up without storing a value
+    token = service._backend.acquire_lock("feed", ttl=10)
+    threading.Timer(0.1, service._backend.release_lock, ("feed", token)).start()
+
+    started = time.monotonic()
+    value = service.get_or_set("feed", lambda: ["article"], ttl=60)
+
+    assert value == ["article"]
+    assert time.monotonic() - started < 1
+    assert service.get("feed") == ["article"]
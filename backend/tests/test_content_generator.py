@@ -0,0 +1,90 @@
+"""
+Tests for one-shot multi-platform generation (src/generators/content_generator.py)
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.generators import ContentGenerator
+
+
+ARTICLES = [{"title": "Rust 2.0", "source": "Hacker News", "published": "2026-10-01"}]
+PLATFORMS = {
+    "twitter": {"enabled": True, "max_length": 280},
+    "linkedin": {"enabled": True, "max_length": 3000},
+    "threads": {"enabled": False, "max_length": 500},
+}
+
+
+class ScriptedGenerator(ContentGenerator):
+    """Answers each AI call by its operation, recording the calls"""
+
+    def __init__(self, replies):
+        super().__init__(SimpleNamespace(prepare_context=lambda articles: (articles, "context")), PLATFORMS)
+        self.replies = replies
+        self.calls = []
+
+    async def _call_ai(self, prompt, max_tokens=500, context=None, system="", json_output=False):
+        operation = context["operation"]
+        self.calls.append((operation, context.get("platform"), json_output))
+        return self.replies[operation]
+
+
+@pytest.mark.parametrize("reply", [
+    '{"summary": "s", "twitter": "t"}',
+    '```json\n{"summary": "s", "twitter": "t"}\n```',
+    'Here are your posts:\n{"summary": "s", "twitter": "t"}\nEnjoy!',
+])
+def test_parse_json_object_tolerates_fences_and_prose(reply):
+    assert ContentGenerator._parse_json_object(reply) == {"summary": "s", "twitter": "t"}
+
+
+@pytest.mark.parametrize("reply", ["No JSON here", '["summary"]', '{"summary": '])
+def test_parse_json_object_rejects_other_replies(reply):
+    with pytest.raises(ValueError):
+        ContentGenerator._parse_json_object(reply)
+
+
+@pytest.mark.asyncio
+async def test_one_shot_is_one_call_when_the_reply_is_complete():
+    generator = ScriptedGenerator({
+        "generate_posts_one_shot": json.dumps({
+            "summary": " Rust 2.0 shipped. ",
+            "twitter": "Rust 2.0 is out! #rust",
+            "linkedin": "The Rust team shipped 2.0.",
+        }),
+    })
+
+    summary, posts = await generator.generate_posts_one_shot(ARTICLES, user_id=1)
+
+    assert generator.calls == [("generate_posts_one_shot", None, True)]
+    assert summary["summary"] == "Rust 2.0 shipped."
+    assert summary["sources"] == ["Hacker News"]
+    assert posts == {"twitter": "Rust 2.0 is out! #rust", "linkedin": "The Rust team shipped 2.0."}
+
+
+@pytest.mark.asyncio
+async def test_one_shot_repairs_long_and_missing_posts():
+    generator = ScriptedGenerator({
+        "generate_posts_one_shot": json.dumps({"summary": "Rust 2.0 shipped.", "twitter": "x" * 400}),
+        "shorten_platform_post": "Rust 2.0 is out!",
+        "generate_platform_post": "The Rust team shipped 2.0.",
+    })
+
+    _, posts = await generator.generate_posts_one_shot(ARTICLES)
+
+    assert sorted(generator.calls) == [
+        ("generate_platform_post", "linkedin", False),
+        ("generate_posts_one_shot", None, True),
+        ("shorten_platform_post", "twitter", False),
+    ]
+    assert posts == {"twitter": "Rust 2.0 is out!", "linkedin": "The Rust team shipped 2.0."}
+
+
+@pytest.mark.asyncio
+async def test_one_shot_without_a_summary_is_invalid():
+    generator = ScriptedGenerator({"generate_posts_one_shot": '{"twitter": "Rust 2.0 is out!"}'})
+
+    with pytest.raises(ValueError):
+        await generator.generate_posts_one_shot(ARTICLES)
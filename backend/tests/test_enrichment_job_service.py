@@ -0,0 +1,100 @@
+"""
+Tests for the batch enrichment job runner (services/enrichment_job_service.py)
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base, User
+from database_enrichment_jobs import EnrichmentJob, EnrichmentJobStatus
+from services import enrichment_job_service
+
+
+@pytest.fixture
+def job_db(monkeypatch):
+    """SQLite session factory the runner uses instead of the app database"""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine, tables=[User.__table__, EnrichmentJob.__table__])
+    Session = sessionmaker(bind=engine)
+
+    def get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(enrichment_job_service, "get_db", get_db)
+    monkeypatch.setattr(enrichment_job_service, "CHECKPOINT_EVERY", 2)
+    yield Session
+    engine.dispose()
+
+
+def _create_job(Session, article_count: int) -> int:
+    db = Session()
+    db.add(User(id=1, email="user@example.com", password_hash="x", full_name="User"))
+    db.commit()
+    job = enrichment_job_service.create_enrichment_job(
+        db, user_id=1, article_ids=list(range(1, article_count + 1)), concurrency=1
+    )
+    job_id = job.id
+    db.close()
+    return job_id
+
+
+def _get_job(Session, job_id: int) -> EnrichmentJob:
+    db = Session()
+    job = db.query(EnrichmentJob).filter(EnrichmentJob.id == job_id).first()
+    db.expunge(job)
+    db.close()
+    return job
+
+
+@pytest.mark.asyncio
+async def test_runner_stops_when_cancelled_by_another_process(job_db, monkeypatch):
+    job_id = _create_job(job_db, 20)
+    processed = []
+
+    async def process_article(self, article_id, user_id, force):
+        processed.append(article_id)
+        if article_id == 5:
+            # Another process handles the cancel request: no runner there,
+            # so only the row changes
+            runner = enrichment_job_service._active_runners.pop(job_id)
+            db = job_db()
+            job = db.query(EnrichmentJob).filter(EnrichmentJob.id == job_id).first()
+            assert enrichment_job_service.cancel_enrichment_job(db, job)
+            db.close()
+            enrichment_job_service._active_runners[job_id] = runner
+        return "succeeded", None, None, {}
+
+    monkeypatch.setattr(enrichment_job_service.EnrichmentJobRunner, "_process_article", process_article)
+
+    await enrichment_job_service.run_enrichment_job(job_id)
+
+    job = _get_job(job_db, job_id)
+    assert job.status == EnrichmentJobStatus.CANCELLED.value
+    assert job.completed_at is None
+    assert len(processed) <= 6
+    assert job.processed == len(processed)
+    assert enrichment_job_service.is_job_resumable(job)
+
+
+@pytest.mark.asyncio
+async def test_runner_completes_without_cancellation(job_db, monkeypatch):
+    job_id = _create_job(job_db, 5)
+
+    async def process_article(self, article_id, user_id, force):
+        return "succeeded", None, None, {}
+
+    monkeypatch.setattr(enrichment_job_service.EnrichmentJobRunner, "_process_article", process_article)
+
+    report = await enrichment_job_service.run_enrichment_job(job_id)
+
+    job = _get_job(job_db, job_id)
+    assert job.status == EnrichmentJobStatus.COMPLETED.value
+    assert job.processed == job.succeeded == 5
+    assert report["status"] == EnrichmentJobStatus.COMPLETED.value
@@ -0,0 +1,66 @@
+"""
+Tests for the generation worker pool (services/generation_worker.py)
+"""
+import asyncio
+
+import pytest
+
+from services import generation_worker
+from services.generation_worker import GenerationWorkerPool
+from utils.job_store import JobStore
+
+
+@pytest.fixture
+def job_queues(fake_redis, monkeypatch):
+    """Test job kind with an interactive and a batch queue; handlers wait on `release`"""
+    interactive = JobStore("test")
+    batch = JobStore("test", queue="batch")
+    release = asyncio.Event()
+    ran = []
+
+    async def handler(job_id, payload):
+        ran.append(job_id)
+        if payload.get("batch"):
+            await release.wait()
+
+    monkeypatch.setattr(generation_worker, "POLL_INTERVAL", 0.01)
+    monkeypatch.setattr(generation_worker, "JOB_HANDLERS", {"test": (interactive, handler)})
+    monkeypatch.setattr(generation_worker, "BATCH_JOB_HANDLERS", {"test": (batch, handler)})
+    return interactive, batch, release, ran
+
+
+async def wait_until(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_batch_jobs_are_claimed_only_when_a_slot_is_free(job_queues):
+    interactive, batch, release, ran = job_queues
+    pool = GenerationWorkerPool(workers=1, batch_jobs=1)
+
+    await generation_worker._enqueue("test", "b1", {"batch": True})
+    await generation_worker._enqueue("test", "b2", {"batch": True})
+    pool.start()
+    try:
+        await wait_until(lambda: "b1" in ran)
+
+        # The second batch job stays queued, unleased, while the slot is taken
+        await asyncio.sleep(0.1)
+        assert await batch.get_queue_stats() == {"queued": 1, "running": 1}
+
+        # Interactive jobs are not held up by running batch jobs
+        await generation_worker._enqueue("test", "i1", {})
+        await wait_until(lambda: "i1" in ran)
+        assert await interactive.get_queue_stats() == {"queued": 0, "running": 0}
+
+        release.set()
+        await wait_until(lambda: "b2" in ran)
+        await asyncio.sleep(0.05)
+        assert await batch.get_queue_stats() == {"queued": 0, "running": 0}
+    finally:
+        await pool.stop()
+
+    assert ran == ["b1", "i1", "b2"]
@@ -0,0 +1,115 @@
+"""
+Tests for the Redis job store and work queue (utils/job_store.py)
+"""
+import pytest
+
+from utils.job_store import JobStore, JobSubscription
+
+
+@pytest.fixture
+def store(fake_redis):
+    return JobStore("test", lease_seconds=30, max_attempts=2)
+
+
+@pytest.mark.asyncio
+async def test_claim_is_fifo_and_leases_the_job(store, fake_redis):
+    redis = await fake_redis()
+    await store.enqueue(1, {"post_id": 1})
+    await store.enqueue(2, {"post_id": 2})
+
+    first = await store.claim()
+    second = await store.claim()
+
+    assert first == {"job_id": "1", "payload": {"post_id": 1}, "attempts": 1}
+    assert second["job_id"] == "2"
+    assert await store.claim() is None
+    assert await store.get_queue_stats() == {"queued": 0, "running": 2}
+    assert await redis.zscore(store._claimed_key, "1") > 0
+
+    await store.complete(1)
+    assert await store.get_queue_stats() == {"queued": 0, "running": 1}
+    assert await redis.exists(store._payload_key(1)) == 0
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_is_requeued_and_renewed_lease_is_not(store, fake_redis):
+    redis = await fake_redis()
+    await store.enqueue(1, {"post_id": 1})
+    await store.enqueue(2, {"post_id": 2})
+    await store.claim()
+    await store.claim()
+
+    # Job 1's worker died: its lease lapsed. Job 2's worker keeps renewing.
+    await redis.zadd(store._claimed_key, {"1": 0})
+    await store.renew_lease(2)
+
+    assert await store.requeue_stale() == ["1"]
+    assert await store.get_queue_stats() == {"queued": 1, "running": 1}
+
+    reclaimed = await store.claim()
+    assert reclaimed["job_id"] == "1"
+    assert reclaimed["attempts"] == 2
+
+
+@pytest.mark.asyncio
+async def test_job_over_max_attempts_is_failed(store, fake_redis):
+    redis = await fake_redis()
+    await store.create(1, {"status": "running"})
+    await store.enqueue(1, {"post_id": 1})
+
+    for _ in range(2):
+        assert await store.claim() is not None
+        await redis.zadd(store._claimed_key, {"1": 0})
+        await store.requeue_stale()
+
+    assert await store.claim() is None
+    assert (await store.get(1))["status"] == "failed"
+    assert await store.get_queue_stats() == {"queued": 0, "running": 0}
+
+
+@pytest.mark.asyncio
+async def test_claim_skips_jobs_whose_payload_expired(store, fake_redis):
+    redis = await fake_redis()
+    await store.enqueue(1, {"post_id": 1})
+    await store.enqueue(2, {"post_id": 2})
+    await redis.delete(store._payload_key(1))
+
+    assert (await store.claim())["job_id"] == "2"
+    assert await store.get_queue_stats() == {"queued": 0, "running": 1}
+
+
+@pytest.mark.asyncio
+async def test_update_publishes_and_does_not_resurrect(store):
+    await store.create(1, {"status": "pending", "progress": 0})
+    subscription = await store.subscribe(1)
+    try:
+        assert await store.update(1, progress=50)
+        assert await subscription.next(timeout=1) == {"job_id": 1, "progress": 50}
+    finally:
+        await subscription.close()
+
+    await store.delete(1)
+    assert not await store.update(1, progress=100)
+    assert await store.get(1) is None
+
+
+class _LegacyPubSub:
+    """redis-py < 5.0.1 async PubSub: close() but no aclose()"""
+
+    def __init__(self):
+        self.closed = False
+
+    async def unsubscribe(self):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_subscription_close_falls_back_to_close():
+    pubsub = _LegacyPubSub()
+
+    await JobSubscription(pubsub=pubsub).close()
+
+    assert pubsub.closed
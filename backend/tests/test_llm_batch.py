@@ -0,0 +1,118 @@
+"""
+Tests for batched LLM calls (src/utils/llm_batch.py), on the local backend
+"""
+import asyncio
+
+import pytest
+
+from src.utils import llm_batch, llm_client
+from src.utils.llm_batch import BatchLLMClient, LocalBatchBackend, get_batch_llm_client
+from src.utils.ai_exceptions import AIProviderError, ErrorType
+from src.utils.llm_client import LLMClient, LLMResponse
+from utils import llm_usage
+
+
+@pytest.fixture
+def local_batches(monkeypatch, fake_redis):
+    """LLM_BATCH_BACKEND=local with a short window; returns the local backend"""
+    backend = LocalBatchBackend(responder=lambda request: f"answer: {request.prompt}")
+    monkeypatch.setattr(llm_batch, "LLM_BATCH_BACKEND", "local")
+    monkeypatch.setattr(llm_batch, "LLM_BATCH_WINDOW", 0.05)
+    monkeypatch.setattr(llm_batch, "BATCH_BACKENDS", {**llm_batch.BATCH_BACKENDS, "local": backend})
+    monkeypatch.setattr(llm_batch, "_batch_clients", llm_batch.OrderedDict())
+    monkeypatch.setattr(llm_client, "_clients", llm_client.OrderedDict())
+    return backend
+
+
+def individual_calls(llm, sent, fail=False):
+    """Replace the regular client's complete() with a recording stand-in"""
+    async def complete(prompt, **options):
+        sent.append(prompt)
+        if fail:
+            raise AIProviderError(llm.provider, ErrorType.SERVICE_UNAVAILABLE, "Provider down")
+        return LLMResponse(text=f"single: {prompt}", provider=llm.provider, model=options["model"])
+    llm.complete = complete
+
+
+@pytest.mark.asyncio
+async def test_calls_in_one_window_share_a_batch(local_batches, fake_redis):
+    batch = get_batch_llm_client("openai", "sk-test")
+    assert isinstance(batch, BatchLLMClient)
+    assert get_batch_llm_client("openai", "sk-test") is batch
+
+    responses = await asyncio.gather(*(
+        batch.complete(f"prompt {n}", system="Be brief", context={"user_id": 7, "operation": "digest"})
+        for n in range(3)
+    ))
+
+    assert [response.text for response in responses] == [f"answer: prompt {n}" for n in range(3)]
+    assert all(response.model == llm_client.DEFAULT_MODELS["openai"] for response in responses)
+    assert local_batches.batches == [3]
+    assert batch.idle
+
+    # Usage is recorded per call, at the local backend's batch price
+    redis = await fake_redis()
+    usage = await redis.hgetall(llm_usage._user_key(7, llm_usage._day()))
+    assert usage["calls"] == "3"
+    assert int(usage["operation:digest"]) > 0
+    assert float(usage["cost_usd"]) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_submitted_without_waiting(local_batches, monkeypatch):
+    monkeypatch.setattr(llm_batch, "LLM_BATCH_WINDOW", 60)
+    monkeypatch.setattr(llm_batch, "LLM_BATCH_MAX_REQUESTS", 2)
+    batch = get_batch_llm_client("anthropic", "sk-ant-test")
+
+    responses = await asyncio.wait_for(
+        asyncio.gather(*(batch.complete(f"prompt {n}") for n in range(4))), timeout=5
+    )
+
+    assert len(responses) == 4
+    assert local_batches.batches == [2, 2]
+
+
+@pytest.mark.asyncio
+async def test_calls_missing_from_the_batch_are_sent_individually(local_batches, monkeypatch):
+    class PartialBackend(LocalBatchBackend):
+        async def run(self, llm, requests):
+            responses = await super().run(llm, requests)
+            return {
+                custom_id: response for custom_id, response in responses.items()
+                if "drop" not in response.text
+            }
+
+    batch = BatchLLMClient(get_batch_llm_client("openai", "sk-test").llm, PartialBackend(local_batches.responder))
+    sent = []
+    individual_calls(batch.llm, sent)
+
+    kept, dropped = await asyncio.gather(batch.complete("keep me"), batch.complete("drop me"))
+
+    assert kept.text == "answer: keep me"
+    assert dropped.text == "single: drop me"
+    assert sent == ["drop me"]
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_falls_back_and_surfaces_errors(local_batches):
+    def responder(request):
+        raise RuntimeError("batch rejected")
+
+    local_batches.responder = responder
+    batch = get_batch_llm_client("openai", "sk-test")
+    sent = []
+    individual_calls(batch.llm, sent, fail=True)
+
+    with pytest.raises(AIProviderError):
+        await batch.complete("hello")
+    assert sent == ["hello"]
+
+
+@pytest.mark.asyncio
+async def test_providers_without_a_batch_api_use_the_regular_client(local_batches, monkeypatch):
+    monkeypatch.setattr(llm_batch, "LLM_BATCH_BACKEND", "")
+
+    assert isinstance(get_batch_llm_client("deepseek", "sk-ds-test"), LLMClient)
+    batch = get_batch_llm_client("openai", "sk-test")
+    assert batch.backend.name == "openai"
+    assert batch.cost_factor == 0.5
@@ -0,0 +1,67 @@
+"""
+Tests for the pooled LLM clients (src/utils/llm_client.py)
+"""
+import asyncio
+
+import pytest
+
+from src.utils import llm_client
+from src.utils.llm_client import LLMResponse, get_llm_client
+
+
+@pytest.fixture
+def small_pool(monkeypatch, fake_redis):
+    monkeypatch.setattr(llm_client, "LLM_CLIENT_POOL_SIZE", 1)
+    monkeypatch.setattr(llm_client, "_clients", llm_client.OrderedDict())
+
+
+def track_close(client, closed):
+    async def aclose():
+        closed.append(client)
+    client.aclose = aclose
+
+
+@pytest.mark.asyncio
+async def test_pool_returns_same_client_per_key(small_pool):
+    assert get_llm_client("openai", "sk-a") is get_llm_client("openai", "sk-a")
+    assert get_llm_client("openai", "sk-a") is not get_llm_client("openai", "sk-b")
+
+
+@pytest.mark.asyncio
+async def test_evicted_idle_client_is_closed(small_pool):
+    closed = []
+    first = get_llm_client("openai", "sk-a")
+    track_close(first, closed)
+
+    get_llm_client("openai", "sk-b")
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert closed == [first]
+
+
+@pytest.mark.asyncio
+async def test_evicted_client_closes_after_call_in_flight(small_pool):
+    closed = []
+    release = asyncio.Event()
+    first = get_llm_client("openai", "sk-a")
+    track_close(first, closed)
+
+    async def slow_create(prompt, model, *args, **kwargs):
+        await release.wait()
+        return LLMResponse(text="ok", provider="openai", model=model, prompt_tokens=5, completion_tokens=1)
+
+    first._create = slow_create
+    call = asyncio.create_task(first.complete("hello", max_retries=1))
+    await asyncio.sleep(0.05)
+
+    get_llm_client("openai", "sk-b")  # Evicts the busy client
+    await asyncio.sleep(0.05)
+    assert closed == []
+
+    release.set()
+    assert (await call).text == "ok"
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert closed == [first]
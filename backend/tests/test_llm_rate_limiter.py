@@ -0,0 +1,117 @@
+"""
+Tests for the shared LLM rate limiter (utils/llm_rate_limiter.py)
+"""
+import asyncio
+
+import pytest
+
+from utils import llm_rate_limiter
+from utils.llm_rate_limiter import LLMRateLimiter, RateLimitWaitExceeded, _FairQueue, _Waiter
+
+
+@pytest.fixture
+def limiter(fake_redis, monkeypatch):
+    monkeypatch.setattr(llm_rate_limiter, "LLM_RATE_LIMIT_ENABLED", True)
+    return LLMRateLimiter({"openai": (60, 1000), "deepseek": (0, 0)}, max_wait=0.5)
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_and_settle_refunds(limiter, fake_redis):
+    redis = await fake_redis()
+
+    first = await limiter.acquire("openai", "key", tokens=600)
+    assert first is not None and first.waited == 0
+
+    # 400 tokens left; 600 more would take 12s to refill
+    with pytest.raises(RateLimitWaitExceeded):
+        await limiter.acquire("openai", "key", tokens=600)
+
+    # The first call used only 100 of its 600 tokens
+    await limiter.settle(first, used_tokens=100)
+    assert 899 <= float(await redis.hget(first.bucket, "tokens")) <= 1000
+
+    assert await limiter.acquire("openai", "key", tokens=600) is not None
+    assert await limiter.acquire("openai", "other-key", tokens=600) is not None
+
+    stats = await redis.hgetall(llm_rate_limiter.STATS_KEY)
+    assert stats["openai:calls"] == "3"
+    assert stats["openai:rejected"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_settle_is_capped_and_keeps_the_ttl(limiter, fake_redis):
+    redis = await fake_redis()
+    reservation = await limiter.acquire("openai", "key", tokens=100)
+
+    await limiter.settle(reservation, used_tokens=-5000)
+
+    assert float(await redis.hget(reservation.bucket, "tokens")) == 1000
+    assert 0 < await redis.pttl(reservation.bucket) <= 120000
+
+
+@pytest.mark.asyncio
+async def test_settle_does_not_recreate_an_expired_bucket(limiter, fake_redis):
+    redis = await fake_redis()
+    reservation = await limiter.acquire("openai", "key", tokens=500)
+    await redis.delete(reservation.bucket)
+
+    await limiter.settle(reservation, used_tokens=10)
+
+    assert await redis.exists(reservation.bucket) == 0
+
+
+@pytest.mark.asyncio
+async def test_unlimited_provider_is_not_reserved(limiter):
+    assert await limiter.acquire("deepseek", "key", tokens=10**6) is None
+
+
+@pytest.mark.asyncio
+async def test_queued_calls_are_granted_as_the_bucket_refills(fake_redis, monkeypatch):
+    monkeypatch.setattr(llm_rate_limiter, "LLM_RATE_LIMIT_ENABLED", True)
+    redis = await fake_redis()
+    # 6000 requests/minute: one request every 10ms once the bucket is empty
+    limiter = LLMRateLimiter({"openai": (6000, 0)}, max_wait=5)
+    await limiter.throttle("openai", "key")
+
+    reservations = await asyncio.gather(*(
+        limiter.acquire("openai", "key", tokens=0, user_id=user) for user in (1, 1, 2, 3)
+    ))
+
+    assert all(reservation.waited > 0 for reservation in reservations)
+    assert limiter.waiting() == {}
+    stats = await redis.hgetall(llm_rate_limiter.STATS_KEY)
+    assert stats["openai:queued"] == "4"
+    assert stats["openai:provider_429s"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_call_past_max_wait_is_rejected(fake_redis, monkeypatch):
+    monkeypatch.setattr(llm_rate_limiter, "LLM_RATE_LIMIT_ENABLED", True)
+    limiter = LLMRateLimiter({"openai": (60, 0)}, max_wait=0.5)
+    await limiter.throttle("openai", "key")
+
+    # An empty 60 rpm bucket needs a second per request
+    with pytest.raises(RateLimitWaitExceeded):
+        await limiter.acquire("openai", "key", tokens=0)
+
+
+def test_fair_queue_serves_users_round_robin():
+    loop = asyncio.new_event_loop()
+    try:
+        queue = _FairQueue()
+        waiters = {}
+        for name, user in (("a1", "a"), ("a2", "a"), ("a3", "a"), ("b1", "b"), ("c1", "c")):
+            waiters[name] = _Waiter(loop.create_future(), 0, 0)
+            queue.put(user, waiters[name])
+
+        # A cancelled call is skipped
+        waiters["b1"].future.cancel()
+
+        order = []
+        while (waiter := queue.next()) is not None:
+            order.append(next(name for name, w in waiters.items() if w is waiter))
+
+        assert order == ["a1", "c1", "a2", "a3"]
+        assert len(queue) == 0
+    finally:
+        loop.close()
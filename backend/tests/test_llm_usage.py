@@ -0,0 +1,57 @@
+"""
+Tests for LLM usage metrics and token quotas (utils/llm_usage.py)
+"""
+import pytest
+
+from config.settings import settings
+from utils.llm_usage import check_token_quota, get_usage_totals, get_user_usage, record_llm_usage
+
+
+@pytest.mark.asyncio
+async def test_usage_is_counted_per_user_and_in_totals(fake_redis):
+    await record_llm_usage("openai", "gpt-4o-mini", 1000, 200, user_id=5, operation="summarize_articles")
+    await record_llm_usage("openai", "gpt-4o-mini", 300, 100, user_id=5, operation="generate_platform_post")
+    await record_llm_usage("anthropic", "claude-3-5-sonnet", 50, 50, operation="enrich_article")
+
+    usage = await get_user_usage(5, days=2)
+    today = usage["today"]
+
+    assert today["calls"] == 2
+    assert today["prompt_tokens"] == 1300
+    assert today["total_tokens"] == 1600
+    assert today["cost_usd"] > 0
+    assert today["tokens_by_operation"] == {"summarize_articles": 1200, "generate_platform_post": 400}
+    assert usage["daily"][1]["calls"] == 0
+    assert [call["operation"] for call in usage["recent_calls"]] == [
+        "generate_platform_post", "summarize_articles",
+    ]
+
+    totals = (await get_usage_totals())[0]
+    assert totals["calls"] == 3
+    assert totals["tokens_by_model"] == {"gpt-4o-mini": 1600, "claude-3-5-sonnet": 100}
+
+
+@pytest.mark.asyncio
+async def test_daily_token_quota(fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "AI_DAILY_TOKEN_QUOTA", 1000)
+
+    await record_llm_usage("openai", "gpt-4o-mini", 600, 100, user_id=5)
+    allowed, info = await check_token_quota(5)
+    assert allowed
+    assert info == {"daily_limit": 1000, "used": 700, "remaining": 300}
+
+    await record_llm_usage("openai", "gpt-4o-mini", 250, 50, user_id=5)
+    allowed, info = await check_token_quota(5)
+    assert not allowed
+    assert info["remaining"] == 0
+
+    # Other users have their own quota
+    assert (await check_token_quota(6))[0]
+
+
+@pytest.mark.asyncio
+async def test_quota_disabled_by_default(fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "AI_DAILY_TOKEN_QUOTA", 0)
+    await record_llm_usage("openai", "gpt-4o-mini", 10**6, 0, user_id=5)
+
+    assert await check_token_quota(5) == (True, {"daily_limit": None, "used": None, "remaining": None})
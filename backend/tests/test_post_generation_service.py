@@ -0,0 +1,93 @@
+"""
+Tests for generation budgets and progress streams (services/post_generation_service.py)
+"""
+import asyncio
+
+import pytest
+
+from schemas.posts import GenerationStatus
+from services.post_generation_service import ConcurrencyBudget, PostGenerationService
+
+
+@pytest.mark.asyncio
+async def test_budget_limits_concurrent_holders_per_key():
+    budget = ConcurrencyBudget(2)
+    running = {"user-1": 0, "user-2": 0}
+    peak = {"user-1": 0, "user-2": 0}
+
+    async def call(key):
+        async with budget.acquire(key):
+            running[key] += 1
+            peak[key] = max(peak[key], running[key])
+            await asyncio.sleep(0.01)
+            running[key] -= 1
+
+    await asyncio.gather(*(call(key) for key in running for _ in range(5)))
+
+    assert peak == {"user-1": 2, "user-2": 2}
+    assert budget._slots == {}
+
+
+@pytest.mark.asyncio
+async def test_budget_releases_on_error_and_cancellation():
+    budget = ConcurrencyBudget(1)
+
+    with pytest.raises(RuntimeError):
+        async with budget.acquire("openai"):
+            raise RuntimeError("provider error")
+
+    async with budget.acquire("openai"):
+        waiter = asyncio.create_task(budget.acquire("openai").__aenter__())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    assert budget._slots == {}
+    async with budget.acquire("openai"):
+        pass
+
+
+async def _collect(stream):
+    events = []
+    async for event in stream:
+        events.append(event)
+    return events
+
+
+@pytest.mark.asyncio
+async def test_progress_stream_follows_updates_until_completion(fake_redis):
+    await PostGenerationService.create_job(101)
+    await PostGenerationService.update_job(101, status=GenerationStatus.PROCESSING, progress=10)
+    stream = PostGenerationService.stream_progress(101)
+
+    first = await stream.__anext__()
+    await PostGenerationService.update_job(101, progress=50, current_step="Generating AI summary")
+    await PostGenerationService.update_job(101, status=GenerationStatus.COMPLETED, progress=100)
+    # Published after completion; the stream must already have ended
+    await PostGenerationService.update_job(101, progress=0)
+    rest = await asyncio.wait_for(_collect(stream), timeout=5)
+
+    assert first["status"] == "processing" and first["progress"] == 10
+    assert [(event["status"], event["progress"]) for event in rest] == [
+        ("processing", 50),
+        ("completed", 100),
+    ]
+    assert rest[0]["step"] == "Generating AI summary"
+    assert rest[-1]["post_id"] == 101
+
+
+@pytest.mark.asyncio
+async def test_progress_stream_keeps_alive_and_ends_on_failure(fake_redis, monkeypatch):
+    monkeypatch.setattr(PostGenerationService, "PROGRESS_KEEPALIVE", 0.05)
+    await PostGenerationService.create_job(102)
+    stream = PostGenerationService.stream_progress(102)
+
+    assert (await stream.__anext__())["status"] == "started"
+    assert await stream.__anext__() is None
+
+    await PostGenerationService.update_job(102, status=GenerationStatus.FAILED, error="Quota exceeded")
+    rest = [event for event in await asyncio.wait_for(_collect(stream), timeout=5) if event]
+
+    assert rest == [{"status": "error", "error": "Quota exceeded"}]
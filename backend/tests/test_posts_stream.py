@@ -0,0 +1,133 @@
+"""
+Tests for the streaming post generation endpoint (api/posts.py)
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from api import posts
+from database import get_db
+from src.generators import ContentGenerator
+
+
+DRAFTS = {
+    "twitter": ["Rust 2.0 ", "is out. ", "#rust"],
+    "linkedin": ["The Rust team ", "shipped 2.0.\n", "Read more."],
+}
+
+
+class FakeSession:
+    """Just enough of a Session for generate_post_stream"""
+
+    def __init__(self):
+        self.added = []
+
+    def query(self, model):
+        return self
+
+    def filter(self, *criteria):
+        return self
+
+    def all(self):
+        return [SimpleNamespace(provider="openai", encrypted_key="encrypted")]
+
+    def add(self, post):
+        self.added.append(post)
+
+    def commit(self):
+        pass
+
+    def refresh(self, post):
+        post.id = 77
+
+
+class FakeSummarizer:
+    model = "gpt-4o-mini"
+
+    def __init__(self, provider, api_key):
+        pass
+
+    async def summarize_articles(self, articles, user_id=None):
+        return {"summary": "Rust 2.0 released"}
+
+
+class FakeGenerator(ContentGenerator):
+    linkedin_started = None
+
+    async def stream_platform_post(self, platform, summary, user_id=None, post_id=None):
+        if platform == "twitter":
+            # Only completes if LinkedIn is streaming at the same time
+            await asyncio.wait_for(self.linkedin_started.wait(), timeout=2)
+        for delta in DRAFTS[platform]:
+            yield delta
+            if platform == "linkedin":
+                self.linkedin_started.set()
+            await asyncio.sleep(0)
+
+
+@pytest.fixture
+def stream_app(monkeypatch):
+    async def within_quota(user_id):
+        return True, {}
+
+    async def noop(*args, **kwargs):
+        pass
+
+    FakeGenerator.linkedin_started = asyncio.Event()
+    monkeypatch.setattr(posts, "decrypt_api_key", lambda encrypted: "sk-test")
+    monkeypatch.setattr(posts, "check_token_quota", within_quota)
+    monkeypatch.setattr(posts, "is_lazy_enrichment_enabled", lambda: False)
+    monkeypatch.setattr(posts, "load_article_contexts", lambda db, ids: [{"id": 1, "title": "Rust 2.0"}])
+    monkeypatch.setattr(posts, "is_generation_cache_enabled", lambda db, user_id: False)
+    monkeypatch.setattr(posts, "AISummarizer", FakeSummarizer)
+    monkeypatch.setattr(posts, "ContentGenerator", FakeGenerator)
+    monkeypatch.setattr(posts.PostsCache, "invalidate_user_posts", noop)
+
+    app = FastAPI()
+    app.include_router(posts.router, prefix="/api/posts")
+    app.state.db = FakeSession()
+    app.dependency_overrides[posts.get_current_user_dependency] = lambda: SimpleNamespace(id=5)
+    app.dependency_overrides[get_db] = lambda: app.state.db
+    return app
+
+
+@pytest.mark.asyncio
+async def test_platforms_stream_concurrently_into_one_event_stream(stream_app):
+    async with AsyncClient(app=stream_app, base_url="http://test") as client:
+        response = await client.get(
+            "/api/posts/generate/stream",
+            params={"article_ids": "1", "platforms": "twitter,linkedin"},
+        )
+
+    events = [
+        json.loads(line[len("data: "):])
+        for line in response.text.splitlines()
+        if line.startswith("data: ")
+    ]
+    assert not [event for event in events if event["status"] == "error"]
+
+    deltas = [(event["platform"], event["delta"]) for event in events if "delta" in event]
+    assert deltas[0][0] == "linkedin"
+    for platform, parts in DRAFTS.items():
+        assert [delta for name, delta in deltas if name == platform] == parts
+
+    finals = {
+        event["platform"]: event for event in events
+        if event["status"] == "processing" and "content" in event
+    }
+    assert finals["twitter"]["content"] == {"twitter": "Rust 2.0 is out. #rust"}
+    assert finals["linkedin"]["validation"]["platform"] == "linkedin"
+    assert any(
+        "validation" in event and "content" not in event and event["platform"] == "linkedin"
+        for event in events
+    )
+
+    completed = events[-1]
+    assert completed["status"] == "completed"
+    assert completed["post_id"] == 77
+    assert completed["content"]["linkedin"] == "The Rust team shipped 2.0.\nRead more."
+    assert stream_app.state.db.added[0].platforms == ["twitter", "linkedin"]
@@ -0,0 +1,93 @@
+"""
+Tests for the shared Redis clients (config/redis_config.py)
+"""
+import pytest
+
+from config import redis_config
+from config.settings import settings
+
+
+@pytest.fixture
+def fresh_clients(monkeypatch):
+    for name in (
+        "_redis_pool", "_async_redis_pool", "_redis_client", "_async_redis_client",
+        "_redis_binary_client", "_async_redis_binary_client",
+    ):
+        monkeypatch.setattr(redis_config, name, None)
+
+
+def test_clients_use_redis_url(monkeypatch, fresh_clients):
+    monkeypatch.setattr(settings, "REDIS_URL", "rediss://:secret@cache.example.com:6380/2")
+
+    client = redis_config.get_redis_client()
+    kwargs = client.connection_pool.connection_kwargs
+
+    assert kwargs["host"] == "cache.example.com"
+    assert kwargs["port"] == 6380
+    assert kwargs["db"] == 2
+    assert kwargs["password"] == "secret"
+    assert client.connection_pool.connection_class.__name__ == "SSLConnection"
+
+
+def test_clients_fall_back_to_host_settings(monkeypatch, fresh_clients):
+    monkeypatch.setattr(settings, "REDIS_URL", None)
+
+    kwargs = redis_config.get_redis_client().connection_pool.connection_kwargs
+
+    assert kwargs["host"] == redis_config.RedisConfig.REDIS_HOST
+    assert kwargs["port"] == redis_config.RedisConfig.REDIS_PORT
+
+
+@pytest.mark.asyncio
+async def test_text_and_binary_clients_share_one_pool(monkeypatch, fresh_clients):
+    monkeypatch.setattr(settings, "REDIS_URL", "redis://cache.example.com:6379/0")
+
+    assert redis_config.get_redis_binary_client().connection_pool is redis_config.get_redis_client().connection_pool
+    text = await redis_config.get_async_redis_client()
+    binary = await redis_config.get_async_redis_binary_client()
+    assert binary.connection_pool is text.connection_pool
+
+
+def test_binary_client_returns_bytes_on_shared_pool():
+    fakeredis = pytest.importorskip("fakeredis")
+    from redis import ConnectionPool, Redis
+
+    pool = ConnectionPool(
+        connection_class=fakeredis.FakeConnection, server=fakeredis.FakeServer(), decode_responses=True
+    )
+    text = Redis(connection_pool=pool)
+    binary = redis_config._BinaryRedis(connection_pool=pool)
+
+    binary.set("payload", b"\x00\xff")
+    text.set("name", "value")
+
+    assert binary.get("payload") == b"\x00\xff"
+    assert text.get("name") == "value"
+    assert binary.get("name") == b"value"
+
+    pipe = binary.pipeline(transaction=False)
+    pipe.get("payload")
+    pipe.get("name")
+    assert pipe.execute() == [b"\x00\xff", b"value"]
+
+
+@pytest.mark.asyncio
+async def test_async_binary_client_returns_bytes_on_shared_pool():
+    fakeredis = pytest.importorskip("fakeredis")
+    from redis.asyncio import ConnectionPool, Redis
+
+    pool = ConnectionPool(
+        connection_class=fakeredis.FakeAsyncConnection, server=fakeredis.FakeServer(), decode_responses=True
+    )
+    text = Redis(connection_pool=pool)
+    binary = redis_config._AsyncBinaryRedis(connection_pool=pool)
+
+    await binary.set("payload", b"\x00\xff")
+    await text.set("name", "value")
+
+    assert await binary.get("payload") == b"\x00\xff"
+    assert await text.get("name") == "value"
+    assert await binary.get("name") == b"value"
+    pipe = binary.pipeline(transaction=False)
+    pipe.get("payload")
+    assert await pipe.execute() == [b"\x00\xff"]
@@ -0,0 +1,119 @@
+"""
+Tests for the conditional GET middleware (middleware/response_cache.py)
+"""
+import pytest
+from fastapi import FastAPI, Request
+from httpx import AsyncClient
+
+from middleware.response_cache import ResponseCacheMiddleware
+from utils.data_version import bump_data_version
+
+
+USER_ID = 7
+AUTH = {"Authorization": "Bearer test-token"}
+
+
+@pytest.fixture
+def posts_app(fake_redis):
+    app = FastAPI(version="test")
+    app.add_middleware(ResponseCacheMiddleware, routes={"/api/posts": (("posts",), "private, no-cache")})
+    calls = []
+
+    @app.get("/api/posts")
+    async def list_posts(request: Request):
+        request.state.user_id = USER_ID  # As set by authentication
+        calls.append(1)
+        return [{"id": 1}]
+
+    app.state.calls = calls
+    return app
+
+
+@pytest.mark.asyncio
+async def test_etag_only_after_credential_is_known(posts_app):
+    async with AsyncClient(app=posts_app, base_url="http://test") as client:
+        first = await client.get("/api/posts", headers=AUTH)
+        second = await client.get("/api/posts", headers=AUTH)
+
+    assert first.status_code == 200
+    assert "etag" not in first.headers
+    assert second.status_code == 200
+    assert second.headers["etag"]
+    assert second.headers["vary"] == "Authorization"
+
+
+@pytest.mark.asyncio
+async def test_matching_etag_is_answered_without_running_the_route(posts_app):
+    async with AsyncClient(app=posts_app, base_url="http://test") as client:
+        await client.get("/api/posts", headers=AUTH)
+        etag = (await client.get("/api/posts", headers=AUTH)).headers["etag"]
+        calls = len(posts_app.state.calls)
+
+        response = await client.get("/api/posts", headers={**AUTH, "If-None-Match": f"W/{etag}"})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert len(posts_app.state.calls) == calls
+
+
+@pytest.mark.asyncio
+async def test_posts_version_bump_changes_etag(posts_app):
+    async with AsyncClient(app=posts_app, base_url="http://test") as client:
+        await client.get("/api/posts", headers=AUTH)
+        etag = (await client.get("/api/posts", headers=AUTH)).headers["etag"]
+
+        await bump_data_version(USER_ID, "posts")
+        response = await client.get("/api/posts", headers={**AUTH, "If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_other_users_bump_keeps_etag(posts_app):
+    async with AsyncClient(app=posts_app, base_url="http://test") as client:
+        await client.get("/api/posts", headers=AUTH)
+        etag = (await client.get("/api/posts", headers=AUTH)).headers["etag"]
+
+        await bump_data_version(USER_ID + 1, "posts")
+        response = await client.get("/api/posts", headers={**AUTH, "If-None-Match": etag})
+
+    assert response.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_unauthenticated_requests_are_not_cached(posts_app):
+    async with AsyncClient(app=posts_app, base_url="http://test") as client:
+        response = await client.get("/api/posts")
+
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_feed_invalidation_drops_cached_listing_and_bumps_version(fake_redis):
+    from api.feeds_enhanced import feeds_cache, invalidate_user_feeds, user_feeds_tag
+    from utils.data_version import get_data_versions
+
+    await feeds_cache.set("recent:7:page:1", {"articles": ["old"]}, tags=[user_feeds_tag(USER_ID)])
+    before = await get_data_versions(USER_ID, ("articles", "feeds"))
+
+    assert await invalidate_user_feeds(USER_ID) == 1
+
+    assert await feeds_cache.get("recent:7:page:1") is None
+    after = await get_data_versions(USER_ID, ("articles", "feeds"))
+    assert after["articles"] != before["articles"]
+    assert after["feeds"] != before["feeds"]
+
+
+@pytest.mark.asyncio
+async def test_aggregator_leaves_versions_alone_when_nothing_was_stored(fake_redis):
+    from services.feed_aggregator import FeedAggregator
+    from utils.data_version import get_data_versions
+
+    before = await get_data_versions(USER_ID, ("articles",))
+    await FeedAggregator._invalidate_listings(USER_ID, articles_added=0)
+    assert await get_data_versions(USER_ID, ("articles",)) == before
+
+    await FeedAggregator._invalidate_listings(USER_ID, articles_added=3)
+    assert await get_data_versions(USER_ID, ("articles",)) != before
@@ -0,0 +1,75 @@
+"""
+Tests for token counting (utils/token_budget.py)
+"""
+import pytest
+
+from utils import token_budget
+from utils.token_budget import estimate_tokens, truncate_to_tokens
+
+
+class WordEncoding:
+    """Stand-in tiktoken encoding: one token per word"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def encode(self, text, disallowed_special=()):
+        return text.split()
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+@pytest.fixture
+def encodings(monkeypatch):
+    """Encodings requested by name, served without downloading tiktoken files"""
+    requested = []
+
+    def get_encoding(name):
+        requested.append(name)
+        return WordEncoding(name)
+
+    monkeypatch.setattr(token_budget, "_get_encoding", get_encoding)
+    token_budget._tokenizer.cache_clear()
+    token_budget._count_tokens.cache_clear()
+    yield requested
+    token_budget._tokenizer.cache_clear()
+    token_budget._count_tokens.cache_clear()
+
+
+def test_openai_models_use_their_own_encoding(encodings):
+    assert estimate_tokens("Rust two point oh", "gpt-4o") == 4
+    assert estimate_tokens("Rust two point oh", "gpt-4") == 4
+    assert estimate_tokens("Rust two point oh") == 4
+
+    assert encodings == ["o200k_base", "cl100k_base", "cl100k_base"]
+
+
+def test_other_providers_scale_the_base_count(encodings):
+    text = " ".join(["word"] * 20)
+
+    assert estimate_tokens(text, "claude-3-5-sonnet") == 23
+    assert estimate_tokens(text, "deepseek-chat") == 21
+    assert set(encodings) == {"cl100k_base"}
+    assert estimate_tokens("", "claude-3-5-sonnet") == 0
+
+
+def test_truncate_to_tokens_cuts_at_a_boundary(encodings):
+    text = "First sentence here. Second sentence is a little longer than that."
+
+    assert truncate_to_tokens(text, 100, "gpt-4") == text
+    assert truncate_to_tokens(text, 6, "gpt-4") == "First sentence here."
+    assert truncate_to_tokens(text, 9, "gpt-4") == "First sentence here. Second sentence is a..."
+    assert truncate_to_tokens(text, 0) == ""
+
+
+def test_counts_fall_back_to_characters_without_tiktoken(monkeypatch):
+    monkeypatch.setattr(token_budget, "_get_encoding", lambda name: None)
+    token_budget._tokenizer.cache_clear()
+    token_budget._count_tokens.cache_clear()
+    try:
+        assert estimate_tokens("x" * 10, "gpt-4o") == 3
+        assert truncate_to_tokens("word " * 20, 3).endswith("...")
+    finally:
+        token_budget._tokenizer.cache_clear()
+        token_budget._count_tokens.cache_clear()
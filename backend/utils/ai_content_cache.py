@@ -1,8 +1,20 @@
 """
 AI Content Cache - Reduce AI API costs by caching generated content
 
-This module caches AI-generated social media posts to avoid re-generating
-identical content, saving on AI API costs and improving response times.
+Generated summaries and platform posts are cached by what actually goes into
+the prompt, not by article IDs: the key is a hash of the normalized article
+content (title, source, link and the summary/AI context text, lowercased with
+whitespace collapsed) plus platform, tone, provider, model and any other
+generation parameters. The same story picked by two users, or the same text
+ingested twice under different article IDs, is generated once.
+
+- Users can opt out with the "ai_generation_cache" setting ("false"); their
+  generations neither read nor populate the shared cache
+- Storage is bounded: values over AI_GENERATION_CACHE_MAX_VALUE_BYTES are not
+  cached, and the oldest entries are evicted beyond
+  AI_GENERATION_CACHE_MAX_ENTRIES
+- Hits, misses and the estimated API cost saved are counted in Redis across
+  workers (AIContentCache.get_stats, reported by /api/health/cache/stats)
 
 Cost Savings Example:
 - Without cache: Generate 10 posts from same articles = 10 API calls = $0.20
@@ -10,118 +22,325 @@ Cost Savings Example:
 - Savings: 90% reduction in AI API costs
 """
 import hashlib
-from typing import Optional, List
+import json
+import re
+import time
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from loguru import logger
 
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from utils.cache_manager import cache
-from config.redis_config import RedisConfig
+from utils.cache_manager import get_cache
+from utils.token_budget import estimate_tokens
+from config.redis_config import get_async_redis_client, RedisConfig
 
 
-class AIContentCache:
+# Namespaces (TTL policies in utils/cache_manager.py)
+content_cache = get_cache("ai_content")
+image_cache = get_cache("ai_image")
+
+# Bump when prompts change so old generations stop matching
+GENERATION_PROMPT_VERSION = 1
+
+# Pseudo-platform for the shared article summary
+SUMMARY_PLATFORM = "summary"
+
+# Per-user setting (Settings table); "false" opts out of the shared cache
+OPT_OUT_SETTING_KEY = "ai_generation_cache"
+
+# Cached keys by creation time (size bound) and cross-worker counters
+INDEX_KEY = "aigen:index"
+STATS_KEY = "aigen:stats"
+
+# Approximate prompt overhead (instructions) on top of the article text
+PROMPT_OVERHEAD_TOKENS = 250
+
+# USD per 1M tokens (input, output), matched by model name prefix
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4": (30.00, 60.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "claude-3-5-haiku": (0.80, 4.00),
+    "claude-3-5-sonnet": (3.00, 15.00),
+    "claude-3-haiku": (0.25, 1.25),
+    "claude-3-opus": (15.00, 75.00),
+    "deepseek-chat": (0.27, 1.10),
+    "deepseek-reasoner": (0.55, 2.19),
+}
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+# ============================================================================
+# KEYS AND COSTS
+# ============================================================================
+
+def normalize_text(text: Optional[str]) -> str:
+    """Canonical form of prompt text: NFKC, lowercase, collapsed whitespace"""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", str(text)).lower()
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def article_content_hash(article: Dict[str, Any]) -> str:
     """
-    Cache for AI-generated content to reduce API costs.
+    Hash of the article content that reaches the prompt.
 
-    Uses content-based hashing to identify identical generation requests
-    and return cached results instead of making expensive AI API calls.
+    Uses the precomputed AI context when present, otherwise the summary,
+    the same way the summarizer builds its context.
     """
+    body = article.get("ai_context") or article.get("summary") or article.get("content")
+    parts = [
+        normalize_text(article.get("title")),
+        normalize_text(article.get("source")),
+        normalize_text(article.get("link") or article.get("url")),
+        normalize_text(body),
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+def generation_cache_key(
+    articles: List[Dict[str, Any]],
+    platform: str,
+    provider: str,
+    model: str,
+    tone: Optional[str] = None,
+    params: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Cache key for one generation.
 
-    @staticmethod
-    def _content_hash(articles: List[dict], platforms: List[str]) -> str:
-        """
-        Create deterministic hash from articles and platforms.
+    Article order doesn't matter; every other input that changes the output
+    (platform, tone, provider, model, params, prompt version) does.
+    """
+    signature = {
+        "articles": sorted(article_content_hash(article) for article in articles),
+        "platform": platform,
+        "tone": normalize_text(tone) or "default",
+        "provider": (provider or "").lower(),
+        "model": model or "",
+        "params": params or {},
+        "version": GENERATION_PROMPT_VERSION,
+    }
+    digest = hashlib.sha256(json.dumps(signature, sort_keys=True, default=str).encode()).hexdigest()
+    return f"gen:{digest[:40]}"
+
+
+def _model_prices(model: Optional[str]) -> Optional[Tuple[float, float]]:
+    model = (model or "").lower()
+    # Longest prefix first so "gpt-4o-mini" wins over "gpt-4o" and "gpt-4"
+    for prefix in sorted(MODEL_PRICES, key=len, reverse=True):
+        if model.startswith(prefix):
+            return MODEL_PRICES[prefix]
+    return None
+
+
+def estimate_generation_cost(model: Optional[str], prompt_tokens: int, completion_tokens: int) -> float:
+    """
+    Estimated API cost of a generation in USD (0.0 for unknown models)
 
-        Args:
-            articles: List of article dictionaries
-            platforms: List of platform names
+    Args:
+        model: Model name
+        prompt_tokens: Input tokens
+        completion_tokens: Output tokens
+    """
+    prices = _model_prices(model)
+    if prices is None:
+        return 0.0
+    input_price, output_price = prices
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+def _estimate_prompt_tokens(articles: List[Dict[str, Any]]) -> int:
+    tokens = PROMPT_OVERHEAD_TOKENS
+    for article in articles:
+        tokens += article.get("ai_context_tokens") or estimate_tokens(
+            article.get("ai_context") or article.get("summary")
+        )
+        tokens += estimate_tokens(article.get("title"))
+    return tokens
 
-        Returns:
-            SHA256 hash (first 16 chars) for cache key
-        """
-        # Sort articles by title for consistency
-        article_titles = sorted([a.get('title', '') for a in articles])
 
-        # Sort platforms for consistency
-        sorted_platforms = sorted(platforms)
+def is_generation_cache_enabled(db, user_id: Optional[int]) -> bool:
+    """
+    Whether a user's generations may use the shared cache.
 
-        # Create content signature
-        content = f"{article_titles}:{sorted_platforms}"
+    Args:
+        db: Database session
+        user_id: User ID (None = no per-user setting)
 
-        # Hash it
-        return hashlib.sha256(content.encode()).hexdigest()[:16]
+    Returns:
+        False if disabled globally or the user opted out
+    """
+    if not RedisConfig.AI_GENERATION_CACHE_ENABLED or not content_cache.enabled:
+        return False
+    if user_id is None:
+        return True
 
-    @staticmethod
-    async def get_cached_content(
-        articles: List[dict],
-        platforms: List[str]
-    ) -> Optional[dict]:
-        """
-        Get cached AI-generated content if available.
+    from sqlalchemy import text
 
-        Args:
-            articles: List of article dictionaries
-            platforms: List of platform names to generate for
+    try:
+        row = db.execute(
+            text("SELECT value FROM settings WHERE user_id = :user_id AND key = :key"),
+            {"user_id": user_id, "key": OPT_OUT_SETTING_KEY}
+        ).first()
+    except Exception as e:
+        logger.warning(f"Could not read AI cache setting for user {user_id}: {e}")
+        return True
 
-        Returns:
-            Dictionary of cached content per platform, or None if not cached
+    if row is None or row.value is None:
+        return True
+    return str(row.value).strip().lower() not in ("false", "0", "no", "off")
 
-        Example:
-            >>> cached = await AIContentCache.get_cached_content(articles, ["twitter", "linkedin"])
-            >>> if cached:
-            ...     twitter_post = cached["twitter"]
-            ...     linkedin_post = cached["linkedin"]
-        """
-        cache_key = f"ai_content:{AIContentCache._content_hash(articles, platforms)}"
 
-        cached = await cache.get(cache_key)
+# ============================================================================
+# CACHE
+# ============================================================================
 
-        if cached:
-            logger.info(f"AI content cache HIT - saved API call for {len(platforms)} platforms")
-        else:
-            logger.debug(f"AI content cache MISS - will generate new content")
+class AIContentCache:
+    """
+    Cache for AI-generated content to reduce API costs.
 
-        return cached
+    One entry per (articles, platform, generation parameters); the summary is
+    cached under the SUMMARY_PLATFORM pseudo-platform. Callers check
+    is_generation_cache_enabled() first so opted-out users bypass it.
+    """
 
     @staticmethod
-    async def cache_content(
-        articles: List[dict],
-        platforms: List[str],
-        content: dict
-    ) -> bool:
+    async def _record(pipe_ops: Iterable[Tuple[str, tuple]]):
+        try:
+            redis = await get_async_redis_client()
+            pipe = redis.pipeline(transaction=False)
+            for op, args in pipe_ops:
+                getattr(pipe, op)(*args)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to record AI content cache stats: {e}")
+
+    @staticmethod
+    async def get(
+        articles: List[Dict[str, Any]],
+        platform: str,
+        *,
+        provider: str,
+        model: str,
+        tone: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Optional[Any]:
         """
-        Cache AI-generated content for future reuse.
+        Get a cached generation.
 
         Args:
-            articles: List of article dictionaries used for generation
-            platforms: List of platform names
-            content: Dictionary of generated content per platform
+            articles: Articles the content is generated from
+            platform: Platform name, or SUMMARY_PLATFORM
+            provider: AI provider
+            model: Model name
+            tone: Optional tone
+            params: Other parameters that change the output
 
         Returns:
-            True if caching successful
+            The cached value, or None
+        """
+        if not RedisConfig.AI_GENERATION_CACHE_ENABLED or not content_cache.enabled:
+            return None
+
+        key = generation_cache_key(articles, platform, provider, model, tone, params)
+        entry = await content_cache.get(key)
+
+        if not isinstance(entry, dict) or "value" not in entry:
+            await AIContentCache._record([("hincrby", (STATS_KEY, "misses", 1))])
+            logger.debug(f"AI content cache MISS for {platform} ({model})")
+            return None
+
+        cost = float(entry.get("cost_usd") or 0.0)
+        await AIContentCache._record([
+            ("hincrby", (STATS_KEY, "hits", 1)),
+            ("hincrby", (STATS_KEY, "tokens_saved", int(entry.get("tokens") or 0))),
+            ("hincrbyfloat", (STATS_KEY, "usd_saved", cost)),
+        ])
+        logger.info(f"AI content cache HIT for {platform} ({model}), saved ~${cost:.4f}")
+        return entry["value"]
 
-        Example:
-            >>> content = {
-            ...     "twitter": "AI advances in 2024...",
-            ...     "linkedin": "Exciting developments in AI..."
-            ... }
-            >>> await AIContentCache.cache_content(articles, ["twitter", "linkedin"], content)
+    @staticmethod
+    async def set(
+        articles: List[Dict[str, Any]],
+        platform: str,
+        value: Any,
+        *,
+        provider: str,
+        model: str,
+        tone: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None
+    ) -> bool:
         """
-        cache_key = f"ai_content:{AIContentCache._content_hash(articles, platforms)}"
+        Cache a generation.
 
-        # Cache for 24 hours - AI content can be reused for a day
-        success = await cache.set(
-            cache_key,
-            content,
-            ttl=RedisConfig.CACHE_TTL_VERY_LONG  # 24 hours
-        )
+        Token counts are used to estimate the cost a later hit saves; they
+        are estimated from the text when the provider didn't report them.
 
-        if success:
-            logger.info(f"Cached AI content for {len(platforms)} platforms (24h TTL)")
+        Returns:
+            True if cached
+        """
+        if not value or not RedisConfig.AI_GENERATION_CACHE_ENABLED or not content_cache.enabled:
+            return False
+
+        if prompt_tokens is None:
+            prompt_tokens = _estimate_prompt_tokens(articles)
+        if completion_tokens is None:
+            completion_tokens = estimate_tokens(
+                value if isinstance(value, str) else json.dumps(value, default=str), model
+            )
+
+        key = generation_cache_key(articles, platform, provider, model, tone, params)
+        entry = {
+            "value": value,
+            "model": model,
+            "tokens": prompt_tokens + completion_tokens,
+            "cost_usd": estimate_generation_cost(model, prompt_tokens, completion_tokens),
+            "created_at": time.time(),
+        }
+        tags = [f"article:{article['id']}:generations" for article in articles if article.get("id")]
+
+        if not await content_cache.set(key, entry, ttl=RedisConfig.AI_GENERATION_CACHE_TTL, tags=tags):
+            return False
+
+        await AIContentCache._enforce_size_bound(key)
+        return True
 
-        return success
+    @staticmethod
+    async def _enforce_size_bound(key: str):
+        """Index the new key and evict the oldest entries beyond the limit"""
+        max_entries = RedisConfig.AI_GENERATION_CACHE_MAX_ENTRIES
+        try:
+            now = time.time()
+            ttl = RedisConfig.AI_GENERATION_CACHE_TTL
+            redis = await get_async_redis_client()
+            pipe = redis.pipeline(transaction=False)
+            # Entries older than the TTL have already expired
+            pipe.zremrangebyscore(INDEX_KEY, 0, now - ttl)
+            pipe.zadd(INDEX_KEY, {key: now})
+            pipe.expire(INDEX_KEY, ttl)
+            pipe.zcard(INDEX_KEY)
+            *_, size = await pipe.execute()
+
+            if size <= max_entries:
+                return
+
+            evicted = await redis.zpopmin(INDEX_KEY, size - max_entries)
+            for evicted_key, _ in evicted:
+                await content_cache.delete(evicted_key)
+
+            await AIContentCache._record([("hincrby", (STATS_KEY, "evictions", len(evicted)))])
+        except Exception as e:
+            logger.warning(f"Failed to enforce AI content cache size bound: {e}")
 
     @staticmethod
     async def invalidate_for_articles(article_ids: List[int]) -> int:
@@ -136,15 +355,58 @@ class AIContentCache:
         Returns:
             Number of cache entries invalidated
         """
-        # This is a simple implementation - could be enhanced with article ID tracking
-        # For now, we'll just log the invalidation request
-        logger.info(f"AI content invalidation requested for articles: {article_ids}")
+        if not article_ids:
+            return 0
+        return await content_cache.invalidate_tags(
+            *[f"article:{article_id}:generations" for article_id in article_ids]
+        )
 
-        # In a more sophisticated implementation, we'd track which cache entries
-        # correspond to which articles, then delete only those entries
-        # For simplicity, we're not implementing this now, but the pattern is here
+    @staticmethod
+    async def clear() -> int:
+        """
+        Delete all cached generations (counters are kept).
 
-        return 0
+        Returns:
+            Number of cache entries deleted
+        """
+        deleted = await content_cache.delete_pattern("gen:*")
+        try:
+            redis = await get_async_redis_client()
+            await redis.delete(INDEX_KEY)
+        except Exception as e:
+            logger.warning(f"Failed to reset AI content cache index: {e}")
+        return deleted
+
+    @staticmethod
+    async def get_stats() -> Dict[str, Any]:
+        """
+        Hit/miss counts and estimated savings across all workers.
+
+        Returns:
+            Dictionary with hits, misses, hit rate, tokens and USD saved,
+            evictions and the number of cached entries
+        """
+        redis = await get_async_redis_client()
+        pipe = redis.pipeline(transaction=False)
+        pipe.hgetall(STATS_KEY)
+        pipe.zcard(INDEX_KEY)
+        counters, entries = await pipe.execute()
+
+        hits = int(counters.get("hits", 0))
+        misses = int(counters.get("misses", 0))
+        lookups = hits + misses
+
+        return {
+            "enabled": RedisConfig.AI_GENERATION_CACHE_ENABLED and content_cache.enabled,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate_percent": round((hits / lookups) * 100, 2) if lookups > 0 else 0.0,
+            "tokens_saved": int(counters.get("tokens_saved", 0)),
+            "estimated_usd_saved": round(float(counters.get("usd_saved", 0.0)), 4),
+            "evictions": int(counters.get("evictions", 0)),
+            "entries": entries,
+            "max_entries": RedisConfig.AI_GENERATION_CACHE_MAX_ENTRIES,
+        }
 
 
 class AIImageCache:
@@ -187,9 +449,9 @@ class AIImageCache:
         Returns:
             Cached image URL or None
         """
-        cache_key = f"ai_image:{AIImageCache._image_prompt_hash(prompt, model, size)}"
+        cache_key = AIImageCache._image_prompt_hash(prompt, model, size)
 
-        cached = await cache.get(cache_key)
+        cached = await image_cache.get(cache_key)
 
         if cached:
             logger.info(f"AI image cache HIT - saved image generation API call")
@@ -217,10 +479,10 @@ class AIImageCache:
         Returns:
             True if caching successful
         """
-        cache_key = f"ai_image:{AIImageCache._image_prompt_hash(prompt, model, size)}"
+        cache_key = AIImageCache._image_prompt_hash(prompt, model, size)
 
         # Cache for 7 days - images are expensive to generate
-        success = await cache.set(
+        success = await image_cache.set(
             cache_key,
             {"url": image_url, "prompt": prompt, "model": model, "size": size},
             ttl=RedisConfig.CACHE_TTL_VERY_LONG * 7  # 7 days
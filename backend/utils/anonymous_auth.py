@@ -4,7 +4,7 @@ For single-user deployments without login
 """
 import os
 from sqlalchemy.orm import Session
-from fastapi import Depends
+from fastapi import Depends, Request
 from database import User, get_db
 import logging
 
@@ -14,7 +14,7 @@ logger = logging.getLogger(__name__)
 ANONYMOUS_MODE_ENABLED = os.getenv("ANONYMOUS_MODE", "false").lower() == "true"
 
 
-def get_anonymous_user(db: Session = Depends(get_db)) -> User:
+def get_anonymous_user(request: Request, db: Session = Depends(get_db)) -> User:
     """
     Always return the anonymous user (id=1).
     Creates the anonymous user if it doesn't exist.
@@ -23,6 +23,7 @@ def get_anonymous_user(db: Session = Depends(get_db)) -> User:
     Use only in single-user deployments.
 
     Args:
+        request: Incoming request (user id is recorded on request.state)
         db: Database session
 
     Returns:
@@ -49,6 +50,7 @@ def get_anonymous_user(db: Session = Depends(get_db)) -> User:
         db.refresh(user)
         logger.info("Created anonymous user (id=1) for ANONYMOUS_MODE")
 
+    request.state.user_id = user.id
     return user
 
 
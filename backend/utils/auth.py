@@ -216,13 +216,18 @@ def get_current_user(
 
 
 def get_current_user_dependency(
-    authorization: Annotated[Optional[str], Header()] = None, db: Session = Depends(get_db)
+    request: Request,
+    authorization: Annotated[Optional[str], Header()] = None,
+    db: Session = Depends(get_db),
 ) -> User:
     """
     FastAPI dependency for getting the current authenticated user.
     Extracts token from Authorization header (Bearer token format).
 
+    The user id is recorded on request.state for middleware (response cache).
+
     Args:
+        request: Incoming request
         authorization: Authorization header value (Bearer {token})
         db: Database session
 
@@ -264,6 +269,7 @@ def get_current_user_dependency(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    request.state.user_id = user.id
     return user
 
 
@@ -8,11 +8,31 @@ Provides a comprehensive caching layer with:
 - Cache invalidation patterns
 - Hit/miss tracking
 - Decorator support for easy caching
+- Optional in-process L1 (bounded LRU, short TTL) in front of Redis, kept
+  coherent across workers via Redis pub/sub invalidation
+- Stampede protection: single-flight loads and stale-while-revalidate
+- Tag-based invalidation (sorted sets of keys, pruned by expiry) instead of
+  keyspace scans
+- Compact binary payloads (orjson/msgpack + compression, see cache_serializer)
+- Per-namespace policies (TTL, max value size) and metrics
+- Multi-key get/set (MGET / pipelined SETEX) and entity hydration for lists
+- Cache warming support: warm() writes plus tracking of which warmed entries
+  are actually read (see services/cache_warmer.py)
+
+This is the application's cache subsystem: get a namespace with
+get_cache("posts") rather than constructing ad-hoc Redis helpers. The sync
+services.cache_service.CacheService shares its serializer, Redis connection
+settings and metrics.
 """
 import json
 import hashlib
 import functools
-from typing import Any, Optional, Callable
+import fnmatch
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Optional, Callable, Dict, Tuple, Awaitable, Iterable, List, Hashable
 from datetime import datetime
 import asyncio
 from loguru import logger
@@ -21,36 +41,665 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from config.redis_config import get_async_redis_client, RedisConfig
+from config.redis_config import get_async_redis_client, get_async_redis_binary_client, RedisConfig
+from utils.cache_serializer import serializer
 
 
+# ============================================================================
+# IN-PROCESS L1 CACHE
+# ============================================================================
+
+class LocalCache:
+    """
+    Bounded LRU cache with per-entry TTL, used as L1 in front of Redis.
+
+    Values are stored deserialized and returned as-is, so a hit is a dict
+    lookup. Callers must treat values obtained from the cache as read-only.
+    """
+
+    def __init__(self, max_entries: int, default_ttl: int):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a live entry (None on miss or expiry)"""
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        """Store an entry for at most `ttl` (capped at the default TTL)"""
+        ttl = min(ttl or self.default_ttl, self.default_ttl)
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        """Drop one entry"""
+        return self._entries.pop(key, None) is not None
+
+    def delete_pattern(self, pattern: str) -> int:
+        """Drop all entries whose key matches a glob pattern"""
+        matching = [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]
+        for key in matching:
+            del self._entries[key]
+        return len(matching)
+
+    def clear(self):
+        """Drop all entries"""
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and occupancy"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate_percent": round((self.hits / total) * 100, 2) if total > 0 else 0.0,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.default_ttl,
+            "evictions": self.evictions,
+        }
+
+
+# Process-wide L1 shared by all CacheManager instances (keys are namespaced)
+_l1_cache = LocalCache(RedisConfig.CACHE_L1_MAX_ENTRIES, RedisConfig.CACHE_L1_TTL)
+
+# Identifies this process so it ignores its own invalidation messages
+_instance_id = uuid.uuid4().hex
+
+# Redis (L2) lookups made by this process
+_l2_stats = {"hits": 0, "misses": 0}
+
+# Pub/sub invalidation counters
+_invalidation_stats = {"published": 0, "received": 0}
+
+_invalidation_listener: Optional[asyncio.Task] = None
+
+
+def _apply_invalidation(data: Any):
+    """Drop L1 entries named in an invalidation message from another worker"""
+    try:
+        message = json.loads(data)
+    except (TypeError, ValueError):
+        return
+
+    if message.get("origin") == _instance_id:
+        return
+
+    _invalidation_stats["received"] += 1
+
+    for key in message.get("keys") or []:
+        _l1_cache.delete(key)
+
+    if message.get("pattern"):
+        _l1_cache.delete_pattern(message["pattern"])
+
+
+async def _listen_for_invalidations():
+    """Subscribe to the invalidation channel, reconnecting on errors"""
+    while True:
+        pubsub = None
+        try:
+            redis = await get_async_redis_client()
+            pubsub = redis.pubsub()
+            await pubsub.subscribe(RedisConfig.CACHE_INVALIDATION_CHANNEL)
+
+            # Anything cached while we were not listening may be stale
+            _l1_cache.clear()
+
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message:
+                    _apply_invalidation(message.get("data"))
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception as e:
+            logger.warning(f"Cache invalidation listener error, retrying: {e}")
+            await asyncio.sleep(RedisConfig.CACHE_L1_TTL)
+
+        finally:
+            if pubsub is not None:
+                try:
+                    await pubsub.reset()
+                except Exception:
+                    pass
+
+
+def _ensure_invalidation_listener():
+    """Start the pub/sub listener on first L1 use (needs a running loop)"""
+    global _invalidation_listener
+
+    if _invalidation_listener is not None and not _invalidation_listener.done():
+        return
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+
+    _invalidation_listener = loop.create_task(_listen_for_invalidations())
+
+
+async def stop_cache_invalidation_listener():
+    """Stop the pub/sub listener (call before closing Redis connections)"""
+    global _invalidation_listener
+
+    if _invalidation_listener is not None:
+        _invalidation_listener.cancel()
+        try:
+            await _invalidation_listener
+        except (asyncio.CancelledError, Exception):
+            pass
+        _invalidation_listener = None
+
+
+def _invalidation_message(keys: Optional[list] = None, pattern: Optional[str] = None) -> str:
+    """Serialize an invalidation message for other workers"""
+    _invalidation_stats["published"] += 1
+    return json.dumps({"origin": _instance_id, "keys": keys, "pattern": pattern})
+
+
+# ============================================================================
+# STAMPEDE PROTECTION
+# ============================================================================
+
+# Loads in flight in this process, keyed by full cache key
+_inflight: Dict[str, asyncio.Task] = {}
+
+# Marker key of stale-while-revalidate envelopes stored in Redis
+_SWR_MARKER = "__swr_fresh_until__"
+
+# How often a worker waiting on another worker's fill re-reads the cache
+FILL_POLL_INTERVAL = 0.05
+
+# Delete the lock only if we still own it
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+# Registered Lua scripts, keyed by source. They run by SHA (EVALSHA) so hot
+# paths don't resend the script body; redis-py reloads them on NOSCRIPT.
+_scripts: Dict[str, Any] = {}
+
+
+def _script(redis, source: str):
+    """Script object for a Lua source (call it with client=redis)"""
+    script = _scripts.get(source)
+    if script is None:
+        script = _scripts[source] = redis.register_script(source)
+    return script
+
+
+async def _acquire_fill_lock(key: str) -> Tuple[bool, Optional[str]]:
+    """
+    Try to take the cross-process fill lock for a key.
+
+    Returns:
+        (acquired, token). If Redis is unavailable the caller proceeds
+        without a lock: (True, None).
+    """
+    token = uuid.uuid4().hex
+    try:
+        redis = await get_async_redis_client()
+        acquired = await redis.set(f"lock:{key}", token, nx=True, ex=RedisConfig.CACHE_FILL_LOCK_TTL)
+        return bool(acquired), token if acquired else None
+    except Exception as e:
+        logger.warning(f"Cache fill lock unavailable for {key}: {e}")
+        return True, None
+
+
+async def _release_fill_lock(key: str, token: Optional[str]):
+    """Release a fill lock taken by _acquire_fill_lock"""
+    if not token:
+        return
+    try:
+        redis = await get_async_redis_client()
+        await _script(redis, _RELEASE_LOCK_SCRIPT)(keys=[f"lock:{key}"], args=[token], client=redis)
+    except Exception as e:
+        logger.warning(f"Failed to release cache fill lock for {key}: {e}")
+
+
+def _forget_flight(key: str, task: asyncio.Task):
+    """Drop a finished flight (and mark its exception as retrieved)"""
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    if not task.cancelled():
+        task.exception()
+
+
+def _start_flight(key: str, coro: Awaitable) -> asyncio.Task:
+    """Run a load as its own task so it outlives any single caller"""
+    task = asyncio.get_running_loop().create_task(coro)
+    _inflight[key] = task
+    task.add_done_callback(functools.partial(_forget_flight, key))
+    return task
+
+
+async def _load_with_fill_lock(
+    key: str,
+    loader: Callable[[], Awaitable[Any]],
+    read: Optional[Callable[[], Awaitable[Any]]]
+) -> Any:
+    """Load under the cross-process lock, or wait for the worker holding it"""
+    acquired, token = await _acquire_fill_lock(key)
+
+    if not acquired and read is not None:
+        deadline = time.monotonic() + RedisConfig.CACHE_FILL_LOCK_TTL
+        while time.monotonic() < deadline:
+            await asyncio.sleep(FILL_POLL_INTERVAL)
+            value = await read()
+            if value is not None:
+                return value
+
+            # The holder released the lock (or died) without caching a value,
+            # e.g. its loader failed or returned None: take over the load
+            # instead of polling out the rest of the lock TTL
+            acquired, token = await _acquire_fill_lock(key)
+            if acquired:
+                value = await read()
+                if value is not None:
+                    await _release_fill_lock(key, token)
+                    return value
+                break
+        else:
+            logger.warning(f"Timed out waiting for another worker to fill {key}, loading directly")
+
+    try:
+        return await loader()
+    finally:
+        await _release_fill_lock(key, token)
+
+
+async def run_single_flight(
+    key: str,
+    loader: Callable[[], Awaitable[Any]],
+    read: Optional[Callable[[], Awaitable[Any]]] = None
+) -> Any:
+    """
+    Run `loader` at most once at a time per key.
+
+    Concurrent callers in this process share one in-flight task. Across
+    processes a short Redis lock elects one loader; the others poll `read`
+    (typically a cache lookup) until the value appears. If the lock is
+    released without a value being cached, the next poller takes the lock
+    and loads; after CACHE_FILL_LOCK_TTL the others load directly. The
+    loader is expected to store its result in the cache.
+
+    Args:
+        key: Key identifying the load (usually the full cache key)
+        loader: Async callable producing (and caching) the value
+        read: Async callable returning the cached value or None
+
+    Returns:
+        The loaded value
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = _start_flight(key, _load_with_fill_lock(key, loader, read))
+    return await asyncio.shield(task)
+
+
+def _wrap_stale(value: Any, ttl: int) -> dict:
+    """Wrap a value with its freshness deadline (wall clock, shared across workers)"""
+    return {_SWR_MARKER: time.time() + ttl, "value": value}
+
+
+def _unwrap_stale(cached: Any) -> Tuple[Any, bool]:
+    """Return (value, is_fresh) for a possibly wrapped cache value"""
+    if isinstance(cached, dict) and _SWR_MARKER in cached:
+        return cached["value"], cached[_SWR_MARKER] > time.time()
+    return cached, True
+
+
+# ============================================================================
+# TAG-BASED INVALIDATION
+# ============================================================================
+
+# Tags are sorted sets of cache keys scored by the key's expiry (unix time),
+# so members whose value has expired can be pruned by score. Tag keys
+# written by older versions are plain sets; both scripts convert them,
+# assuming their members live as long as the set itself.
+_TAG_MIGRATE_LUA = """
+local function migrate_legacy_tag(tag, now)
+    if redis.call('TYPE', tag)['ok'] ~= 'set' then
+        return
+    end
+    local keys = redis.call('SMEMBERS', tag)
+    local expires_at = now + math.max(redis.call('TTL', tag), 0)
+    redis.call('DEL', tag)
+    for _, key in ipairs(keys) do
+        redis.call('ZADD', tag, expires_at, key)
+    end
+end
+"""
+
+# Register a key under tags: prune expired members, add the key, and let
+# each tag expire with its longest-lived member.
+# ARGV: member key, its expiry, now
+_ADD_TAGS_SCRIPT = _TAG_MIGRATE_LUA + """
+local now = tonumber(ARGV[3])
+for _, tag in ipairs(KEYS) do
+    migrate_legacy_tag(tag, now)
+    redis.call('ZREMRANGEBYSCORE', tag, '-inf', now)
+    redis.call('ZADD', tag, ARGV[2], ARGV[1])
+    local last = redis.call('ZRANGE', tag, -1, -1, 'WITHSCORES')
+    redis.call('EXPIREAT', tag, math.ceil(tonumber(last[2])))
+end
+return #KEYS
+"""
+
+# Atomically collect and delete the live members of the given tags.
+# Returns the deleted member keys so callers can drop their L1 copies.
+# ARGV: now
+_INVALIDATE_TAGS_SCRIPT = _TAG_MIGRATE_LUA + """
+local now = tonumber(ARGV[1])
+local members = {}
+for _, tag in ipairs(KEYS) do
+    migrate_legacy_tag(tag, now)
+    local keys = redis.call('ZRANGEBYSCORE', tag, now, '+inf')
+    for i = 1, #keys, 500 do
+        redis.call('DEL', unpack(keys, i, math.min(i + 499, #keys)))
+    end
+    for _, key in ipairs(keys) do
+        table.insert(members, key)
+    end
+    redis.call('DEL', tag)
+end
+return members
+"""
+
+
+def _tag_key(tag: str) -> str:
+    """Redis key of the sorted set holding a tag's cache keys"""
+    return f"tag:{tag}"
+
+
+def add_tags(pipe, full_key: str, tags: Iterable[str], ttl: int):
+    """
+    Queue registration of a cached key under tags on a Redis pipeline.
+
+    Members whose values have expired are pruned on every registration, and
+    a tag expires together with its longest-lived member, so tag sets stay
+    proportional to the live entries they cover.
+
+    Args:
+        pipe: Redis pipeline the value is being written on
+        full_key: Full (namespaced) cache key
+        tags: Tags such as "user:123:posts" or "feed:456"
+        ttl: TTL of the cached value in seconds
+    """
+    tag_keys = [_tag_key(tag) for tag in tags]
+    if not tag_keys:
+        return
+
+    now = time.time()
+    pipe.eval(_ADD_TAGS_SCRIPT, len(tag_keys), *tag_keys, full_key, now + ttl, now)
+
+
+async def invalidate_tags(*tags: str) -> int:
+    """
+    Delete every cache entry registered under any of the tags.
+
+    Cost is proportional to the number of live tagged entries, not the
+    keyspace.
+
+    Args:
+        *tags: Tags to invalidate
+
+    Returns:
+        Number of cache keys invalidated
+    """
+    if not tags or not RedisConfig.CACHE_ENABLED:
+        return 0
+
+    try:
+        redis = await get_async_redis_client()
+        members = await _script(redis, _INVALIDATE_TAGS_SCRIPT)(
+            keys=[_tag_key(tag) for tag in tags], args=[time.time()], client=redis
+        )
+        keys = sorted(set(members or []))
+
+        if RedisConfig.CACHE_L1_ENABLED and keys:
+            for key in keys:
+                _l1_cache.delete(key)
+            await redis.publish(
+                RedisConfig.CACHE_INVALIDATION_CHANNEL, _invalidation_message(keys=keys)
+            )
+
+        if RedisConfig.CACHE_DEBUG:
+            logger.debug(f"Cache INVALIDATE tags {list(tags)}: {len(keys)} keys")
+
+        return len(keys)
+
+    except Exception as e:
+        logger.error(f"Cache tag invalidation error for {list(tags)}: {e}")
+        return 0
+
+
+# ============================================================================
+# WARM HIT TRACKING
+# ============================================================================
+
+# Warmed keys not read yet live in a per-namespace set; the first read of
+# one counts as a warm hit. Counters are shared by all workers.
+WARM_STATS_KEY = "cachewarm:stats"
+
+# GET that also records the first read of a warmed key.
+# Returns nil on a miss, otherwise {value, warm_hit}.
+_GET_TRACKING_WARM_SCRIPT = """
+local value = redis.call('GET', KEYS[1])
+if not value then
+    return false
+end
+local warm_hit = redis.call('SREM', KEYS[2], KEYS[1])
+if warm_hit == 1 then
+    redis.call('HINCRBY', KEYS[3], ARGV[1], 1)
+end
+return {value, warm_hit}
+"""
+
+
+def _warm_set_key(namespace: str) -> str:
+    """Redis key of the set of warmed, not yet read keys of a namespace"""
+    return f"cachewarm:{namespace}:pending"
+
+
+# ============================================================================
+# NAMESPACE POLICIES AND METRICS
+# ============================================================================
+
+@dataclass
+class NamespacePolicy:
+    """Cache behaviour for one key namespace."""
+    default_ttl: int = RedisConfig.CACHE_TTL_MEDIUM
+    max_ttl: Optional[int] = None  # Longer TTLs are capped
+    max_value_bytes: Optional[int] = None  # Larger serialized values are not cached
+    l1_enabled: Optional[bool] = None  # None = CACHE_L1_ENABLED
+    track_warm_hits: bool = False  # Count reads of entries written by warm()
+
+
+@dataclass
+class CacheMetrics:
+    """Per-namespace counters for this process."""
+    hits: int = 0
+    l1_hits: int = 0
+    misses: int = 0
+    sets: int = 0
+    rejected: int = 0  # Values over max_value_bytes
+    errors: int = 0
+    bytes_written: int = 0
+    get_time_ms: float = 0.0
+    set_time_ms: float = 0.0
+    max_get_ms: float = 0.0
+    warmed: int = 0  # Entries written by warm()
+    warm_hits: int = 0  # First reads of warmed entries served by this process
+
+    def to_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        data = asdict(self)
+        data.update({
+            "hit_rate_percent": round((self.hits / lookups) * 100, 2) if lookups > 0 else 0.0,
+            "avg_get_ms": round(self.get_time_ms / lookups, 3) if lookups > 0 else 0.0,
+            "avg_set_ms": round(self.set_time_ms / self.sets, 3) if self.sets > 0 else 0.0,
+            "avg_value_bytes": round(self.bytes_written / self.sets) if self.sets > 0 else 0,
+        })
+        data["get_time_ms"] = round(self.get_time_ms, 3)
+        data["set_time_ms"] = round(self.set_time_ms, 3)
+        data["max_get_ms"] = round(self.max_get_ms, 3)
+        return data
+
+
+_namespace_policies: Dict[str, NamespacePolicy] = {}
+_namespace_metrics: Dict[str, CacheMetrics] = {}
+_namespace_managers: Dict[str, "CacheManager"] = {}
+
+
+def register_namespace(namespace: str, **policy) -> NamespacePolicy:
+    """
+    Register (or replace) the policy for a cache namespace.
+
+    Args:
+        namespace: Key prefix, e.g. "posts"
+        **policy: NamespacePolicy fields
+
+    Returns:
+        The registered policy
+    """
+    _namespace_policies[namespace] = NamespacePolicy(**policy)
+    _namespace_managers.pop(namespace, None)
+    return _namespace_policies[namespace]
+
+
+def get_namespace_policy(namespace: str) -> NamespacePolicy:
+    """Policy for a namespace (defaults if unregistered)"""
+    return _namespace_policies.get(namespace) or NamespacePolicy()
+
+
+def get_namespace_metrics(namespace: str) -> CacheMetrics:
+    """Metrics for a namespace, created on first use"""
+    metrics = _namespace_metrics.get(namespace)
+    if metrics is None:
+        metrics = _namespace_metrics[namespace] = CacheMetrics()
+    return metrics
+
+
+def get_cache(namespace: str) -> "CacheManager":
+    """
+    Shared CacheManager for a namespace.
+
+    Usage:
+        posts = get_cache("posts")
+        await posts.set("user:1:list", items, tags=["user:1:posts"])
+    """
+    manager = _namespace_managers.get(namespace)
+    if manager is None:
+        manager = _namespace_managers[namespace] = CacheManager(namespace=namespace)
+    return manager
+
+
+# Built-in namespaces
+register_namespace("aipost")
+register_namespace("posts", default_ttl=RedisConfig.CACHE_TTL_SHORT, max_ttl=RedisConfig.CACHE_TTL_LONG)
+register_namespace(
+    "feeds",
+    default_ttl=RedisConfig.CACHE_TTL_MEDIUM,
+    max_value_bytes=2 * 1024 * 1024,
+    track_warm_hits=True,
+)
+register_namespace("enrichment", default_ttl=RedisConfig.CACHE_TTL_VERY_LONG * 7)
+register_namespace(
+    "ai_content",
+    default_ttl=RedisConfig.AI_GENERATION_CACHE_TTL,
+    max_value_bytes=RedisConfig.AI_GENERATION_CACHE_MAX_VALUE_BYTES,
+)
+register_namespace("ai_image", default_ttl=RedisConfig.CACHE_TTL_VERY_LONG * 7)
+
+
+# ============================================================================
+# CACHE MANAGER
+# ============================================================================
+
 class CacheManager:
     """
     Centralized cache management with automatic serialization.
 
     Features:
-    - Automatic JSON serialization
+    - Automatic serialization (versioned binary format, see cache_serializer)
     - Key namespacing
     - TTL management
-    - Cache invalidation patterns
-    - Hit/miss tracking (via Redis INFO)
+    - Cache invalidation by tag (preferred) or glob pattern
+    - Hit/miss and latency metrics per namespace (plus Redis INFO)
+    - Optional in-process L1 (CACHE_L1_ENABLED) with pub/sub invalidation
+
+    TTL defaults, caps and size limits come from the namespace policy (see
+    register_namespace). Values returned from the L1 are shared objects;
+    don't mutate them.
 
     Example:
-        >>> cache = CacheManager(namespace="users")
+        >>> cache = get_cache("users")
         >>> await cache.set("user:123", {"name": "John", "email": "john@example.com"}, ttl=300)
         >>> user_data = await cache.get("user:123")
         >>> await cache.delete("user:123")
     """
 
-    def __init__(self, namespace: str = "aipost"):
+    def __init__(
+        self,
+        namespace: str = "aipost",
+        l1_enabled: Optional[bool] = None,
+        l1_ttl: Optional[int] = None
+    ):
         """
         Initialize cache manager.
 
         Args:
             namespace: Prefix for all cache keys (default: "aipost")
+            l1_enabled: Use the in-process L1 (default: policy, then CACHE_L1_ENABLED)
+            l1_ttl: L1 entry lifetime in seconds (default/max: CACHE_L1_TTL)
         """
         self.namespace = namespace
         self.enabled = RedisConfig.CACHE_ENABLED
+        self.policy = get_namespace_policy(namespace)
+        self.metrics = get_namespace_metrics(namespace)
+
+        if l1_enabled is None:
+            l1_enabled = self.policy.l1_enabled
+        self.l1_enabled = RedisConfig.CACHE_L1_ENABLED if l1_enabled is None else l1_enabled
+        self.l1_ttl = l1_ttl or RedisConfig.CACHE_L1_TTL
+
+    def _resolve_ttl(self, ttl: Optional[int]) -> int:
+        """Apply the namespace default and cap to a requested TTL"""
+        if ttl is None:
+            ttl = self.policy.default_ttl
+        if self.policy.max_ttl is not None:
+            ttl = min(ttl, self.policy.max_ttl)
+        return ttl
 
     def _make_key(self, key: str) -> str:
         """
@@ -77,39 +726,71 @@ class CacheManager:
         if not self.enabled:
             return None
 
+        full_key = self._make_key(key)
+        metrics = self.metrics
+
+        if self.l1_enabled:
+            _ensure_invalidation_listener()
+            value = _l1_cache.get(full_key)
+            if value is not None:
+                metrics.hits += 1
+                metrics.l1_hits += 1
+                return value
+
+        started = time.perf_counter()
         try:
-            redis = await get_async_redis_client()
-            full_key = self._make_key(key)
-            value = await redis.get(full_key)
+            redis = await get_async_redis_binary_client()
+
+            if self.policy.track_warm_hits:
+                value = await self._get_tracking_warm_hit(redis, full_key)
+            else:
+                value = await redis.get(full_key)
 
             if value is None:
+                _l2_stats["misses"] += 1
+                metrics.misses += 1
                 if RedisConfig.CACHE_DEBUG:
                     logger.debug(f"Cache MISS: {full_key}")
                 return None
 
+            _l2_stats["hits"] += 1
+            metrics.hits += 1
             if RedisConfig.CACHE_DEBUG:
                 logger.debug(f"Cache HIT: {full_key}")
 
-            # Deserialize JSON
-            return json.loads(value)
+            result = serializer.loads(value)
+
+            if self.l1_enabled:
+                _l1_cache.set(full_key, result, ttl=self.l1_ttl)
+
+            return result
 
         except Exception as e:
+            metrics.errors += 1
+            metrics.misses += 1
             logger.error(f"Cache get error for key {key}: {e}")
             return None
 
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            metrics.get_time_ms += elapsed_ms
+            metrics.max_get_ms = max(metrics.max_get_ms, elapsed_ms)
+
     async def set(
         self,
         key: str,
         value: Any,
-        ttl: Optional[int] = None
+        ttl: Optional[int] = None,
+        tags: Optional[List[str]] = None
     ) -> bool:
         """
         Set value in cache.
 
         Args:
             key: Cache key
-            value: Value to cache (will be JSON serialized)
-            ttl: Time to live in seconds (default: CACHE_TTL_MEDIUM = 5 minutes)
+            value: Value to cache (JSON-compatible; non-JSON types are stringified)
+            ttl: Time to live in seconds (default: namespace policy, capped at its max_ttl)
+            tags: Tags to register the key under (see invalidate_tags)
 
         Returns:
             True if successful
@@ -117,18 +798,48 @@ class CacheManager:
         if not self.enabled:
             return False
 
+        metrics = self.metrics
+        started = time.perf_counter()
+
         try:
-            redis = await get_async_redis_client()
+            redis = await get_async_redis_binary_client()
             full_key = self._make_key(key)
 
-            # Serialize to JSON
-            serialized = json.dumps(value, default=str)
+            serialized = serializer.dumps(value)
+
+            if self.policy.max_value_bytes is not None and len(serialized) > self.policy.max_value_bytes:
+                metrics.rejected += 1
+                logger.warning(
+                    f"Cache value for {full_key} too large ({len(serialized)} bytes), not cached"
+                )
+                return False
+
+            ttl = self._resolve_ttl(ttl)
+
+            if self.l1_enabled or tags or self.policy.track_warm_hits:
+                pipe = redis.pipeline(transaction=False)
+                pipe.setex(full_key, ttl, serialized)
+
+                if tags:
+                    add_tags(pipe, full_key, tags, ttl)
 
-            # Set with TTL
-            if ttl is None:
-                ttl = RedisConfig.CACHE_TTL_MEDIUM
+                if self.policy.track_warm_hits:
+                    # A normal write replaces any warmed value
+                    pipe.srem(_warm_set_key(self.namespace), full_key)
 
-            await redis.setex(full_key, ttl, serialized)
+                if self.l1_enabled:
+                    # Other workers drop their copy; ours refills from Redis on next get
+                    _l1_cache.delete(full_key)
+                    pipe.publish(
+                        RedisConfig.CACHE_INVALIDATION_CHANNEL, _invalidation_message(keys=[full_key])
+                    )
+
+                await pipe.execute()
+            else:
+                await redis.setex(full_key, ttl, serialized)
+
+            metrics.sets += 1
+            metrics.bytes_written += len(serialized)
 
             if RedisConfig.CACHE_DEBUG:
                 logger.debug(f"Cache SET: {full_key} (TTL: {ttl}s)")
@@ -136,9 +847,241 @@ class CacheManager:
             return True
 
         except Exception as e:
+            metrics.errors += 1
             logger.error(f"Cache set error for key {key}: {e}")
             return False
 
+        finally:
+            metrics.set_time_ms += (time.perf_counter() - started) * 1000
+
+    async def _get_tracking_warm_hit(self, redis, full_key: str) -> Optional[bytes]:
+        """GET that counts the first read of a warmed entry"""
+        result = await _script(redis, _GET_TRACKING_WARM_SCRIPT)(
+            keys=[full_key, _warm_set_key(self.namespace), WARM_STATS_KEY],
+            args=[f"{self.namespace}:warm_hits"],
+            client=redis,
+        )
+        if result is None:
+            return None
+
+        value, warm_hit = result
+        if warm_hit:
+            self.metrics.warm_hits += 1
+        return value
+
+    async def warm(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None,
+        tags: Optional[List[str]] = None
+    ) -> bool:
+        """
+        Write a precomputed value ahead of demand.
+
+        Same as set(), but in namespaces with track_warm_hits the entry is
+        remembered until its first read, which feeds the warm hit ratio
+        (CacheStats.get_warm_stats).
+
+        Returns:
+            True if the value was cached
+        """
+        if not await self.set(key, value, ttl=ttl, tags=tags):
+            return False
+
+        self.metrics.warmed += 1
+
+        if self.policy.track_warm_hits:
+            full_key = self._make_key(key)
+            warm_set = _warm_set_key(self.namespace)
+            try:
+                redis = await get_async_redis_client()
+                pipe = redis.pipeline(transaction=False)
+                pipe.sadd(warm_set, full_key)
+                pipe.expire(warm_set, max(self._resolve_ttl(ttl), RedisConfig.CACHE_TTL_VERY_LONG))
+                pipe.hincrby(WARM_STATS_KEY, f"{self.namespace}:warmed", 1)
+                await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Failed to record warmed cache key {full_key}: {e}")
+
+        return True
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Get several values in one round trip (L1 first, then MGET).
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Dictionary of key -> value for the keys that were cached
+        """
+        keys = list(dict.fromkeys(keys))
+        if not self.enabled or not keys:
+            return {}
+
+        metrics = self.metrics
+        found: Dict[str, Any] = {}
+        remaining = keys
+
+        if self.l1_enabled:
+            _ensure_invalidation_listener()
+            remaining = []
+            for key in keys:
+                value = _l1_cache.get(self._make_key(key))
+                if value is None:
+                    remaining.append(key)
+                else:
+                    found[key] = value
+            metrics.hits += len(found)
+            metrics.l1_hits += len(found)
+
+        if not remaining:
+            return found
+
+        started = time.perf_counter()
+        try:
+            redis = await get_async_redis_binary_client()
+            values = await redis.mget([self._make_key(key) for key in remaining])
+
+            for key, value in zip(remaining, values):
+                if value is None:
+                    continue
+                result = serializer.loads(value)
+                found[key] = result
+                if self.l1_enabled:
+                    _l1_cache.set(self._make_key(key), result, ttl=self.l1_ttl)
+
+            hits = sum(1 for key in remaining if key in found)
+            _l2_stats["hits"] += hits
+            _l2_stats["misses"] += len(remaining) - hits
+            metrics.hits += hits
+            metrics.misses += len(remaining) - hits
+
+        except Exception as e:
+            metrics.errors += 1
+            metrics.misses += len(remaining)
+            logger.error(f"Cache get_many error for {len(remaining)} keys: {e}")
+
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            metrics.get_time_ms += elapsed_ms
+            metrics.max_get_ms = max(metrics.max_get_ms, elapsed_ms)
+
+        return found
+
+    async def set_many(
+        self,
+        items: Dict[str, Any],
+        ttl: Optional[int] = None,
+        tags: Optional[List[str]] = None
+    ) -> bool:
+        """
+        Set several values in one pipelined round trip.
+
+        Args:
+            items: Dictionary of key -> value
+            ttl: Time to live in seconds (default: namespace policy)
+            tags: Tags to register every key under (see invalidate_tags)
+
+        Returns:
+            True if successful
+        """
+        if not self.enabled or not items:
+            return False
+
+        metrics = self.metrics
+        started = time.perf_counter()
+        ttl = self._resolve_ttl(ttl)
+
+        try:
+            redis = await get_async_redis_binary_client()
+            pipe = redis.pipeline(transaction=False)
+            full_keys = []
+            written = 0
+
+            for key, value in items.items():
+                serialized = serializer.dumps(value)
+                if self.policy.max_value_bytes is not None and len(serialized) > self.policy.max_value_bytes:
+                    metrics.rejected += 1
+                    continue
+
+                full_key = self._make_key(key)
+                pipe.setex(full_key, ttl, serialized)
+                if tags:
+                    add_tags(pipe, full_key, tags, ttl)
+                full_keys.append(full_key)
+                written += len(serialized)
+
+            if not full_keys:
+                return False
+
+            if self.l1_enabled:
+                for full_key in full_keys:
+                    _l1_cache.delete(full_key)
+                pipe.publish(
+                    RedisConfig.CACHE_INVALIDATION_CHANNEL, _invalidation_message(keys=full_keys)
+                )
+
+            await pipe.execute()
+
+            metrics.sets += len(full_keys)
+            metrics.bytes_written += written
+            return True
+
+        except Exception as e:
+            metrics.errors += 1
+            logger.error(f"Cache set_many error for {len(items)} keys: {e}")
+            return False
+
+        finally:
+            metrics.set_time_ms += (time.perf_counter() - started) * 1000
+
+    async def hydrate(
+        self,
+        ids: List[Hashable],
+        key_for: Callable[[Hashable], str],
+        loader: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]],
+        ttl: Optional[int] = None,
+        tags: Optional[List[str]] = None
+    ) -> List[Any]:
+        """
+        Resolve entities by ID through the cache (entity-cache pattern).
+
+        List endpoints cache only their ordered ID lists and hydrate the
+        entities here: one MGET for all IDs, one loader call for the misses,
+        one pipelined write to cache them. Entities are shared by every list
+        (and detail view) that contains them.
+
+        Args:
+            ids: Entity IDs in the order to return
+            key_for: ID -> cache key
+            loader: Async callable loading missing IDs -> {id: entity}
+            ttl: Entity TTL in seconds (default: namespace policy)
+            tags: Tags to register newly cached entities under
+
+        Returns:
+            Entities in the order of ids (IDs the loader did not return are skipped)
+        """
+        if not ids:
+            return []
+
+        cached = await self.get_many(key_for(entity_id) for entity_id in ids)
+        entities = {entity_id: cached[key_for(entity_id)] for entity_id in ids if key_for(entity_id) in cached}
+
+        missing = [entity_id for entity_id in dict.fromkeys(ids) if entity_id not in entities]
+        if missing:
+            loaded = await loader(missing)
+            entities.update(loaded)
+
+            await self.set_many(
+                {key_for(entity_id): entity for entity_id, entity in loaded.items()},
+                ttl=ttl,
+                tags=tags
+            )
+
+        return [entities[entity_id] for entity_id in ids if entity_id in entities]
+
     async def delete(self, key: str) -> bool:
         """
         Delete key from cache.
@@ -152,11 +1095,19 @@ class CacheManager:
         if not self.enabled:
             return False
 
+        full_key = self._make_key(key)
+        if self.l1_enabled:
+            _l1_cache.delete(full_key)
+
         try:
             redis = await get_async_redis_client()
-            full_key = self._make_key(key)
             await redis.delete(full_key)
 
+            if self.l1_enabled:
+                await redis.publish(
+                    RedisConfig.CACHE_INVALIDATION_CHANNEL, _invalidation_message(keys=[full_key])
+                )
+
             if RedisConfig.CACHE_DEBUG:
                 logger.debug(f"Cache DELETE: {full_key}")
 
@@ -166,10 +1117,28 @@ class CacheManager:
             logger.error(f"Cache delete error for key {key}: {e}")
             return False
 
+    async def invalidate_tags(self, *tags: str) -> int:
+        """
+        Delete all entries registered under any of the tags (any namespace).
+
+        Args:
+            *tags: Tags to invalidate (e.g. "user:123:posts")
+
+        Returns:
+            Number of keys deleted
+        """
+        if not self.enabled:
+            return 0
+
+        return await invalidate_tags(*tags)
+
     async def delete_pattern(self, pattern: str) -> int:
         """
         Delete all keys matching pattern.
 
+        This scans the whole keyspace; prefer tags + invalidate_tags for
+        anything on a request path.
+
         Args:
             pattern: Glob pattern (e.g., "user:123:*")
 
@@ -179,24 +1148,34 @@ class CacheManager:
         if not self.enabled:
             return 0
 
+        full_pattern = self._make_key(pattern)
+
         try:
             redis = await get_async_redis_client()
-            full_pattern = self._make_key(pattern)
 
             # Get all matching keys
             keys = []
             async for key in redis.scan_iter(match=full_pattern):
                 keys.append(key)
 
-            if keys:
-                deleted = await redis.delete(*keys)
-                if RedisConfig.CACHE_DEBUG:
-                    logger.debug(f"Cache DELETE PATTERN: {full_pattern} ({deleted} keys)")
-                return deleted
+            deleted = await redis.delete(*keys) if keys else 0
 
-            return 0
+            # Drop L1 copies only once the keys are gone, so no worker can
+            # refill its L1 from them in between
+            if self.l1_enabled:
+                _l1_cache.delete_pattern(full_pattern)
+                await redis.publish(
+                    RedisConfig.CACHE_INVALIDATION_CHANNEL,
+                    _invalidation_message(pattern=full_pattern)
+                )
+
+            if deleted and RedisConfig.CACHE_DEBUG:
+                logger.debug(f"Cache DELETE PATTERN: {full_pattern} ({deleted} keys)")
+            return deleted
 
         except Exception as e:
+            if self.l1_enabled:
+                _l1_cache.delete_pattern(full_pattern)
             logger.error(f"Cache delete pattern error for {pattern}: {e}")
             return 0
 
@@ -241,6 +1220,13 @@ class CacheManager:
             full_key = self._make_key(key)
             new_value = await redis.incrby(full_key, amount)
 
+            # Counters read through get() may sit in other workers' L1 too
+            if self.l1_enabled:
+                _l1_cache.delete(full_key)
+                await redis.publish(
+                    RedisConfig.CACHE_INVALIDATION_CHANNEL, _invalidation_message(keys=[full_key])
+                )
+
             # Set TTL if provided and this is a new key
             if ttl and new_value == amount:
                 await redis.expire(full_key, ttl)
@@ -272,9 +1258,110 @@ class CacheManager:
             logger.error(f"Cache get_ttl error for key {key}: {e}")
             return None
 
+    async def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+        stale_ttl: int = 0,
+        single_flight: bool = True,
+        tags: Optional[List[str]] = None
+    ) -> Any:
+        """
+        Get a value, loading and caching it on a miss.
+
+        With single_flight, concurrent misses for the same key run the loader
+        once (per process, and across processes via a Redis lock). With
+        stale_ttl, values are kept stale_ttl seconds past their ttl; a stale
+        hit is returned immediately while one caller refreshes it in the
+        background, so the loader must not depend on request-scoped
+        resources (e.g. the request's DB session).
+
+        Args:
+            key: Cache key
+            loader: Async callable producing the value (None is not cached)
+            ttl: Freshness lifetime in seconds (default: namespace policy)
+            stale_ttl: Extra seconds a stale value may be served (0 = off)
+            single_flight: Coalesce concurrent loads of the same key
+            tags: Tags to register the key under (see invalidate_tags)
+
+        Returns:
+            Cached or freshly loaded value
+        """
+        if not self.enabled:
+            return await loader()
+
+        ttl = self._resolve_ttl(ttl)
+
+        cached = await self.get(key)
+        if cached is not None:
+            value, fresh = _unwrap_stale(cached)
+            if not fresh:
+                self._schedule_refresh(key, loader, ttl, stale_ttl, tags)
+            return value
+
+        async def load():
+            return await self._load_and_store(key, loader, ttl, stale_ttl, tags)
+
+        if not single_flight:
+            return await load()
+
+        async def read():
+            cached_value = await self.get(key)
+            return None if cached_value is None else _unwrap_stale(cached_value)[0]
+
+        return await run_single_flight(self._make_key(key), load, read)
+
+    async def _load_and_store(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int,
+        tags: Optional[List[str]] = None
+    ) -> Any:
+        """Run the loader and cache its result (wrapped when serving stale)"""
+        result = await loader()
+
+        if result is not None:
+            if stale_ttl:
+                await self.set(key, _wrap_stale(result, ttl), ttl=ttl + stale_ttl, tags=tags)
+            else:
+                await self.set(key, result, ttl=ttl, tags=tags)
+
+        return result
+
+    def _schedule_refresh(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int,
+        tags: Optional[List[str]] = None
+    ):
+        """Refresh a stale key in the background unless a refresh is already running"""
+        full_key = self._make_key(key)
+        flight_key = f"refresh:{full_key}"
+        if flight_key in _inflight:
+            return
+
+        async def refresh():
+            acquired, token = await _acquire_fill_lock(full_key)
+            if not acquired:
+                return None  # Another worker is refreshing
+            try:
+                return await self._load_and_store(key, loader, ttl, stale_ttl, tags)
+            except Exception as e:
+                logger.warning(f"Background cache refresh failed for {full_key}: {e}")
+                return None
+            finally:
+                await _release_fill_lock(full_key, token)
+
+        _start_flight(flight_key, refresh())
+
 
 # Create default cache manager instance
-cache = CacheManager()
+cache = get_cache("aipost")
 
 
 def cache_key(*args, **kwargs) -> str:
@@ -302,7 +1389,9 @@ def cache_key(*args, **kwargs) -> str:
 def cached(
     ttl: int = RedisConfig.CACHE_TTL_MEDIUM,
     key_prefix: str = "",
-    key_builder: Optional[Callable] = None
+    key_builder: Optional[Callable] = None,
+    single_flight: bool = False,
+    stale_ttl: int = 0
 ):
     """
     Decorator for caching async function results.
@@ -313,10 +1402,17 @@ def cached(
             # Expensive database query
             return await db.query(User).filter(User.id == user_id).first()
 
+        @cached(ttl=60, key_prefix="feeds", single_flight=True, stale_ttl=300)
+        async def get_popular_feeds():
+            ...
+
     Args:
         ttl: Cache TTL in seconds (default: 5 minutes)
         key_prefix: Prefix for cache key (default: "")
         key_builder: Custom function to build cache key from args
+        single_flight: Run the function once for concurrent misses of a key
+        stale_ttl: Serve values up to this many seconds past ttl while one
+            caller refreshes in the background (0 = off)
 
     Returns:
         Decorated async function
@@ -332,6 +1428,15 @@ def cached(
 
             full_key = f"{key_prefix}:{func.__name__}:{cache_key_str}"
 
+            if single_flight or stale_ttl:
+                return await cache.get_or_set(
+                    full_key,
+                    lambda: func(*args, **kwargs),
+                    ttl=ttl,
+                    stale_ttl=stale_ttl,
+                    single_flight=single_flight
+                )
+
             # Try to get from cache
             cached_value = await cache.get(full_key)
             if cached_value is not None:
@@ -373,6 +1478,79 @@ def cached(
 class CacheStats:
     """Utility class for gathering cache statistics."""
 
+    @staticmethod
+    def get_tier_stats() -> dict:
+        """
+        Get this process's L1 and L2 hit rates.
+
+        L2 counts only lookups that reached Redis (L1 misses).
+
+        Returns:
+            Dictionary with "l1" and "l2" sections
+        """
+        l2_total = _l2_stats["hits"] + _l2_stats["misses"]
+
+        return {
+            "l1": {
+                "enabled": RedisConfig.CACHE_L1_ENABLED,
+                **_l1_cache.get_stats(),
+                "invalidations_published": _invalidation_stats["published"],
+                "invalidations_received": _invalidation_stats["received"],
+                "listener_running": (
+                    _invalidation_listener is not None and not _invalidation_listener.done()
+                ),
+            },
+            "l2": {
+                "hits": _l2_stats["hits"],
+                "misses": _l2_stats["misses"],
+                "hit_rate_percent": (
+                    round((_l2_stats["hits"] / l2_total) * 100, 2) if l2_total > 0 else 0.0
+                ),
+            },
+        }
+
+    @staticmethod
+    def get_namespace_stats() -> dict:
+        """
+        Get this process's per-namespace metrics and policies.
+
+        Returns:
+            Dictionary of namespace -> metrics (hit rate, latency, sizes) and policy
+        """
+        namespaces = set(_namespace_metrics) | set(_namespace_policies)
+        return {
+            namespace: {
+                **get_namespace_metrics(namespace).to_dict(),
+                "policy": asdict(get_namespace_policy(namespace)),
+            }
+            for namespace in sorted(namespaces)
+        }
+
+    @staticmethod
+    async def get_warm_stats() -> dict:
+        """
+        Get cache warming effectiveness across all workers.
+
+        Returns:
+            Dictionary of namespace -> warmed entries, warm hits (warmed
+            entries read at least once) and warm hit ratio
+        """
+        redis = await get_async_redis_client()
+        counters = await redis.hgetall(WARM_STATS_KEY)
+
+        stats: Dict[str, Dict[str, Any]] = {}
+        for field, count in counters.items():
+            namespace, _, counter = field.rpartition(":")
+            stats.setdefault(namespace, {"warmed": 0, "warm_hits": 0})[counter] = int(count)
+
+        for namespace_stats in stats.values():
+            warmed = namespace_stats["warmed"]
+            namespace_stats["warm_hit_rate_percent"] = (
+                round((namespace_stats["warm_hits"] / warmed) * 100, 2) if warmed > 0 else 0.0
+            )
+
+        return stats
+
     @staticmethod
     async def get_stats() -> dict:
         """
@@ -380,6 +1558,8 @@ class CacheStats:
 
         Returns:
             Dictionary with cache stats including hit rate, memory usage, etc.
+            plus separate L1 (in-process) and L2 (Redis) hit rates and
+            per-namespace metrics
         """
         try:
             redis = await get_async_redis_client()
@@ -407,13 +1587,18 @@ class CacheStats:
                 "expired_keys": info.get("expired_keys", 0),
                 "uptime_seconds": info.get("uptime_in_seconds"),
                 "redis_version": info.get("redis_version"),
+                **CacheStats.get_tier_stats(),
+                "namespaces": CacheStats.get_namespace_stats(),
+                "warming": await CacheStats.get_warm_stats(),
             }
         except Exception as e:
             logger.error(f"Failed to get cache stats: {e}")
             return {
                 "enabled": RedisConfig.CACHE_ENABLED,
                 "connected": False,
-                "error": str(e)
+                "error": str(e),
+                **CacheStats.get_tier_stats(),
+                "namespaces": CacheStats.get_namespace_stats(),
             }
 
     @staticmethod
@@ -427,6 +1612,11 @@ class CacheStats:
         try:
             redis = await get_async_redis_client()
             await redis.flushdb()
+            _l1_cache.clear()
+            if RedisConfig.CACHE_L1_ENABLED:
+                await redis.publish(
+                    RedisConfig.CACHE_INVALIDATION_CHANNEL, _invalidation_message(pattern="*")
+                )
             logger.warning("Cache flushed - all keys deleted")
             return True
         except Exception as e:
@@ -0,0 +1,236 @@
+"""
+Cache Serialization
+
+Binary encoding for cached payloads shared by all cache layers.
+
+Format (version 1):
+    byte 0   FORMAT_VERSION (0x01)
+    byte 1   codec id (low nibble) | compression id (high nibble)
+    byte 2+  payload
+
+Legacy entries written as plain JSON text (before this module existed) can
+never start with byte 0x01, so they are still decoded transparently. Readers
+decode every registered codec and compression regardless of what they are
+configured to write, which lets a new codec be rolled out worker by worker.
+
+Usage:
+    from utils.cache_serializer import serializer
+
+    data = serializer.dumps({"articles": [...]})
+    value = serializer.loads(data)
+"""
+import json
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+from loguru import logger
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.redis_config import RedisConfig
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import lz4.frame
+
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+
+FORMAT_VERSION = 1
+
+# Codec and compression ids are part of the stored format: never reuse them
+CODEC_JSON = 0
+CODEC_ORJSON = 1
+CODEC_MSGPACK = 2
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_LZ4 = 2
+
+ZLIB_LEVEL = 1  # Favour speed; cached payloads are mostly repetitive JSON-like text
+
+
+# ============================================================================
+# CODECS
+# ============================================================================
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, default=str, separators=(",", ":")).encode("utf-8")
+
+
+def _json_loads(data: bytes) -> Any:
+    return json.loads(data)
+
+
+def _orjson_dumps(value: Any) -> bytes:
+    # Datetimes go through default=str like the stdlib codec, so cached
+    # values read back the same whichever codec wrote them
+    return orjson.dumps(
+        value,
+        default=str,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+    )
+
+
+def _msgpack_default(value: Any) -> str:
+    return str(value)
+
+
+def _msgpack_dumps(value: Any) -> bytes:
+    return msgpack.packb(value, default=_msgpack_default, use_bin_type=True)
+
+
+def _msgpack_loads(data: bytes) -> Any:
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+# codec id -> (name, dumps, loads)
+_CODECS: Dict[int, Tuple[str, Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    CODEC_JSON: ("json", _json_dumps, _json_loads),
+}
+
+if ORJSON_AVAILABLE:
+    _CODECS[CODEC_ORJSON] = ("orjson", _orjson_dumps, orjson.loads)
+
+if MSGPACK_AVAILABLE:
+    _CODECS[CODEC_MSGPACK] = ("msgpack", _msgpack_dumps, _msgpack_loads)
+
+# compression id -> (name, compress, decompress)
+_COMPRESSIONS: Dict[int, Tuple[str, Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    COMPRESSION_ZLIB: ("zlib", lambda data: zlib.compress(data, ZLIB_LEVEL), zlib.decompress),
+}
+
+if LZ4_AVAILABLE:
+    _COMPRESSIONS[COMPRESSION_LZ4] = ("lz4", lz4.frame.compress, lz4.frame.decompress)
+
+
+def register_codec(
+    codec_id: int,
+    name: str,
+    dumps: Callable[[Any], bytes],
+    loads: Callable[[bytes], Any]
+):
+    """
+    Register an additional codec.
+
+    Args:
+        codec_id: Stored id (0-15), unique and stable forever
+        name: Name used in CACHE_SERIALIZER
+        dumps: Value -> bytes
+        loads: Bytes -> value
+    """
+    if not 0 <= codec_id <= 15:
+        raise ValueError("codec_id must be between 0 and 15")
+    _CODECS[codec_id] = (name, dumps, loads)
+
+
+def _lookup(table: Dict[int, tuple], name: str) -> Optional[int]:
+    for entry_id, entry in table.items():
+        if entry[0] == name:
+            return entry_id
+    return None
+
+
+# ============================================================================
+# SERIALIZER
+# ============================================================================
+
+class CacheSerializer:
+    """
+    Encodes cache values with a configured codec and optional compression.
+
+    Payloads at or above compress_min_bytes are compressed, and stored
+    compressed only if that actually saves space.
+    """
+
+    def __init__(
+        self,
+        codec: str = "orjson",
+        compression: str = "zlib",
+        compress_min_bytes: int = 1024
+    ):
+        codec_id = _lookup(_CODECS, codec)
+        if codec_id is None:
+            logger.warning(f"Cache codec '{codec}' unavailable, falling back to json")
+            codec_id = CODEC_JSON
+
+        compression_id = COMPRESSION_NONE
+        if compression and compression != "none":
+            compression_id = _lookup(_COMPRESSIONS, compression)
+            if compression_id is None:
+                logger.warning(f"Cache compression '{compression}' unavailable, falling back to zlib")
+                compression_id = COMPRESSION_ZLIB
+
+        self.codec_id = codec_id
+        self.compression_id = compression_id
+        self.compress_min_bytes = compress_min_bytes
+
+    @property
+    def codec_name(self) -> str:
+        return _CODECS[self.codec_id][0]
+
+    def dumps(self, value: Any) -> bytes:
+        """Encode a value for storage"""
+        payload = _CODECS[self.codec_id][1](value)
+        compression_id = COMPRESSION_NONE
+
+        if self.compression_id != COMPRESSION_NONE and len(payload) >= self.compress_min_bytes:
+            compressed = _COMPRESSIONS[self.compression_id][1](payload)
+            if len(compressed) < len(payload):
+                payload = compressed
+                compression_id = self.compression_id
+
+        header = bytes((FORMAT_VERSION, self.codec_id | (compression_id << 4)))
+        return header + payload
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """
+        Decode a stored value (any registered codec, or legacy JSON text).
+
+        Raises:
+            ValueError: Unknown format version, codec or compression
+        """
+        if isinstance(data, str):
+            return json.loads(data)
+
+        if not data or data[0] != FORMAT_VERSION:
+            return json.loads(data)
+
+        flags = data[1]
+        codec_id = flags & 0x0F
+        compression_id = flags >> 4
+        payload = data[2:]
+
+        if compression_id != COMPRESSION_NONE:
+            if compression_id not in _COMPRESSIONS:
+                raise ValueError(f"Unknown cache compression id {compression_id}")
+            payload = _COMPRESSIONS[compression_id][2](payload)
+
+        if codec_id not in _CODECS:
+            raise ValueError(f"Unknown cache codec id {codec_id}")
+
+        return _CODECS[codec_id][2](payload)
+
+
+# Shared serializer configured from CACHE_SERIALIZER / CACHE_COMPRESSION
+serializer = CacheSerializer(
+    codec=RedisConfig.CACHE_SERIALIZER,
+    compression=RedisConfig.CACHE_COMPRESSION,
+    compress_min_bytes=RedisConfig.CACHE_COMPRESS_MIN_BYTES,
+)
@@ -0,0 +1,105 @@
+"""
+Per-User Data Versions
+
+Monotonic counters in Redis that change whenever a user's data changes:
+- articles: new articles ingested, bookmarks changed
+- feeds: feed subscriptions or feed status changed
+- posts: posts created, generated, updated, published or deleted
+- system: global data shared by all users (system sources)
+
+Writers bump the scopes they touch; readers (the HTTP response cache)
+combine the versions into an ETag, so "has anything changed?" is a single
+MGET instead of a database query.
+
+Counters are seeded from the current time the first time they are used, so
+a counter that expires and is recreated never repeats an earlier value.
+
+Usage:
+    from utils.data_version import bump_data_version
+
+    await bump_data_version(user.id, "articles", "feeds")
+"""
+import time
+from typing import Dict, Iterable, Optional
+from loguru import logger
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.redis_config import get_async_redis_client, RedisConfig
+
+
+SCOPES = ("articles", "feeds", "posts", "system")
+
+
+def _version_key(scope: str, user_id: Optional[int]) -> str:
+    if scope == "system":
+        return "dataver:system:global"
+    return f"dataver:{scope}:{user_id}"
+
+
+def _seed() -> int:
+    return time.time_ns() // 1_000_000
+
+
+async def bump_data_version(user_id: Optional[int], *scopes: str):
+    """
+    Mark a user's data as changed.
+
+    Failures are logged and swallowed: a missed bump only means clients
+    revalidate against a stale ETag until the next bump.
+
+    Args:
+        user_id: Owner of the data (ignored for the "system" scope)
+        *scopes: Scopes that changed
+    """
+    if user_id is None and any(scope != "system" for scope in scopes):
+        return
+
+    try:
+        redis = await get_async_redis_client()
+        ttl = RedisConfig.DATA_VERSION_TTL
+        async with redis.pipeline(transaction=False) as pipe:
+            for scope in scopes:
+                key = _version_key(scope, user_id)
+                pipe.set(key, _seed(), nx=True, ex=ttl)
+                pipe.incr(key)
+                pipe.expire(key, ttl)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to bump data version {scopes} for user {user_id}: {e}")
+
+
+async def get_data_versions(user_id: Optional[int], scopes: Iterable[str]) -> Dict[str, str]:
+    """
+    Read the current versions of a user's scopes.
+
+    Missing counters are seeded so the returned versions are stable until
+    the next bump.
+
+    Args:
+        user_id: Owner of the data
+        scopes: Scopes to read
+
+    Returns:
+        Mapping of scope -> version
+
+    Raises:
+        Redis errors are propagated so callers can skip caching
+    """
+    scopes = list(scopes)
+    keys = [_version_key(scope, user_id) for scope in scopes]
+    redis = await get_async_redis_client()
+
+    values = await redis.mget(keys)
+    missing = [key for key, value in zip(keys, values) if value is None]
+
+    if missing:
+        async with redis.pipeline(transaction=False) as pipe:
+            for key in missing:
+                pipe.set(key, _seed(), nx=True, ex=RedisConfig.DATA_VERSION_TTL)
+            await pipe.execute()
+        values = await redis.mget(keys)
+
+    return {scope: str(value) for scope, value in zip(scopes, values)}
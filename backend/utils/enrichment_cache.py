@@ -0,0 +1,207 @@
+"""
+Enrichment Cache - Share article enrichment results across users and restarts
+
+Article enrichment downloads the page, runs readability, extracts images and
+topics and builds a summary. The same URL is frequently enriched for several
+users (everyone subscribed to the same feed), so the results are stored in
+Redis keyed by canonical URL and reused.
+
+Cache entries carry a hash of the markup they were built from:
+- Lookups that supply content (feed entries) only hit when the hash matches,
+  so an updated article is re-enriched.
+- Lookups without content (page fetch) accept entries built from the page
+  itself, skipping the download entirely.
+"""
+import hashlib
+from datetime import datetime
+from typing import Optional, Dict, Any
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from loguru import logger
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.cache_manager import get_cache
+from config.redis_config import RedisConfig
+
+
+# Query parameters that never change the article content
+TRACKING_PARAMS = {
+    "utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content",
+    "utm_name", "fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src",
+    "cmpid", "ocid", "igshid",
+}
+
+# Fields shared across users. Category is left out: it can come from the
+# user's own feed tags, and re-classifying cached text is cheap.
+CACHED_FIELDS = (
+    "full_text",
+    "content_for_ai",
+    "featured_image",
+    "auto_summary",
+    "quality_score",
+    "author",
+    "publish_date",
+    "reading_time",
+    "topics",
+    "ai_context",
+    "ai_context_tokens",
+)
+
+# Cache enrichment for 7 days - pages rarely change after publication
+ENRICHMENT_CACHE_TTL = RedisConfig.CACHE_TTL_VERY_LONG * 7
+
+# Schema version, bump when the cached shape changes
+ENRICHMENT_CACHE_VERSION = 1
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize an article URL so trivially different links share a cache entry.
+
+    Lowercases scheme and host, drops the fragment, default ports, tracking
+    parameters and trailing slashes, and sorts the remaining query parameters.
+
+    Args:
+        url: Article URL
+
+    Returns:
+        Canonical URL string
+    """
+    if not url:
+        return ""
+
+    try:
+        parts = urlsplit(url.strip())
+        scheme = parts.scheme.lower() or "http"
+        host = (parts.hostname or "").lower()
+        if host.startswith("www."):
+            host = host[4:]
+
+        port = parts.port
+        if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+            host = f"{host}:{port}"
+
+        path = parts.path.rstrip("/") or "/"
+
+        query = urlencode(sorted(
+            (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if k.lower() not in TRACKING_PARAMS
+        ))
+
+        return urlunsplit((scheme, host, path, query, ""))
+
+    except ValueError:
+        return url.strip()
+
+
+def content_hash(content: Optional[str]) -> Optional[str]:
+    """
+    Hash article markup for cache validation.
+
+    Args:
+        content: Raw HTML/text the enrichment was built from
+
+    Returns:
+        SHA256 hex digest (first 32 chars), or None for empty content
+    """
+    if not content:
+        return None
+    return hashlib.sha256(content.encode("utf-8", errors="ignore")).hexdigest()[:32]
+
+
+class EnrichmentCache:
+    """
+    Redis-backed cache for article enrichment results.
+
+    Keyed by canonical URL; values hold the shared enrichment fields plus the
+    hash and origin ("page" or "feed") of the markup they were built from.
+    """
+
+    _cache = get_cache("enrichment")
+
+    @staticmethod
+    def _key(url: str) -> str:
+        """Build cache key from canonical URL hash"""
+        canonical = canonicalize_url(url)
+        return f"url:{hashlib.sha256(canonical.encode()).hexdigest()[:32]}"
+
+    @staticmethod
+    async def get(url: str, source_content: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get cached enrichment for a URL if it is still valid.
+
+        Args:
+            url: Article URL
+            source_content: Markup the caller would enrich from (None = page fetch)
+
+        Returns:
+            Dictionary of enrichment fields, or None on miss/stale entry
+        """
+        if not url:
+            return None
+
+        entry = await EnrichmentCache._cache.get(EnrichmentCache._key(url))
+        if not entry or entry.get("version") != ENRICHMENT_CACHE_VERSION:
+            return None
+
+        if source_content is not None:
+            # Caller has content: only reuse if it is what we enriched last time
+            if entry.get("content_hash") != content_hash(source_content):
+                logger.debug(f"Enrichment cache STALE (content changed): {url}")
+                return None
+        elif entry.get("origin") != "page":
+            # Caller wants the full page; a feed-derived entry is not enough
+            return None
+
+        logger.debug(f"Enrichment cache HIT: {url}")
+        return entry.get("data")
+
+    @staticmethod
+    async def set(
+        url: str,
+        enriched: Dict[str, Any],
+        source_content: Optional[str],
+        origin: str = "page"
+    ) -> bool:
+        """
+        Store enrichment results for a URL.
+
+        Args:
+            url: Article URL
+            enriched: Enriched article data
+            source_content: Markup the enrichment was built from
+            origin: "page" (downloaded) or "feed" (feed-provided content)
+
+        Returns:
+            True if caching successful
+        """
+        if not url or not enriched.get("full_text"):
+            return False
+
+        entry = {
+            "version": ENRICHMENT_CACHE_VERSION,
+            "canonical_url": canonicalize_url(url),
+            "origin": origin,
+            "content_hash": content_hash(source_content),
+            "cached_at": datetime.utcnow().isoformat(),
+            "data": {field: enriched.get(field) for field in CACHED_FIELDS},
+        }
+
+        return await EnrichmentCache._cache.set(
+            EnrichmentCache._key(url), entry, ttl=ENRICHMENT_CACHE_TTL
+        )
+
+    @staticmethod
+    async def invalidate(url: str) -> bool:
+        """
+        Drop cached enrichment for a URL.
+
+        Args:
+            url: Article URL
+
+        Returns:
+            True if successful
+        """
+        return await EnrichmentCache._cache.delete(EnrichmentCache._key(url))
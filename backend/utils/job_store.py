@@ -0,0 +1,451 @@
+"""
+Distributed Job Store
+
+Redis-backed state and queue for background jobs (post and image generation),
+so any API worker can answer a status poll and jobs survive restarts.
+
+Layout (per job kind, e.g. "post"):
+    jobs:{kind}:{id}            hash, one JSON-encoded value per job field
+    jobs:{kind}:{id}:payload    JSON arguments for the worker that runs the job
+    jobs:{kind}:{id}:events     pub/sub channel, one message per update
+    jobs:{kind}:alias:{name}    job id lookup (e.g. latest image job of a post)
+    jobs:{kind}:queue           list of queued job ids (FIFO)
+    jobs:{kind}:claimed         sorted set of claimed job ids by lease expiry
+
+Updates write the changed fields, refresh the TTL and publish the change in
+one Lua script, so readers never see half an update and subscribers are
+notified of every committed one. Finished jobs are kept for
+JOB_FINISHED_TTL seconds, active ones for JOB_TTL.
+
+Queued jobs are claimed atomically (Lua) with a lease. Workers renew the
+lease while a job runs; a job whose lease expires (its worker died) is put
+back on the queue, up to JOB_MAX_ATTEMPTS claims.
+
+When Redis is unavailable the store falls back to process memory, which
+behaves like the previous in-memory job dicts (single worker only).
+
+Usage:
+    from utils.job_store import JobStore
+
+    jobs = JobStore("post")
+    await jobs.create(post_id, {"status": "queued", "progress": 0})
+    await jobs.update(post_id, progress=40, current_step="Generating")
+    job = await jobs.get(post_id)
+"""
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Union
+from loguru import logger
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.redis_config import get_async_redis_client, RedisConfig
+
+
+JobId = Union[int, str]
+
+TERMINAL_STATUSES = {"completed", "failed", "cancelled"}
+
+# Write fields, refresh the TTL and publish, only if the job still exists
+_UPDATE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+for i = 3, #ARGV, 2 do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+redis.call('PUBLISH', KEYS[2], ARGV[2])
+return 1
+"""
+
+# Pop the oldest queued job and lease it to the caller
+_CLAIM_SCRIPT = """
+local job_id = redis.call('RPOP', KEYS[1])
+if not job_id then
+    return nil
+end
+redis.call('ZADD', KEYS[2], ARGV[1], job_id)
+return job_id
+"""
+
+# Move jobs whose lease expired back to the front of the queue
+_REQUEUE_SCRIPT = """
+local stale = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1], 'LIMIT', 0, 100)
+for _, job_id in ipairs(stale) do
+    redis.call('ZREM', KEYS[2], job_id)
+    redis.call('RPUSH', KEYS[1], job_id)
+end
+return stale
+"""
+
+
+def _encode(value: Any) -> str:
+    return json.dumps(value, default=_json_default)
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _decode_fields(fields: Dict[str, str]) -> Dict[str, Any]:
+    return {name: json.loads(value) for name, value in fields.items()}
+
+
+def _is_terminal(fields: Dict[str, Any]) -> bool:
+    status = fields.get("status")
+    return status is not None and str(getattr(status, "value", status)) in TERMINAL_STATUSES
+
+
+class JobStore:
+    """
+    Job state, progress notifications and work queue for one job kind.
+
+    Values are stored as JSON: datetimes come back as ISO strings and enums
+    as their values. Stores of the same kind share job state; `queue` gives
+    one its own work queue (e.g. jobs claimed only when there is room).
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        ttl: Optional[int] = None,
+        finished_ttl: Optional[int] = None,
+        lease_seconds: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        queue: Optional[str] = None
+    ):
+        self.kind = kind
+        self.queue = queue
+        self.ttl = ttl or RedisConfig.JOB_TTL
+        self.finished_ttl = finished_ttl or RedisConfig.JOB_FINISHED_TTL
+        self.lease_seconds = lease_seconds or RedisConfig.JOB_LEASE_SECONDS
+        self.max_attempts = max_attempts or RedisConfig.JOB_MAX_ATTEMPTS
+
+        # Fallback when Redis is unavailable (this process only)
+        self._local: Dict[str, Dict[str, Any]] = {}
+        self._local_aliases: Dict[str, str] = {}
+        self._local_listeners: Dict[str, Set[asyncio.Queue]] = {}
+
+    # ========================================================================
+    # KEYS
+    # ========================================================================
+
+    def _job_key(self, job_id: JobId) -> str:
+        return f"jobs:{self.kind}:{job_id}"
+
+    def _payload_key(self, job_id: JobId) -> str:
+        return f"jobs:{self.kind}:{job_id}:payload"
+
+    def _channel(self, job_id: JobId) -> str:
+        return f"jobs:{self.kind}:{job_id}:events"
+
+    def _alias_key(self, alias: str) -> str:
+        return f"jobs:{self.kind}:alias:{alias}"
+
+    @property
+    def _queue_prefix(self) -> str:
+        return f"jobs:{self.kind}:{self.queue}" if self.queue else f"jobs:{self.kind}"
+
+    @property
+    def _queue_key(self) -> str:
+        return f"{self._queue_prefix}:queue"
+
+    @property
+    def _claimed_key(self) -> str:
+        return f"{self._queue_prefix}:claimed"
+
+    # ========================================================================
+    # STATE
+    # ========================================================================
+
+    async def create(self, job_id: JobId, job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Store a new job, replacing any previous job with the same id
+
+        Args:
+            job_id: Job ID
+            job: Initial job fields
+
+        Returns:
+            The job as stored
+        """
+        encoded = {name: _encode(value) for name, value in job.items()}
+
+        try:
+            redis = await get_async_redis_client()
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.delete(self._job_key(job_id))
+                pipe.hset(self._job_key(job_id), mapping=encoded)
+                pipe.expire(self._job_key(job_id), self.ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Job store unavailable, keeping {self.kind} job {job_id} in memory: {e}")
+            self._local[str(job_id)] = _decode_fields(encoded)
+
+        return _decode_fields(encoded)
+
+    async def get(self, job_id: JobId) -> Optional[Dict[str, Any]]:
+        """Get a job's fields, or None if it does not exist (or expired)"""
+        try:
+            redis = await get_async_redis_client()
+            fields = await redis.hgetall(self._job_key(job_id))
+            if fields:
+                return _decode_fields(fields)
+        except Exception as e:
+            logger.warning(f"Job store unavailable reading {self.kind} job {job_id}: {e}")
+
+        job = self._local.get(str(job_id))
+        return dict(job) if job is not None else None
+
+    async def update(self, job_id: JobId, **fields) -> bool:
+        """
+        Atomically update job fields and notify subscribers
+
+        Nothing is written for a job that does not exist (expired or
+        deleted), so late updates cannot resurrect it.
+
+        Returns:
+            True if the job existed and was updated
+        """
+        if not fields:
+            return False
+
+        encoded = {name: _encode(value) for name, value in fields.items()}
+        event = _encode({"job_id": job_id, **fields})
+        ttl = self.finished_ttl if _is_terminal(fields) else self.ttl
+
+        args = [ttl, event]
+        for name, value in encoded.items():
+            args.extend((name, value))
+
+        try:
+            redis = await get_async_redis_client()
+            updated = await redis.eval(
+                _UPDATE_SCRIPT, 2, self._job_key(job_id), self._channel(job_id), *args
+            )
+            if updated:
+                return True
+            if str(job_id) not in self._local:
+                return False
+        except Exception as e:
+            logger.warning(f"Job store unavailable updating {self.kind} job {job_id}: {e}")
+
+        job = self._local.get(str(job_id))
+        if job is None:
+            return False
+
+        job.update(_decode_fields(encoded))
+        self._notify_local(job_id, json.loads(event))
+        return True
+
+    async def delete(self, job_id: JobId):
+        """Remove a job and its payload"""
+        self._local.pop(str(job_id), None)
+        try:
+            redis = await get_async_redis_client()
+            await redis.delete(self._job_key(job_id), self._payload_key(job_id))
+        except Exception as e:
+            logger.warning(f"Job store unavailable deleting {self.kind} job {job_id}: {e}")
+
+    async def set_alias(self, alias: str, job_id: JobId):
+        """Point a lookup name (e.g. "post:12:user:3") at a job"""
+        self._local_aliases[alias] = str(job_id)
+        try:
+            redis = await get_async_redis_client()
+            await redis.set(self._alias_key(alias), str(job_id), ex=self.ttl)
+        except Exception as e:
+            logger.warning(f"Job store unavailable setting {self.kind} job alias {alias}: {e}")
+
+    async def resolve_alias(self, alias: str) -> Optional[str]:
+        """Job ID a lookup name points at, if any"""
+        try:
+            redis = await get_async_redis_client()
+            job_id = await redis.get(self._alias_key(alias))
+            if job_id is not None:
+                return job_id
+        except Exception as e:
+            logger.warning(f"Job store unavailable resolving {self.kind} job alias {alias}: {e}")
+
+        return self._local_aliases.get(alias)
+
+    # ========================================================================
+    # NOTIFICATIONS
+    # ========================================================================
+
+    def _notify_local(self, job_id: JobId, event: Dict[str, Any]):
+        for queue in self._local_listeners.get(str(job_id), ()):
+            queue.put_nowait(event)
+
+    async def subscribe(self, job_id: JobId) -> "JobSubscription":
+        """
+        Subscribe to the updates of one job, as committed by any worker
+
+        The subscription is active when this returns: subscribe first, then
+        read the current state (get), so no update between the two is missed.
+        Close the subscription when done.
+        """
+        try:
+            redis = await get_async_redis_client()
+            pubsub = redis.pubsub()
+            await pubsub.subscribe(self._channel(job_id))
+            return JobSubscription(pubsub=pubsub)
+        except Exception as e:
+            logger.warning(f"Job events unavailable for {self.kind} job {job_id}, using local events: {e}")
+
+        queue: asyncio.Queue = asyncio.Queue()
+        listeners = self._local_listeners.setdefault(str(job_id), set())
+        listeners.add(queue)
+
+        def unsubscribe():
+            listeners.discard(queue)
+            if not listeners:
+                self._local_listeners.pop(str(job_id), None)
+
+        return JobSubscription(queue=queue, on_close=unsubscribe)
+
+    # ========================================================================
+    # QUEUE
+    # ========================================================================
+
+    async def enqueue(self, job_id: JobId, payload: Dict[str, Any]) -> bool:
+        """
+        Queue a job for the worker pool
+
+        Returns:
+            False if Redis is unavailable (the caller should run the job itself)
+        """
+        try:
+            redis = await get_async_redis_client()
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.set(self._payload_key(job_id), _encode(payload), ex=self.ttl)
+                pipe.lpush(self._queue_key, str(job_id))
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.warning(f"Job queue unavailable for {self.kind} job {job_id}: {e}")
+            return False
+
+    async def claim(self) -> Optional[Dict[str, Any]]:
+        """
+        Claim the oldest queued job
+
+        Returns:
+            {"job_id", "payload", "attempts"} or None if the queue is empty.
+            Jobs over JOB_MAX_ATTEMPTS are marked failed and skipped.
+        """
+        redis = await get_async_redis_client()
+
+        while True:
+            job_id = await redis.eval(
+                _CLAIM_SCRIPT, 2, self._queue_key, self._claimed_key,
+                time.time() + self.lease_seconds
+            )
+            if job_id is None:
+                return None
+
+            payload = await redis.get(self._payload_key(job_id))
+            if payload is None:
+                # Job expired or was deleted while queued
+                await redis.zrem(self._claimed_key, job_id)
+                continue
+
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.hincrby(self._job_key(job_id), "attempts", 1)
+                pipe.expire(self._job_key(job_id), self.ttl)
+                attempts, _ = await pipe.execute()
+            if attempts > self.max_attempts:
+                logger.error(f"{self.kind} job {job_id} abandoned after {attempts - 1} attempts")
+                await self.update(
+                    job_id,
+                    status="failed",
+                    error="Job was interrupted too many times",
+                )
+                await self.complete(job_id)
+                continue
+
+            return {"job_id": job_id, "payload": json.loads(payload), "attempts": attempts}
+
+    async def renew_lease(self, job_id: JobId):
+        """Extend a claimed job's lease (call periodically while it runs)"""
+        redis = await get_async_redis_client()
+        await redis.zadd(
+            self._claimed_key, {str(job_id): time.time() + self.lease_seconds}, xx=True
+        )
+
+    async def complete(self, job_id: JobId):
+        """Release a claimed job once it has finished (successfully or not)"""
+        redis = await get_async_redis_client()
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(self._claimed_key, str(job_id))
+            pipe.delete(self._payload_key(job_id))
+            await pipe.execute()
+
+    async def requeue_stale(self) -> List[str]:
+        """Put jobs whose worker stopped renewing the lease back on the queue"""
+        redis = await get_async_redis_client()
+        stale = await redis.eval(_REQUEUE_SCRIPT, 2, self._queue_key, self._claimed_key, time.time())
+        if stale:
+            logger.warning(f"Requeued {len(stale)} interrupted {self.kind} jobs: {stale}")
+        return list(stale or [])
+
+    async def get_queue_stats(self) -> Dict[str, int]:
+        """Queued and running job counts"""
+        redis = await get_async_redis_client()
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.llen(self._queue_key)
+            pipe.zcard(self._claimed_key)
+            queued, running = await pipe.execute()
+        return {"queued": queued, "running": running}
+
+
+class JobSubscription:
+    """Updates of one job, from Redis pub/sub or (fallback) this process"""
+
+    def __init__(self, pubsub=None, queue: Optional[asyncio.Queue] = None, on_close=None):
+        self._pubsub = pubsub
+        self._queue = queue
+        self._on_close = on_close
+
+    async def next(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Wait for the next update
+
+        Returns:
+            The updated fields (plus job_id), or None if nothing arrived
+            within `timeout` seconds
+        """
+        if self._pubsub is None:
+            try:
+                return await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                return None
+
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            message = await self._pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=remaining
+            )
+            if message and message.get("type") == "message":
+                return json.loads(message["data"])
+
+    async def close(self):
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.unsubscribe()
+                # aclose() is redis-py >= 5.0.1; older versions only have close()
+                close = getattr(self._pubsub, "aclose", None) or self._pubsub.close
+                await close()
+            except Exception as e:
+                logger.warning(f"Failed to close job subscription: {e}")
+        if self._on_close is not None:
+            self._on_close()
@@ -0,0 +1,345 @@
+"""
+LLM Rate Limiter
+
+Client-side rate limiting of LLM calls per provider API key, shared by all
+workers through Redis. Users sharing a key (e.g. the global key from
+api/posts_v2._get_global_api_key) queue for it instead of all running into
+the provider's 429s.
+
+- Two token buckets per key: requests per minute and tokens per minute
+  (LLM_RATE_LIMITS, per provider; 0 = unlimited). A call reserves one
+  request plus its prompt tokens and max_tokens, and the unused tokens are
+  returned when it finishes.
+- Calls that don't fit wait in a fair-share queue: per key, the waiting
+  users are served round-robin (one call each in turn), so one user's burst
+  doesn't hold up everyone else. Queues are per worker, the buckets shared.
+- A call waits at most LLM_RATE_LIMIT_MAX_WAIT seconds, then fails with the
+  provider's usual rate limit error.
+- A 429 from the provider empties the key's buckets, so every worker backs
+  off instead of retrying into it.
+- Calls, queued calls and queue wait time are counted in Redis per provider
+  (get_rate_limit_stats, reported by /api/health/cache/stats).
+
+If Redis is unavailable, calls are not limited.
+"""
+import asyncio
+import os
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional, Tuple
+from loguru import logger
+
+from config.redis_config import get_async_redis_client
+
+
+# Configuration (environment)
+LLM_RATE_LIMIT_ENABLED = os.getenv("LLM_RATE_LIMIT_ENABLED", "true").lower() == "true"
+LLM_RATE_LIMIT_MAX_WAIT = float(os.getenv("LLM_RATE_LIMIT_MAX_WAIT", 30))
+
+# (requests per minute, tokens per minute) per API key
+LLM_RATE_LIMITS: Dict[str, Tuple[int, int]] = {
+    "openai": (int(os.getenv("OPENAI_RPM_LIMIT", 500)), int(os.getenv("OPENAI_TPM_LIMIT", 30000))),
+    "anthropic": (int(os.getenv("ANTHROPIC_RPM_LIMIT", 50)), int(os.getenv("ANTHROPIC_TPM_LIMIT", 40000))),
+    "deepseek": (int(os.getenv("DEEPSEEK_RPM_LIMIT", 0)), int(os.getenv("DEEPSEEK_TPM_LIMIT", 0))),
+}
+
+STATS_KEY = "llmratelimit:stats"
+
+# Refill both buckets, then take one request and ARGV[3] tokens if both
+# have enough. Returns 0 when taken, else the milliseconds until they would.
+_TAKE_SCRIPT = """
+local rpm = tonumber(ARGV[1])
+local tpm = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+
+local state = redis.call('HMGET', KEYS[1], 'requests', 'tokens', 'ts')
+local requests = tonumber(state[1]) or rpm
+local tokens = tonumber(state[2]) or tpm
+local elapsed = math.max(0, now - (tonumber(state[3]) or now))
+
+requests = math.min(rpm, requests + elapsed * rpm / 60000)
+tokens = math.min(tpm, tokens + elapsed * tpm / 60000)
+cost = math.min(cost, tpm)
+
+local wait = 0
+if rpm > 0 and requests < 1 then
+    wait = (1 - requests) * 60000 / rpm
+end
+if tpm > 0 and tokens < cost then
+    wait = math.max(wait, (cost - tokens) * 60000 / tpm)
+end
+
+if wait == 0 then
+    requests = requests - 1
+    tokens = tokens - cost
+    redis.call('HINCRBY', KEYS[2], ARGV[5] .. ':calls', 1)
+end
+
+redis.call('HSET', KEYS[1], 'requests', tostring(requests), 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], 120000)
+return math.ceil(wait)
+"""
+
+
+# Return a finished call's unused tokens (negative: charge its overrun),
+# capped at ARGV[2] (tpm). An expired bucket is left alone: it refills to
+# full when next created, and HINCRBYFLOAT would recreate it without a TTL.
+_SETTLE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens')) or tonumber(ARGV[2])
+tokens = math.min(tonumber(ARGV[2]), tokens + tonumber(ARGV[1]))
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens))
+redis.call('PEXPIRE', KEYS[1], 120000)
+return 1
+"""
+
+
+class RateLimitWaitExceeded(Exception):
+    """The call would have waited longer than LLM_RATE_LIMIT_MAX_WAIT"""
+
+    def __init__(self, wait: float):
+        self.wait = wait
+        super().__init__(f"Rate limit wait of {wait:.1f}s exceeds {LLM_RATE_LIMIT_MAX_WAIT:.0f}s")
+
+
+@dataclass
+class Reservation:
+    """Capacity taken for one call (settle it with the actual usage)"""
+    provider: str
+    bucket: str
+    tokens: int
+    waited: float = 0.0
+
+
+@dataclass
+class _Waiter:
+    future: asyncio.Future
+    tokens: int
+    deadline: float
+
+
+class _FairQueue:
+    """Waiting calls of one API key, served round-robin by user"""
+
+    def __init__(self):
+        self.users: "OrderedDict[Any, Deque[_Waiter]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return sum(len(waiters) for waiters in self.users.values())
+
+    def put(self, user: Any, waiter: _Waiter):
+        self.users.setdefault(user, deque()).append(waiter)
+
+    def next(self) -> Optional[_Waiter]:
+        """Oldest call of the user whose turn it is (the user then goes last)"""
+        while self.users:
+            user, waiters = self.users.popitem(last=False)
+            waiter = waiters.popleft()
+            if waiters:
+                self.users[user] = waiters
+            if not waiter.future.done():  # Not cancelled meanwhile
+                return waiter
+        return None
+
+
+class LLMRateLimiter:
+    """Per API key RPM/TPM buckets in Redis, with per-worker fair-share queues"""
+
+    def __init__(self, limits: Dict[str, Tuple[int, int]], max_wait: float):
+        self.limits = limits
+        self.max_wait = max_wait
+        self._queues: Dict[str, _FairQueue] = {}
+        self._dispatchers: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def _bucket(provider: str, key_id: str) -> str:
+        return f"llmratelimit:{provider}:{key_id}"
+
+    async def _take(self, provider: str, bucket: str, tokens: int) -> float:
+        """Take capacity; returns 0 if taken, else seconds to wait (0 without Redis)"""
+        rpm, tpm = self.limits[provider]
+        try:
+            redis = await get_async_redis_client()
+            wait_ms = await redis.eval(
+                _TAKE_SCRIPT, 2, bucket, STATS_KEY,
+                rpm, tpm, tokens, int(time.time() * 1000), provider
+            )
+        except Exception as e:
+            logger.warning(f"LLM rate limiter unavailable, not limiting: {e}")
+            return 0.0
+        return int(wait_ms) / 1000
+
+    async def acquire(
+        self,
+        provider: str,
+        key_id: str,
+        tokens: int,
+        user_id: Optional[int] = None
+    ) -> Optional[Reservation]:
+        """
+        Wait for capacity for one call
+
+        Args:
+            provider: AI provider
+            key_id: Hash identifying the API key
+            tokens: Tokens the call may use (prompt + max_tokens)
+            user_id: User the call is for (fair-share queue; None = shared)
+
+        Returns:
+            Reservation, or None if the provider isn't limited
+
+        Raises:
+            RateLimitWaitExceeded: The wait would exceed LLM_RATE_LIMIT_MAX_WAIT
+        """
+        rpm, tpm = self.limits.get(provider, (0, 0))
+        if not LLM_RATE_LIMIT_ENABLED or (rpm <= 0 and tpm <= 0):
+            return None
+
+        bucket = self._bucket(provider, key_id)
+        reservation = Reservation(provider, bucket, tokens if tpm > 0 else 0)
+
+        # Nobody waiting in this worker: try the bucket directly
+        queue = self._queues.get(bucket)
+        if not queue:
+            wait = await self._take(provider, bucket, reservation.tokens)
+            if wait == 0:
+                return reservation
+            if wait > self.max_wait:
+                await self._record_wait(provider, 0.0, rejected=True)
+                raise RateLimitWaitExceeded(wait)
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        waiter = _Waiter(loop.create_future(), reservation.tokens, started + self.max_wait)
+
+        queue = self._queues.setdefault(bucket, _FairQueue())
+        queue.put(user_id, waiter)
+        if bucket not in self._dispatchers:
+            self._dispatchers[bucket] = loop.create_task(self._dispatch(provider, bucket, queue))
+
+        try:
+            await waiter.future
+        except RateLimitWaitExceeded:
+            await self._record_wait(provider, loop.time() - started, rejected=True)
+            raise
+
+        reservation.waited = loop.time() - started
+        await self._record_wait(provider, reservation.waited)
+        return reservation
+
+    async def _dispatch(self, provider: str, bucket: str, queue: _FairQueue):
+        """Grant one queued call at a time, as the buckets refill"""
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                waiter = queue.next()
+                if waiter is None:
+                    return
+
+                while not waiter.future.done():
+                    wait = await self._take(provider, bucket, waiter.tokens)
+                    if wait == 0:
+                        waiter.future.set_result(None)
+                    elif loop.time() + wait > waiter.deadline:
+                        waiter.future.set_exception(RateLimitWaitExceeded(wait))
+                    else:
+                        await asyncio.sleep(wait)
+        finally:
+            self._dispatchers.pop(bucket, None)
+            if not queue:
+                self._queues.pop(bucket, None)
+
+    async def settle(self, reservation: Optional[Reservation], used_tokens: int):
+        """Return the reserved tokens a finished call didn't use"""
+        if reservation is None or not reservation.tokens:
+            return
+
+        unused = reservation.tokens - used_tokens
+        if unused == 0:
+            return
+
+        _, tpm = self.limits[reservation.provider]
+        try:
+            redis = await get_async_redis_client()
+            await redis.eval(_SETTLE_SCRIPT, 1, reservation.bucket, unused, tpm)
+        except Exception as e:
+            logger.warning(f"Failed to settle LLM rate limit reservation: {e}")
+
+    async def throttle(self, provider: str, key_id: str):
+        """The provider answered 429: empty the key's buckets for every worker"""
+        if not LLM_RATE_LIMIT_ENABLED or provider not in self.limits:
+            return
+
+        try:
+            redis = await get_async_redis_client()
+            pipe = redis.pipeline(transaction=False)
+            pipe.hset(self._bucket(provider, key_id), mapping={
+                "requests": 0, "tokens": 0, "ts": int(time.time() * 1000)
+            })
+            pipe.hincrby(STATS_KEY, f"{provider}:provider_429s", 1)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to throttle LLM rate limit bucket: {e}")
+
+    async def _record_wait(self, provider: str, waited: float, rejected: bool = False):
+        try:
+            redis = await get_async_redis_client()
+            pipe = redis.pipeline(transaction=False)
+            if rejected:
+                pipe.hincrby(STATS_KEY, f"{provider}:rejected", 1)
+            else:
+                pipe.hincrby(STATS_KEY, f"{provider}:queued", 1)
+            pipe.hincrby(STATS_KEY, f"{provider}:wait_ms", int(waited * 1000))
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to record LLM rate limit wait: {e}")
+
+    def waiting(self) -> Dict[str, int]:
+        """Calls waiting in this worker, per provider"""
+        waiting: Dict[str, int] = {}
+        for bucket, queue in self._queues.items():
+            provider = bucket.split(":")[1]
+            waiting[provider] = waiting.get(provider, 0) + len(queue)
+        return waiting
+
+
+llm_rate_limiter = LLMRateLimiter(LLM_RATE_LIMITS, LLM_RATE_LIMIT_MAX_WAIT)
+
+
+async def get_rate_limit_stats() -> Dict[str, Any]:
+    """
+    Calls, queued calls and queue wait time per provider, across all workers
+
+    Returns:
+        Dictionary per provider, plus the calls waiting in this worker
+    """
+    redis = await get_async_redis_client()
+    counters = await redis.hgetall(STATS_KEY)
+
+    stats: Dict[str, Any] = {"enabled": LLM_RATE_LIMIT_ENABLED}
+    waiting = llm_rate_limiter.waiting()
+
+    for provider, (rpm, tpm) in LLM_RATE_LIMITS.items():
+        calls = int(counters.get(f"{provider}:calls", 0))
+        queued = int(counters.get(f"{provider}:queued", 0))
+        wait_ms = int(counters.get(f"{provider}:wait_ms", 0))
+        waits = queued + int(counters.get(f"{provider}:rejected", 0))
+
+        stats[provider] = {
+            "rpm_limit": rpm or None,
+            "tpm_limit": tpm or None,
+            "calls": calls,
+            "queued": queued,
+            "queued_percent": round(queued / calls * 100, 2) if calls else 0.0,
+            "avg_queue_wait_ms": round(wait_ms / waits, 1) if waits else 0.0,
+            "total_queue_wait_ms": wait_ms,
+            "rejected": int(counters.get(f"{provider}:rejected", 0)),
+            "provider_429s": int(counters.get(f"{provider}:provider_429s", 0)),
+            "waiting_in_worker": waiting.get(provider, 0),
+        }
+
+    return stats
@@ -0,0 +1,196 @@
+"""
+LLM Usage Metrics
+
+Tokens and estimated cost of every LLM call, counted in Redis across workers
+per user and per UTC day:
+
+    llmusage:user:{user_id}:{YYYYMMDD}   calls, prompt/completion/total tokens,
+                                         cost_usd, tokens per operation
+    llmusage:total:{YYYYMMDD}            the same for all users, plus tokens
+                                         per model
+    llmusage:calls:{user_id}             the user's most recent calls
+
+Calls are recorded by LLMClient (src/utils/llm_client.py) with the token
+usage the provider reports (counted with utils/token_budget.py when it
+reports none), attributed to the `user_id` of the call context.
+
+AI_DAILY_TOKEN_QUOTA (0 = unlimited) is enforced with check_token_quota
+before a generation starts. Metrics are best effort: if Redis is
+unavailable nothing is recorded and quotas are not enforced.
+"""
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from loguru import logger
+
+from config.redis_config import get_async_redis_client, RedisConfig
+from config.settings import settings
+from utils.ai_content_cache import estimate_generation_cost
+
+
+def _day(offset: int = 0) -> str:
+    return (datetime.utcnow() - timedelta(days=offset)).strftime("%Y%m%d")
+
+
+def _user_key(user_id: int, day: str) -> str:
+    return f"llmusage:user:{user_id}:{day}"
+
+
+def _total_key(day: str) -> str:
+    return f"llmusage:total:{day}"
+
+
+def _calls_key(user_id: int) -> str:
+    return f"llmusage:calls:{user_id}"
+
+
+def _parse_counters(counters: Dict[str, str]) -> Dict[str, Any]:
+    """Typed summary of a usage hash"""
+    usage = {
+        "calls": int(counters.get("calls", 0)),
+        "prompt_tokens": int(counters.get("prompt_tokens", 0)),
+        "completion_tokens": int(counters.get("completion_tokens", 0)),
+        "total_tokens": int(counters.get("total_tokens", 0)),
+        "cost_usd": round(float(counters.get("cost_usd", 0.0)), 4),
+    }
+    for field, value in counters.items():
+        group, _, name = field.partition(":")
+        if group in ("operation", "model") and name:
+            usage.setdefault(f"tokens_by_{group}", {})[name] = int(value)
+    return usage
+
+
+async def record_llm_usage(
+    provider: str,
+    model: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    user_id: Optional[int] = None,
+    operation: Optional[str] = None,
+    cost_factor: float = 1.0
+):
+    """
+    Record one completed LLM call (never raises)
+
+    Args:
+        provider: AI provider
+        model: Model name
+        prompt_tokens: Input tokens
+        completion_tokens: Output tokens
+        user_id: User the call was made for (None = only counted in totals)
+        operation: What the call was for (e.g. "summarize_articles")
+        cost_factor: Price relative to the regular API (e.g. 0.5 for batch APIs)
+    """
+    total_tokens = prompt_tokens + completion_tokens
+    cost = estimate_generation_cost(model, prompt_tokens, completion_tokens) * cost_factor
+    operation = operation or "other"
+    day = _day()
+
+    keys = [_total_key(day)]
+    if user_id is not None:
+        keys.append(_user_key(user_id, day))
+
+    try:
+        redis = await get_async_redis_client()
+        pipe = redis.pipeline(transaction=False)
+
+        for key in keys:
+            pipe.hincrby(key, "calls", 1)
+            pipe.hincrby(key, "prompt_tokens", prompt_tokens)
+            pipe.hincrby(key, "completion_tokens", completion_tokens)
+            pipe.hincrby(key, "total_tokens", total_tokens)
+            pipe.hincrbyfloat(key, "cost_usd", cost)
+            pipe.hincrby(key, f"operation:{operation}", total_tokens)
+            pipe.expire(key, RedisConfig.LLM_USAGE_TTL)
+
+        pipe.hincrby(_total_key(day), f"model:{model}", total_tokens)
+
+        if user_id is not None:
+            pipe.lpush(_calls_key(user_id), json.dumps({
+                "at": int(time.time()),
+                "provider": provider,
+                "model": model,
+                "operation": operation,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "cost_usd": round(cost, 6),
+            }))
+            pipe.ltrim(_calls_key(user_id), 0, RedisConfig.LLM_USAGE_RECENT_CALLS - 1)
+            pipe.expire(_calls_key(user_id), RedisConfig.LLM_USAGE_TTL)
+
+        await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to record LLM usage: {e}")
+
+
+async def get_user_usage(user_id: int, days: int = 7) -> Dict[str, Any]:
+    """
+    A user's LLM usage
+
+    Args:
+        user_id: User ID
+        days: Days of daily totals to return (today first)
+
+    Returns:
+        Dictionary with today's usage, daily totals and the recent calls
+    """
+    redis = await get_async_redis_client()
+    dates = [_day(offset) for offset in range(max(days, 1))]
+
+    pipe = redis.pipeline(transaction=False)
+    for day in dates:
+        pipe.hgetall(_user_key(user_id, day))
+    pipe.lrange(_calls_key(user_id), 0, -1)
+    *daily, calls = await pipe.execute()
+
+    daily_usage = [
+        {"date": day, **_parse_counters(counters)}
+        for day, counters in zip(dates, daily)
+    ]
+
+    return {
+        "today": daily_usage[0],
+        "daily": daily_usage,
+        "daily_token_quota": settings.AI_DAILY_TOKEN_QUOTA or None,
+        "recent_calls": [json.loads(call) for call in calls],
+    }
+
+
+async def get_usage_totals(days: int = 1) -> List[Dict[str, Any]]:
+    """LLM usage of all users per day (today first)"""
+    redis = await get_async_redis_client()
+    dates = [_day(offset) for offset in range(max(days, 1))]
+
+    pipe = redis.pipeline(transaction=False)
+    for day in dates:
+        pipe.hgetall(_total_key(day))
+    daily = await pipe.execute()
+
+    return [{"date": day, **_parse_counters(counters)} for day, counters in zip(dates, daily)]
+
+
+async def check_token_quota(user_id: int) -> Tuple[bool, Dict[str, Any]]:
+    """
+    Check a user's daily LLM token quota (AI_DAILY_TOKEN_QUOTA)
+
+    Returns:
+        Tuple of (is_allowed, quota info with daily_limit, used, remaining)
+    """
+    limit = settings.AI_DAILY_TOKEN_QUOTA
+    if limit <= 0:
+        return True, {"daily_limit": None, "used": None, "remaining": None}
+
+    try:
+        redis = await get_async_redis_client()
+        used = int(await redis.hget(_user_key(user_id, _day()), "total_tokens") or 0)
+    except Exception as e:
+        logger.warning(f"Token quota unavailable for user {user_id}: {e}")
+        return True, {"daily_limit": limit, "used": None, "remaining": None}
+
+    info = {"daily_limit": limit, "used": used, "remaining": max(0, limit - used)}
+    if used >= limit:
+        logger.warning(f"Daily token quota exceeded for user {user_id}: {used}/{limit}")
+        return False, info
+
+    return True, info
@@ -5,12 +5,15 @@ Provides cached database queries and cache invalidation strategies
 for posts endpoints.
 
 Caching Strategy:
-- List posts: 1 minute TTL (high traffic, frequently updated)
-- Single post: 5 minutes TTL (moderate traffic)
+- List posts: 1 minute TTL, caching only the page's post IDs; posts are
+  hydrated from per-post entries with one multi-get (shared with detail views)
+- Single post: 1 minute TTL (same entry hydrates list pages, so it shares
+  their TTL)
 - Post status: 30 seconds TTL (generation status changes frequently)
 - Connections: 5 minutes TTL (infrequent changes)
 
-Cache Invalidation:
+Cache Invalidation (tag-based, see utils.cache_manager.invalidate_tags):
+- Post lists are tagged "user:{id}:posts", connections "user:{id}:connections"
 - On post create: invalidate user's post list
 - On post update: invalidate specific post + user's post list
 - On post delete: invalidate specific post + user's post list
@@ -27,16 +30,37 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from database import Post
 from database_social_media import SocialMediaConnection
-from utils.cache_manager import cache, cached, CacheManager
+from utils.cache_manager import get_cache
+from utils.data_version import bump_data_version
 from config.redis_config import RedisConfig
 
 
+# Keys live under "posts:" (policy in utils/cache_manager.py)
+cache = get_cache("posts")
+
+
+def _post_to_dict(post: Post) -> Dict[str, Any]:
+    """Cacheable representation of a post"""
+    return {
+        "id": post.id,
+        "article_title": post.article_title,
+        "twitter_content": post.twitter_content,
+        "linkedin_content": post.linkedin_content,
+        "threads_content": post.threads_content,
+        "instagram_caption": post.instagram_caption,
+        "platforms": post.platforms or [],
+        "status": post.status,
+        "created_at": post.created_at.isoformat() if post.created_at else None,
+        "published_at": post.published_at.isoformat() if post.published_at else None,
+    }
+
+
 # Cached database queries
 class PostsCache:
     """Centralized caching for posts API endpoints."""
 
     def __init__(self):
-        self.cache = CacheManager(namespace="posts")
+        self.cache = cache
 
     # =========================================================================
     # CACHED QUERIES
@@ -52,44 +76,43 @@ class PostsCache:
         """
         Get user's posts with caching (1 minute TTL).
 
-        Cache key: posts:user:{user_id}:list:skip:{skip}:limit:{limit}
+        The page caches only its ordered post IDs; posts are hydrated from
+        the per-post entries used by get_single_post, loading only misses.
+        Concurrent misses for the same page run the query once (single-flight).
+
+        Cache keys: posts:user:{user_id}:list:skip:{skip}:limit:{limit} (IDs),
+                    posts:post:{post_id}:user:{user_id} (posts)
         """
         cache_key = f"user:{user_id}:list:skip:{skip}:limit:{limit}"
 
-        # Try cache
-        cached_result = await cache.get(cache_key)
-        if cached_result is not None:
-            logger.debug(f"Cache HIT: User posts for user_id={user_id}")
-            return cached_result
-
-        # Cache miss - query database
-        logger.debug(f"Cache MISS: User posts for user_id={user_id}")
-        posts = db.query(Post).filter(Post.user_id == user_id)\
-            .order_by(Post.created_at.desc())\
-            .offset(skip)\
-            .limit(limit)\
-            .all()
-
-        # Convert to dict for caching
-        result = [
-            {
-                "id": post.id,
-                "article_title": post.article_title,
-                "twitter_content": post.twitter_content,
-                "linkedin_content": post.linkedin_content,
-                "threads_content": post.threads_content,
-                "instagram_caption": post.instagram_caption,
-                "platforms": post.platforms or [],
-                "status": post.status,
-                "created_at": post.created_at.isoformat() if post.created_at else None,
-                "published_at": post.published_at.isoformat() if post.published_at else None,
-            }
-            for post in posts
-        ]
+        async def load_post_ids():
+            logger.debug(f"Cache MISS: User posts for user_id={user_id}")
+            rows = db.query(Post.id).filter(Post.user_id == user_id)\
+                .order_by(Post.created_at.desc())\
+                .offset(skip)\
+                .limit(limit)\
+                .all()
+            return [row.id for row in rows]
 
         # Cache for 1 minute (short TTL for frequently changing data)
-        await cache.set(cache_key, result, ttl=RedisConfig.CACHE_TTL_SHORT)
-        return result
+        post_ids = await cache.get_or_set(
+            cache_key,
+            load_post_ids,
+            ttl=RedisConfig.CACHE_TTL_SHORT,
+            tags=[f"user:{user_id}:posts"]
+        )
+
+        async def load_posts(ids: List[int]) -> Dict[int, Dict[str, Any]]:
+            posts = db.query(Post).filter(Post.id.in_(ids), Post.user_id == user_id).all()
+            return {post.id: _post_to_dict(post) for post in posts}
+
+        # Same short TTL as the list, so list pages stay as fresh as before
+        return await cache.hydrate(
+            post_ids,
+            lambda post_id: f"post:{post_id}:user:{user_id}",
+            load_posts,
+            ttl=RedisConfig.CACHE_TTL_SHORT
+        )
 
     @staticmethod
     async def get_single_post(
@@ -98,9 +121,10 @@ class PostsCache:
         user_id: int
     ) -> Optional[Dict[str, Any]]:
         """
-        Get single post with caching (5 minutes TTL).
+        Get single post with caching (1 minute TTL).
 
-        Cache key: posts:post:{post_id}:user:{user_id}
+        Cache key: posts:post:{post_id}:user:{user_id}. List pages hydrate
+        from the same entry, so it uses the list TTL to keep them as fresh.
         """
         cache_key = f"post:{post_id}:user:{user_id}"
 
@@ -121,21 +145,10 @@ class PostsCache:
             return None
 
         # Convert to dict
-        result = {
-            "id": post.id,
-            "article_title": post.article_title,
-            "twitter_content": post.twitter_content,
-            "linkedin_content": post.linkedin_content,
-            "threads_content": post.threads_content,
-            "instagram_caption": post.instagram_caption,
-            "platforms": post.platforms or [],
-            "status": post.status,
-            "created_at": post.created_at.isoformat() if post.created_at else None,
-            "published_at": post.published_at.isoformat() if post.published_at else None,
-        }
+        result = _post_to_dict(post)
 
-        # Cache for 5 minutes
-        await cache.set(cache_key, result, ttl=RedisConfig.CACHE_TTL_MEDIUM)
+        # Cache for 1 minute (same TTL as list hydration)
+        await cache.set(cache_key, result, ttl=RedisConfig.CACHE_TTL_SHORT)
         return result
 
     @staticmethod
@@ -206,7 +219,12 @@ class PostsCache:
         }
 
         # Cache for 5 minutes
-        await cache.set(cache_key, result, ttl=RedisConfig.CACHE_TTL_MEDIUM)
+        await cache.set(
+            cache_key,
+            result,
+            ttl=RedisConfig.CACHE_TTL_MEDIUM,
+            tags=[f"user:{user_id}:connections"]
+        )
         return result
 
     # =========================================================================
@@ -223,8 +241,8 @@ class PostsCache:
         - Post deleted
         - Post status changes (draft → published)
         """
-        pattern = f"user:{user_id}:list:*"
-        deleted = await cache.delete_pattern(pattern)
+        deleted = await cache.invalidate_tags(f"user:{user_id}:posts")
+        await bump_data_version(user_id, "posts")
         logger.info(f"Invalidated {deleted} cached post list entries for user {user_id}")
 
     @staticmethod
@@ -238,6 +256,8 @@ class PostsCache:
         """
         cache_key = f"post:{post_id}:user:{user_id}"
         await cache.delete(cache_key)
+        # List responses embed the post, so their ETags change too
+        await bump_data_version(user_id, "posts")
         logger.info(f"Invalidated cached post {post_id}")
 
     @staticmethod
@@ -277,8 +297,7 @@ class PostsCache:
         - User connects/disconnects social media account
         - OAuth token refreshed
         """
-        pattern = f"connections:user:{user_id}:*"
-        deleted = await cache.delete_pattern(pattern)
+        deleted = await cache.invalidate_tags(f"user:{user_id}:connections")
         logger.info(f"Invalidated {deleted} cached connection entries for user {user_id}")
 
 
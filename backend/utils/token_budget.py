@@ -0,0 +1,157 @@
+"""
+Token Budget Utilities
+
+Token counts for sizing LLM prompts and accounting for their cost.
+
+- OpenAI models are counted exactly, with the model's own tiktoken encoding
+- Other providers' tokenizers aren't available locally: their counts are the
+  cl100k_base count scaled by the tokenizer's ratio to it
+  (TOKENIZER_CALIBRATION; compare against the provider-reported usage in
+  utils/llm_usage.py to adjust)
+- Without tiktoken, or without its encoding files (downloaded on first use;
+  set TIKTOKEN_CACHE_DIR to provide them offline), counts fall back to
+  characters / CHARS_PER_TOKEN
+
+Counts are memoized per text, and article counts are computed once at
+enrichment time and stored next to the text (`ai_context_tokens`), so prompt
+assembly mostly adds up numbers.
+"""
+import math
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
+from loguru import logger
+
+
+# Average characters per token for English prose across OpenAI/Anthropic tokenizers
+CHARS_PER_TOKEN = 4
+
+# Encoding for texts counted without a model, and the base for other providers
+BASE_ENCODING = "cl100k_base"
+
+# Tokens per cl100k_base token, by model name prefix (non-OpenAI tokenizers)
+TOKENIZER_CALIBRATION = {
+    "claude": 1.15,
+    "deepseek": 1.05,
+}
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(name: str) -> Optional[Any]:
+    """tiktoken encoding by name (None if tiktoken or its files are unavailable)"""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        logger.warning(f"tiktoken encoding {name} unavailable, estimating token counts: {e}")
+        return None
+
+
+@lru_cache(maxsize=256)
+def _tokenizer(model: Optional[str]) -> Tuple[Optional[Any], float]:
+    """(encoding, calibration factor) used to count tokens for a model"""
+    model = (model or "").lower()
+
+    for prefix, factor in TOKENIZER_CALIBRATION.items():
+        if model.startswith(prefix):
+            return _get_encoding(BASE_ENCODING), factor
+
+    name = BASE_ENCODING
+    if model:
+        try:
+            from tiktoken.model import encoding_name_for_model
+            name = encoding_name_for_model(model)
+        except Exception:
+            pass  # Unknown model (or no tiktoken): base encoding
+
+    return _get_encoding(name), 1.0
+
+
+@lru_cache(maxsize=2048)
+def _count_tokens(text: str, model: Optional[str]) -> int:
+    encoding, factor = _tokenizer(model)
+    if encoding is None:
+        return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+    return max(1, math.ceil(len(encoding.encode(text, disallowed_special=())) * factor))
+
+
+def estimate_tokens(text: Optional[str], model: Optional[str] = None) -> int:
+    """
+    Count the tokens of a text
+
+    Args:
+        text: Text to measure
+        model: Model the text is sent to (None = cl100k_base)
+
+    Returns:
+        Token count (0 for empty text); exact for OpenAI models
+    """
+    if not text:
+        return 0
+    return _count_tokens(text, model)
+
+
+def truncate_to_tokens(text: Optional[str], max_tokens: int, model: Optional[str] = None) -> str:
+    """
+    Cut text to fit a token budget, preferring a sentence or word boundary
+
+    Args:
+        text: Text to truncate
+        max_tokens: Token budget
+        model: Model the text is sent to (None = cl100k_base)
+
+    Returns:
+        Text within the budget ("..." appended if cut)
+    """
+    if not text or max_tokens <= 0:
+        return ""
+
+    if estimate_tokens(text, model) <= max_tokens:
+        return text
+
+    encoding, factor = _tokenizer(model)
+    if encoding is None:
+        max_chars = max_tokens * CHARS_PER_TOKEN - 3
+    else:
+        # Leave a token for the "..."
+        keep = max(0, int((max_tokens - 1) / factor))
+        max_chars = len(encoding.decode(encoding.encode(text, disallowed_special=())[:keep]))
+
+    cut = text[:max_chars]
+
+    # Back up to the last sentence end, or failing that the last space
+    boundary = max(cut.rfind(". "), cut.rfind(".\n"))
+    if boundary > max_chars // 2:
+        return cut[:boundary + 1]
+
+    space = cut.rfind(" ")
+    if space > max_chars // 2:
+        cut = cut[:space]
+
+    return cut.rstrip() + "..."
+
+
+def allocate_token_budget(token_counts: List[int], budget: int) -> List[int]:
+    """
+    Split a token budget across texts
+
+    Texts under an equal share keep all their tokens; what they leave unused
+    is shared by the longer ones, so short texts don't waste budget that
+    long ones need.
+
+    Args:
+        token_counts: Tokens of each text
+        budget: Total token budget
+
+    Returns:
+        Tokens allowed for each text (in the same order)
+    """
+    allocation = [0] * len(token_counts)
+    remaining = max(budget, 0)
+
+    by_size = sorted(range(len(token_counts)), key=token_counts.__getitem__)
+    for position, index in enumerate(by_size):
+        share = remaining // (len(token_counts) - position)
+        allocation[index] = min(token_counts[index], share)
+        remaining -= allocation[index]
+
+    return allocation